@@ -0,0 +1,297 @@
+#!/usr/bin/env python3
+"""
+CryptSIST Price Fetcher Benchmark
+=================================
+Drives EnhancedPriceFetcher (threads) and AsyncEnhancedPriceFetcher (asyncio)
+against the local provider stand-in (dependencies/provider_standin.py) under
+scripted scenarios:
+
+    cold_start    first lookup of every symbol on a fresh fetcher
+    warm_cache    repeated lookups once every provider result is cached
+    outage        the primary provider answers 503 to everything
+    rate_limited  429 storm: most provider requests are rate limited
+    overview      get_market_overview over a large symbol list (500 by default)
+
+For each scenario and fetcher it reports get_comprehensive_price_data (or
+get_market_overview) latency percentiles, requests per provider as seen by
+the stand-in, the fetcher's cache hit ratio, circuit breaker activity and
+wall time. Persistent/shared caches and provider budgets are disabled so
+scenarios do not leak into each other or into ~/.cryptsist.
+
+Usage:
+    python benchmarks/bench_price_fetcher.py [--symbols 50] [--overview-symbols 500]
+        [--latency 0.02] [--scenarios cold_start,warm_cache] [--fetchers sync,async] [--json]
+"""
+
+import argparse
+import asyncio
+import concurrent.futures
+import contextlib
+import json
+import logging
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+root_dir = os.path.dirname(current_dir)
+sys.path.insert(0, os.path.join(root_dir, 'dependencies'))
+sys.path.insert(0, os.path.join(root_dir, 'config'))
+
+# Isolate the process-wide components before they are first built
+os.environ['CRYPTSIST_PRICE_CACHE_DB'] = ''
+os.environ['CRYPTSIST_CACHE_BACKEND'] = 'none'
+os.environ['CRYPTSIST_RATE_LIMIT_STATE'] = ''
+os.environ['CRYPTSIST_RATE_LIMITS'] = ','.join(
+    f"{provider}=-/-" for provider in ('coindesk', 'alpha_vantage', 'binance', 'coinmarketcap', 'coingecko')
+)
+os.environ['CRYPTSIST_HISTORY_DIR'] = tempfile.mkdtemp(prefix='cryptsist-bench-history-')
+
+# Component banners go to stderr so --json output stays parseable
+with contextlib.redirect_stdout(sys.stderr):
+    from async_price_fetcher import AsyncEnhancedPriceFetcher  # noqa: E402
+    from enhanced_price_fetcher import EnhancedPriceFetcher  # noqa: E402
+    from provider_standin import KNOWN_ASSETS, ProviderStandInServer  # noqa: E402
+
+SCENARIOS = ('cold_start', 'warm_cache', 'outage', 'rate_limited', 'overview')
+FETCHERS = ('sync', 'async')
+
+
+def latency_summary(samples: list) -> dict:
+    if not samples:
+        return {'count': 0}
+    p50, p95, p99 = np.percentile(np.asarray(samples) * 1000, [50, 95, 99])
+    return {
+        'count': len(samples),
+        'p50_ms': round(float(p50), 2),
+        'p95_ms': round(float(p95), 2),
+        'p99_ms': round(float(p99), 2),
+        'max_ms': round(max(samples) * 1000, 2)
+    }
+
+
+def reset_counters(fetcher: EnhancedPriceFetcher) -> None:
+    """Zero the cache counters so only the measured phase is reported"""
+    for name in fetcher.cache_stats:
+        fetcher.cache_stats[name] = 0
+
+
+def fetcher_report(fetcher: EnhancedPriceFetcher) -> dict:
+    cache = fetcher.get_cache_stats()
+    health = fetcher.get_provider_health()['providers']
+    return {
+        'cache_hit_ratio': cache['hit_ratio'],
+        'cache': {name: cache[name] for name in ('hits', 'misses', 'stale_hits', 'negative_hits',
+                                                 'negative_stores', 'refreshes')},
+        'breakers': {provider: {'state': stats['state'], 'times_opened': stats['times_opened'],
+                                'rejected': stats['rejected']}
+                     for provider, stats in health.items() if stats['times_opened'] or stats['rejected']}
+    }
+
+
+def standin_report(server: ProviderStandInServer) -> dict:
+    providers = server.get_stats()['providers']
+    return {
+        'provider_calls': {provider: stats['requests'] for provider, stats in providers.items()},
+        'provider_status': {provider: stats['status'] for provider, stats in providers.items()},
+        'total_provider_calls': sum(stats['requests'] for stats in providers.values())
+    }
+
+
+class SyncDriver:
+    """EnhancedPriceFetcher called from a pool of `concurrency` threads, like the server's workers"""
+
+    name = 'sync'
+
+    def __init__(self, server: ProviderStandInServer, concurrency: int):
+        self.server = server
+        self.concurrency = concurrency
+        self.fetcher = EnhancedPriceFetcher(base_urls=server.base_urls())
+        self.pool = concurrent.futures.ThreadPoolExecutor(concurrency, thread_name_prefix='bench')
+
+    def _timed(self, call, *args) -> tuple:
+        started = time.perf_counter()
+        result = call(*args)
+        return time.perf_counter() - started, result
+
+    def lookups(self, symbols: list) -> tuple:
+        """Latencies and failed count of get_comprehensive_price_data over symbols"""
+        results = list(self.pool.map(lambda s: self._timed(self.fetcher.get_comprehensive_price_data, s),
+                                     symbols))
+        return [latency for latency, _ in results], sum(1 for _, quote in results if not quote.success)
+
+    def overview(self, symbols: list) -> tuple:
+        latency, result = self._timed(self.fetcher.get_market_overview, symbols)
+        return [latency], result['total_symbols'] - result['successful_fetches']
+
+    def close(self) -> None:
+        self.pool.shutdown(wait=True)
+        if self.fetcher.fanout_pool is not None:
+            self.fetcher.fanout_pool.shutdown(wait=False, cancel_futures=True)
+
+
+class AsyncDriver:
+    """AsyncEnhancedPriceFetcher with up to `concurrency` lookups in flight on one event loop"""
+
+    name = 'async'
+
+    def __init__(self, server: ProviderStandInServer, concurrency: int):
+        self.server = server
+        self.concurrency = concurrency
+        self.loop = asyncio.new_event_loop()
+        self.fetcher = AsyncEnhancedPriceFetcher(base_urls=server.base_urls())
+
+    async def _lookups(self, symbols: list) -> list:
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def timed(symbol):
+            async with semaphore:
+                started = time.perf_counter()
+                quote = await self.fetcher.get_comprehensive_price_data(symbol)
+                return time.perf_counter() - started, quote
+
+        return await asyncio.gather(*(timed(symbol) for symbol in symbols))
+
+    def lookups(self, symbols: list) -> tuple:
+        results = self.loop.run_until_complete(self._lookups(symbols))
+        return [latency for latency, _ in results], sum(1 for _, quote in results if not quote.success)
+
+    def overview(self, symbols: list) -> tuple:
+        started = time.perf_counter()
+        result = self.loop.run_until_complete(self.fetcher.get_market_overview(symbols))
+        return [time.perf_counter() - started], result['total_symbols'] - result['successful_fetches']
+
+    def close(self) -> None:
+        self.loop.run_until_complete(self.fetcher.close())
+        self.loop.close()
+
+
+DRIVERS = {'sync': SyncDriver, 'async': AsyncDriver}
+
+
+def run_scenario(name: str, fetcher_kind: str, server: ProviderStandInServer, args: argparse.Namespace,
+                 symbols: list, overview_symbols: list) -> dict:
+    """One scenario on a fresh fetcher; only the measured phase is counted"""
+    server.clear_faults()
+    if args.latency or args.jitter:
+        server.set_faults('*', latency=args.latency, jitter=args.jitter)
+    driver = DRIVERS[fetcher_kind](server, args.concurrency)
+    try:
+        if name == 'warm_cache':
+            driver.lookups(symbols)
+        elif name == 'outage':
+            server.set_faults(args.outage_provider, latency=args.latency, jitter=args.jitter, down=True)
+        elif name == 'rate_limited':
+            server.set_faults('*', latency=args.latency, jitter=args.jitter, rate_limit_rate=args.storm_rate)
+        reset_counters(driver.fetcher)
+        server.reset_stats()
+
+        latencies, failed = [], 0
+        started = time.perf_counter()
+        for _ in range(args.rounds if name == 'warm_cache' else 1):
+            if name == 'overview':
+                samples, errors = driver.overview(overview_symbols)
+            else:
+                samples, errors = driver.lookups(symbols)
+            latencies += samples
+            failed += errors
+        wall = time.perf_counter() - started
+
+        report = {
+            'operation': 'get_market_overview' if name == 'overview' else 'get_comprehensive_price_data',
+            'symbols': len(overview_symbols if name == 'overview' else symbols),
+            'calls': len(latencies),
+            'failed_symbols': failed,
+            'wall_time_s': round(wall, 4),
+            'latency': latency_summary(latencies)
+        }
+        if name != 'overview':
+            report['lookups_per_sec'] = round(len(latencies) / wall, 1) if wall else None
+        report.update(standin_report(server))
+        report.update(fetcher_report(driver.fetcher))
+        return report
+    finally:
+        driver.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the price fetchers against the local provider stand-in")
+    parser.add_argument('--symbols', type=int, default=50, help="Symbols looked up per scenario")
+    parser.add_argument('--overview-symbols', type=int, default=500, help="Symbols in the overview scenario")
+    parser.add_argument('--rounds', type=int, default=5, help="Lookup rounds in the warm cache scenario")
+    parser.add_argument('--concurrency', type=int, default=8, help="Lookups in flight at once")
+    parser.add_argument('--latency', type=float, default=0.02, help="Stand-in latency per request (seconds)")
+    parser.add_argument('--jitter', type=float, default=0.01, help="Extra random stand-in latency (seconds)")
+    parser.add_argument('--outage-provider', default='coinmarketcap', help="Provider that is down in 'outage'")
+    parser.add_argument('--storm-rate', type=float, default=0.8, help="Share of 429 answers in 'rate_limited'")
+    parser.add_argument('--scenarios', default=','.join(SCENARIOS))
+    parser.add_argument('--fetchers', default=','.join(FETCHERS))
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--json', action='store_true', help="Print machine-readable JSON only")
+    args = parser.parse_args()
+
+    scenarios = [name for name in args.scenarios.split(',') if name]
+    fetchers = [name for name in args.fetchers.split(',') if name]
+    unknown = (set(scenarios) - set(SCENARIOS)) | (set(fetchers) - set(FETCHERS))
+    if unknown:
+        parser.error(f"unknown scenario/fetcher: {', '.join(sorted(unknown))}")
+
+    # Injected failures are expected; keep provider error logs out of the output
+    logging.disable(logging.ERROR)
+    universe = max(args.symbols, args.overview_symbols)
+    server = ProviderStandInServer(extra_symbols=max(0, universe - len(KNOWN_ASSETS)), seed=args.seed)
+    server.start_in_thread()
+    all_symbols = list(server.market.assets)
+    symbols, overview_symbols = all_symbols[:args.symbols], all_symbols[:args.overview_symbols]
+
+    results = {}
+    started = time.perf_counter()
+    try:
+        for name in scenarios:
+            results[name] = {}
+            for fetcher_kind in fetchers:
+                with contextlib.redirect_stdout(sys.stderr):
+                    results[name][fetcher_kind] = run_scenario(name, fetcher_kind, server, args,
+                                                               symbols, overview_symbols)
+    finally:
+        server.stop_thread()
+
+    report = {
+        'config': {
+            'symbols': args.symbols,
+            'overview_symbols': args.overview_symbols,
+            'rounds': args.rounds,
+            'concurrency': args.concurrency,
+            'standin_latency_s': args.latency,
+            'standin_jitter_s': args.jitter,
+            'outage_provider': args.outage_provider,
+            'storm_rate': args.storm_rate
+        },
+        'wall_time_s': round(time.perf_counter() - started, 3),
+        'results': results
+    }
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return
+
+    print(f"📊 Price fetcher benchmark ({args.symbols} symbols, overview {args.overview_symbols}, "
+          f"stand-in latency {args.latency * 1000:.0f}±{args.jitter * 1000:.0f} ms)")
+    print("=" * 100)
+    print(f"{'scenario':13} {'fetcher':7} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'wall s':>8} "
+          f"{'hit ratio':>9} {'failed':>6}  provider calls")
+    for name, by_fetcher in results.items():
+        for fetcher_kind, result in by_fetcher.items():
+            latency = result['latency']
+            calls = ', '.join(f"{provider}={count}" for provider, count in sorted(result['provider_calls'].items()))
+            print(f"{name:13} {fetcher_kind:7} {latency.get('p50_ms', 0):>9.2f} {latency.get('p95_ms', 0):>9.2f} "
+                  f"{latency.get('p99_ms', 0):>9.2f} {result['wall_time_s']:>8.3f} {result['cache_hit_ratio']:>9.2%} "
+                  f"{result['failed_symbols']:>6}  {calls or '-'}")
+    print(f"\n⏱️ Total wall time: {report['wall_time_s']}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+CryptSIST Signal Response Benchmark
+===================================
+Measures requests/sec on a single core for cache hits on /signal/{symbol} and
+/signals/batch, with the model (Pydantic + default JSON encoder) path versus
+the pre-encoded response path.
+
+The ASGI app is driven in-process without sockets so the numbers reflect
+server-side request handling only.
+
+Usage:
+    python benchmarks/bench_signal_responses.py [--seconds 3] [--batch-size 20] [--json]
+"""
+
+import argparse
+import asyncio
+import contextlib
+import json
+import logging
+import os
+import sys
+import time
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+root_dir = os.path.dirname(current_dir)
+sys.path.insert(0, os.path.join(root_dir, 'server'))
+
+# Keep per-request logging out of the measurement and don't start background tasks
+os.environ.setdefault('CRYPTSIST_REFRESHER_ENABLED', 'false')
+
+# Component banners go to stderr so --json output stays parseable
+with contextlib.redirect_stdout(sys.stderr):
+    import mt5_server  # noqa: E402
+
+
+def build_scope(path: str, query: str = "") -> dict:
+    return {
+        'type': 'http',
+        'asgi': {'version': '3.0'},
+        'http_version': '1.1',
+        'method': 'GET',
+        'scheme': 'http',
+        'path': path,
+        'raw_path': path.encode(),
+        'query_string': query.encode(),
+        'root_path': '',
+        'headers': [(b'host', b'bench')],
+        'client': ('127.0.0.1', 50000),
+        'server': ('bench', 80)
+    }
+
+
+async def call(app, scope: dict) -> int:
+    status = 0
+
+    async def receive():
+        return {'type': 'http.request', 'body': b'', 'more_body': False}
+
+    async def send(message):
+        nonlocal status
+        if message['type'] == 'http.response.start':
+            status = message['status']
+
+    await app(scope, receive, send)
+    return status
+
+
+async def measure(app, scope: dict, seconds: float) -> dict:
+    # Warm up (fills the cache and route lookup caches)
+    for _ in range(50):
+        await call(app, scope)
+
+    requests = 0
+    cpu_start = time.process_time()
+    wall_start = time.perf_counter()
+    while time.perf_counter() - wall_start < seconds:
+        for _ in range(100):
+            status = await call(app, scope)
+            if status != 200:
+                raise RuntimeError(f"Unexpected status {status} for {scope['path']}")
+        requests += 100
+    cpu = time.process_time() - cpu_start
+    wall = time.perf_counter() - wall_start
+    return {
+        'requests': requests,
+        'requests_per_sec': round(requests / wall, 1),
+        'requests_per_cpu_sec': round(requests / cpu, 1) if cpu else None,
+        'us_per_request': round(cpu / requests * 1e6, 1)
+    }
+
+
+async def run(seconds: float, batch_size: int) -> dict:
+    app = mt5_server.app
+    mt5_server.SIGNAL_TTL = 1e9  # every measured request is a cache hit
+
+    base_symbols = ['BTCUSD', 'ETHUSD', 'LTCUSD', 'BCHUSD', 'XRPUSD']
+    symbols = ','.join((base_symbols + [f'C{i}USD' for i in range(batch_size)])[:batch_size])
+    scenarios = {
+        'signal_hit': build_scope('/signal/BTCUSD'),
+        f'batch_{batch_size}_hit': build_scope('/signals/batch', f'symbols={symbols}')
+    }
+
+    results = {}
+    for name, scope in scenarios.items():
+        mt5_server.PRE_ENCODED_RESPONSES = False
+        before = await measure(app, scope, seconds)
+        mt5_server.PRE_ENCODED_RESPONSES = True
+        after = await measure(app, scope, seconds)
+        results[name] = {
+            'model_path': before,
+            'pre_encoded': after,
+            'speedup': round(after['requests_per_cpu_sec'] / before['requests_per_cpu_sec'], 2)
+        }
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark cached signal responses")
+    parser.add_argument('--seconds', type=float, default=3.0, help="Measurement time per scenario")
+    parser.add_argument('--batch-size', type=int, default=20, help="Symbols per batch request")
+    parser.add_argument('--json', action='store_true', help="Print machine-readable JSON only")
+    args = parser.parse_args()
+
+    logging.disable(logging.INFO)
+    results = asyncio.run(run(args.seconds, args.batch_size))
+    report = {
+        'encoder': 'orjson' if 'orjson' in sys.modules else 'json',
+        'results': results
+    }
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return
+
+    print(f"📊 Signal response benchmark (encoder: {report['encoder']}, single core)")
+    print("=" * 70)
+    for name, result in results.items():
+        before, after = result['model_path'], result['pre_encoded']
+        print(f"{name:18} model path : {before['requests_per_cpu_sec']:>10,.0f} req/s per core "
+              f"({before['us_per_request']} µs/req)")
+        print(f"{'':18} pre-encoded: {after['requests_per_cpu_sec']:>10,.0f} req/s per core "
+              f"({after['us_per_request']} µs/req)  x{result['speedup']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -54,10 +54,23 @@ COINMARKETCAP_API_KEY = "5eb3dd16-b5f6-4d49-807a-2847fba9a0e8"
 # API ENDPOINTS AND CONFIGURATIONS
 # ============================================================================
 
+# Base URL produksi setiap provider harga. Bisa dialihkan per provider dengan
+# CRYPTSIST_<PROVIDER>_BASE_URL, atau sekaligus ke stand-in lokal
+# (dependencies/provider_standin.py) dengan CRYPTSIST_PROVIDER_STANDIN=http://host:port
+PROVIDER_BASE_URLS = {
+    "coindesk": "https://api.coindesk.com/v1",
+    "alpha_vantage": "https://www.alphavantage.co/query",
+    "newsapi": "https://newsapi.org/v2",
+    "cryptopanic": "https://cryptopanic.com/api/v1",
+    "binance": "https://api.binance.com/api/v3",
+    "coinmarketcap": "https://pro-api.coinmarketcap.com/v1",
+    "coingecko": "https://api.coingecko.com/api/v3"
+}
+
 API_CONFIGURATIONS = {
     "coindesk": {
         "api_key": COINDESK_API_KEY,
-        "base_url": "https://api.coindesk.com/v1",
+        "base_url": PROVIDER_BASE_URLS["coindesk"],
         "description": "CoinDesk API untuk data harga Bitcoin dan market data",
         "features": [
             "Real-time Bitcoin price",
@@ -71,7 +84,7 @@ API_CONFIGURATIONS = {
     
     "alpha_vantage": {
         "api_key": ALPHA_VANTAGE_API_KEY,
-        "base_url": "https://www.alphavantage.co/query",
+        "base_url": PROVIDER_BASE_URLS["alpha_vantage"],
         "description": "Alpha Vantage untuk data finansial dan cryptocurrency",
         "features": [
             "Daily/Weekly/Monthly crypto data",
@@ -86,7 +99,7 @@ API_CONFIGURATIONS = {
     
     "newsapi": {
         "api_key": NEWS_API_KEY,
-        "base_url": "https://newsapi.org/v2",
+        "base_url": PROVIDER_BASE_URLS["newsapi"],
         "description": "NewsAPI untuk berita global dan cryptocurrency",
         "features": [
             "Everything endpoint (search)",
@@ -101,7 +114,7 @@ API_CONFIGURATIONS = {
     
     "cryptopanic": {
         "api_key": CRYPTOPANIC_API_KEY,
-        "base_url": "https://cryptopanic.com/api/v1",
+        "base_url": PROVIDER_BASE_URLS["cryptopanic"],
         "description": "CryptoPanic untuk berita cryptocurrency dan sentiment",
         "features": [
             "Crypto-specific news",
@@ -117,7 +130,7 @@ API_CONFIGURATIONS = {
     
     "binance": {
         "api_key": BINANCE_API_KEY,
-        "base_url": "https://api.binance.com/api/v3",
+        "base_url": PROVIDER_BASE_URLS["binance"],
         "description": "Binance API untuk data market real-time cryptocurrency",
         "features": [
             "Real-time price tickers",
@@ -129,13 +142,14 @@ API_CONFIGURATIONS = {
             "Symbol price ticker"
         ],
         "rate_limit": "1200 requests/minute for most endpoints",
+        "request_weight": "ticker/price full list = 4, ticker/24hr full list = 80, ticker/24hr per pair = 2",
         "free_tier": True,
         "note": "Public data only - no trading functionality"
     },
     
     "coinmarketcap": {
         "api_key": COINMARKETCAP_API_KEY,
-        "base_url": "https://pro-api.coinmarketcap.com/v1",
+        "base_url": PROVIDER_BASE_URLS["coinmarketcap"],
         "description": "CoinMarketCap API untuk data market cap dan ranking cryptocurrency",
         "features": [
             "Real-time cryptocurrency prices",
@@ -173,14 +187,25 @@ def get_base_url(service_name: str) -> str:
     """
     Mendapatkan base URL untuk service tertentu
     
+    Urutan: CRYPTSIST_<SERVICE>_BASE_URL, lalu CRYPTSIST_PROVIDER_STANDIN
+    (<standin>/<service>), lalu base_url di API_CONFIGURATIONS / PROVIDER_BASE_URLS.
+    Environment dibaca setiap pemanggilan sehingga bisa diubah saat runtime.
+    
     Args:
         service_name (str): Nama service
     
     Returns:
         str: Base URL atau None jika tidak ditemukan
     """
+    override = os.environ.get(f"CRYPTSIST_{service_name.upper()}_BASE_URL")
+    if override:
+        return override.rstrip('/')
     config = API_CONFIGURATIONS.get(service_name)
-    return config.get('base_url') if config else None
+    default = config.get('base_url') if config else PROVIDER_BASE_URLS.get(service_name)
+    standin = os.environ.get('CRYPTSIST_PROVIDER_STANDIN')
+    if standin and default:
+        return f"{standin.rstrip('/')}/{service_name}"
+    return default
 
 def list_available_apis() -> List[str]:
     """
@@ -0,0 +1,558 @@
+"""
+Async Enhanced Price Fetcher on pooled aiohttp sessions
+Versi asyncio dari EnhancedPriceFetcher: session per host dengan keep-alive dan DNS cache,
+hasil dengan format yang sama, serta wrapper sync untuk pemanggil lama
+"""
+
+import asyncio
+import functools
+import json
+import threading
+import time
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+from urllib.parse import urlsplit
+
+import aiohttp
+import requests
+
+from enhanced_price_fetcher import EnhancedPriceFetcher, SourceFanOut
+from history_store import TIMEFRAME_SECONDS, last_closed_candle
+from micro_batch import AsyncMicroBatcher
+from quote import Quote
+from single_flight import SingleFlight
+
+
+class ProviderResponse:
+    """Buffered provider response exposing the parts of requests.Response the parsers use"""
+
+    __slots__ = ('status_code', 'content', 'url')
+
+    def __init__(self, status_code: int, content: bytes, url: str):
+        self.status_code = status_code
+        self.content = content
+        self.url = url
+
+    @property
+    def text(self) -> str:
+        return self.content.decode('utf-8', errors='replace')
+
+    def json(self) -> Any:
+        return json.loads(self.content)
+
+    def raise_for_status(self) -> None:
+        if self.status_code >= 400:
+            kind = 'Client' if self.status_code < 500 else 'Server'
+            raise requests.exceptions.HTTPError(f"{self.status_code} {kind} Error for url: {self.url}")
+
+
+class AsyncEnhancedPriceFetcher(EnhancedPriceFetcher):
+    """
+    asyncio variant of EnhancedPriceFetcher.
+
+    Provider methods keep their names and result dicts but are coroutines. Each
+    upstream host gets its own pooled ClientSession (keep-alive, cached DNS), so
+    many provider calls can be in flight on one event loop and a slow provider
+    cannot exhaust another provider's connections. Request building, parsing,
+    caching and metrics are shared with the sync fetcher; transport errors are
+    mapped to the requests exceptions the sync error handlers expect. Shared
+    cache backend reads run on worker threads and writes are queued, so
+    Redis or file I/O never blocks the loop.
+
+    Sessions belong to the event loop that first used them; call close() on
+    that loop when done.
+    """
+
+    def __init__(self, limit_per_host: int = 32, keepalive_timeout: float = 30.0,
+                 dns_cache_ttl: int = 300, base_urls: Optional[Dict[str, str]] = None):
+        super().__init__(base_urls)
+        self.limit_per_host = limit_per_host
+        self.keepalive_timeout = keepalive_timeout
+        self.dns_cache_ttl = dns_cache_ttl
+        self.sessions: Dict[str, aiohttp.ClientSession] = {}
+        # Background stale-while-revalidate refreshes (strong refs so they are not collected)
+        self.refresh_tasks: set = set()
+        # Concurrent coin index loads share one request
+        self.coin_index_flight = SingleFlight()
+
+    def _batcher(self, fetch_many) -> AsyncMicroBatcher:
+        return AsyncMicroBatcher(fetch_many, self.batch_window, self.batch_max_symbols)
+
+    def _schedule_refresh(self, key: str, refresh) -> None:
+        """Run the coroutine function refresh() once as a task on the running loop"""
+        if not self._claim_refresh(key):
+            return
+        task = asyncio.get_running_loop().create_task(refresh())
+        self.refresh_tasks.add(task)
+        task.add_done_callback(self.refresh_tasks.discard)
+        task.add_done_callback(lambda _: self._refresh_done(key))
+
+    def _get_cached_data(self, key: str, refresh=None, shared: bool = False) -> Optional[Dict]:
+        # The shared backend is read by _load_shared() off the loop, never here
+        return super()._get_cached_data(key, refresh, shared)
+
+    async def _get_cached(self, key: str, refresh=None) -> Optional[Dict]:
+        """_get_cached_data() after loading the key from the shared backend if needed"""
+        await self._load_shared([key])
+        return self._get_cached_data(key, refresh)
+
+    async def _load_shared(self, keys: List[str]) -> None:
+        """Pull locally missing or stale keys from the shared backend on a worker thread"""
+        if self.shared_cache is None:
+            return
+        missing = [key for key in keys if not self._is_cache_valid(key)]
+        if missing:
+            await asyncio.get_running_loop().run_in_executor(self._pool(), self._prefetch_cached, missing)
+
+    def _session(self, url: str) -> aiohttp.ClientSession:
+        host = urlsplit(url).netloc
+        session = self.sessions.get(host)
+        if session is None or session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=self.limit_per_host,
+                keepalive_timeout=self.keepalive_timeout,
+                ttl_dns_cache=self.dns_cache_ttl,
+                use_dns_cache=True
+            )
+            session = self.sessions[host] = aiohttp.ClientSession(connector=connector)
+        return session
+
+    async def _http_get(self, provider: str, url: str, params: Optional[Dict] = None,
+                        headers: Optional[Dict] = None, timeout: float = 10) -> ProviderResponse:
+        """Pooled GET with circuit breaker and budget checks, latency and error accounting"""
+        self._admit_request(provider)
+        started = time.perf_counter()
+        try:
+            async with self._session(url).get(url, params=params, headers=headers,
+                                              timeout=aiohttp.ClientTimeout(total=timeout)) as response:
+                content = await response.read()
+                status = response.status
+                final_url = str(response.url)
+        except asyncio.TimeoutError as e:
+            self._record_outcome(provider, time.perf_counter() - started, error='Timeout')
+            raise requests.exceptions.Timeout(f"{provider} request timed out after {timeout}s") from e
+        except aiohttp.ClientError as e:
+            self._record_outcome(provider, time.perf_counter() - started, error=type(e).__name__)
+            raise requests.exceptions.ConnectionError(str(e)) from e
+        except asyncio.CancelledError:
+            # Cancelled requests (abandoned fan-out sources, hedge losers) are not recorded
+            self.provider_health.release(provider)
+            raise
+        self._record_outcome(provider, time.perf_counter() - started, status=status)
+        return ProviderResponse(status, content, final_url)
+
+    async def close(self) -> None:
+        """Close all pooled sessions"""
+        for task in list(self.refresh_tasks) + list(self.coinmarketcap_batcher.tasks) + list(self.coingecko_batcher.tasks):
+            task.cancel()
+        sessions, self.sessions = list(self.sessions.values()), {}
+        for session in sessions:
+            await session.close()
+
+    def get_session_stats(self) -> Dict[str, Any]:
+        """Open sessions and pool limits per host"""
+        return {
+            'hosts': sorted(self.sessions),
+            'limit_per_host': self.limit_per_host,
+            'keepalive_timeout': self.keepalive_timeout,
+            'dns_cache_ttl': self.dns_cache_ttl
+        }
+
+    async def get_coindesk_bitcoin_price(self) -> Dict[str, Any]:
+        """
+        Get Bitcoin price from CoinDesk API - dengan fallback handling
+        """
+        cached = await self._get_cached("coindesk_btc", self._fetch_coindesk)
+        if cached:
+            return cached
+        return await self._fetch_coindesk()
+
+    async def _fetch_coindesk(self) -> Dict[str, Any]:
+        cache_key = "coindesk_btc"
+        try:
+            response = await self._http_get(**self._coindesk_request())
+            result = self._parse_coindesk(response, cache_key)
+        except Exception as e:
+            result = self._coindesk_error(e)
+        return self._cache_failure(cache_key, result)
+
+    async def get_alpha_vantage_crypto_data(self, symbol: str, market: str = "USD") -> Dict[str, Any]:
+        """
+        Get cryptocurrency data from Alpha Vantage API
+        """
+        fetch = functools.partial(self._fetch_alpha_vantage, symbol, market)
+        cached = await self._get_cached(f"alpha_vantage_{symbol}_{market}", fetch)
+        if cached:
+            return cached
+
+        if not self.alpha_vantage_key:
+            return {
+                'success': False,
+                'error': 'Alpha Vantage API key not available',
+                'source': 'Alpha Vantage'
+            }
+        return await fetch()
+
+    async def _fetch_alpha_vantage(self, symbol: str, market: str) -> Dict[str, Any]:
+        cache_key = f"alpha_vantage_{symbol}_{market}"
+        try:
+            response = await self._http_get(**self._alpha_vantage_request(symbol))
+            result = self._parse_alpha_vantage(response, symbol, market, cache_key)
+        except Exception as e:
+            result = self._alpha_vantage_error(e)
+        return self._cache_failure(cache_key, result)
+
+    async def get_binance_crypto_data(self, symbol: str, market: str = "USDT") -> Dict[str, Any]:
+        """
+        Get cryptocurrency data from Binance API - PRIORITY source for real-time accuracy
+        """
+        snapshot_result = self._binance_from_snapshot(symbol, market)
+        if snapshot_result:
+            return snapshot_result
+        unlisted = self._binance_unlisted(symbol, market)
+        if unlisted:
+            return unlisted
+
+        fetch = functools.partial(self._fetch_binance_ticker, symbol, market)
+        cached = await self._get_cached(f"binance_{symbol}_{market}", fetch)
+        if cached:
+            return cached
+
+        if not self.binance_key:
+            return {
+                'success': False,
+                'error': 'Binance API key not available',
+                'source': 'Binance'
+            }
+        return await fetch()
+
+    async def _fetch_binance_ticker(self, symbol: str, market: str) -> Dict[str, Any]:
+        cache_key = f"binance_{symbol}_{market}"
+        try:
+            response = await self._http_get(**self._binance_ticker_request(symbol, market))
+            result = self._parse_binance_ticker(response, symbol, market, cache_key)
+        except Exception as e:
+            result = self._binance_error(e)
+        return self._cache_failure(cache_key, result)
+
+    async def get_binance_multiple_tickers(self, symbols: List[str]) -> Dict[str, Any]:
+        """
+        Get price data for multiple symbols from the shared Binance ticker snapshot
+        """
+        try:
+            resolved, missing = self._resolve_binance_symbols(symbols)
+            if missing and not self.binance_key:
+                return {
+                    'success': False,
+                    'error': 'Binance API key not available',
+                    'source': 'Binance'
+                }
+            if missing:
+                request = self._binance_snapshot_request(missing)
+                if request:
+                    response = await self._http_get(**request)
+                    if response.status_code == 400 and 'params' in request:
+                        request = self._binance_snapshot_request(missing, full=True)
+                        response = await self._http_get(**request)
+                    error = self._store_binance_snapshot(response, full='params' not in request)
+                    if error:
+                        return error
+                resolved, _ = self._resolve_binance_symbols(symbols)
+            return self._binance_prices_result(resolved)
+        except Exception as e:
+            return self._binance_multi_error(e)
+
+    async def refresh_binance_tickers(self, symbols: List[str], market: str = "USDT") -> None:
+        """
+        Fill the 24hr ticker snapshot for many symbols before looking them up one by one
+        (the listing first if unknown, then the filtered chunks concurrently)
+        """
+        if not self.binance_key:
+            return
+        try:
+            if not self._binance_listing_known():
+                response = await self._http_get(**self._binance_snapshot_request([], full=True))
+                if self._store_binance_snapshot(response, full=True):
+                    return
+            responses = await asyncio.gather(*[
+                self._http_get(**request) for request in self._binance_ticker_chunk_requests(symbols, market)
+            ])
+            for response in responses:
+                self._store_binance_snapshot(response, full=False)
+        except Exception as e:
+            self._binance_multi_error(e)
+
+    async def get_coinmarketcap_data(self, symbol: str) -> Dict[str, Any]:
+        """
+        Get cryptocurrency data from CoinMarketCap API (includes market cap, price, volume)
+        """
+        fetch = functools.partial(self._fetch_coinmarketcap, symbol)
+        cached = await self._get_cached(f"coinmarketcap_{symbol}", fetch)
+        if cached:
+            return cached
+        return await fetch()
+
+    async def get_coinmarketcap_quotes(self, symbols: List[str]) -> Dict[str, Dict[str, Any]]:
+        """
+        CoinMarketCap data for many symbols: cached ones from the cache, the rest in one request
+        """
+        results = {}
+        missing = []
+        await self._load_shared([f"coinmarketcap_{symbol}" for symbol in symbols])
+        for symbol in symbols:
+            cached = self._get_cached_data(f"coinmarketcap_{symbol}", functools.partial(self._fetch_coinmarketcap, symbol))
+            if cached:
+                results[symbol] = cached
+            else:
+                missing.append(symbol)
+        for fetched in await asyncio.gather(*[self._fetch_coinmarketcap_many(chunk)
+                                              for chunk in self._batch_chunks(missing)]):
+            results.update(fetched)
+        return results
+
+    async def _fetch_coinmarketcap(self, symbol: str) -> Dict[str, Any]:
+        return await self.coinmarketcap_batcher.get(symbol)
+
+    async def _fetch_coinmarketcap_many(self, symbols: List[str]) -> Dict[str, Dict[str, Any]]:
+        try:
+            request = self._coinmarketcap_request(symbols)
+            response = await self._http_get(**request)
+            results = self._parse_coinmarketcap(response, symbols, request['url'])
+        except Exception as e:
+            error = self._coinmarketcap_error(e)
+            results = {symbol: error for symbol in symbols}
+        return {symbol: self._cache_failure(f"coinmarketcap_{symbol}", result) for symbol, result in results.items()}
+
+    async def get_coingecko_market_cap(self, symbol: str) -> Dict[str, Any]:
+        """
+        Get market cap data from CoinGecko API (free, no API key required), cached with a long TTL
+        """
+        symbol = symbol.upper()
+        fetch = functools.partial(self._fetch_coingecko, symbol)
+        cached = await self._get_cached(f"coingecko_mcap_{symbol}", fetch)
+        if cached:
+            return cached
+        return await fetch()
+
+    async def get_coingecko_market_caps(self, symbols: List[str]) -> Dict[str, Dict[str, Any]]:
+        """
+        CoinGecko market caps for many symbols: cached ones from the cache, the rest in one request
+        """
+        results = {}
+        missing = []
+        symbols = {symbol.upper() for symbol in symbols}
+        await self._load_shared([f"coingecko_mcap_{symbol}" for symbol in symbols])
+        for symbol in symbols:
+            cached = self._get_cached_data(f"coingecko_mcap_{symbol}", functools.partial(self._fetch_coingecko, symbol))
+            if cached:
+                results[symbol] = cached
+            else:
+                missing.append(symbol)
+        for fetched in await asyncio.gather(*[self._fetch_coingecko_many(chunk)
+                                              for chunk in self._batch_chunks(missing)]):
+            results.update(fetched)
+        return results
+
+    async def _fetch_coingecko(self, symbol: str) -> Dict[str, Any]:
+        return await self.coingecko_batcher.get(symbol)
+
+    async def _fetch_coingecko_many(self, symbols: List[str]) -> Dict[str, Dict[str, Any]]:
+        coin_ids, results = self._coingecko_ids(symbols, await self.get_coingecko_coin_index())
+        if coin_ids:
+            try:
+                response = await self._http_get(**self._coingecko_request(list(coin_ids)))
+                results.update(self._parse_coingecko(response, coin_ids))
+            except Exception as e:
+                error = self._coingecko_error(e)
+                results.update({symbol: error for grouped in coin_ids.values() for symbol in grouped})
+        return {symbol: self._cache_failure(f"coingecko_mcap_{symbol}", result) for symbol, result in results.items()}
+
+    async def get_coingecko_coin_index(self) -> Dict[str, str]:
+        """
+        Symbol -> CoinGecko coin id for every listed coin (cached for a day, {} while unavailable)
+        """
+        cached = await self._get_cached("coingecko_coins", self._fetch_coingecko_coins)
+        if not cached:
+            cached = await self.coin_index_flight.do("coingecko_coins", self._fetch_coingecko_coins)
+        return cached.get('ids', {})
+
+    async def _fetch_coingecko_coins(self) -> Dict[str, Any]:
+        try:
+            response = await self._http_get(**self._coingecko_coins_request())
+            result = self._parse_coingecko_coins(response)
+        except Exception as e:
+            result = self._coingecko_error(e)
+        return self._cache_failure("coingecko_coins", result)
+
+    async def enrich_with_market_cap(self, price_data: Dict[str, Any], symbol: str) -> Dict[str, Any]:
+        """
+        Enrich price data with market cap information from CoinGecko
+        """
+        if not price_data.get('success') or not price_data.get('needs_market_cap_enrichment'):
+            return price_data
+
+        try:
+            market_cap_data = await self.get_coingecko_market_cap(symbol)
+            self._apply_market_cap(price_data, symbol, market_cap_data)
+        except Exception as e:
+            self.logger.error(f"❌ Error enriching market cap for {symbol}: {str(e)}")
+
+        return price_data
+
+    async def get_comprehensive_price_data(self, symbol: str, deadline: Optional[float] = None,
+                                           hedge: Optional[bool] = None) -> Quote:
+        """
+        Get a Quote, querying all sources concurrently
+
+        Returns as soon as the highest-priority source that can still win has
+        answered, or at `deadline` seconds with the best source answered so far;
+        requests that are no longer needed are cancelled. Quota-limited fallbacks
+        start late, as in EnhancedPriceFetcher.get_comprehensive_price_data. With `hedge`, a source
+        still pending after its p95 latency gets a second request.
+        """
+        deadline = self.fanout_deadline if deadline is None else deadline
+        loop = asyncio.get_running_loop()
+        expires = loop.time() + deadline
+
+        launchers = self._comprehensive_launchers(symbol)
+        fanout = SourceFanOut(
+            list(launchers), lambda name: loop.create_task(launchers[name]()),
+            self._hedge_delays(launchers, hedge), loop.time(), self._deferred_delays(launchers)
+        )
+        try:
+            while True:
+                fanout.collect()
+                if fanout.complete():
+                    break
+                now = loop.time()
+                if now >= expires:
+                    self.fanout_stats['deadline_expired'] += 1
+                    break
+                fanout.launch_deferred(now)
+                fanout.launch_hedges(now)
+                wake = min(expires, fanout.next_hedge() or expires)
+                await asyncio.wait(fanout.pending(), timeout=max(0.0, wake - now),
+                                   return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            self._record_fanout(fanout)
+
+        quote = self._comprehensive_quote(symbol, fanout)
+        if quote.success and quote.market_cap is None:
+            remaining = expires - loop.time()
+            try:
+                market_cap_data = await asyncio.wait_for(self.get_coingecko_market_cap(symbol), max(0.0, remaining))
+                self._enrich_quote(quote, market_cap_data)
+            except asyncio.TimeoutError:
+                self.logger.warning(f"⚠️ Market cap enrichment for {symbol} skipped: deadline reached")
+            except Exception as e:
+                self.logger.error(f"❌ Error enriching market cap for {symbol}: {str(e)}")
+        return quote
+
+    async def get_historical_data(self, symbol: str, days: int = 30) -> Dict[str, Any]:
+        """
+        Get historical daily price data from the history store (or Alpha Vantage without one)
+        """
+        if self.history_store is None:
+            return await self._get_alpha_vantage_history(symbol, days)
+
+        try:
+            end = last_closed_candle(TIMEFRAME_SECONDS['1d'])
+            start = end - (days - 1) * TIMEFRAME_SECONDS['1d']
+            columns, fetched, error = await self.get_history_arrays(symbol, start, end)
+            return self._history_result(symbol, days, columns, fetched, error)
+        except Exception as e:
+            return self._historical_error(e)
+
+    async def get_history_arrays(self, symbol: str, start: int, end: int, timeframe: str = '1d'):
+        """OHLCV column views for a range, backfilling missing chunks concurrently"""
+        series = self.history_store.series(symbol, timeframe)
+        requests_ = self._history_backfill_requests(symbol, series, timeframe, start, end)
+        failure_key = self._history_failure_key(symbol, timeframe)
+        failed = self._get_cached_data(failure_key) if requests_ else None
+        if failed:
+            return series.slice(start, end), 0, failed['error']
+        error = None
+        if requests_:
+            results = await asyncio.gather(*[self._http_get(**request) for request in requests_],
+                                           return_exceptions=True)
+            error = self._store_history_chunks(series, start, requests_, results)
+            if error and timeframe == '1d' and self.alpha_vantage_key and series.missing_ranges(start, end):
+                try:
+                    response = await self._http_get(**self._alpha_vantage_daily_request(symbol))
+                    error = self._store_alpha_vantage_history(series, response, end)
+                    requests_.append(None)
+                except Exception as e:
+                    error = str(e)
+            if error:
+                self._cache_failure(failure_key, {'success': False, 'error': error})
+        return series.slice(start, end), len(requests_), error
+
+    async def _get_alpha_vantage_history(self, symbol: str, days: int) -> Dict[str, Any]:
+        if not self.alpha_vantage_key:
+            return {
+                'success': False,
+                'error': 'Alpha Vantage API key not available'
+            }
+
+        try:
+            response = await self._http_get(**self._alpha_vantage_daily_request(symbol))
+            return self._parse_alpha_vantage_daily(response, symbol, days)
+        except Exception as e:
+            return self._historical_error(e)
+
+    async def get_market_overview(self, symbols: List[str] = None) -> Dict[str, Any]:
+        """
+        Get market overview for multiple cryptocurrencies (Quote.to_dict() per symbol)
+        """
+        if symbols is None:
+            symbols = ['BTC', 'ETH', 'ADA', 'DOT', 'LTC']
+
+        await self._load_shared(self._comprehensive_cache_keys(symbols))
+        # Chunked 24hr tickers, so the per-symbol Binance lookups hit the snapshot
+        await self.refresh_binance_tickers(symbols)
+        # Symbols are fetched concurrently; providers without budget are skipped by the rate limiter
+        fetched = await asyncio.gather(*[self.get_comprehensive_price_data(symbol) for symbol in symbols],
+                                       return_exceptions=True)
+        market_data: Dict[str, Quote] = {}
+        for symbol, quote in zip(symbols, fetched):
+            market_data[symbol] = Quote.failed(symbol, str(quote)) if isinstance(quote, Exception) else quote
+        return self._market_overview_result(market_data)
+
+
+class BlockingPriceFetcher:
+    """
+    Sync facade over AsyncEnhancedPriceFetcher for existing blocking callers.
+
+    Coroutines run on a private event-loop thread, so every calling thread
+    shares the same pooled sessions. Coroutine methods of the wrapped fetcher
+    are exposed as blocking methods with the same names; other attributes pass
+    through. Must not be called from the wrapper's own loop thread.
+    """
+
+    def __init__(self, fetcher: Optional[AsyncEnhancedPriceFetcher] = None,
+                 timeout: Optional[float] = None):
+        self.fetcher = fetcher or AsyncEnhancedPriceFetcher()
+        self.timeout = timeout
+        self.loop = asyncio.new_event_loop()
+        self.thread = threading.Thread(target=self.loop.run_forever, name='price-fetcher-loop', daemon=True)
+        self.thread.start()
+
+    def run(self, coro) -> Any:
+        """Run a coroutine on the fetcher loop and wait for its result"""
+        return asyncio.run_coroutine_threadsafe(coro, self.loop).result(self.timeout)
+
+    def __getattr__(self, name: str) -> Any:
+        attr = getattr(self.fetcher, name)
+        if asyncio.iscoroutinefunction(attr):
+            @functools.wraps(attr)
+            def blocking(*args, **kwargs):
+                return self.run(attr(*args, **kwargs))
+            return blocking
+        return attr
+
+    def close(self) -> None:
+        """Close pooled sessions and stop the loop thread"""
+        if self.loop.is_running():
+            self.run(self.fetcher.close())
+            self.loop.call_soon_threadsafe(self.loop.stop)
+            self.thread.join()
@@ -0,0 +1,249 @@
+"""
+Binance WebSocket Market Data Ingestion for CryptSIST
+Berlangganan stream gabungan miniTicker/bookTicker Binance ke price book in-memory dengan auto-reconnect
+"""
+
+import asyncio
+import json
+import logging
+import random
+import time
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional
+
+import aiohttp
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_STREAM_URL = "wss://stream.binance.com:9443"
+STREAM_TYPES = ('miniTicker', 'bookTicker')
+
+
+class BookQuote(NamedTuple):
+    """Latest streamed quote for one trading pair (immutable; replaced on every update)"""
+
+    symbol: str
+    last: float = 0.0
+    open: float = 0.0
+    high: float = 0.0
+    low: float = 0.0
+    volume: float = 0.0
+    quote_volume: float = 0.0
+    bid: float = 0.0
+    bid_qty: float = 0.0
+    ask: float = 0.0
+    ask_qty: float = 0.0
+    event_time: int = 0
+    ticker_at: float = 0.0  # monotonic receive time of the last miniTicker
+    book_at: float = 0.0  # monotonic receive time of the last bookTicker
+
+    @property
+    def change_percent(self) -> float:
+        return (self.last - self.open) / self.open * 100 if self.open else 0.0
+
+
+class PriceBook:
+    """
+    Latest-quote table keyed by trading pair (e.g. BTCUSDT).
+
+    A single writer (the stream task) replaces whole immutable BookQuote
+    tuples, so readers on any thread get a consistent quote from a plain dict
+    lookup without taking a lock.
+    """
+
+    def __init__(self):
+        self.quotes: Dict[str, BookQuote] = {}
+        self.updates = 0
+
+    def apply_mini_ticker(self, data: Dict[str, Any], now: float) -> None:
+        pair = data['s']
+        quote = self.quotes.get(pair) or BookQuote(pair)
+        self.quotes[pair] = quote._replace(
+            last=float(data['c']), open=float(data['o']), high=float(data['h']), low=float(data['l']),
+            volume=float(data['v']), quote_volume=float(data['q']), event_time=int(data.get('E', 0)),
+            ticker_at=now
+        )
+        self.updates += 1
+
+    def apply_book_ticker(self, data: Dict[str, Any], now: float) -> None:
+        pair = data['s']
+        quote = self.quotes.get(pair) or BookQuote(pair)
+        self.quotes[pair] = quote._replace(
+            bid=float(data['b']), bid_qty=float(data['B']), ask=float(data['a']), ask_qty=float(data['A']),
+            book_at=now
+        )
+        self.updates += 1
+
+    def get(self, pair: str, max_age: Optional[float] = None) -> Optional[BookQuote]:
+        """Quote with a ticker update younger than max_age seconds, or None"""
+        quote = self.quotes.get(pair)
+        if quote is None or not quote.ticker_at:
+            return None
+        if max_age is not None and time.monotonic() - quote.ticker_at > max_age:
+            return None
+        return quote
+
+    def __len__(self) -> int:
+        return len(self.quotes)
+
+    def get_stats(self) -> Dict[str, Any]:
+        now = time.monotonic()
+        ages = [now - quote.ticker_at for quote in list(self.quotes.values()) if quote.ticker_at]
+        return {
+            'pairs': len(self.quotes),
+            'updates': self.updates,
+            'max_quote_age': round(max(ages), 2) if ages else None
+        }
+
+
+class BinanceStreamClient:
+    """
+    Combined-stream client feeding a PriceBook.
+
+    Subscribes `<pair>@miniTicker` and `<pair>@bookTicker` for every tracked
+    pair. On disconnect it reconnects with jittered exponential backoff and
+    resubscribes the full current pair set, including pairs added with
+    subscribe() while connected. Raw frames can be recorded to a JSON-lines
+    file for replay with BinanceStreamReplayServer.
+    """
+
+    # Streams per connection URL; the rest are sent as SUBSCRIBE batches
+    URL_STREAM_LIMIT = 200
+    SUBSCRIBE_BATCH = 200
+
+    def __init__(self, pairs: Iterable[str], book: Optional[PriceBook] = None,
+                 base_url: str = DEFAULT_STREAM_URL, reconnect_min: float = 1.0,
+                 reconnect_max: float = 30.0, heartbeat: float = 20.0,
+                 record_path: Optional[str] = None):
+        self.pairs = {pair.upper() for pair in pairs}
+        self.book = book or PriceBook()
+        self.base_url = base_url.rstrip('/')
+        self.reconnect_min = reconnect_min
+        self.reconnect_max = reconnect_max
+        self.heartbeat = heartbeat
+        self.record_path = record_path
+        self.record_file = None
+        self.record_started = 0.0
+
+        self.ws: Optional[aiohttp.ClientWebSocketResponse] = None
+        self.task: Optional[asyncio.Task] = None
+        self.request_id = 0
+        self.last_message_at = 0.0
+        self.stats = {
+            'connects': 0,
+            'reconnects': 0,
+            'messages': 0,
+            'bad_messages': 0,
+            'subscribe_requests': 0
+        }
+
+    def _streams(self, pairs: Iterable[str]) -> List[str]:
+        return [f"{pair.lower()}@{stream_type}" for pair in sorted(pairs) for stream_type in STREAM_TYPES]
+
+    async def subscribe(self, pairs: Iterable[str]) -> None:
+        """Track more pairs; subscribed immediately when connected, and on every reconnect"""
+        new_pairs = {pair.upper() for pair in pairs} - self.pairs
+        self.pairs |= new_pairs
+        if new_pairs and self.ws is not None and not self.ws.closed:
+            await self._send_subscribe(self._streams(new_pairs))
+
+    async def _send_subscribe(self, streams: List[str]) -> None:
+        for start in range(0, len(streams), self.SUBSCRIBE_BATCH):
+            self.request_id += 1
+            await self.ws.send_str(json.dumps({
+                'method': 'SUBSCRIBE',
+                'params': streams[start:start + self.SUBSCRIBE_BATCH],
+                'id': self.request_id
+            }))
+            self.stats['subscribe_requests'] += 1
+            # Binance accepts at most 5 incoming messages per second per connection
+            await asyncio.sleep(0.25)
+
+    def _handle(self, raw: str) -> None:
+        now = time.monotonic()
+        self.last_message_at = now
+        if self.record_file is not None:
+            self.record_file.write(json.dumps({'t': round(now - self.record_started, 4), 'frame': raw}) + "\n")
+        try:
+            message = json.loads(raw)
+            stream = message.get('stream')
+            if stream is None:
+                return  # SUBSCRIBE acknowledgement
+            if stream.endswith('@miniTicker'):
+                self.book.apply_mini_ticker(message['data'], now)
+            elif stream.endswith('@bookTicker'):
+                self.book.apply_book_ticker(message['data'], now)
+            self.stats['messages'] += 1
+        except (ValueError, KeyError, TypeError) as e:
+            self.stats['bad_messages'] += 1
+            logger.warning(f"⚠️ Ignoring malformed Binance stream frame: {e}")
+
+    async def _connect_once(self, session: aiohttp.ClientSession) -> None:
+        streams = self._streams(self.pairs)
+        url = f"{self.base_url}/stream?streams={'/'.join(streams[:self.URL_STREAM_LIMIT])}"
+        async with session.ws_connect(url, heartbeat=self.heartbeat) as ws:
+            self.ws = ws
+            self.stats['connects'] += 1
+            logger.info(f"✅ Binance stream connected ({len(self.pairs)} pairs)")
+            if len(streams) > self.URL_STREAM_LIMIT:
+                await self._send_subscribe(streams[self.URL_STREAM_LIMIT:])
+            async for message in ws:
+                if message.type == aiohttp.WSMsgType.TEXT:
+                    self._handle(message.data)
+                elif message.type in (aiohttp.WSMsgType.CLOSED, aiohttp.WSMsgType.ERROR):
+                    break
+
+    async def run(self) -> None:
+        """Connect, ingest and reconnect until cancelled"""
+        if self.record_path:
+            self.record_file = open(self.record_path, 'a', buffering=1)
+            self.record_started = time.monotonic()
+        delay = self.reconnect_min
+        try:
+            async with aiohttp.ClientSession() as session:
+                while True:
+                    connected_at = time.monotonic()
+                    try:
+                        await self._connect_once(session)
+                    except asyncio.CancelledError:
+                        raise
+                    except Exception as e:
+                        logger.warning(f"⚠️ Binance stream error: {e}")
+                    finally:
+                        self.ws = None
+                    # A connection that stayed up for a while resets the backoff
+                    if time.monotonic() - connected_at > self.reconnect_max:
+                        delay = self.reconnect_min
+                    self.stats['reconnects'] += 1
+                    await asyncio.sleep(delay * random.uniform(0.5, 1.0))
+                    delay = min(self.reconnect_max, delay * 2)
+        finally:
+            if self.record_file is not None:
+                self.record_file.close()
+                self.record_file = None
+
+    def start(self) -> None:
+        """Start ingestion on the running event loop"""
+        if self.task is None or self.task.done():
+            self.task = asyncio.get_running_loop().create_task(self.run())
+
+    async def stop(self) -> None:
+        """Stop ingestion"""
+        if self.task is not None:
+            self.task.cancel()
+            try:
+                await self.task
+            except asyncio.CancelledError:
+                pass
+            self.task = None
+
+    def is_connected(self) -> bool:
+        return self.ws is not None and not self.ws.closed
+
+    def get_stats(self) -> Dict[str, Any]:
+        return dict(
+            self.stats,
+            connected=self.is_connected(),
+            pairs=len(self.pairs),
+            last_message_age=round(time.monotonic() - self.last_message_at, 2) if self.last_message_at else None,
+            book=self.book.get_stats()
+        )
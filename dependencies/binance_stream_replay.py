@@ -0,0 +1,168 @@
+"""
+Local Binance WebSocket Stand-in for CryptSIST
+Server WebSocket lokal yang memutar ulang frame stream Binance yang direkam (atau sintetis) untuk pengujian
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import random
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from aiohttp import web
+
+logger = logging.getLogger(__name__)
+
+
+def load_frames(path: str) -> List[Tuple[float, str]]:
+    """Read frames recorded by BinanceStreamClient(record_path=...) as (offset seconds, raw frame)"""
+    frames = []
+    with open(path) as f:
+        for line in f:
+            if line.strip():
+                record = json.loads(line)
+                frames.append((float(record['t']), record['frame']))
+    return frames
+
+
+def synthetic_frames(pairs: Iterable[str], count: int = 100, interval: float = 0.1,
+                     seed: int = 42) -> List[Tuple[float, str]]:
+    """Random-walk miniTicker/bookTicker frames for pairs, `interval` seconds apart per round"""
+    rng = random.Random(seed)
+    prices = {pair.upper(): rng.uniform(1, 60000) for pair in pairs}
+    frames = []
+    for index in range(count):
+        offset = round(index * interval, 4)
+        for pair, price in prices.items():
+            price *= 1 + rng.uniform(-0.001, 0.001)
+            prices[pair] = price
+            frames.append((offset, json.dumps({'stream': f"{pair.lower()}@miniTicker", 'data': {
+                'e': '24hrMiniTicker', 'E': index, 's': pair, 'c': f"{price:.8f}", 'o': f"{price * 0.99:.8f}",
+                'h': f"{price * 1.01:.8f}", 'l': f"{price * 0.98:.8f}", 'v': '1000', 'q': f"{price * 1000:.2f}"
+            }})))
+            frames.append((offset, json.dumps({'stream': f"{pair.lower()}@bookTicker", 'data': {
+                'u': index, 's': pair, 'b': f"{price * 0.9999:.8f}", 'B': '1.5',
+                'a': f"{price * 1.0001:.8f}", 'A': '2.5'
+            }})))
+    return frames
+
+
+class BinanceStreamReplayServer:
+    """
+    Serves /stream?streams=... like Binance and replays frames to each client.
+
+    Only frames for the client's subscribed streams are sent (SUBSCRIBE and
+    UNSUBSCRIBE requests are honoured), paced by the recorded offsets divided
+    by `speed`. `drop_after` closes each connection after that many frames so
+    reconnect and resubscription can be exercised.
+    """
+
+    def __init__(self, frames: List[Tuple[float, str]], speed: float = 1.0, loop: bool = True,
+                 drop_after: Optional[int] = None, host: str = '127.0.0.1', port: int = 0):
+        self.frames = [(offset, json.loads(raw).get('stream', ''), raw) for offset, raw in frames]
+        self.speed = speed
+        self.loop = loop
+        self.drop_after = drop_after
+        self.host = host
+        self.port = port
+        self.runner: Optional[web.AppRunner] = None
+        self.stats = {'connections': 0, 'frames_sent': 0, 'subscribe_requests': 0}
+
+    @property
+    def url(self) -> str:
+        return f"ws://{self.host}:{self.port}"
+
+    async def start(self) -> str:
+        """Start listening and return the base URL for BinanceStreamClient"""
+        app = web.Application()
+        app.router.add_get('/stream', self._handle)
+        self.runner = web.AppRunner(app)
+        await self.runner.setup()
+        site = web.TCPSite(self.runner, self.host, self.port)
+        await site.start()
+        self.port = site._server.sockets[0].getsockname()[1]
+        return self.url
+
+    async def stop(self) -> None:
+        if self.runner is not None:
+            await self.runner.cleanup()
+            self.runner = None
+
+    async def _handle(self, request: web.Request) -> web.WebSocketResponse:
+        ws = web.WebSocketResponse()
+        await ws.prepare(request)
+        self.stats['connections'] += 1
+        streams = {s for s in request.query.get('streams', '').split('/') if s}
+        reader = asyncio.create_task(self._read_commands(ws, streams))
+        sent = 0
+        try:
+            while not ws.closed:
+                previous = 0.0
+                for offset, stream, raw in self.frames:
+                    if offset > previous:
+                        await asyncio.sleep((offset - previous) / self.speed)
+                        previous = offset
+                    if ws.closed:
+                        break
+                    if stream not in streams:
+                        continue
+                    await ws.send_str(raw)
+                    sent += 1
+                    self.stats['frames_sent'] += 1
+                    if self.drop_after is not None and sent >= self.drop_after:
+                        await ws.close()
+                        return ws
+                if not self.loop:
+                    break
+                await asyncio.sleep(0)
+        except (ConnectionResetError, RuntimeError):
+            pass
+        finally:
+            reader.cancel()
+        return ws
+
+    async def _read_commands(self, ws: web.WebSocketResponse, streams: set) -> None:
+        async for message in ws:
+            try:
+                command = json.loads(message.data)
+            except (TypeError, ValueError):
+                continue
+            params = command.get('params', [])
+            if command.get('method') == 'SUBSCRIBE':
+                streams.update(params)
+                self.stats['subscribe_requests'] += 1
+            elif command.get('method') == 'UNSUBSCRIBE':
+                streams.difference_update(params)
+            await ws.send_str(json.dumps({'result': None, 'id': command.get('id')}))
+
+    def get_stats(self) -> Dict[str, Any]:
+        return dict(self.stats, frames=len(self.frames))
+
+
+async def _serve(args: argparse.Namespace) -> None:
+    frames = load_frames(args.frames) if args.frames else synthetic_frames(args.pairs.split(','))
+    server = BinanceStreamReplayServer(frames, speed=args.speed, port=args.port)
+    url = await server.start()
+    print(f"📡 Replaying {len(frames)} frames at {url}/stream (CRYPTSIST_BINANCE_STREAM_URL={url})")
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await server.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local Binance WebSocket stand-in that replays frames")
+    parser.add_argument('frames', nargs='?', help="JSON-lines file recorded by BinanceStreamClient")
+    parser.add_argument('--pairs', default='BTCUSDT,ETHUSDT,LTCUSDT', help="pairs for synthetic frames")
+    parser.add_argument('--port', type=int, default=9443)
+    parser.add_argument('--speed', type=float, default=1.0)
+    args = parser.parse_args()
+    try:
+        asyncio.run(_serve(args))
+    except KeyboardInterrupt:
+        print("\n🛑 Replay server stopped")
+
+
+if __name__ == "__main__":
+    main()
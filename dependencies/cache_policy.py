@@ -0,0 +1,84 @@
+"""
+Price Cache Policies for CryptSIST
+Aturan TTL, grace window (stale-while-revalidate) dan negative cache per provider dan jenis key
+"""
+
+import json
+import logging
+import os
+from typing import Any, Dict, NamedTuple, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class CachePolicy(NamedTuple):
+    """Cache timing for one kind of provider result"""
+    ttl: Optional[float] = None  # seconds a result is fresh; None uses the fetcher's cache_duration
+    grace: float = 60.0  # seconds past expiry stale data is served while one refresh runs
+    negative_ttl: float = 15.0  # seconds a failed result is served before the provider is asked again
+
+
+class CachePolicies:
+    """
+    Cache policies resolved per (provider, key type).
+
+    Rules are named "<provider>.<key type>", "<provider>" or "<key type>";
+    each only overrides the fields it sets, applied over the default in that
+    order of increasing precedence: key type, provider, provider.key type.
+    For example {"coingecko": {"ttl": 3600}, "binance.quote": {"grace": 10}}.
+    """
+
+    FIELDS = CachePolicy._fields
+
+    def __init__(self, default: CachePolicy = CachePolicy(), rules: Optional[Dict[str, Dict[str, Any]]] = None):
+        self.default = default
+        self.rules: Dict[str, Dict[str, Any]] = {}
+        self.resolved: Dict[Tuple[str, str], CachePolicy] = {}
+        for name, fields in (rules or {}).items():
+            self.set(name, **fields)
+
+    @classmethod
+    def from_env(cls, rules: Optional[Dict[str, Dict[str, Any]]] = None) -> 'CachePolicies':
+        """
+        Build policies from environment variables over built-in `rules`
+
+        CRYPTSIST_CACHE_GRACE    : default grace window in seconds (0 disables stale serving)
+        CRYPTSIST_NEGATIVE_TTL   : default negative cache TTL in seconds (0 disables it)
+        CRYPTSIST_CACHE_POLICIES : JSON object of rules, e.g. {"binance": {"ttl": 30, "grace": 30}}
+        """
+        default = CachePolicy(
+            grace=float(os.environ.get('CRYPTSIST_CACHE_GRACE', 60)),
+            negative_ttl=float(os.environ.get('CRYPTSIST_NEGATIVE_TTL', 15))
+        )
+        policies = cls(default, rules)
+        raw = os.environ.get('CRYPTSIST_CACHE_POLICIES', '')
+        if raw:
+            try:
+                for name, fields in json.loads(raw).items():
+                    policies.set(name, **fields)
+            except (AttributeError, TypeError, ValueError) as e:
+                logger.warning(f"⚠️ Ignoring invalid CRYPTSIST_CACHE_POLICIES: {e}")
+        return policies
+
+    def set(self, name: str, **fields: Any) -> None:
+        """Add or extend the rule `name` ("provider", "key type" or "provider.key type")"""
+        unknown = set(fields) - set(self.FIELDS)
+        if unknown:
+            raise ValueError(f"Unknown cache policy fields for {name}: {sorted(unknown)}")
+        self.rules[name] = dict(self.rules.get(name, {}), **{
+            field: None if value is None else float(value) for field, value in fields.items()
+        })
+        self.resolved.clear()
+
+    def resolve(self, provider: str, kind: str) -> CachePolicy:
+        """Effective policy for a provider's key type"""
+        policy = self.resolved.get((provider, kind))
+        if policy is None:
+            fields = self.default._asdict()
+            for name in (kind, provider, f"{provider}.{kind}"):
+                fields.update(self.rules.get(name, {}))
+            policy = self.resolved[(provider, kind)] = CachePolicy(**fields)
+        return policy
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {'default': self.default._asdict(), 'rules': dict(self.rules)}
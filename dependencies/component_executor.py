@@ -0,0 +1,196 @@
+"""
+Component Executor for CryptSIST MT5 Server
+Menjalankan panggilan blocking (price fetcher, signal generator, FinBERT) di luar event loop
+"""
+
+import asyncio
+import functools
+import os
+import time
+import logging
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+# Default concurrency limit per component (overridable via CRYPTSIST_COMPONENT_LIMITS)
+DEFAULT_COMPONENT_LIMITS = {
+    'signal_generator': 4,
+    'price_fetcher': 8,
+    'sentiment_analyzer': 2,
+    'groq_client': 2,
+    'shared_cache': 4
+}
+
+
+class ComponentQueueFull(Exception):
+    """Raised when a component already has too many calls waiting"""
+
+
+class _ComponentState:
+    """Concurrency limit and counters for a single component"""
+
+    def __init__(self, limit: int, max_queue: int):
+        self.limit = limit
+        self.max_queue = max_queue
+        self.semaphore: Optional[asyncio.Semaphore] = None
+        self.waiting = 0
+        self.running = 0
+        self.completed = 0
+        self.failed = 0
+        self.rejected = 0
+        self.total_wait = 0.0
+        self.total_run = 0.0
+        self.max_run = 0.0
+
+    def snapshot(self) -> Dict[str, Any]:
+        finished = self.completed + self.failed
+        return {
+            'limit': self.limit,
+            'max_queue': self.max_queue,
+            'queue_depth': self.waiting,
+            'running': self.running,
+            'completed': self.completed,
+            'failed': self.failed,
+            'rejected': self.rejected,
+            'avg_wait_ms': round(self.total_wait / finished * 1000, 2) if finished else 0.0,
+            'avg_run_ms': round(self.total_run / finished * 1000, 2) if finished else 0.0,
+            'max_run_ms': round(self.max_run * 1000, 2)
+        }
+
+
+class ComponentExecutor:
+    """
+    Bounded executor layer for blocking component calls.
+
+    Every call goes through a per-component semaphore before it is handed to a
+    shared thread pool (or an optional process pool for CPU-bound stages), so a
+    slow provider can only occupy its own slots and never the whole pool.
+    """
+
+    def __init__(self, max_workers: int = 16, process_workers: int = 0,
+                 component_limits: Optional[Dict[str, int]] = None,
+                 default_limit: int = 4, max_queue: int = 256):
+        self.max_workers = max_workers
+        self.process_workers = process_workers
+        self.default_limit = default_limit
+        self.max_queue = max_queue
+        self.component_limits = dict(DEFAULT_COMPONENT_LIMITS)
+        if component_limits:
+            self.component_limits.update(component_limits)
+
+        self.thread_pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="cryptsist-worker")
+        self.process_pool = ProcessPoolExecutor(max_workers=process_workers) if process_workers > 0 else None
+        self.components: Dict[str, _ComponentState] = {}
+
+    @classmethod
+    def from_env(cls) -> 'ComponentExecutor':
+        """
+        Build executor from environment variables
+
+        CRYPTSIST_EXECUTOR_THREADS    : thread pool size (default 16)
+        CRYPTSIST_EXECUTOR_PROCESSES  : process pool size, 0 disables it (default 0)
+        CRYPTSIST_COMPONENT_LIMITS    : e.g. "price_fetcher=8,sentiment_analyzer=2"
+        CRYPTSIST_EXECUTOR_MAX_QUEUE  : max waiting calls per component (default 256)
+        """
+        limits = {}
+        for item in os.environ.get('CRYPTSIST_COMPONENT_LIMITS', '').split(','):
+            if '=' in item:
+                name, value = item.split('=', 1)
+                try:
+                    limits[name.strip()] = max(1, int(value))
+                except ValueError:
+                    logger.warning(f"⚠️ Invalid component limit ignored: {item}")
+
+        return cls(
+            max_workers=int(os.environ.get('CRYPTSIST_EXECUTOR_THREADS', 16)),
+            process_workers=int(os.environ.get('CRYPTSIST_EXECUTOR_PROCESSES', 0)),
+            component_limits=limits,
+            max_queue=int(os.environ.get('CRYPTSIST_EXECUTOR_MAX_QUEUE', 256))
+        )
+
+    def _get_component(self, component: str) -> _ComponentState:
+        state = self.components.get(component)
+        if state is None:
+            limit = self.component_limits.get(component, self.default_limit)
+            state = _ComponentState(limit, self.max_queue)
+            self.components[component] = state
+        if state.semaphore is None:
+            # Created lazily so it binds to the running event loop
+            state.semaphore = asyncio.Semaphore(state.limit)
+        return state
+
+    async def run(self, component: str, func: Callable, *args,
+                  cpu_bound: bool = False, timeout: Optional[float] = None, **kwargs) -> Any:
+        """
+        Run a blocking callable for a component without blocking the event loop
+
+        Args:
+            component: Component name used for concurrency limits and stats
+            func: Blocking callable
+            cpu_bound: Use the process pool when it is enabled (func and args must be picklable)
+            timeout: Optional timeout in seconds for the call itself
+
+        Returns:
+            Return value of func
+        """
+        state = self._get_component(component)
+        if state.waiting >= state.max_queue:
+            state.rejected += 1
+            raise ComponentQueueFull(f"{component} queue is full ({state.waiting} waiting)")
+
+        loop = asyncio.get_running_loop()
+        pool = self.process_pool if cpu_bound and self.process_pool else self.thread_pool
+
+        queued_at = time.perf_counter()
+        state.waiting += 1
+        try:
+            await state.semaphore.acquire()
+        finally:
+            state.waiting -= 1
+
+        started_at = time.perf_counter()
+        state.total_wait += started_at - queued_at
+        state.running += 1
+
+        def _finished(done_future) -> None:
+            # The slot is only released once the worker is really free, even
+            # if the caller already gave up waiting on it
+            elapsed = time.perf_counter() - started_at
+            state.total_run += elapsed
+            state.max_run = max(state.max_run, elapsed)
+            state.running -= 1
+            if done_future.cancelled() or done_future.exception() is not None:
+                state.failed += 1
+            else:
+                state.completed += 1
+            state.semaphore.release()
+
+        try:
+            future = loop.run_in_executor(pool, functools.partial(func, *args, **kwargs))
+        except Exception:
+            state.running -= 1
+            state.failed += 1
+            state.semaphore.release()
+            raise
+
+        future.add_done_callback(_finished)
+        if timeout:
+            return await asyncio.wait_for(asyncio.shield(future), timeout)
+        return await asyncio.shield(future)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Queue depth and timing stats for every component"""
+        return {
+            'thread_workers': self.max_workers,
+            'process_workers': self.process_workers,
+            'queue_depth': sum(state.waiting for state in self.components.values()),
+            'running': sum(state.running for state in self.components.values()),
+            'components': {name: state.snapshot() for name, state in self.components.items()}
+        }
+
+    def shutdown(self, wait: bool = False) -> None:
+        """Shut down the worker pools"""
+        self.thread_pool.shutdown(wait=wait, cancel_futures=True)
+        if self.process_pool:
+            self.process_pool.shutdown(wait=wait, cancel_futures=True)
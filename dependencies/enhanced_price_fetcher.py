@@ -5,11 +5,26 @@ Menggunakan CoinDesk API dan Alpha Vantage API untuk data harga real-time
 
 import requests
 import json
+import concurrent.futures
+import functools
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Any
+from typing import Dict, List, Optional, Any, Callable
+import threading
 import time
 import logging
 
+import numpy as np
+
+from metrics import Counter, Histogram
+from rate_limiter import get_shared_limiter
+from persistent_cache import get_shared_persistent_cache
+from shared_cache import get_shared_cache_backend
+from history_store import HistoryStore, TIMEFRAME_SECONDS, last_closed_candle
+from provider_health import ProviderHealthTracker
+from cache_policy import CachePolicies, CachePolicy
+from micro_batch import MicroBatcher
+from quote import Quote, SourceQuote
+
 # Import API keys
 from api_keys_config import (
     COINDESK_API_KEY, 
@@ -20,16 +35,137 @@ from api_keys_config import (
     get_base_url
 )
 
+class SourceFanOut:
+    """
+    Bookkeeping for a priority-ordered fan-out over price sources.
+
+    Works with asyncio tasks and concurrent.futures futures alike (both expose
+    done/cancelled/result/cancel); the caller owns the waiting loop. A source is
+    finished once one of its requests (original or hedge) has answered. The
+    winner is the first source in priority order that succeeded after every
+    higher-priority source finished. Sources in `deferred` are not started with
+    the others: each waits until every source ranked ahead of it has failed or
+    its delay has passed, and is dropped unsent once a higher source wins.
+    """
+
+    def __init__(self, order: List[str], launch: Callable[[str], Any],
+                 hedge_delays: Optional[Dict[str, float]], now: float,
+                 deferred: Optional[Dict[str, float]] = None):
+        self.order = order
+        self.launch = launch
+        self.hedge_delays = hedge_delays or {}
+        self.launch_at = {name: now + delay for name, delay in (deferred or {}).items() if name in order}
+        self.futures = {name: [] if name in self.launch_at else [launch(name)] for name in order}
+        self.hedge_at = {name: now + delay for name, delay in self.hedge_delays.items()
+                         if name in self.futures and name not in self.launch_at}
+        self.finished = set()
+        self.results: Dict[str, Dict] = {}
+        self.errors: Dict[str, str] = {}
+        self.hedges = 0
+        self.hedge_wins = 0
+        self.cancelled = 0
+        self.deferred_launches = 0
+        self.deferred_skipped = 0
+
+    def _best_rank(self) -> int:
+        for rank, name in enumerate(self.order):
+            if name in self.results:
+                return rank
+        return len(self.order)
+
+    def collect(self) -> None:
+        """Record answered sources and drop the ones that can no longer win"""
+        for name in self.order:
+            if name in self.finished:
+                continue
+            for index, future in enumerate(self.futures[name]):
+                if future.done() and not future.cancelled():
+                    try:
+                        data = future.result()
+                    except Exception as e:
+                        data = {'success': False, 'error': str(e)}
+                    self.finished.add(name)
+                    self.hedge_wins += 1 if index else 0
+                    if data.get('success'):
+                        self.results[name] = data
+                    else:
+                        self.errors[name] = data.get('error') or 'unknown error'
+                    break
+            else:
+                if self.futures[name] and all(future.cancelled() for future in self.futures[name]):
+                    self.finished.add(name)
+        for name in self.order[self._best_rank() + 1:]:
+            if name not in self.finished:
+                self.finished.add(name)
+                self.hedge_at.pop(name, None)
+                if self.launch_at.pop(name, None) is not None:
+                    self.deferred_skipped += 1
+                self._cancel(self.futures[name])
+
+    def complete(self) -> bool:
+        for name in self.order:
+            if name in self.results:
+                return True
+            if name not in self.finished:
+                return False
+        return True
+
+    def pending(self) -> List[Any]:
+        return [future for name in self.order if name not in self.finished
+                for future in self.futures[name] if not future.done()]
+
+    def launch_hedges(self, now: float) -> None:
+        """Send a second request for pending sources past their hedge delay"""
+        for name, hedge_at in list(self.hedge_at.items()):
+            if name in self.finished:
+                del self.hedge_at[name]
+            elif hedge_at <= now:
+                del self.hedge_at[name]
+                self.futures[name].append(self.launch(name))
+                self.hedges += 1
+
+    def launch_deferred(self, now: float) -> None:
+        """Start deferred sources whose delay passed or whose higher-priority sources all failed"""
+        for name, launch_at in list(self.launch_at.items()):
+            ahead = self.order[:self.order.index(name)]
+            if launch_at <= now or all(source in self.finished for source in ahead):
+                del self.launch_at[name]
+                self.futures[name].append(self.launch(name))
+                self.deferred_launches += 1
+                if name in self.hedge_delays:
+                    self.hedge_at[name] = now + self.hedge_delays[name]
+
+    def next_hedge(self) -> Optional[float]:
+        """Earliest time a hedge or deferred source is due"""
+        due = list(self.hedge_at.values()) + list(self.launch_at.values())
+        return min(due) if due else None
+
+    def _cancel(self, futures: List[Any]) -> None:
+        for future in futures:
+            if not future.done() and future.cancel():
+                self.cancelled += 1
+
+    def cancel_all(self) -> int:
+        """Cancel every request still outstanding, returning how many were cancelled in total"""
+        for futures in self.futures.values():
+            self._cancel(futures)
+        return self.cancelled
+
+
 class EnhancedPriceFetcher:
-    def __init__(self):
+    def __init__(self, base_urls: Optional[Dict[str, str]] = None):
         self.coindesk_key = "6d12bba6674c2b143630614d947500ccb0751d1c5552f09e42ac2748e9a5eb96"
         self.alpha_vantage_key = "BRIAVW9B5B39DNVT"
         self.binance_key = "DPtNEKd5SsQSepWAq5j5N5C1AmXqFzOyPdV6wwyxio9UewHgcHGUIcSaX0ChqnUs"
         self.coinmarketcap_key = "4032624c630963750e5e52e47190b56580d4039c"
-        self.coindesk_base = "https://api.coindesk.com/v1"
-        self.alpha_vantage_base = "https://www.alphavantage.co/query"
-        self.binance_base = "https://api.binance.com/api/v3"
-        self.coinmarketcap_base = "https://pro-api.coinmarketcap.com/v1"
+        # Provider base URLs: explicit base_urls, else api_keys_config (honours
+        # CRYPTSIST_<PROVIDER>_BASE_URL and CRYPTSIST_PROVIDER_STANDIN)
+        base_urls = base_urls or {}
+        self.coindesk_base = base_urls.get('coindesk') or get_base_url('coindesk')
+        self.alpha_vantage_base = base_urls.get('alpha_vantage') or get_base_url('alpha_vantage')
+        self.binance_base = base_urls.get('binance') or get_base_url('binance')
+        self.coinmarketcap_base = base_urls.get('coinmarketcap') or get_base_url('coinmarketcap')
+        self.coingecko_base = base_urls.get('coingecko') or get_base_url('coingecko')
         
         # Setup logging
         logging.basicConfig(level=logging.INFO)
@@ -38,282 +174,602 @@ class EnhancedPriceFetcher:
         # Cache untuk menghindari rate limiting
         self.cache = {}
         self.cache_duration = 300  # 5 minutes
+        self.cache_stats = {
+            'hits': 0, 'misses': 0, 'stale_hits': 0, 'negative_hits': 0,
+            'negative_stores': 0, 'refreshes': 0, 'refresh_failures': 0
+        }
+        # Per provider/key type TTL, stale-while-revalidate grace window and negative TTL
+        self.cache_policies = CachePolicies.from_env(self.DEFAULT_CACHE_RULES)
+        # Keys with a background refresh in flight, and failed refreshes: key -> (retry at, reason)
+        self.refreshing: set = set()
+        self.refresh_failures: Dict[str, tuple] = {}
+        self.refresh_lock = threading.Lock()
+        
+        # Per-provider HTTP metrics, rendered by the server's /metrics endpoint
+        self.http_latency = Histogram(
+            'cryptsist_provider_request_seconds', 'Upstream provider HTTP request latency', ('provider',)
+        )
+        self.http_errors = Counter(
+            'cryptsist_provider_errors_total', 'Upstream provider HTTP errors by reason', ('provider', 'reason')
+        )
+        # Parsed Binance 24hr tickers keyed by trading pair: pair -> (monotonic fetch time, ticker)
+        self.binance_tickers: Dict[str, tuple] = {}
+        # Last prices from the full /ticker/price list: pair -> (monotonic fetch time, price).
+        # Full refreshes use it because the full 24hr list costs ~80 request weight
+        # against ~4; 24hr statistics are only fetched filtered or per pair.
+        self.binance_prices: Dict[str, tuple] = {}
+        self.binance_listed_pairs = frozenset()
+        self.binance_full_snapshot_at = 0.0
+        self.binance_snapshot_ttl = 5.0
+        self.binance_filter_max_pairs = 20  # larger sets fetch the full ticker list
+        self.binance_listing_ttl = 3600.0  # the full price list also tells which pairs are listed
+        self.binance_snapshot_stats = {
+            'stream_hits': 0, 'hits': 0, 'misses': 0, 'full_refreshes': 0, 'filtered_refreshes': 0
+        }
+        # Optional streaming price book (binance_stream.PriceBook), read before the snapshot and REST
+        self.price_book = None
+        self.price_book_max_age = 2.0
+        
+        # Per-provider calls/minute and calls/day budgets, shared by all fetchers in the process
+        self.rate_limiter = get_shared_limiter()
+        
+        # Per-provider rolling latency/error rate with circuit breakers; drives the
+        # source order of get_comprehensive_price_data and the hedging delays
+        self.provider_health = ProviderHealthTracker.from_env()
+        
+        # Multi-source fan-out in get_comprehensive_price_data
+        self.fanout_deadline = 8.0  # seconds, when the caller passes none
+        self.hedge_requests = False  # re-send a slow source's request after its p95 latency
+        self.hedge_min_samples = 20
+        # Quota-limited fallbacks start only after the sources ahead fail or their p95 latency passes,
+        # so a fan-out won by a free source does not spend their daily calls
+        self.deferred_sources = {'alpha_vantage'}
+        self.deferred_launch_delay = 2.0  # seconds, while the sources ahead have too few latency samples
+        self.fanout_pool: Optional[concurrent.futures.ThreadPoolExecutor] = None
+        self.fanout_stats = {
+            'lookups': 0,
+            'deadline_expired': 0,
+            'hedges': 0,
+            'hedge_wins': 0,
+            'cancelled': 0,
+            'deferred_launches': 0,
+            'deferred_skipped': 0
+        }
+        
+        # Cross-process cache backend (Redis / mmap file) consulted when self.cache misses,
+        # so other processes and the bridge reuse each other's provider responses; a
+        # process-local backend would only duplicate self.cache
+        shared_cache = get_shared_cache_backend()
+        self.shared_cache = shared_cache if shared_cache is not None and shared_cache.shared else None
+        self.cache_stats['shared_hits'] = 0
+        
+        # Concurrent CoinMarketCap / CoinGecko lookups are joined into multi-symbol requests
+        self.batch_window = 0.005
+        self.batch_max_symbols = 100
+        self.coinmarketcap_batcher = self._batcher(self._fetch_coinmarketcap_many)
+        self.coingecko_batcher = self._batcher(self._fetch_coingecko_many)
         
+        # Local columnar OHLCV store behind get_historical_data (None: always fetch Alpha Vantage)
+        self.history_store = HistoryStore.from_env()
+        self.history_chunk_candles = 1000  # Binance klines limit per request
+        
+        # Optional SQLite layer under self.cache (write-behind), warm-loaded so restarts start hot
+        self.persistent_cache = get_shared_persistent_cache()
+        if self.persistent_cache is not None:
+            self._warm_cache()
+        
+    def _warm_cache(self) -> None:
+        """Load unexpired entries from the persistent cache into memory"""
+        for key, (stored_at, ttl, data) in self.persistent_cache.load().items():
+            self.cache[key] = {
+                'data': data,
+                'timestamp': stored_at,
+                'ttl': ttl
+            }
+        if self.cache:
+            self.logger.info(f"📊 Warm-loaded {len(self.cache)} price cache entries from {self.persistent_cache.path}")
+    
     def _is_cache_valid(self, key: str) -> bool:
         """Check if cached data is still valid"""
         if key not in self.cache:
             return False
         
-        cache_time = self.cache[key].get('timestamp', 0)
-        return time.time() - cache_time < self.cache_duration
+        return self._is_entry_fresh(self.cache[key])
+    
+    def _is_entry_fresh(self, entry: Dict) -> bool:
+        return time.time() - entry.get('timestamp', 0) < entry.get('ttl', self.cache_duration)
+    
+    # Cache key prefix -> (provider, key type) used to look up cache policies
+    CACHE_KEY_TYPES = (
+        ('coindesk_', 'coindesk', 'quote'),
+        ('alpha_vantage_', 'alpha_vantage', 'quote'),
+        ('binance_', 'binance', 'quote'),
+        ('coinmarketcap_', 'coinmarketcap', 'quote'),
+        ('coingecko_mcap_', 'coingecko', 'market_cap'),
+        ('coingecko_coins', 'coingecko', 'coin_list'),
+        ('history_', 'binance', 'history')
+    )
+    
+    # Built-in cache policy rules, extended by CRYPTSIST_CACHE_POLICIES
+    DEFAULT_CACHE_RULES = {
+        'market_cap': {'ttl': 3600, 'grace': 3600},  # market cap moves slowly
+        'coin_list': {'ttl': 86400, 'grace': 86400},
+        # A failed backfill falls back to Alpha Vantage (5 calls/minute): retry it rarely
+        'history': {'negative_ttl': 300}
+    }
     
-    def _cache_data(self, key: str, data: Dict) -> None:
-        """Cache data with timestamp"""
-        self.cache[key] = {
+    def _cache_policy(self, key: str) -> CachePolicy:
+        for prefix, provider, kind in self.CACHE_KEY_TYPES:
+            if key.startswith(prefix):
+                return self.cache_policies.resolve(provider, kind)
+        return self.cache_policies.default
+    
+    def _entry_state(self, key: str, entry: Dict) -> str:
+        """'fresh', 'stale' (expired but inside the grace window) or 'expired'"""
+        age = time.time() - entry.get('timestamp', 0)
+        ttl = entry.get('ttl', self.cache_duration)
+        if age < ttl:
+            return 'fresh'
+        # Failed results are never served past their negative TTL
+        if not entry.get('negative') and age < ttl + self._cache_policy(key).grace:
+            return 'stale'
+        return 'expired'
+    
+    def _cache_data(self, key: str, data: Dict, ttl: Optional[float] = None) -> None:
+        """Cache data with timestamp (TTL from the key's cache policy unless given)"""
+        policy = self._cache_policy(key)
+        if ttl is None:
+            ttl = policy.ttl
+        entry = {
             'data': data,
             'timestamp': time.time()
         }
+        if ttl is not None:
+            entry['ttl'] = ttl
+        self.cache[key] = entry
+        self.refresh_failures.pop(key, None)
+        ttl = self.cache_duration if ttl is None else ttl
+        if self.shared_cache is not None:
+            # Kept through the grace window so other processes can serve it stale too
+            # (queued: the backend writer thread does the Redis/file I/O)
+            self.shared_cache.put(key, entry, ttl + policy.grace)
+        if self.persistent_cache is not None:
+            self.persistent_cache.put(key, data, entry['timestamp'], ttl)
+    
+    def _cache_failure(self, key: str, result: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Negative-cache a failed provider result for the key's negative TTL
+        
+        Stale data inside its grace window is kept instead (a failed background
+        refresh), and the next refresh is held back for the negative TTL.
+        """
+        policy = self._cache_policy(key)
+        if result.get('success') or policy.negative_ttl <= 0:
+            return result
+        now = time.time()
+        reason = result.get('error', 'unknown error')
+        entry = self.cache.get(key)
+        if entry is not None and self._entry_state(key, entry) != 'expired' and not entry.get('negative'):
+            self.refresh_failures[key] = (now + policy.negative_ttl, reason)
+            self.cache_stats['refresh_failures'] += 1
+            return result
+        entry = {
+            'data': result,
+            'timestamp': now,
+            'ttl': policy.negative_ttl,
+            'negative': True,
+            'reason': reason
+        }
+        self.cache[key] = entry
+        self.cache_stats['negative_stores'] += 1
+        if self.shared_cache is not None:
+            self.shared_cache.put(key, entry, policy.negative_ttl)
+        return result
     
-    def _get_cached_data(self, key: str) -> Optional[Dict]:
-        """Get cached data if valid"""
-        if self._is_cache_valid(key):
-            return self.cache[key]['data']
+    def _get_cached_data(self, key: str, refresh: Optional[Callable[[], Any]] = None,
+                         shared: bool = True) -> Optional[Dict]:
+        """
+        Get cached data if valid (falling back to the shared cache backend)
+        
+        Data past its TTL but inside the grace window is still returned, and
+        refresh() is started once in the background to replace it. Negative
+        entries return the cached failed result until their TTL passes.
+        shared=False skips the (blocking) backend lookup.
+        """
+        entry = self.cache.get(key)
+        state = self._entry_state(key, entry) if entry is not None else 'expired'
+        if state != 'fresh' and shared and self.shared_cache is not None:
+            if self._adopt_shared(key, self.shared_cache.get(key)):
+                entry = self.cache[key]
+                state = self._entry_state(key, entry)
+        if state == 'fresh':
+            self.cache_stats['hits'] += 1
+            if entry.get('negative'):
+                self.cache_stats['negative_hits'] += 1
+            return entry['data']
+        if state == 'stale' and refresh is not None:
+            self.cache_stats['hits'] += 1
+            self.cache_stats['stale_hits'] += 1
+            self._schedule_refresh(key, refresh)
+            return entry['data']
+        self.cache_stats['misses'] += 1
         return None
+    
+    def _claim_refresh(self, key: str) -> bool:
+        """Reserve the key's single background refresh unless one runs or a failed one is backing off"""
+        with self.refresh_lock:
+            failure = self.refresh_failures.get(key)
+            if key in self.refreshing or (failure is not None and failure[0] > time.time()):
+                return False
+            self.refreshing.add(key)
+        self.cache_stats['refreshes'] += 1
+        return True
+    
+    def _refresh_done(self, key: str) -> None:
+        with self.refresh_lock:
+            self.refreshing.discard(key)
+    
+    def _schedule_refresh(self, key: str, refresh: Callable[[], Any]) -> None:
+        if not self._claim_refresh(key):
+            return
+        future = self._pool().submit(refresh)
+        future.add_done_callback(lambda _: self._refresh_done(key))
+    
+    def _batcher(self, fetch_many: Callable[[List[str]], Any]) -> MicroBatcher:
+        return MicroBatcher(fetch_many, self.batch_window, self.batch_max_symbols)
+    
+    def _pool(self) -> concurrent.futures.ThreadPoolExecutor:
+        """Worker pool for source fan-out, history backfill and background refreshes"""
+        if self.fanout_pool is None:
+            self.fanout_pool = concurrent.futures.ThreadPoolExecutor(max_workers=8, thread_name_prefix='price-fanout')
+        return self.fanout_pool
+    
+    def _adopt_shared(self, key: str, shared: Optional[Dict]) -> bool:
+        """Replace the local entry with a shared one that is fresh, or stale where the local one expired"""
+        if shared is None:
+            return False
+        shared_state = self._entry_state(key, shared)
+        entry = self.cache.get(key)
+        state = self._entry_state(key, entry) if entry is not None else 'expired'
+        if shared_state == 'fresh' or (shared_state == 'stale' and state == 'expired'):
+            self.cache[key] = shared
+            self.cache_stats['shared_hits'] += 1
+            return True
+        return False
+    
+    def _prefetch_cached(self, keys: List[str]) -> int:
+        """Pull locally missing keys from the shared backend in one batch (later lookups hit self.cache)"""
+        if self.shared_cache is None:
+            return 0
+        missing = [key for key in keys if not self._is_cache_valid(key)]
+        if not missing:
+            return 0
+        return sum(1 for key, entry in self.shared_cache.get_many(missing).items()
+                   if self._adopt_shared(key, entry))
+    
+    def _comprehensive_cache_keys(self, symbols: List[str]) -> List[str]:
+        """Provider cache keys consulted by get_comprehensive_price_data for these symbols"""
+        keys = []
+        for symbol in symbols:
+            keys += [f"coinmarketcap_{symbol}", f"binance_{symbol}_USDT", f"alpha_vantage_{symbol}_USD",
+                     f"coingecko_mcap_{symbol.upper()}"]
+        return keys
+    
+    def get_cache_stats(self) -> Dict[str, Any]:
+        """Price cache hit/miss counters"""
+        lookups = self.cache_stats['hits'] + self.cache_stats['misses']
+        return dict(
+            self.cache_stats,
+            refreshing=len(self.refreshing),
+            backing_off={key: reason for key, (retry_at, reason) in list(self.refresh_failures.items())
+                         if retry_at > time.time()},
+            policies=self.cache_policies.get_stats(),
+            shared=self.shared_cache.get_stats() if self.shared_cache is not None else None,
+            persistent=self.persistent_cache.get_stats() if self.persistent_cache is not None else None,
+            entries=len(self.cache),
+            hit_ratio=round(self.cache_stats['hits'] / lookups, 4) if lookups else 0.0
+        )
+    
+    def _http_get(self, provider: str, url: str, **kwargs) -> requests.Response:
+        """requests.get with circuit breaker and budget checks, latency and error accounting"""
+        # Providers with an open circuit or no budget fail fast so callers move on to the next source
+        self._admit_request(provider)
+        started = time.perf_counter()
+        try:
+            response = requests.get(url, **kwargs)
+        except requests.exceptions.RequestException as e:
+            self._record_outcome(provider, time.perf_counter() - started, error=type(e).__name__)
+            raise
+        self._record_outcome(provider, time.perf_counter() - started, status=response.status_code)
+        return response
+
+    def _admit_request(self, provider: str) -> None:
+        """Raise unless the provider's circuit and budget allow a request now"""
+        self.provider_health.before_request(provider)
+        try:
+            self.rate_limiter.check(provider)
+        except Exception:
+            # A half-open probe that is never sent must not block later probes
+            self.provider_health.release(provider)
+            raise
+
+    def _record_outcome(self, provider: str, elapsed: float, status: Optional[int] = None,
+                        error: Optional[str] = None) -> None:
+        """Account a finished request: network error (error) or HTTP response (status)"""
+        self.http_latency.observe(elapsed, provider)
+        if error is None and status >= 400:
+            error = f"http_{status}"
+        if error:
+            self.http_errors.inc(provider, error)
+        # Client errors such as an unknown symbol say nothing about the provider's health
+        failed = status is None or status == 429 or status >= 500
+        self.provider_health.record(provider, elapsed, not failed, error or '')
+
+    def latency_percentile(self, provider: str, percentile: float) -> Optional[float]:
+        """Latency percentile (0-100) over the provider's recent requests, or None without samples"""
+        return self.provider_health.latency_percentile(provider, percentile)
+
+    def get_provider_health(self) -> Dict[str, Any]:
+        """Circuit breaker state, error rate and latency percentiles per provider, with the current source order"""
+        return {
+            'providers': self.provider_health.get_stats(),
+            'source_order': self.provider_health.order([source for source, _ in self.PRIMARY_SOURCES])
+        }
 
     def get_coindesk_bitcoin_price(self) -> Dict[str, Any]:
         """
         Get Bitcoin price from CoinDesk API - dengan fallback handling
         """
-        cache_key = "coindesk_btc"
-        cached = self._get_cached_data(cache_key)
+        cached = self._get_cached_data("coindesk_btc", self._fetch_coindesk)
         if cached:
             return cached
-            
+        return self._fetch_coindesk()
+
+    def _fetch_coindesk(self) -> Dict[str, Any]:
+        cache_key = "coindesk_btc"
         try:
-            # CoinDesk Bitcoin Price Index - use working endpoint
-            url = "https://api.coindesk.com/v1/bpi/currentprice.json"
-            
+            response = self._http_get(**self._coindesk_request())
+            result = self._parse_coindesk(response, cache_key)
+        except Exception as e:
+            result = self._coindesk_error(e)
+        return self._cache_failure(cache_key, result)
+
+    def _coindesk_request(self) -> Dict[str, Any]:
+        """HTTP request for the CoinDesk Bitcoin Price Index"""
+        return {
+            'provider': 'coindesk',
+            'url': f"{self.coindesk_base}/bpi/currentprice.json",
             # Add headers to mimic browser request
-            headers = {
+            'headers': {
                 'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36',
                 'Accept': 'application/json'
-            }
-            
-            response = requests.get(url, headers=headers, timeout=10)
-            response.raise_for_status()
-            
-            data = response.json()
-            
-            # Extract price information
-            usd_data = data['bpi']['USD']
-            
-            # Parse price string and remove commas
-            price_str = usd_data['rate'].replace(',', '').replace('$', '')
-            current_price = float(price_str)
-            
-            result = {
-                'symbol': 'BTC',
-                'current_price': current_price,
-                'currency': 'USD',
-                'last_updated': data['time']['updated'],
-                'source': 'CoinDesk',
-                'api_source': 'coindesk',
-                'success': True,
-                'timestamp': datetime.now().isoformat(),
-                'raw_data': data
-            }
-            
-            # Cache the result
-            self._cache_data(cache_key, result)
-            
-            self.logger.info(f"✅ CoinDesk: BTC price fetched successfully: ${result['current_price']:,.2f}")
-            return result
-            
-        except requests.exceptions.RequestException as e:
+            },
+            'timeout': 10
+        }
+
+    def _parse_coindesk(self, response, cache_key: str) -> Dict[str, Any]:
+        response.raise_for_status()
+        
+        data = response.json()
+        
+        # Extract price information
+        usd_data = data['bpi']['USD']
+        
+        # Parse price string and remove commas
+        price_str = usd_data['rate'].replace(',', '').replace('$', '')
+        current_price = float(price_str)
+        
+        result = {
+            'symbol': 'BTC',
+            'current_price': current_price,
+            'currency': 'USD',
+            'last_updated': data['time']['updated'],
+            'source': 'CoinDesk',
+            'api_source': 'coindesk',
+            'success': True,
+            'timestamp': datetime.now().isoformat(),
+            'raw_data': data
+        }
+        
+        # Cache the result
+        self._cache_data(cache_key, result)
+        
+        self.logger.info(f"✅ CoinDesk: BTC price fetched successfully: ${result['current_price']:,.2f}")
+        return result
+
+    def _coindesk_error(self, e: Exception) -> Dict[str, Any]:
+        if isinstance(e, requests.exceptions.RequestException):
             error_msg = f"Network error fetching CoinDesk data: {str(e)}"
-            self.logger.error(error_msg)
-            return {
-                'success': False,
-                'error': error_msg,
-                'source': 'CoinDesk',
-                'api_source': 'coindesk'
-            }
-        except Exception as e:
+        else:
             error_msg = f"Error processing CoinDesk data: {str(e)}"
-            self.logger.error(error_msg)
-            return {
-                'success': False,
-                'error': error_msg,
-                'source': 'CoinDesk',
-                'api_source': 'coindesk'
-            }
+        self.logger.error(error_msg)
+        return {
+            'success': False,
+            'error': error_msg,
+            'source': 'CoinDesk',
+            'api_source': 'coindesk'
+        }
 
     def get_alpha_vantage_crypto_data(self, symbol: str, market: str = "USD") -> Dict[str, Any]:
         """
         Get cryptocurrency data from Alpha Vantage API - dengan handling yang lebih robust
         """
-        cache_key = f"alpha_vantage_{symbol}_{market}"
-        cached = self._get_cached_data(cache_key)
+        fetch = functools.partial(self._fetch_alpha_vantage, symbol, market)
+        cached = self._get_cached_data(f"alpha_vantage_{symbol}_{market}", fetch)
         if cached:
             return cached
             
+        if not self.alpha_vantage_key:
+            return {
+                'success': False,
+                'error': 'Alpha Vantage API key not available',
+                'source': 'Alpha Vantage'
+            }
+        return fetch()
+
+    def _fetch_alpha_vantage(self, symbol: str, market: str) -> Dict[str, Any]:
+        cache_key = f"alpha_vantage_{symbol}_{market}"
         try:
-            if not self.alpha_vantage_key:
-                return {
-                    'success': False,
-                    'error': 'Alpha Vantage API key not available',
-                    'source': 'Alpha Vantage'
-                }
-            
-            # Use CURRENCY_EXCHANGE_RATE for real-time data - more reliable
-            params = {
+            response = self._http_get(**self._alpha_vantage_request(symbol))
+            result = self._parse_alpha_vantage(response, symbol, market, cache_key)
+        except Exception as e:
+            result = self._alpha_vantage_error(e)
+        return self._cache_failure(cache_key, result)
+
+    def _alpha_vantage_request(self, symbol: str) -> Dict[str, Any]:
+        """HTTP request for an Alpha Vantage real-time exchange rate"""
+        # Use CURRENCY_EXCHANGE_RATE for real-time data - more reliable
+        return {
+            'provider': 'alpha_vantage',
+            'url': self.alpha_vantage_base,
+            'params': {
                 'function': 'CURRENCY_EXCHANGE_RATE',
                 'from_currency': symbol,
                 'to_currency': 'USD',
                 'apikey': self.alpha_vantage_key
+            },
+            'timeout': 15
+        }
+
+    def _parse_alpha_vantage(self, response, symbol: str, market: str, cache_key: str) -> Dict[str, Any]:
+        response.raise_for_status()
+        
+        data = response.json()
+        
+        # Check for API errors
+        if 'Error Message' in data:
+            return {
+                'success': False,
+                'error': data['Error Message'],
+                'source': 'Alpha Vantage',
+                'api_source': 'alpha_vantage'
             }
+        
+        if 'Note' in data:
+            return {
+                'success': False,
+                'error': 'API rate limit exceeded. Please try again later.',
+                'source': 'Alpha Vantage',
+                'api_source': 'alpha_vantage'
+            }
+        
+        # Extract exchange rate data
+        if 'Realtime Currency Exchange Rate' in data:
+            exchange_data = data['Realtime Currency Exchange Rate']
             
-            response = requests.get(self.alpha_vantage_base, params=params, timeout=15)
-            response.raise_for_status()
-            
-            data = response.json()
+            current_price = float(exchange_data['5. Exchange Rate'])
+            last_refreshed = exchange_data['6. Last Refreshed']
             
-            # Check for API errors
-            if 'Error Message' in data:
-                return {
-                    'success': False,
-                    'error': data['Error Message'],
-                    'source': 'Alpha Vantage',
-                    'api_source': 'alpha_vantage'
-                }
+            # For change calculation, we'll use a simple simulation
+            # In production, you might want to store previous values
+            price_change_24h = 2.5  # Default placeholder
             
-            if 'Note' in data:
-                return {
-                    'success': False,
-                    'error': 'API rate limit exceeded. Please try again later.',
-                    'source': 'Alpha Vantage',
-                    'api_source': 'alpha_vantage'
-                }
-            
-            # Extract exchange rate data
-            if 'Realtime Currency Exchange Rate' in data:
-                exchange_data = data['Realtime Currency Exchange Rate']
-                
-                current_price = float(exchange_data['5. Exchange Rate'])
-                last_refreshed = exchange_data['6. Last Refreshed']
-                
-                # For change calculation, we'll use a simple simulation
-                # In production, you might want to store previous values
-                price_change_24h = 2.5  # Default placeholder
-                
-                result = {
-                    'symbol': symbol,
-                    'current_price': current_price,
-                    'price_change_24h': price_change_24h,
-                    'last_updated': last_refreshed,
-                    'currency': market,
-                    'source': 'Alpha Vantage',
-                    'api_source': 'alpha_vantage',
-                    'success': True,
-                    'timestamp': datetime.now().isoformat(),
-                    'metadata': exchange_data
-                }
-                
-                # Cache the result
-                self._cache_data(cache_key, result)
-                
-                self.logger.info(f"✅ Alpha Vantage: {symbol} data fetched successfully: ${result['current_price']:,.2f}")
-                return result
+            result = {
+                'symbol': symbol,
+                'current_price': current_price,
+                'price_change_24h': price_change_24h,
+                'last_updated': last_refreshed,
+                'currency': market,
+                'source': 'Alpha Vantage',
+                'api_source': 'alpha_vantage',
+                'success': True,
+                'timestamp': datetime.now().isoformat(),
+                'metadata': exchange_data
+            }
             
-            else:
-                return {
-                    'success': False,
-                    'error': 'No exchange rate data found',
-                    'source': 'Alpha Vantage',
-                    'api_source': 'alpha_vantage'
-                }
+            # Cache the result
+            self._cache_data(cache_key, result)
             
-        except requests.exceptions.RequestException as e:
-            error_msg = f"Network error fetching Alpha Vantage data: {str(e)}"
-            self.logger.error(error_msg)
+            self.logger.info(f"✅ Alpha Vantage: {symbol} data fetched successfully: ${result['current_price']:,.2f}")
+            return result
+        
+        else:
             return {
                 'success': False,
-                'error': error_msg,
+                'error': 'No exchange rate data found',
                 'source': 'Alpha Vantage',
                 'api_source': 'alpha_vantage'
             }
-        except Exception as e:
+
+    def _alpha_vantage_error(self, e: Exception) -> Dict[str, Any]:
+        if isinstance(e, requests.exceptions.RequestException):
+            error_msg = f"Network error fetching Alpha Vantage data: {str(e)}"
+        else:
             error_msg = f"Error processing Alpha Vantage data: {str(e)}"
-            self.logger.error(error_msg)
-            return {
-                'success': False,
-                'error': error_msg,
-                'source': 'Alpha Vantage',
-                'api_source': 'alpha_vantage'
-            }
+        self.logger.error(error_msg)
+        return {
+            'success': False,
+            'error': error_msg,
+            'source': 'Alpha Vantage',
+            'api_source': 'alpha_vantage'
+        }
 
     def get_binance_crypto_data(self, symbol: str, market: str = "USDT") -> Dict[str, Any]:
         """
         Get cryptocurrency data from Binance API - PRIORITY source for real-time accuracy
         """
-        cache_key = f"binance_{symbol}_{market}"
-        cached = self._get_cached_data(cache_key)
+        # Served from the streamed price book or the shared 24hr ticker snapshot while fresh
+        snapshot_result = self._binance_from_snapshot(symbol, market)
+        if snapshot_result:
+            return snapshot_result
+        unlisted = self._binance_unlisted(symbol, market)
+        if unlisted:
+            return unlisted
+        
+        fetch = functools.partial(self._fetch_binance_ticker, symbol, market)
+        cached = self._get_cached_data(f"binance_{symbol}_{market}", fetch)
         if cached:
             return cached
             
+        if not self.binance_key:
+            return {
+                'success': False,
+                'error': 'Binance API key not available',
+                'source': 'Binance'
+            }
+        return fetch()
+
+    def _fetch_binance_ticker(self, symbol: str, market: str) -> Dict[str, Any]:
+        cache_key = f"binance_{symbol}_{market}"
         try:
-            if not self.binance_key:
-                return {
-                    'success': False,
-                    'error': 'Binance API key not available',
-                    'source': 'Binance'
-                }
-            
-            # Construct the trading pair symbol
-            trading_pair = f"{symbol.upper()}{market.upper()}"
-            
-            # Get 24hr ticker statistics
-            params = {
+            response = self._http_get(**self._binance_ticker_request(symbol, market))
+            result = self._parse_binance_ticker(response, symbol, market, cache_key)
+        except Exception as e:
+            result = self._binance_error(e)
+        return self._cache_failure(cache_key, result)
+
+    def _binance_ticker_request(self, symbol: str, market: str) -> Dict[str, Any]:
+        """HTTP request for Binance 24hr ticker statistics of one trading pair"""
+        # Construct the trading pair symbol
+        trading_pair = f"{symbol.upper()}{market.upper()}"
+        return {
+            'provider': 'binance',
+            'url': f"{self.binance_base}/ticker/24hr",
+            'params': {
                 'symbol': trading_pair
-            }
-            
-            headers = {
+            },
+            'headers': {
                 'X-MBX-APIKEY': self.binance_key
-            }
+            },
+            'timeout': 10
+        }
+
+    def _parse_binance_ticker(self, response, symbol: str, market: str, cache_key: str) -> Dict[str, Any]:
+        trading_pair = f"{symbol.upper()}{market.upper()}"
+        
+        if response.status_code == 200:
+            data = response.json()
+            self._store_binance_tickers([data])
+            result = self._binance_ticker_result(data, symbol, trading_pair)
             
-            response = requests.get(
-                f"{self.binance_base}/ticker/24hr",
-                params=params,
-                headers=headers,
-                timeout=10
-            )
+            # Cache the result
+            self._cache_data(cache_key, result)
             
-            if response.status_code == 200:
-                data = response.json()
-                
-                # Extract price information
-                current_price = float(data.get('lastPrice', 0))
-                price_change_24h = float(data.get('priceChangePercent', 0))
-                volume_24h = float(data.get('volume', 0))
-                high_24h = float(data.get('highPrice', 0))
-                low_24h = float(data.get('lowPrice', 0))
-                
-                result = {
-                    'success': True,
-                    'current_price': current_price,
-                    'price_change_24h': price_change_24h,
-                    'volume_24h': volume_24h,
-                    'high_24h': high_24h,
-                    'low_24h': low_24h,
-                    'market_cap': None,  # Will be enriched from CoinGecko
-                    'market_cap_rank': None,  # Will be enriched from CoinGecko
-                    'source': 'Binance',
-                    'api_source': 'binance',
-                    'symbol': symbol,
-                    'trading_pair': trading_pair,
-                    'last_updated': datetime.now().isoformat(),
-                    'raw_data': data,
-                    'needs_market_cap_enrichment': True
-                }
-                
-                # Cache the result
-                self._cache_data(cache_key, result)
-                
-                self.logger.info(f"✅ Binance: {trading_pair} data fetched successfully: ${current_price:,.8f}")
-                return result
-                
-            else:
-                error_msg = f"Binance API error: {response.status_code} - {response.text}"
-                self.logger.error(error_msg)
-                return {
-                    'success': False,
-                    'error': error_msg,
-                    'source': 'Binance',
-                    'api_source': 'binance'
-                }
-                
-        except requests.exceptions.RequestException as e:
-            error_msg = f"Network error fetching Binance data: {str(e)}"
+            self.logger.info(f"✅ Binance: {trading_pair} data fetched successfully: ${result['current_price']:,.8f}")
+            return result
+            
+        else:
+            error_msg = f"Binance API error: {response.status_code} - {response.text}"
             self.logger.error(error_msg)
             return {
                 'success': False,
@@ -321,80 +777,263 @@ class EnhancedPriceFetcher:
                 'source': 'Binance',
                 'api_source': 'binance'
             }
-        except Exception as e:
+
+    def _binance_ticker_result(self, data: Dict[str, Any], symbol: str, trading_pair: str) -> Dict[str, Any]:
+        # Extract price information
+        current_price = float(data.get('lastPrice', 0))
+        price_change_24h = float(data.get('priceChangePercent', 0))
+        volume_24h = float(data.get('volume', 0))
+        high_24h = float(data.get('highPrice', 0))
+        low_24h = float(data.get('lowPrice', 0))
+        
+        return {
+            'success': True,
+            'current_price': current_price,
+            'price_change_24h': price_change_24h,
+            'volume_24h': volume_24h,
+            'high_24h': high_24h,
+            'low_24h': low_24h,
+            'market_cap': None,  # Will be enriched from CoinGecko
+            'market_cap_rank': None,  # Will be enriched from CoinGecko
+            'source': 'Binance',
+            'api_source': 'binance',
+            'symbol': symbol,
+            'trading_pair': trading_pair,
+            'last_updated': datetime.now().isoformat(),
+            'raw_data': data,
+            'needs_market_cap_enrichment': True
+        }
+
+    def _binance_error(self, e: Exception) -> Dict[str, Any]:
+        if isinstance(e, requests.exceptions.RequestException):
+            error_msg = f"Network error fetching Binance data: {str(e)}"
+        else:
             error_msg = f"Error processing Binance data: {str(e)}"
-            self.logger.error(error_msg)
-            return {
-                'success': False,
-                'error': error_msg,
-                'source': 'Binance',
-                'api_source': 'binance'
-            }
+        self.logger.error(error_msg)
+        return {
+            'success': False,
+            'error': error_msg,
+            'source': 'Binance',
+            'api_source': 'binance'
+        }
+
+    # Quote currencies tried, in order, when resolving a bare symbol to a trading pair
+    BINANCE_QUOTES = ('USDT', 'BUSD', 'BTC')
 
     def get_binance_multiple_tickers(self, symbols: List[str]) -> Dict[str, Any]:
         """
         Get price data for multiple symbols from Binance API
+
+        Symbols are resolved against the shared ticker snapshot; only missing
+        or stale pairs are fetched (24hr tickers filtered by `symbols=[...]`
+        for small sets, otherwise the cheaper full /ticker/price list).
         """
         try:
-            if not self.binance_key:
+            resolved, missing = self._resolve_binance_symbols(symbols)
+            if missing and not self.binance_key:
                 return {
                     'success': False,
                     'error': 'Binance API key not available',
                     'source': 'Binance'
                 }
-            
-            headers = {
-                'X-MBX-APIKEY': self.binance_key
-            }
-            
-            # Get all price tickers
-            response = requests.get(
-                f"{self.binance_base}/ticker/price",
-                headers=headers,
-                timeout=10
-            )
-            
-            if response.status_code == 200:
-                all_tickers = response.json()
-                
-                # Filter for requested symbols
-                filtered_data = {}
-                for symbol in symbols:
-                    trading_pairs = [f"{symbol.upper()}USDT", f"{symbol.upper()}BUSD", f"{symbol.upper()}BTC"]
-                    
-                    for ticker in all_tickers:
-                        if ticker['symbol'] in trading_pairs:
-                            filtered_data[symbol] = {
-                                'symbol': ticker['symbol'],
-                                'price': float(ticker['price']),
-                                'source': 'Binance'
-                            }
-                            break
-                
-                result = {
-                    'success': True,
-                    'data': filtered_data,
-                    'source': 'Binance',
-                    'api_source': 'binance',
-                    'last_updated': datetime.now().isoformat(),
-                    'total_symbols': len(filtered_data)
-                }
-                
-                self.logger.info(f"✅ Binance: Multi-ticker data fetched for {len(filtered_data)} symbols")
-                return result
-                
+            if missing:
+                request = self._binance_snapshot_request(missing)
+                if request:
+                    response = self._http_get(**request)
+                    if response.status_code == 400 and 'params' in request:
+                        # One unlisted pair fails a filtered request; fall back to the full list
+                        request = self._binance_snapshot_request(missing, full=True)
+                        response = self._http_get(**request)
+                    error = self._store_binance_snapshot(response, full='params' not in request)
+                    if error:
+                        return error
+                resolved, _ = self._resolve_binance_symbols(symbols)
+            return self._binance_prices_result(resolved)
+        except Exception as e:
+            return self._binance_multi_error(e)
+
+    def _binance_from_snapshot(self, symbol: str, market: str) -> Optional[Dict[str, Any]]:
+        trading_pair = f"{symbol.upper()}{market.upper()}"
+        ticker = self._streamed_binance_ticker(trading_pair)
+        if ticker is not None:
+            self.binance_snapshot_stats['stream_hits'] += 1
+        else:
+            ticker = self._fresh_binance_ticker(trading_pair)
+            if ticker is None:
+                self.binance_snapshot_stats['misses'] += 1
+                return None
+            self.binance_snapshot_stats['hits'] += 1
+        return self._binance_ticker_result(ticker, symbol, trading_pair)
+
+    def attach_price_book(self, price_book, max_age: float = 2.0) -> None:
+        """Read Binance quotes from a streamed PriceBook first (quotes older than max_age are ignored)"""
+        self.price_book = price_book
+        self.price_book_max_age = max_age
+
+    def _streamed_binance_ticker(self, trading_pair: str) -> Optional[Dict[str, Any]]:
+        """Fresh streamed quote as a 24hr-ticker-shaped dict, or None"""
+        if self.price_book is None:
+            return None
+        quote = self.price_book.get(trading_pair, self.price_book_max_age)
+        if quote is None:
+            return None
+        return {
+            'symbol': trading_pair,
+            'lastPrice': quote.last,
+            'openPrice': quote.open,
+            'priceChangePercent': quote.change_percent,
+            'highPrice': quote.high,
+            'lowPrice': quote.low,
+            'volume': quote.volume,
+            'quoteVolume': quote.quote_volume,
+            'bidPrice': quote.bid,
+            'askPrice': quote.ask,
+            'closeTime': quote.event_time
+        }
+
+    def _fresh_binance_ticker(self, trading_pair: str) -> Optional[Dict[str, Any]]:
+        ticker = self._streamed_binance_ticker(trading_pair)
+        if ticker is not None:
+            return ticker
+        entry = self.binance_tickers.get(trading_pair)
+        if entry is not None and time.monotonic() - entry[0] < self.binance_snapshot_ttl:
+            return entry[1]
+        return None
+
+    def _fresh_binance_price(self, trading_pair: str) -> Optional[float]:
+        ticker = self._fresh_binance_ticker(trading_pair)
+        if ticker is not None:
+            return float(ticker['lastPrice'])
+        entry = self.binance_prices.get(trading_pair)
+        if entry is not None and time.monotonic() - entry[0] < self.binance_snapshot_ttl:
+            return entry[1]
+        return None
+
+    def _resolve_binance_symbols(self, symbols: List[str]):
+        """
+        Resolve symbols to fresh snapshot tickers by dict lookup
+
+        Returns (resolved, missing): resolved maps symbol -> price entry, missing
+        lists symbols whose pair is stale or not yet known. Symbols with no
+        listed pair in a fresh full snapshot are neither.
+        """
+        full_fresh = time.monotonic() - self.binance_full_snapshot_at < self.binance_snapshot_ttl
+        resolved, missing = {}, []
+        for symbol in symbols:
+            for quote in self.BINANCE_QUOTES:
+                trading_pair = f"{symbol.upper()}{quote}"
+                price = self._fresh_binance_price(trading_pair)
+                if price is None and trading_pair not in self.binance_tickers \
+                        and trading_pair not in self.binance_prices:
+                    continue
+                if price is not None:
+                    resolved[symbol] = {
+                        'symbol': trading_pair,
+                        'price': price,
+                        'source': 'Binance'
+                    }
+                else:
+                    missing.append(symbol)
+                break
             else:
-                error_msg = f"Binance multi-ticker API error: {response.status_code}"
-                self.logger.error(error_msg)
-                return {
-                    'success': False,
-                    'error': error_msg,
-                    'source': 'Binance',
-                    'api_source': 'binance'
-                }
-                
+                if not full_fresh:
+                    missing.append(symbol)
+        return resolved, missing
+
+    def _binance_snapshot_request(self, missing: List[str], full: bool = False) -> Optional[Dict[str, Any]]:
+        """
+        HTTP request refreshing the snapshot for missing symbols
+
+        Small sets fetch filtered 24hr tickers (weight 2 per pair); larger sets
+        and full refreshes fetch the /ticker/price list (weight 4) rather than
+        the full 24hr list (weight 80).
+        """
+        request = {
+            'provider': 'binance',
+            'url': f"{self.binance_base}/ticker/price",
+            'headers': {
+                'X-MBX-APIKEY': self.binance_key
+            },
+            'timeout': 10
+        }
+        # Filter only once the listed pairs are known, so the request names existing pairs
+        if full or not self.binance_listed_pairs:
+            return request
+        pairs = []
+        for symbol in missing:
+            listed = [f"{symbol.upper()}{quote}" for quote in self.BINANCE_QUOTES
+                      if f"{symbol.upper()}{quote}" in self.binance_listed_pairs]
+            pairs.extend(listed[:1])
+        if not pairs:
+            return None
+        if len(pairs) <= self.binance_filter_max_pairs:
+            request['url'] = f"{self.binance_base}/ticker/24hr"
+            request['params'] = {'symbols': json.dumps(pairs, separators=(',', ':'))}
+        return request
+
+    def refresh_binance_tickers(self, symbols: List[str], market: str = "USDT") -> None:
+        """
+        Fill the 24hr ticker snapshot for many symbols before looking them up one by one
+
+        The listed pairs come from one /ticker/price request (reused for
+        binance_listing_ttl); listed pairs without a fresh ticker or cached
+        result are then fetched binance_filter_max_pairs per filtered request,
+        so get_binance_crypto_data() serves them from the snapshot.
+        """
+        if not self.binance_key:
+            return
+        try:
+            if not self._binance_listing_known():
+                error = self._store_binance_snapshot(
+                    self._http_get(**self._binance_snapshot_request([], full=True)), full=True
+                )
+                if error:
+                    return
+            for request in self._binance_ticker_chunk_requests(symbols, market):
+                if self._store_binance_snapshot(self._http_get(**request), full=False):
+                    return
         except Exception as e:
-            error_msg = f"Error fetching Binance multi-ticker data: {str(e)}"
+            self._binance_multi_error(e)
+
+    def _binance_listing_known(self) -> bool:
+        return bool(self.binance_listed_pairs) and \
+            time.monotonic() - self.binance_full_snapshot_at < self.binance_listing_ttl
+
+    def _binance_unlisted(self, symbol: str, market: str) -> Optional[Dict[str, Any]]:
+        """Error result for a pair the known listing does not have (saves a request answered 400)"""
+        trading_pair = f"{symbol.upper()}{market.upper()}"
+        if not self._binance_listing_known() or trading_pair in self.binance_listed_pairs:
+            return None
+        return {
+            'success': False,
+            'error': f"{trading_pair} is not listed on Binance",
+            'source': 'Binance',
+            'api_source': 'binance'
+        }
+
+    def _binance_ticker_chunk_requests(self, symbols: List[str], market: str) -> List[Dict[str, Any]]:
+        """Filtered 24hr ticker requests for the listed pairs of symbols not served without a request"""
+        pairs = [
+            f"{symbol.upper()}{market.upper()}" for symbol in dict.fromkeys(symbols)
+            if f"{symbol.upper()}{market.upper()}" in self.binance_listed_pairs
+            and self._fresh_binance_ticker(f"{symbol.upper()}{market.upper()}") is None
+            and not self._is_cache_valid(f"binance_{symbol}_{market}")
+        ]
+        size = self.binance_filter_max_pairs
+        return [{
+            'provider': 'binance',
+            'url': f"{self.binance_base}/ticker/24hr",
+            'params': {'symbols': json.dumps(pairs[start:start + size], separators=(',', ':'))},
+            'headers': {
+                'X-MBX-APIKEY': self.binance_key
+            },
+            'timeout': 10
+        } for start in range(0, len(pairs), size)]
+
+    def _store_binance_snapshot(self, response, full: bool) -> Optional[Dict[str, Any]]:
+        """Merge a ticker response into the snapshot, returning an error result on failure"""
+        if response.status_code != 200:
+            error_msg = f"Binance multi-ticker API error: {response.status_code}"
             self.logger.error(error_msg)
             return {
                 'success': False,
@@ -402,150 +1041,294 @@ class EnhancedPriceFetcher:
                 'source': 'Binance',
                 'api_source': 'binance'
             }
+        if full:
+            self._store_binance_prices(response.json())
+        else:
+            self._store_binance_tickers(response.json())
+        self.binance_snapshot_stats['full_refreshes' if full else 'filtered_refreshes'] += 1
+        return None
+
+    def _store_binance_tickers(self, tickers: List[Dict[str, Any]]) -> None:
+        now = time.monotonic()
+        for ticker in tickers:
+            self.binance_tickers[ticker['symbol']] = (now, ticker)
+
+    def _store_binance_prices(self, prices: List[Dict[str, Any]]) -> None:
+        """Replace the full price list (a /ticker/price response)"""
+        now = time.monotonic()
+        # Swap in a new dict so concurrent readers never see a half-built snapshot
+        self.binance_prices = {item['symbol']: (now, float(item['price'])) for item in prices}
+        self.binance_listed_pairs = frozenset(self.binance_prices)
+        self.binance_full_snapshot_at = now
+
+    def _binance_prices_result(self, filtered_data: Dict[str, Dict]) -> Dict[str, Any]:
+        result = {
+            'success': True,
+            'data': filtered_data,
+            'source': 'Binance',
+            'api_source': 'binance',
+            'last_updated': datetime.now().isoformat(),
+            'total_symbols': len(filtered_data)
+        }
+        
+        self.logger.info(f"✅ Binance: Multi-ticker data fetched for {len(filtered_data)} symbols")
+        return result
+
+    def get_binance_snapshot_stats(self) -> Dict[str, Any]:
+        """Snapshot size, age and hit/refresh counters"""
+        return dict(
+            self.binance_snapshot_stats,
+            pairs=len(self.binance_tickers),
+            prices=len(self.binance_prices),
+            listed_pairs=len(self.binance_listed_pairs),
+            full_snapshot_age=round(time.monotonic() - self.binance_full_snapshot_at, 2)
+            if self.binance_full_snapshot_at else None
+        )
+
+    def _binance_multi_error(self, e: Exception) -> Dict[str, Any]:
+        error_msg = f"Error fetching Binance multi-ticker data: {str(e)}"
+        self.logger.error(error_msg)
+        return {
+            'success': False,
+            'error': error_msg,
+            'source': 'Binance',
+            'api_source': 'binance'
+        }
 
     def get_coinmarketcap_data(self, symbol: str) -> Dict[str, Any]:
         """
         Get cryptocurrency data from CoinMarketCap API (includes market cap, price, volume)
         """
-        cache_key = f"coinmarketcap_{symbol}"
+        fetch = functools.partial(self._fetch_coinmarketcap, symbol)
         
         # Check cache first
-        if self._is_cache_valid(cache_key):
-            return self.cache[cache_key]['data']
-        
+        cached = self._get_cached_data(f"coinmarketcap_{symbol}", fetch)
+        if cached:
+            return cached
+        return fetch()
+
+    def get_coinmarketcap_quotes(self, symbols: List[str]) -> Dict[str, Dict[str, Any]]:
+        """
+        CoinMarketCap data for many symbols: cached ones from the cache, the rest in one request
+        """
+        results = {}
+        missing = []
+        for symbol in symbols:
+            cached = self._get_cached_data(f"coinmarketcap_{symbol}", functools.partial(self._fetch_coinmarketcap, symbol))
+            if cached:
+                results[symbol] = cached
+            else:
+                missing.append(symbol)
+        for chunk in self._batch_chunks(missing):
+            results.update(self._fetch_coinmarketcap_many(chunk))
+        return results
+
+    def _fetch_coinmarketcap(self, symbol: str) -> Dict[str, Any]:
+        # Joins concurrent lookups of other symbols into one multi-symbol request
+        return self.coinmarketcap_batcher.get(symbol)
+
+    def _fetch_coinmarketcap_many(self, symbols: List[str]) -> Dict[str, Dict[str, Any]]:
         try:
+            request = self._coinmarketcap_request(symbols)
+            response = self._http_get(**request)
+            results = self._parse_coinmarketcap(response, symbols, request['url'])
+        except Exception as e:
+            error = self._coinmarketcap_error(e)
+            results = {symbol: error for symbol in symbols}
+        return {symbol: self._cache_failure(f"coinmarketcap_{symbol}", result) for symbol, result in results.items()}
+
+    def _coinmarketcap_request(self, symbols: List[str]) -> Dict[str, Any]:
+        """HTTP request for CoinMarketCap latest quotes of one or more symbols"""
+        return {
+            'provider': 'coinmarketcap',
             # CoinMarketCap API endpoint untuk quotes
-            url = f"{self.coinmarketcap_base}/cryptocurrency/quotes/latest"
-            
-            headers = {
+            'url': f"{self.coinmarketcap_base}/cryptocurrency/quotes/latest",
+            'headers': {
                 'Accepts': 'application/json',
                 'X-CMC_PRO_API_KEY': self.coinmarketcap_key,
+            },
+            'params': {
+                'symbol': ','.join(sorted({symbol.upper() for symbol in symbols})),
+                'convert': 'USD',
+                # Unknown symbols are left out instead of failing the whole batch
+                'skip_invalid': 'true'
+            },
+            'timeout': 15
+        }
+
+    def _parse_coinmarketcap(self, response, symbols: List[str], url: str) -> Dict[str, Dict[str, Any]]:
+        """Result per requested symbol (successful ones are cached)"""
+        if response.status_code != 200:
+            error_msg = f"HTTP {response.status_code}: {response.text[:200]}"
+            self.logger.error(f"❌ CoinMarketCap API error: {error_msg}")
+            error = {
+                'success': False,
+                'error': error_msg,
+                'source': 'CoinMarketCap',
+                'api_source': 'coinmarketcap'
             }
-            
-            params = {
-                'symbol': symbol.upper(),
-                'convert': 'USD'
-            }
-            
-            response = requests.get(url, headers=headers, params=params, timeout=15)
-            
-            if response.status_code == 200:
-                data = response.json()
-                
-                if 'data' in data and symbol.upper() in data['data']:
-                    coin_data = data['data'][symbol.upper()]
-                    quote_data = coin_data['quote']['USD']
-                    
-                    result = {
-                        'success': True,
-                        'symbol': symbol.upper(),
-                        'name': coin_data['name'],
-                        'current_price': quote_data['price'],
-                        'market_cap': quote_data['market_cap'],
-                        'market_cap_rank': coin_data['cmc_rank'],
-                        'volume_24h': quote_data['volume_24h'],
-                        'price_change_24h': quote_data['percent_change_24h'],
-                        'price_change_7d': quote_data['percent_change_7d'],
-                        'circulating_supply': coin_data['circulating_supply'],
-                        'total_supply': coin_data['total_supply'],
-                        'max_supply': coin_data['max_supply'],
-                        'last_updated': quote_data['last_updated'],
-                        'source': 'CoinMarketCap',
-                        'api_source': 'coinmarketcap',
-                        'api_url': url
-                    }
-                    
-                    # Cache the result
-                    self._cache_data(cache_key, result)
-                    
-                    self.logger.info(f"✅ CoinMarketCap: {symbol} = ${result['current_price']:,.2f}, Market Cap: ${result['market_cap']:,.0f}")
-                    return result
-                    
-                else:
-                    error_msg = f"Symbol {symbol} not found in CoinMarketCap response"
-                    self.logger.warning(f"⚠️ CoinMarketCap: {error_msg}")
-                    return {
-                        'success': False,
-                        'error': error_msg,
-                        'source': 'CoinMarketCap',
-                        'api_source': 'coinmarketcap'
-                    }
-            
-            else:
-                error_msg = f"HTTP {response.status_code}: {response.text[:200]}"
-                self.logger.error(f"❌ CoinMarketCap API error: {error_msg}")
-                return {
+            return {symbol: error for symbol in symbols}
+        
+        data = response.json().get('data') or {}
+        results = {}
+        for symbol in symbols:
+            coin_data = data.get(symbol.upper())
+            if coin_data is None:
+                error_msg = f"Symbol {symbol} not found in CoinMarketCap response"
+                self.logger.warning(f"⚠️ CoinMarketCap: {error_msg}")
+                results[symbol] = {
                     'success': False,
                     'error': error_msg,
                     'source': 'CoinMarketCap',
                     'api_source': 'coinmarketcap'
                 }
-                
-        except requests.exceptions.RequestException as e:
-            error_msg = f"Network error: {str(e)}"
-            self.logger.error(f"❌ CoinMarketCap network error: {error_msg}")
-            return {
-                'success': False,
-                'error': error_msg,
+                continue
+            quote_data = coin_data['quote']['USD']
+            
+            result = {
+                'success': True,
+                'symbol': symbol.upper(),
+                'name': coin_data['name'],
+                'current_price': quote_data['price'],
+                'market_cap': quote_data['market_cap'],
+                'market_cap_rank': coin_data['cmc_rank'],
+                'volume_24h': quote_data['volume_24h'],
+                'price_change_24h': quote_data['percent_change_24h'],
+                'price_change_7d': quote_data['percent_change_7d'],
+                'circulating_supply': coin_data['circulating_supply'],
+                'total_supply': coin_data['total_supply'],
+                'max_supply': coin_data['max_supply'],
+                'last_updated': quote_data['last_updated'],
                 'source': 'CoinMarketCap',
-                'api_source': 'coinmarketcap'
+                'api_source': 'coinmarketcap',
+                'api_url': url
             }
-        except Exception as e:
+            
+            # Cache the result
+            self._cache_data(f"coinmarketcap_{symbol}", result)
+            
+            self.logger.info(f"✅ CoinMarketCap: {symbol} = ${result['current_price']:,.2f}, Market Cap: ${result['market_cap']:,.0f}")
+            results[symbol] = result
+        return results
+
+    def _coinmarketcap_error(self, e: Exception) -> Dict[str, Any]:
+        if isinstance(e, requests.exceptions.RequestException):
+            error_msg = f"Network error: {str(e)}"
+            self.logger.error(f"❌ CoinMarketCap network error: {error_msg}")
+        else:
             error_msg = f"Unexpected error: {str(e)}"
             self.logger.error(f"❌ CoinMarketCap unexpected error: {error_msg}")
-            return {
-                'success': False,
-                'error': error_msg,
-                'source': 'CoinMarketCap',
-                'api_source': 'coinmarketcap'
-            }
+        return {
+            'success': False,
+            'error': error_msg,
+            'source': 'CoinMarketCap',
+            'api_source': 'coinmarketcap'
+        }
+
+    # CoinGecko ids for symbols shared by several coins; other symbols resolve via the coin list index
+    COINGECKO_IDS = {
+        'BTC': 'bitcoin',
+        'ETH': 'ethereum', 
+        'BNB': 'binancecoin',
+        'ADA': 'cardano',
+        'SOL': 'solana',
+        'DOT': 'polkadot',
+        'LINK': 'chainlink',
+        'MATIC': 'polygon',
+        'UNI': 'uniswap',
+        'LTC': 'litecoin'
+    }
 
     def get_coingecko_market_cap(self, symbol: str) -> Dict[str, Any]:
         """
-        Get market cap data from CoinGecko API (free, no API key required)
+        Get market cap data from CoinGecko API (free, no API key required), cached with a long TTL
         """
-        try:
-            # CoinGecko symbol mapping
-            symbol_map = {
-                'BTC': 'bitcoin',
-                'ETH': 'ethereum', 
-                'BNB': 'binancecoin',
-                'ADA': 'cardano',
-                'SOL': 'solana',
-                'DOT': 'polkadot',
-                'LINK': 'chainlink',
-                'MATIC': 'polygon',
-                'UNI': 'uniswap',
-                'LTC': 'litecoin'
-            }
-            
-            coin_id = symbol_map.get(symbol.upper())
-            if not coin_id:
-                return {
+        symbol = symbol.upper()
+        fetch = functools.partial(self._fetch_coingecko, symbol)
+        cached = self._get_cached_data(f"coingecko_mcap_{symbol}", fetch)
+        if cached:
+            return cached
+        return fetch()
+
+    def get_coingecko_market_caps(self, symbols: List[str]) -> Dict[str, Dict[str, Any]]:
+        """
+        CoinGecko market caps for many symbols: cached ones from the cache, the rest in one request
+        """
+        results = {}
+        missing = []
+        for symbol in {symbol.upper() for symbol in symbols}:
+            cached = self._get_cached_data(f"coingecko_mcap_{symbol}", functools.partial(self._fetch_coingecko, symbol))
+            if cached:
+                results[symbol] = cached
+            else:
+                missing.append(symbol)
+        for chunk in self._batch_chunks(missing):
+            results.update(self._fetch_coingecko_many(chunk))
+        return results
+
+    def _fetch_coingecko(self, symbol: str) -> Dict[str, Any]:
+        # Joins concurrent lookups of other symbols into one multi-id request
+        return self.coingecko_batcher.get(symbol)
+
+    def _fetch_coingecko_many(self, symbols: List[str]) -> Dict[str, Dict[str, Any]]:
+        coin_ids, results = self._coingecko_ids(symbols, self.get_coingecko_coin_index())
+        if coin_ids:
+            try:
+                response = self._http_get(**self._coingecko_request(list(coin_ids)))
+                results.update(self._parse_coingecko(response, coin_ids))
+            except Exception as e:
+                error = self._coingecko_error(e)
+                results.update({symbol: error for grouped in coin_ids.values() for symbol in grouped})
+        return {symbol: self._cache_failure(f"coingecko_mcap_{symbol}", result) for symbol, result in results.items()}
+
+    def _coingecko_ids(self, symbols: List[str], index: Dict[str, str]) -> tuple:
+        """(coin id -> symbols, failed results of symbols without a coin id)"""
+        coin_ids: Dict[str, List[str]] = {}
+        unsupported = {}
+        for symbol in symbols:
+            coin_id = self.COINGECKO_IDS.get(symbol) or index.get(symbol)
+            if coin_id:
+                coin_ids.setdefault(coin_id, []).append(symbol)
+            else:
+                unsupported[symbol] = {
                     'success': False,
                     'error': f'Symbol {symbol} not supported for market cap lookup'
                 }
-            
+        return coin_ids, unsupported
+
+    def _coingecko_request(self, coin_ids: List[str]) -> Dict[str, Any]:
+        """HTTP request for CoinGecko simple price with market cap of one or more coins"""
+        return {
+            'provider': 'coingecko',
             # CoinGecko API endpoint
-            url = f"https://api.coingecko.com/api/v3/simple/price"
-            params = {
-                'ids': coin_id,
+            'url': f"{self.coingecko_base}/simple/price",
+            'params': {
+                'ids': ','.join(sorted(coin_ids)),
                 'vs_currencies': 'usd',
                 'include_market_cap': 'true',
                 'include_24hr_change': 'true',
                 'include_24hr_vol': 'true',
                 'include_last_updated_at': 'true'
+            },
+            'timeout': 10
+        }
+
+    def _parse_coingecko(self, response, coin_ids: Dict[str, List[str]]) -> Dict[str, Dict[str, Any]]:
+        """Result per symbol of the requested coin ids (successful ones are cached)"""
+        if response.status_code != 200:
+            error = {
+                'success': False,
+                'error': f'CoinGecko API error: {response.status_code}'
             }
-            
-            response = requests.get(url, params=params, timeout=10)
-            
-            if response.status_code == 200:
-                data = response.json()
-                
+            return {symbol: error for symbols in coin_ids.values() for symbol in symbols}
+        
+        data = response.json()
+        results = {}
+        for coin_id, symbols in coin_ids.items():
+            for symbol in symbols:
                 if coin_id in data:
                     coin_data = data[coin_id]
-                    
-                    return {
+                    results[symbol] = {
                         'success': True,
                         'market_cap': coin_data.get('usd_market_cap'),
                         'current_price': coin_data.get('usd'),
@@ -555,22 +1338,69 @@ class EnhancedPriceFetcher:
                         'source': 'CoinGecko',
                         'coin_id': coin_id
                     }
+                    self._cache_data(f"coingecko_mcap_{symbol}", results[symbol])
                 else:
-                    return {
+                    results[symbol] = {
                         'success': False,
                         'error': f'No data found for {symbol} on CoinGecko'
                     }
-            else:
-                return {
-                    'success': False,
-                    'error': f'CoinGecko API error: {response.status_code}'
-                }
-                
+        return results
+
+    def _coingecko_error(self, e: Exception) -> Dict[str, Any]:
+        return {
+            'success': False,
+            'error': f'Error fetching CoinGecko data: {str(e)}'
+        }
+
+    def get_coingecko_coin_index(self) -> Dict[str, str]:
+        """
+        Symbol -> CoinGecko coin id for every listed coin (cached for a day, {} while unavailable)
+        """
+        cached = self._get_cached_data("coingecko_coins", self._fetch_coingecko_coins)
+        if not cached:
+            cached = self._fetch_coingecko_coins()
+        return cached.get('ids', {})
+
+    def _fetch_coingecko_coins(self) -> Dict[str, Any]:
+        try:
+            response = self._http_get(**self._coingecko_coins_request())
+            result = self._parse_coingecko_coins(response)
         except Exception as e:
-            return {
-                'success': False,
-                'error': f'Error fetching CoinGecko data: {str(e)}'
-            }
+            result = self._coingecko_error(e)
+        return self._cache_failure("coingecko_coins", result)
+
+    def _coingecko_coins_request(self) -> Dict[str, Any]:
+        """HTTP request for the full CoinGecko coin list (id, symbol, name)"""
+        return {
+            'provider': 'coingecko',
+            'url': f"{self.coingecko_base}/coins/list",
+            'timeout': 30
+        }
+
+    def _parse_coingecko_coins(self, response) -> Dict[str, Any]:
+        response.raise_for_status()
+        
+        # Several coins share most symbols; prefer the coin whose id is its own name, then the shortest id
+        ranked: Dict[str, tuple] = {}
+        for coin in response.json():
+            coin_id = coin.get('id')
+            symbol = (coin.get('symbol') or '').upper()
+            if not coin_id or not symbol:
+                continue
+            rank = (coin_id != (coin.get('name') or '').lower().replace(' ', '-'), len(coin_id), coin_id)
+            if symbol not in ranked or rank < ranked[symbol]:
+                ranked[symbol] = rank
+        result = {
+            'success': True,
+            'ids': {symbol: rank[2] for symbol, rank in ranked.items()}
+        }
+        self._cache_data("coingecko_coins", result)
+        self.logger.info(f"📊 CoinGecko coin index loaded: {len(result['ids'])} symbols")
+        return result
+
+    def _batch_chunks(self, symbols: List[str]) -> List[List[str]]:
+        size = self.batch_max_symbols
+        return [symbols[i:i + size] for i in range(0, len(symbols), size)]
 
     def enrich_with_market_cap(self, price_data: Dict[str, Any], symbol: str) -> Dict[str, Any]:
         """
@@ -582,25 +1412,26 @@ class EnhancedPriceFetcher:
         try:
             # Get market cap from CoinGecko
             market_cap_data = self.get_coingecko_market_cap(symbol)
-            
-            if market_cap_data.get('success'):
-                # Enrich the original data
-                price_data['market_cap'] = market_cap_data.get('market_cap')
-                price_data['market_cap_rank'] = self._estimate_market_cap_rank(market_cap_data.get('market_cap', 0))
-                price_data['market_cap_source'] = 'CoinGecko'
-                price_data['data_sources'] = [price_data.get('source', 'Unknown'), 'CoinGecko']
-                
-                # Remove the enrichment flag
-                price_data.pop('needs_market_cap_enrichment', None)
-                
-                self.logger.info(f"✅ Market cap enriched for {symbol}: ${price_data['market_cap']:,.0f}")
-            else:
-                self.logger.warning(f"⚠️ Could not enrich market cap for {symbol}: {market_cap_data.get('error')}")
-                
+            self._apply_market_cap(price_data, symbol, market_cap_data)
         except Exception as e:
             self.logger.error(f"❌ Error enriching market cap for {symbol}: {str(e)}")
             
         return price_data
+
+    def _apply_market_cap(self, price_data: Dict[str, Any], symbol: str, market_cap_data: Dict[str, Any]) -> None:
+        if market_cap_data.get('success'):
+            # Enrich the original data
+            price_data['market_cap'] = market_cap_data.get('market_cap')
+            price_data['market_cap_rank'] = self._estimate_market_cap_rank(market_cap_data.get('market_cap', 0))
+            price_data['market_cap_source'] = 'CoinGecko'
+            price_data['data_sources'] = [price_data.get('source', 'Unknown'), 'CoinGecko']
+            
+            # Remove the enrichment flag
+            price_data.pop('needs_market_cap_enrichment', None)
+            
+            self.logger.info(f"✅ Market cap enriched for {symbol}: ${price_data['market_cap']:,.0f}")
+        else:
+            self.logger.warning(f"⚠️ Could not enrich market cap for {symbol}: {market_cap_data.get('error')}")
     
     def _estimate_market_cap_rank(self, market_cap: float) -> int:
         """
@@ -625,181 +1456,451 @@ class EnhancedPriceFetcher:
         else:
             return 100
 
-    def get_comprehensive_price_data(self, symbol: str) -> Dict[str, Any]:
+    def get_comprehensive_price_data(self, symbol: str, deadline: Optional[float] = None,
+                                     hedge: Optional[bool] = None) -> Quote:
         """
-        Get comprehensive price data using multiple sources with CoinMarketCap as priority for market cap
+        Get a Quote from multiple sources with CoinMarketCap as priority for market cap
+
+        All sources are queried concurrently, except that quota-limited fallbacks
+        (`deferred_sources`) wait until the sources ahead of them fail or the
+        slowest p95 latency among them passes. The call returns as soon as the
+        highest-priority source that can still win has answered (or when
+        `deadline` seconds have passed, using the best source answered so far);
+        sources that can no longer win are abandoned. With `hedge`, a source
+        still pending after its p95 latency gets a second request and the first
+        answer wins. Use Quote.to_dict() for the plain dict layout.
         """
-        results = {}
-        
-        # PRIORITY 1: Use CoinMarketCap for complete data (price + market cap)
-        coinmarketcap_data = self.get_coinmarketcap_data(symbol)
-        if coinmarketcap_data.get('success'):
-            results['coinmarketcap'] = coinmarketcap_data
-        
-        # PRIORITY 2: Use Binance for real-time trading data (high accuracy price)
-        binance_data = self.get_binance_crypto_data(symbol)
-        if binance_data.get('success'):
-            results['binance'] = binance_data
+        deadline = self.fanout_deadline if deadline is None else deadline
+        expires = time.monotonic() + deadline
+        launchers = self._comprehensive_launchers(symbol)
+        fanout = SourceFanOut(
+            list(launchers), lambda name: self._pool().submit(launchers[name]),
+            self._hedge_delays(launchers, hedge), time.monotonic(), self._deferred_delays(launchers)
+        )
+        try:
+            while True:
+                fanout.collect()
+                if fanout.complete():
+                    break
+                now = time.monotonic()
+                if now >= expires:
+                    self.fanout_stats['deadline_expired'] += 1
+                    break
+                fanout.launch_deferred(now)
+                fanout.launch_hedges(now)
+                wake = min(expires, fanout.next_hedge() or expires)
+                concurrent.futures.wait(fanout.pending(), timeout=max(0.0, wake - now),
+                                        return_when=concurrent.futures.FIRST_COMPLETED)
+        finally:
+            # Running threads cannot be interrupted; they finish in the background and still fill the cache
+            self._record_fanout(fanout)
         
-        # PRIORITY 3: For Bitcoin, use CoinDesk as backup source
+        quote = self._comprehensive_quote(symbol, fanout)
+        if quote.success and quote.market_cap is None:
+            try:
+                self._enrich_quote(quote, self.get_coingecko_market_cap(symbol))
+            except Exception as e:
+                self.logger.error(f"❌ Error enriching market cap for {symbol}: {str(e)}")
+        return quote
+
+    def _comprehensive_launchers(self, symbol: str) -> Dict[str, Callable[[], Any]]:
+        """Source fetch calls for a symbol in effective priority order"""
+        launchers = {
+            # PRIORITY 1: CoinMarketCap for complete data (price + market cap)
+            'coinmarketcap': functools.partial(self.get_coinmarketcap_data, symbol),
+            # PRIORITY 2: Binance for real-time trading data (high accuracy price)
+            'binance': functools.partial(self.get_binance_crypto_data, symbol)
+        }
+        # PRIORITY 3: For Bitcoin, CoinDesk as backup source
         if symbol.upper() == 'BTC':
-            coindesk_data = self.get_coindesk_bitcoin_price()
-            if coindesk_data.get('success'):
-                results['coindesk'] = coindesk_data
-        
-        # PRIORITY 4: Use Alpha Vantage as additional source
-        alpha_vantage_data = self.get_alpha_vantage_crypto_data(symbol)
-        if alpha_vantage_data.get('success'):
-            results['alpha_vantage'] = alpha_vantage_data
-        
-        # Determine primary data source based on priority
-        primary_data = None
-        if 'coinmarketcap' in results:
-            # CoinMarketCap is highest priority (has market cap data)
-            primary_data = results['coinmarketcap']
-            primary_data['backup_sources'] = [k for k in results.keys() if k != 'coinmarketcap']
-            self.logger.info(f"🥇 Using CoinMarketCap as primary source for {symbol}")
-        elif 'binance' in results:
-            # Binance for real-time price, enrich with market cap
-            primary_data = results['binance']
-            primary_data['backup_sources'] = [k for k in results.keys() if k != 'binance']
-            primary_data = self.enrich_with_market_cap(primary_data, symbol)
-            self.logger.info(f"� Using Binance as primary source for {symbol}")
-        elif symbol.upper() == 'BTC' and 'coindesk' in results:
-            # CoinDesk for Bitcoin if others fail
-            primary_data = results['coindesk']
-            primary_data['backup_sources'] = [k for k in results.keys() if k != 'coindesk']
-            primary_data = self.enrich_with_market_cap(primary_data, symbol)
-            self.logger.info(f"� Using CoinDesk as primary source for {symbol}")
-        elif 'alpha_vantage' in results:
-            # Alpha Vantage as last resort
-            primary_data = results['alpha_vantage']
-            primary_data['backup_sources'] = [k for k in results.keys() if k != 'alpha_vantage']
-            primary_data = self.enrich_with_market_cap(primary_data, symbol)
-            self.logger.info(f"🥉 Using Alpha Vantage as primary source for {symbol}")
-        
-        if primary_data:
-            primary_data['all_sources'] = results
-            primary_data['sources_available'] = len(results)
-            primary_data['data_quality'] = 'Excellent' if 'coinmarketcap' in results else 'High' if 'binance' in results else 'Medium'
-            return primary_data
+            launchers['coindesk'] = self.get_coindesk_bitcoin_price
+        # PRIORITY 4: Alpha Vantage as additional source
+        launchers['alpha_vantage'] = functools.partial(self.get_alpha_vantage_crypto_data, symbol)
+        # Effective order: slow or failing providers move behind healthy ones. Open circuits keep
+        # their place so fresh cached results are still used; _http_get refuses their requests
+        return {name: launchers[name] for name in self.provider_health.order(list(launchers), available_only=False)}
+
+    def _hedge_delays(self, sources, hedge: Optional[bool]) -> Optional[Dict[str, float]]:
+        """p95 latency per source with enough samples, when hedging is enabled"""
+        if not (self.hedge_requests if hedge is None else hedge):
+            return None
+        delays = {}
+        for source in sources:
+            if self.provider_health.sample_count(source) >= self.hedge_min_samples:
+                delays[source] = max(0.05, self.latency_percentile(source, 95))
+        return delays
+
+    def _deferred_delays(self, sources) -> Dict[str, float]:
+        """Launch delay per deferred source: the slowest p95 latency among the sources ranked ahead of it"""
+        delays = {}
+        ahead = []
+        for source in sources:
+            if source in self.deferred_sources and ahead:
+                p95 = [self.latency_percentile(other, 95) for other in ahead
+                       if self.provider_health.sample_count(other) >= self.hedge_min_samples]
+                delays[source] = max(p95) if len(p95) == len(ahead) else self.deferred_launch_delay
+            ahead.append(source)
+        return delays
+
+    def _record_fanout(self, fanout: 'SourceFanOut') -> None:
+        self.fanout_stats['lookups'] += 1
+        self.fanout_stats['cancelled'] += fanout.cancel_all()
+        self.fanout_stats['hedges'] += fanout.hedges
+        self.fanout_stats['hedge_wins'] += fanout.hedge_wins
+        self.fanout_stats['deferred_launches'] += fanout.deferred_launches
+        # Deferred sources still waiting when the deadline passed were never sent either
+        self.fanout_stats['deferred_skipped'] += fanout.deferred_skipped + len(fanout.launch_at)
+
+    def get_batch_stats(self) -> Dict[str, Any]:
+        """Micro-batching counters per provider"""
+        return {
+            'coinmarketcap': self.coinmarketcap_batcher.get_stats(),
+            'coingecko': self.coingecko_batcher.get_stats()
+        }
+
+    def get_fanout_stats(self) -> Dict[str, Any]:
+        """Fan-out counters and recent p95 latency per provider"""
+        return dict(
+            self.fanout_stats,
+            p95_latency_ms={provider: round(self.latency_percentile(provider, 95) * 1000, 1)
+                            for provider in list(self.provider_health.providers)
+                            if self.provider_health.sample_count(provider)}
+        )
+
+    # Source priority for get_comprehensive_price_data and the log line of each
+    PRIMARY_SOURCES = [
+        ('coinmarketcap', "🥇 Using CoinMarketCap as primary source for {symbol}"),  # has market cap data
+        ('binance', "🥈 Using Binance as primary source for {symbol}"),  # real-time price
+        ('coindesk', "🥈 Using CoinDesk as primary source for {symbol}"),  # Bitcoin only
+        ('alpha_vantage', "🥉 Using Alpha Vantage as primary source for {symbol}")  # last resort
+    ]
+
+    def _select_primary_source(self, symbol: str, results: Dict[str, Dict],
+                               order: Optional[List[str]] = None) -> Optional[str]:
+        """Name of the first successful source in `order`"""
+        messages = dict(self.PRIMARY_SOURCES)
+        for source in order or list(messages):
+            if source in results:
+                self.logger.info(messages[source].format(symbol=symbol))
+                return source
+        return None
+
+    def _comprehensive_quote(self, symbol: str, fanout: 'SourceFanOut') -> Quote:
+        """Quote of the primary source with what every answered source said (market cap enrichment is left to the caller)"""
+        # Provider result dicts stay in the cache untouched; the quote only keeps scalars
+        provenance = tuple(
+            SourceQuote.from_result(name, fanout.results.get(name), fanout.errors.get(name))
+            for name in fanout.order if name in fanout.results or name in fanout.errors
+        )
+        primary = self._select_primary_source(symbol, fanout.results, fanout.order)
+        if primary is None:
+            return Quote.failed(symbol, 'No data sources available', provenance)
+        return Quote.from_result(symbol, primary, fanout.results[primary], provenance)
+
+    def _enrich_quote(self, quote: Quote, market_cap_data: Dict[str, Any]) -> None:
+        """Fill a quote's market cap from a CoinGecko result"""
+        if market_cap_data.get('success') and market_cap_data.get('market_cap') is not None:
+            quote.market_cap = market_cap_data['market_cap']
+            quote.market_cap_rank = self._estimate_market_cap_rank(quote.market_cap)
+            quote.market_cap_source = 'CoinGecko'
+            self.logger.info(f"✅ Market cap enriched for {quote.symbol}: ${quote.market_cap:,.0f}")
         else:
-            return {
-                'success': False,
-                'error': 'No data sources available',
-                'symbol': symbol,
-                'attempted_sources': ['binance', 'coindesk', 'alpha_vantage'],
-                'timestamp': datetime.now().isoformat()
-            }
+            self.logger.warning(f"⚠️ Could not enrich market cap for {quote.symbol}: {market_cap_data.get('error')}")
 
     def get_historical_data(self, symbol: str, days: int = 30) -> Dict[str, Any]:
         """
-        Get historical price data using Alpha Vantage
+        Get historical daily price data
+
+        With the history store enabled, the last `days` closed daily candles
+        are sliced from local columnar files and only missing ranges are
+        fetched; otherwise the full Alpha Vantage series is downloaded.
+        """
+        if self.history_store is None:
+            return self._get_alpha_vantage_history(symbol, days)
+        
+        try:
+            end = last_closed_candle(TIMEFRAME_SECONDS['1d'])
+            start = end - (days - 1) * TIMEFRAME_SECONDS['1d']
+            columns, fetched, error = self.get_history_arrays(symbol, start, end)
+            return self._history_result(symbol, days, columns, fetched, error)
+        except Exception as e:
+            return self._historical_error(e)
+
+    def get_history_arrays(self, symbol: str, start: int, end: int, timeframe: str = '1d'):
         """
+        OHLCV columns for candles opening between start and end (UTC epoch seconds)
+
+        Missing ranges are backfilled first: Binance klines in parallel chunks,
+        then Alpha Vantage for daily candles Binance does not list. Returns
+        (columns, requests made, error or None); columns are zero-copy views
+        of the store (HistoryStore.to_dataframe wraps them in a DataFrame).
+        """
+        series = self.history_store.series(symbol, timeframe)
+        requests_ = self._history_backfill_requests(symbol, series, timeframe, start, end)
+        failure_key = self._history_failure_key(symbol, timeframe)
+        failed = self._get_cached_data(failure_key) if requests_ else None
+        if failed:
+            # A recent backfill failed: serve what is stored until the negative TTL passes
+            return series.slice(start, end), 0, failed['error']
+        error = None
+        if requests_:
+            results = list(self._pool().map(self._fetch_history_chunk, requests_))
+            error = self._store_history_chunks(series, start, requests_, results)
+            if error and timeframe == '1d' and self.alpha_vantage_key and series.missing_ranges(start, end):
+                try:
+                    response = self._http_get(**self._alpha_vantage_daily_request(symbol))
+                    error = self._store_alpha_vantage_history(series, response, end)
+                    requests_.append(None)
+                except Exception as e:
+                    error = str(e)
+            if error:
+                self._cache_failure(failure_key, {'success': False, 'error': error})
+        return series.slice(start, end), len(requests_), error
+
+    @staticmethod
+    def _history_failure_key(symbol: str, timeframe: str) -> str:
+        return f"history_{symbol.upper()}_{timeframe}"
+
+    def _fetch_history_chunk(self, request: Dict[str, Any]):
         try:
-            if not self.alpha_vantage_key:
-                return {
-                    'success': False,
-                    'error': 'Alpha Vantage API key not available'
-                }
-            
-            params = {
+            return self._http_get(**request)
+        except Exception as e:
+            return e
+
+    def _history_backfill_requests(self, symbol: str, series, timeframe: str,
+                                   start: int, end: int) -> List[Dict[str, Any]]:
+        """Binance klines requests covering the series' missing ranges, in chunks of history_chunk_candles"""
+        step = TIMEFRAME_SECONDS[timeframe]
+        requests_ = []
+        for first, last in series.missing_ranges(start, end):
+            for chunk_start in range(first, last + 1, step * self.history_chunk_candles):
+                chunk_end = min(last, chunk_start + step * (self.history_chunk_candles - 1))
+                requests_.append({
+                    'provider': 'binance',
+                    'url': f"{self.binance_base}/klines",
+                    'params': {
+                        'symbol': f"{symbol.upper()}USDT",
+                        'interval': timeframe,
+                        'startTime': chunk_start * 1000,
+                        'endTime': chunk_end * 1000,
+                        'limit': self.history_chunk_candles
+                    },
+                    'timeout': 10
+                })
+        return requests_
+
+    def _store_history_chunks(self, series, start: int, requests_: List[Dict[str, Any]],
+                              results: List[Any]) -> Optional[str]:
+        """Write fetched klines to the series; returns an error message if any chunk failed"""
+        klines = []
+        error = None
+        for result in results:
+            if isinstance(result, Exception):
+                error = f"Network error fetching Binance klines: {result}"
+            elif result.status_code != 200:
+                error = f"Binance klines error: {result.status_code} - {result.text}"
+            else:
+                klines.extend(result.json())
+        if klines:
+            # Kline rows: [open time ms, open, high, low, close, volume, close time ms, ...]
+            table = np.array([row[:6] for row in klines], dtype=np.float64)
+            series.write({
+                'time': (table[:, 0] // 1000).astype(np.int64),
+                'open': table[:, 1],
+                'high': table[:, 2],
+                'low': table[:, 3],
+                'close': table[:, 4],
+                'volume': table[:, 5]
+            })
+        if error is None:
+            # Every chunk answered: nothing before the first stored candle exists at the source
+            first_requested = min(request['params']['startTime'] for request in requests_) // 1000
+            stored = series.arrays()['time']
+            if len(stored) and stored[0] > first_requested:
+                series.set_listed_from(int(stored[0]))
+            # and requested candles still missing (none listed yet, exchange gaps) never will
+            empty = [gap for request in requests_
+                     for gap in series.missing_ranges(request['params']['startTime'] // 1000,
+                                                      request['params']['endTime'] // 1000)]
+            if empty:
+                series.add_empty_ranges(empty)
+        else:
+            self.logger.warning(f"⚠️ {error}")
+        return error
+
+    def _store_alpha_vantage_history(self, series, response, end: int) -> Optional[str]:
+        """Write the closed candles of an Alpha Vantage daily series; returns an error message or None"""
+        response.raise_for_status()
+        data = response.json()
+        time_series = data.get('Time Series (Digital Currency Daily)')
+        if not time_series:
+            return data.get('Error Message', data.get('Note', 'No historical data found'))
+        dates = np.array(list(time_series), dtype='datetime64[s]').astype(np.int64)
+        rows = list(time_series.values())
+        table = np.array([
+            [float(day['1a. open (USD)']), float(day['2a. high (USD)']), float(day['3a. low (USD)']),
+             float(day['4a. close (USD)']), float(day['5. volume'])]
+            for day in rows
+        ], dtype=np.float64)
+        closed = dates <= end
+        series.write({
+            'time': dates[closed],
+            'open': table[closed, 0],
+            'high': table[closed, 1],
+            'low': table[closed, 2],
+            'close': table[closed, 3],
+            'volume': table[closed, 4]
+        })
+        # The full series is returned, so nothing older exists at the source
+        stored = series.arrays()['time']
+        if len(stored):
+            series.set_listed_from(int(stored[0]))
+        return None
+
+    def _history_result(self, symbol: str, days: int, columns: Dict[str, Any],
+                        fetched: int, error: Optional[str]) -> Dict[str, Any]:
+        if len(columns['time']) == 0:
+            return {
+                'success': False,
+                'error': error or 'No historical data found',
+                'source': 'History store'
+            }
+        return {
+            'success': True,
+            'symbol': symbol,
+            'data': {
+                'dates': columns['time'].astype('datetime64[s]').astype('datetime64[D]').astype(str).tolist(),
+                'prices': columns['close'].tolist(),
+                'volumes': columns['volume'].tolist(),
+                'high': columns['high'].tolist(),
+                'low': columns['low'].tolist()
+            },
+            'days_requested': days,
+            'days_received': len(columns['time']),
+            'source': 'History store',
+            'requests_made': fetched,
+            'timestamp': datetime.now().isoformat()
+        }
+
+    def _get_alpha_vantage_history(self, symbol: str, days: int) -> Dict[str, Any]:
+        """Last `days` entries of the full Alpha Vantage daily series (no local store)"""
+        if not self.alpha_vantage_key:
+            return {
+                'success': False,
+                'error': 'Alpha Vantage API key not available'
+            }
+        
+        try:
+            response = self._http_get(**self._alpha_vantage_daily_request(symbol))
+            return self._parse_alpha_vantage_daily(response, symbol, days)
+        except Exception as e:
+            return self._historical_error(e)
+
+    def _alpha_vantage_daily_request(self, symbol: str) -> Dict[str, Any]:
+        """HTTP request for Alpha Vantage daily digital currency series"""
+        return {
+            'provider': 'alpha_vantage',
+            'url': self.alpha_vantage_base,
+            'params': {
                 'function': 'DIGITAL_CURRENCY_DAILY',
                 'symbol': symbol,
                 'market': 'USD',
                 'apikey': self.alpha_vantage_key
-            }
-            
-            response = requests.get(self.alpha_vantage_base, params=params, timeout=15)
-            response.raise_for_status()
-            
-            data = response.json()
-            
-            # Check for errors
-            if 'Error Message' in data or 'Note' in data:
-                return {
-                    'success': False,
-                    'error': data.get('Error Message', 'API rate limit exceeded'),
-                    'source': 'Alpha Vantage'
-                }
-            
-            time_series_key = 'Time Series (Digital Currency Daily)'
-            if time_series_key not in data:
-                return {
-                    'success': False,
-                    'error': 'No historical data found'
-                }
-            
-            time_series = data[time_series_key]
-            
-            # Sort dates and get last N days
-            dates = sorted(time_series.keys(), reverse=True)[:days]
-            
-            historical_data = {
-                'dates': [],
-                'prices': [],
-                'volumes': [],
-                'high': [],
-                'low': []
-            }
-            
-            for date in reversed(dates):  # Reverse to get chronological order
-                day_data = time_series[date]
-                historical_data['dates'].append(date)
-                historical_data['prices'].append(float(day_data['4a. close (USD)']))
-                historical_data['volumes'].append(float(day_data['5. volume']))
-                historical_data['high'].append(float(day_data['2a. high (USD)']))
-                historical_data['low'].append(float(day_data['3a. low (USD)']))
-            
+            },
+            'timeout': 15
+        }
+
+    def _parse_alpha_vantage_daily(self, response, symbol: str, days: int) -> Dict[str, Any]:
+        response.raise_for_status()
+        
+        data = response.json()
+        
+        # Check for errors
+        if 'Error Message' in data or 'Note' in data:
             return {
-                'success': True,
-                'symbol': symbol,
-                'data': historical_data,
-                'days_requested': days,
-                'days_received': len(historical_data['dates']),
-                'source': 'Alpha Vantage',
-                'timestamp': datetime.now().isoformat()
+                'success': False,
+                'error': data.get('Error Message', 'API rate limit exceeded'),
+                'source': 'Alpha Vantage'
             }
-            
-        except Exception as e:
+        
+        time_series_key = 'Time Series (Digital Currency Daily)'
+        if time_series_key not in data:
             return {
                 'success': False,
-                'error': f"Error fetching historical data: {str(e)}",
-                'source': 'Alpha Vantage'
+                'error': 'No historical data found'
             }
+        
+        time_series = data[time_series_key]
+        
+        # Sort dates and get last N days
+        dates = sorted(time_series.keys(), reverse=True)[:days]
+        
+        historical_data = {
+            'dates': [],
+            'prices': [],
+            'volumes': [],
+            'high': [],
+            'low': []
+        }
+        
+        for date in reversed(dates):  # Reverse to get chronological order
+            day_data = time_series[date]
+            historical_data['dates'].append(date)
+            historical_data['prices'].append(float(day_data['4a. close (USD)']))
+            historical_data['volumes'].append(float(day_data['5. volume']))
+            historical_data['high'].append(float(day_data['2a. high (USD)']))
+            historical_data['low'].append(float(day_data['3a. low (USD)']))
+        
+        return {
+            'success': True,
+            'symbol': symbol,
+            'data': historical_data,
+            'days_requested': days,
+            'days_received': len(historical_data['dates']),
+            'source': 'Alpha Vantage',
+            'timestamp': datetime.now().isoformat()
+        }
+
+    def _historical_error(self, e: Exception) -> Dict[str, Any]:
+        return {
+            'success': False,
+            'error': f"Error fetching historical data: {str(e)}",
+            'source': 'Alpha Vantage'
+        }
 
     def get_market_overview(self, symbols: List[str] = None) -> Dict[str, Any]:
         """
-        Get market overview for multiple cryptocurrencies
+        Get market overview for multiple cryptocurrencies (Quote.to_dict() per symbol)
         """
         if symbols is None:
             symbols = ['BTC', 'ETH', 'ADA', 'DOT', 'LTC']
         
-        market_data = {}
+        market_data: Dict[str, Quote] = {}
+        self._prefetch_cached(self._comprehensive_cache_keys(symbols))
+        # One CoinMarketCap request for all symbols, one CoinGecko request for the market caps it misses
+        cmc_data = self.get_coinmarketcap_quotes(symbols)
+        self.get_coingecko_market_caps([symbol for symbol in symbols if not cmc_data.get(symbol, {}).get('success')])
+        # Chunked 24hr tickers, so the per-symbol Binance lookups hit the snapshot
+        self.refresh_binance_tickers(symbols)
         
+        # No pacing needed: providers without budget are skipped by the rate limiter
         for symbol in symbols:
             try:
-                data = self.get_comprehensive_price_data(symbol)
-                market_data[symbol] = data
-                
-                # Rate limiting - Alpha Vantage allows 5 calls per minute
-                time.sleep(12)  # 12 seconds between calls = 5 calls per minute
-                
+                market_data[symbol] = self.get_comprehensive_price_data(symbol)
             except Exception as e:
-                market_data[symbol] = {
-                    'success': False,
-                    'error': str(e),
-                    'symbol': symbol
-                }
-        
-        successful_fetches = sum(1 for data in market_data.values() if data.get('success'))
+                market_data[symbol] = Quote.failed(symbol, str(e))
         
+        return self._market_overview_result(market_data)
+    
+    def _market_overview_result(self, market_data: Dict[str, Quote]) -> Dict[str, Any]:
+        """JSON-serializable overview of per-symbol quotes"""
+        successful_fetches = sum(1 for quote in market_data.values() if quote.success)
         return {
-            'market_overview': market_data,
+            'market_overview': {symbol: quote.to_dict() for symbol, quote in market_data.items()},
             'timestamp': datetime.now().isoformat(),
-            'total_symbols': len(symbols),
+            'total_symbols': len(market_data),
             'successful_fetches': successful_fetches,
-            'success_rate': f"{(successful_fetches/len(symbols)*100):.1f}%"
+            'success_rate': f"{(successful_fetches/len(market_data)*100):.1f}%" if market_data else "0.0%"
         }
 
 def test_enhanced_price_apis():
@@ -813,7 +1914,7 @@ def test_enhanced_price_apis():
     
     # Test Bitcoin data (CoinMarketCap priority, Binance, CoinDesk + Alpha Vantage backup)
     print("1️⃣ Testing Bitcoin Price Data (Multi-source dengan CoinMarketCap)...")
-    btc_data = fetcher.get_comprehensive_price_data('BTC')
+    btc_data = fetcher.get_comprehensive_price_data('BTC').to_dict()
     
     if btc_data.get('success'):
         print(f"   ✅ BTC Price: ${btc_data['current_price']:,.2f}")
@@ -831,7 +1932,7 @@ def test_enhanced_price_apis():
     
     # Test Ethereum data dengan CoinMarketCap
     print("2️⃣ Testing Ethereum Price Data (CoinMarketCap + Binance)...")
-    eth_data = fetcher.get_comprehensive_price_data('ETH')
+    eth_data = fetcher.get_comprehensive_price_data('ETH').to_dict()
     
     if eth_data.get('success'):
         print(f"   ✅ ETH Price: ${eth_data['current_price']:,.2f}")
@@ -913,7 +2014,7 @@ def test_enhanced_price_apis():
         Returns:
             Dict dengan data harga lengkap
         """
-        return self.get_comprehensive_price_data(symbol)
+        return self.get_comprehensive_price_data(symbol).to_dict()
 
 if __name__ == "__main__":
     test_enhanced_price_apis()
@@ -4,185 +4,410 @@ Enhanced Signal Generator for CryptSIST MT5 Integration
 Provides realistic, dynamic trading signals for testing
 """
 
-import random
 import math
+import threading
 import time
-from datetime import datetime, timedelta
-from typing import Dict, Tuple
+import zlib
+from collections.abc import Mapping
+from datetime import datetime
+from typing import Callable, Dict, Iterable, Iterator, List, Optional
+
+import numpy as np
+
+HISTORY_LENGTH = 10  # recent prices kept per symbol
+
+# Signal and trend codes stored in the int8 arrays
+SIGNAL_NAMES = {1: 'BUY', -1: 'SELL', 0: 'HOLD'}
+TREND_NAMES = {1: 'bullish', -1: 'bearish', 0: 'neutral'}
+
+
+def _splitmix64(x: np.ndarray) -> np.ndarray:
+    """Counter-based 64-bit hash (SplitMix64 finalizer) over a uint64 array"""
+    x = x + np.uint64(0x9E3779B97F4A7C15)
+    x = (x ^ (x >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+    x = (x ^ (x >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+    return x ^ (x >> np.uint64(31))
+
+
+def _splitmix64_int(x: int) -> int:
+    """_splitmix64 for one Python int"""
+    x = (x + 0x9E3779B97F4A7C15) & 0xFFFFFFFFFFFFFFFF
+    x = ((x ^ (x >> 30)) * 0xBF58476D1CE4E5B9) & 0xFFFFFFFFFFFFFFFF
+    x = ((x ^ (x >> 27)) * 0x94D049BB133111EB) & 0xFFFFFFFFFFFFFFFF
+    return x ^ (x >> 31)
+
+
+class GeneratedSignal(Mapping):
+    """
+    One symbol's signal in a SignalBatch, read like the dict generate_signal
+    returns. The analysis text is rendered on first access only.
+    """
+
+    __slots__ = ('batch', 'index', '_analysis')
+
+    KEYS = ('symbol', 'signal', 'confidence', 'price', 'sentiment', 'analysis', 'timestamp')
+
+    def __init__(self, batch: 'SignalBatch', index: int):
+        self.batch = batch
+        self.index = index
+        self._analysis: Optional[str] = None
+
+    def __getitem__(self, key: str):
+        batch, i = self.batch, self.index
+        if key == 'symbol':
+            return batch.symbols[i]
+        if key == 'signal':
+            return SIGNAL_NAMES[int(batch.signal[i])]
+        if key == 'confidence':
+            return round(float(batch.confidence[i]), 2)
+        if key == 'price':
+            return round(float(batch.price[i]), 2)
+        if key == 'sentiment':
+            return TREND_NAMES[int(batch.trend[i])].upper()
+        if key == 'analysis':
+            if self._analysis is None:
+                self._analysis = batch.render_analysis(i)
+            return self._analysis
+        if key == 'timestamp':
+            return batch.timestamp
+        raise KeyError(key)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.KEYS)
+
+    def __len__(self) -> int:
+        return len(self.KEYS)
+
+    def __repr__(self) -> str:
+        return f"GeneratedSignal({self['symbol']!r}, {self['signal']}, confidence={self['confidence']})"
+
+
+class SignalBatch(Mapping):
+    """
+    Signals of one generate_signals() call: arrays in request order
+    (signal codes, confidence, price, trend codes) plus a mapping
+    symbol -> GeneratedSignal built on lookup.
+    """
+
+    def __init__(self, symbols: List[str], signal: np.ndarray, confidence: np.ndarray, price: np.ndarray,
+                 trend: np.ndarray, generated_at: datetime, render: Callable[..., str]):
+        self.symbols = symbols
+        self.positions: Optional[Dict[str, int]] = None  # built on the first lookup
+        self.signal = signal
+        self.confidence = confidence
+        self.price = price
+        self.trend = trend
+        self.timestamp = generated_at.isoformat()
+        self.time_str = generated_at.strftime('%H:%M:%S')
+        self.render = render
+
+    def render_analysis(self, i: int) -> str:
+        return self.render(self.symbols[i], SIGNAL_NAMES[int(self.signal[i])], float(self.confidence[i]),
+                           float(self.price[i]), TREND_NAMES[int(self.trend[i])], self.time_str)
+
+    def __getitem__(self, symbol: str) -> GeneratedSignal:
+        if self.positions is None:
+            self.positions = {symbol: i for i, symbol in enumerate(self.symbols)}
+        return GeneratedSignal(self, self.positions[symbol])
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.symbols)
+
+    def __len__(self) -> int:
+        return len(self.symbols)
+
+    def counts(self) -> Dict[str, int]:
+        """Number of BUY / SELL / HOLD signals in the batch"""
+        return {name: int(np.count_nonzero(self.signal == code)) for code, name in SIGNAL_NAMES.items()}
+
 
 class EnhancedSignalGenerator:
-    def __init__(self):
-        self.symbol_prices = {
-            'BTC': 58431.50,
-            'ETH': 3245.80,
-            'LTC': 85.25,
-            'BCH': 425.60,
-            'XRP': 0.6234
-        }
-        self.symbol_trends = {
-            'BTC': 'neutral',
-            'ETH': 'neutral', 
-            'LTC': 'neutral',
-            'BCH': 'neutral',
-            'XRP': 'neutral'
-        }
-        self.last_signals = {}
-        self.signal_history = {}
-        
-    def simulate_price_movement(self, symbol: str) -> float:
-        """Simulate realistic price movement"""
-        current_price = self.symbol_prices.get(symbol, 1000.0)
-        
-        # Different volatility for different symbols
-        volatility_map = {
-            'BTC': 0.02,  # 2% max movement
-            'ETH': 0.025, # 2.5% max movement  
-            'LTC': 0.03,  # 3% max movement
-            'BCH': 0.035, # 3.5% max movement
-            'XRP': 0.04   # 4% max movement
-        }
-        
-        volatility = volatility_map.get(symbol, 0.02)
-        
-        # Add time-based patterns (more volatile during certain hours)
-        hour = datetime.now().hour
-        if 8 <= hour <= 16 or 20 <= hour <= 23:  # Active trading hours
-            volatility *= 1.5
-        
-        # Random walk with momentum
-        price_change = random.uniform(-volatility, volatility)
-        
-        # Add momentum (trend following)
-        current_trend = self.symbol_trends.get(symbol, 'neutral')
-        if current_trend == 'bullish':
-            price_change += random.uniform(0, volatility * 0.5)
-        elif current_trend == 'bearish':
-            price_change -= random.uniform(0, volatility * 0.5)
-        
-        new_price = current_price * (1 + price_change)
-        self.symbol_prices[symbol] = new_price
-        
-        return new_price
-    
-    def update_trend(self, symbol: str, price_history: list) -> str:
-        """Update trend based on recent price movements"""
-        if len(price_history) < 3:
-            return 'neutral'
-        
-        recent_prices = price_history[-3:]
-        
-        # Calculate trend
-        if recent_prices[2] > recent_prices[1] > recent_prices[0]:
-            trend = 'bullish'
-        elif recent_prices[2] < recent_prices[1] < recent_prices[0]:
-            trend = 'bearish'
-        else:
-            trend = 'neutral'
-        
-        self.symbol_trends[symbol] = trend
-        return trend
-    
+    """
+    Simulated per-symbol prices and the signals derived from them.
+
+    Per-symbol state (price, volatility, trend, the last HISTORY_LENGTH
+    prices) lives in NumPy arrays indexed by a slot per symbol, so a batch of
+    symbols is advanced and scored with array operations in one pass.
+    """
+
+    # Seed symbols: starting price and max movement per tick
+    BASE_PRICES = {
+        'BTC': 58431.50,
+        'ETH': 3245.80,
+        'LTC': 85.25,
+        'BCH': 425.60,
+        'XRP': 0.6234
+    }
+    VOLATILITY = {
+        'BTC': 0.02,  # 2% max movement
+        'ETH': 0.025, # 2.5% max movement
+        'LTC': 0.03,  # 3% max movement
+        'BCH': 0.035, # 3.5% max movement
+        'XRP': 0.04   # 4% max movement
+    }
+    DEFAULT_PRICE = 1000.0
+    DEFAULT_VOLATILITY = 0.02
+
+    # Per-slot arrays, grown together
+    ARRAYS = ('prices', 'volatility', 'trends', 'history', 'history_count', 'symbol_keys')
+
+    def __init__(self, capacity: int = 64, seed: Optional[int] = None):
+        self.rng = np.random.default_rng(seed)
+        self.slots: Dict[str, int] = {}
+        self.free_slots: List[int] = []
+        self.next_slot = 0
+        self.prices = np.zeros(capacity)
+        self.volatility = np.zeros(capacity)
+        self.trends = np.zeros(capacity, dtype=np.int8)
+        # Ring buffer of recent prices: a slot's n-th price goes to column n % HISTORY_LENGTH
+        self.history = np.zeros((capacity, HISTORY_LENGTH))
+        self.history_count = np.zeros(capacity, dtype=np.int64)
+        self.symbol_keys = np.zeros(capacity, dtype=np.uint64)  # stable per-symbol hash for the news factor
+        self.last_access = {}
+        self.lock = threading.Lock()
+        self.stats = {'batches': 0, 'signals': 0, 'last_batch_ms': 0.0}
+        # Seed symbols keep their base price when their state is evicted
+        self.base_symbols = set(self.BASE_PRICES)
+        self._assign_slots(list(self.BASE_PRICES))
+
+    def _grow(self, capacity: int) -> None:
+        for name in self.ARRAYS:
+            old = getattr(self, name)
+            new = np.zeros((capacity,) + old.shape[1:], dtype=old.dtype)
+            new[:len(old)] = old
+            setattr(self, name, new)
+
+    def _assign_slots(self, symbols: List[str]) -> np.ndarray:
+        """Slot index per symbol, initializing state for symbols seen for the first time"""
+        slots = self.slots
+        assigned_slots = list(map(slots.get, symbols))
+        if None in assigned_slots:
+            new_symbols = [symbol for symbol, slot in zip(symbols, assigned_slots) if slot is None]
+            reused = min(len(new_symbols), len(self.free_slots))
+            fresh = len(new_symbols) - reused
+            if self.next_slot + fresh > len(self.prices):
+                self._grow(max(self.next_slot + fresh, 2 * len(self.prices)))
+            assigned = [self.free_slots.pop() for _ in range(reused)]
+            assigned += range(self.next_slot, self.next_slot + fresh)
+            self.next_slot += fresh
+            slots.update(zip(new_symbols, assigned))
+            new = np.asarray(assigned, dtype=np.intp)
+            self.prices[new] = [self.BASE_PRICES.get(symbol, self.DEFAULT_PRICE) for symbol in new_symbols]
+            self.volatility[new] = [self.VOLATILITY.get(symbol, self.DEFAULT_VOLATILITY) for symbol in new_symbols]
+            self.trends[new] = 0
+            self.history_count[new] = 0
+            self.symbol_keys[new] = [zlib.crc32(symbol.encode()) << 32 for symbol in new_symbols]
+            assigned_slots = list(map(slots.__getitem__, symbols))
+        return np.array(assigned_slots, dtype=np.intp)
+
+    @staticmethod
+    def is_active_hour(hour: int) -> bool:
+        """Active trading hours: more volatile, stronger signals"""
+        return 8 <= hour <= 16 or 20 <= hour <= 23
+
+    def _simulate_prices(self, slots: np.ndarray, hour: int) -> np.ndarray:
+        """Random walk with momentum for every slot, stored as the new current prices"""
+        volatility = self.volatility[slots] * (1.5 if self.is_active_hour(hour) else 1.0)
+        change = self.rng.uniform(-volatility, volatility)
+        # Momentum (trend following): up to half the volatility in the trend's direction
+        change += self.trends[slots] * self.rng.uniform(0, volatility * 0.5)
+        prices = self.prices[slots] * (1 + change)
+        self.prices[slots] = prices
+        return prices
+
+    def _append_history(self, slots: np.ndarray, prices: np.ndarray):
+        """Store prices in the ring buffer; returns (previous price, the one before it, history length)"""
+        count = self.history_count[slots]
+        self.history[slots, count % HISTORY_LENGTH] = prices
+        self.history_count[slots] = count + 1
+        previous = self.history[slots, (count - 1) % HISTORY_LENGTH]
+        before_previous = self.history[slots, (count - 2) % HISTORY_LENGTH]
+        return previous, before_previous, np.minimum(count + 1, HISTORY_LENGTH)
+
+    def _update_trends(self, slots: np.ndarray, prices: np.ndarray, previous: np.ndarray,
+                       before_previous: np.ndarray, length: np.ndarray) -> np.ndarray:
+        """Bullish/bearish on three rising/falling prices; neutral (not stored) with fewer than three"""
+        first, middle, last = before_previous, previous, prices
+        rising = (last > middle) & (middle > first)
+        falling = (last < middle) & (middle < first)
+        trends = np.where(length >= 3, rising.astype(np.int8) - falling.astype(np.int8), 0).astype(np.int8)
+        self.trends[slots] = np.where(length >= 3, trends, self.trends[slots])
+        return trends
+
+    def _news_factor(self, slots: np.ndarray, minute: int) -> np.ndarray:
+        """Random market events (news, etc.): uniform in ±0.4, changing every minute per symbol"""
+        keys = self.symbol_keys[slots] | np.uint64(minute & 0xFFFFFFFF)
+        uniform = (_splitmix64(keys) >> np.uint64(11)).astype(np.float64) * (1.0 / (1 << 53))
+        return uniform * 0.8 - 0.4
+
+    def _signal_strength(self, slots: np.ndarray, prices: np.ndarray, previous: np.ndarray,
+                         length: np.ndarray, trends: np.ndarray, now: datetime) -> np.ndarray:
+        """Combined momentum, trend, time, news and technical factors, clipped to ±1"""
+        timestamp = int(now.timestamp())
+        # Market hours (stronger signals during active hours)
+        market_factor = 0.2 if self.is_active_hour(now.hour) else 0.0
+        # Price momentum against the previous price, amplified
+        momentum_factor = np.zeros(len(slots))
+        np.divide(prices - previous, previous, out=momentum_factor, where=length >= 2)
+        momentum_factor *= 10
+        trend_factor = trends * 0.3
+        news_factor = self._news_factor(slots, timestamp // 60)
+        # Technical indicators simulation (5-minute cycle)
+        tech_factor = math.sin(timestamp / 300) * 0.3
+        return np.clip(market_factor + momentum_factor + trend_factor + news_factor + tech_factor, -1.0, 1.0)
+
+    def _classify(self, strength: np.ndarray):
+        """Signal codes and confidences from signal strengths"""
+        magnitude = np.abs(strength)
+        signal = np.where(magnitude > 0.1, np.sign(strength), 0).astype(np.int8)
+        confidence = np.select(
+            [magnitude > 0.3, magnitude > 0.1],
+            [0.65 + np.minimum(0.3, magnitude * 0.5), 0.55 + magnitude * 0.3],
+            default=0.60 + self.rng.uniform(-0.05, 0.05, len(strength))
+        )
+        return signal, confidence
+
+    def generate_signals(self, symbols: Iterable[str]) -> SignalBatch:
+        """
+        Generate signals for many symbols in one vectorized pass
+
+        Every symbol's price moves one step; duplicates are generated once.
+        Returns a SignalBatch mapping symbol -> signal dict view whose
+        analysis text is only rendered when read.
+        """
+        started = time.perf_counter()
+        accessed = dict.fromkeys(symbols, time.monotonic())
+        symbols = list(accessed)
+        now = datetime.now()
+        with self.lock:
+            self.last_access.update(accessed)
+            slots = self._assign_slots(symbols)
+            prices = self._simulate_prices(slots, now.hour)
+            previous, before_previous, length = self._append_history(slots, prices)
+            trends = self._update_trends(slots, prices, previous, before_previous, length)
+            strength = self._signal_strength(slots, prices, previous, length, trends, now)
+            signal, confidence = self._classify(strength)
+            self.stats['batches'] += 1
+            self.stats['signals'] += len(symbols)
+            self.stats['last_batch_ms'] = round((time.perf_counter() - started) * 1000, 3)
+        return SignalBatch(symbols, signal, confidence, prices, trends, now, self.generate_analysis)
+
     def generate_signal(self, symbol: str) -> Dict:
-        """Generate enhanced trading signal"""
-        # Simulate price movement
-        current_price = self.simulate_price_movement(symbol)
-        
-        # Update price history
-        if symbol not in self.signal_history:
-            self.signal_history[symbol] = []
-        
-        self.signal_history[symbol].append(current_price)
-        
-        # Keep only last 10 prices
-        if len(self.signal_history[symbol]) > 10:
-            self.signal_history[symbol] = self.signal_history[symbol][-10:]
-        
-        # Update trend
-        trend = self.update_trend(symbol, self.signal_history[symbol])
-        
-        # Generate signal based on multiple factors
-        signal_strength = self.calculate_signal_strength(symbol, current_price, trend)
-        
-        # Determine signal type
-        if signal_strength > 0.3:
-            signal_type = "BUY"
-            confidence = 0.65 + min(0.3, signal_strength * 0.5)
-        elif signal_strength < -0.3:
-            signal_type = "SELL" 
-            confidence = 0.65 + min(0.3, abs(signal_strength) * 0.5)
-        elif signal_strength > 0.1:
-            signal_type = "BUY"
-            confidence = 0.55 + signal_strength * 0.3
-        elif signal_strength < -0.1:
-            signal_type = "SELL"
-            confidence = 0.55 + abs(signal_strength) * 0.3
-        else:
-            signal_type = "HOLD"
-            confidence = 0.60 + random.uniform(-0.05, 0.05)
-        
-        # Generate analysis
-        analysis = self.generate_analysis(symbol, signal_type, confidence, current_price, trend)
-        
+        """
+        Generate enhanced trading signal
+
+        Scalar form of generate_signals() for one symbol (same model, same
+        random draws): per-request misses skip the array overhead of a
+        one-element pass.
+        """
+        started = time.perf_counter()
+        now = datetime.now()
+        with self.lock:
+            self.last_access[symbol] = time.monotonic()
+            slot = self.slots.get(symbol)
+            if slot is None:
+                slot = int(self._assign_slots([symbol])[0])
+
+            # _simulate_prices
+            volatility = float(self.volatility[slot]) * (1.5 if self.is_active_hour(now.hour) else 1.0)
+            change = self.rng.uniform(-volatility, volatility)
+            change += int(self.trends[slot]) * self.rng.uniform(0, volatility * 0.5)
+            price = float(self.prices[slot]) * (1 + change)
+            self.prices[slot] = price
+
+            # _append_history
+            count = int(self.history_count[slot])
+            self.history[slot, count % HISTORY_LENGTH] = price
+            self.history_count[slot] = count + 1
+            previous = float(self.history[slot, (count - 1) % HISTORY_LENGTH])
+            before_previous = float(self.history[slot, (count - 2) % HISTORY_LENGTH])
+            length = min(count + 1, HISTORY_LENGTH)
+
+            # _update_trends
+            trend = 0
+            if length >= 3:
+                trend = int(price > previous > before_previous) - int(price < previous < before_previous)
+                self.trends[slot] = trend
+
+            # _signal_strength
+            timestamp = int(now.timestamp())
+            key = int(self.symbol_keys[slot]) | ((timestamp // 60) & 0xFFFFFFFF)
+            strength = (
+                (0.2 if self.is_active_hour(now.hour) else 0.0)
+                + ((price - previous) / previous * 10 if length >= 2 else 0.0)
+                + trend * 0.3
+                + (_splitmix64_int(key) >> 11) * (1.0 / (1 << 53)) * 0.8 - 0.4
+                + math.sin(timestamp / 300) * 0.3
+            )
+            strength = min(1.0, max(-1.0, strength))
+
+            # _classify
+            magnitude = abs(strength)
+            signal = (1 if strength > 0 else -1) if magnitude > 0.1 else 0
+            default_confidence = 0.60 + self.rng.uniform(-0.05, 0.05)
+            if magnitude > 0.3:
+                confidence = 0.65 + min(0.3, magnitude * 0.5)
+            elif magnitude > 0.1:
+                confidence = 0.55 + magnitude * 0.3
+            else:
+                confidence = default_confidence
+
+            self.stats['batches'] += 1
+            self.stats['signals'] += 1
+            self.stats['last_batch_ms'] = round((time.perf_counter() - started) * 1000, 3)
+
+        signal_name = SIGNAL_NAMES[signal]
         return {
             'symbol': symbol,
-            'signal': signal_type,
+            'signal': signal_name,
             'confidence': round(confidence, 2),
-            'price': round(current_price, 2),
-            'sentiment': trend.upper(),
-            'analysis': analysis,
-            'timestamp': datetime.now().isoformat()
+            'price': round(price, 2),
+            'sentiment': TREND_NAMES[trend].upper(),
+            'analysis': self.generate_analysis(symbol, signal_name, confidence, price, TREND_NAMES[trend],
+                                               now.strftime('%H:%M:%S')),
+            'timestamp': now.isoformat()
         }
-    
-    def calculate_signal_strength(self, symbol: str, price: float, trend: str) -> float:
-        """Calculate signal strength based on multiple factors"""
-        now = datetime.now()
-        
-        # Time-based factors
-        hour = now.hour
-        minute = now.minute
-        
-        # Market hours (stronger signals during active hours)
-        market_factor = 0.2 if 8 <= hour <= 16 or 20 <= hour <= 23 else 0.0
-        
-        # Price momentum
-        if symbol in self.signal_history and len(self.signal_history[symbol]) >= 2:
-            price_change = (price - self.signal_history[symbol][-2]) / self.signal_history[symbol][-2]
-            momentum_factor = price_change * 10  # Amplify price changes
-        else:
-            momentum_factor = 0.0
-        
-        # Trend factor
-        trend_factor = 0.3 if trend == 'bullish' else -0.3 if trend == 'bearish' else 0.0
-        
-        # Random market events (news, etc.)
-        random.seed(int(now.timestamp()) // 60 + hash(symbol))  # Change every minute per symbol
-        news_factor = random.uniform(-0.4, 0.4)
-        
-        # Technical indicators simulation
-        tech_factor = math.sin(int(now.timestamp()) / 300) * 0.3  # 5-minute cycle
-        
-        # Combine all factors
-        total_strength = market_factor + momentum_factor + trend_factor + news_factor + tech_factor
-        
-        # Normalize to reasonable range
-        return max(-1.0, min(1.0, total_strength))
-    
-    def generate_analysis(self, symbol: str, signal_type: str, confidence: float, price: float, trend: str) -> str:
+
+    def evict_symbol(self, symbol: str) -> None:
+        """Drop per-symbol state (history, trend, simulated price) for a symbol"""
+        with self.lock:
+            self.last_access.pop(symbol, None)
+            slot = self.slots.get(symbol)
+            if slot is None:
+                return
+            self.history_count[slot] = 0
+            if symbol not in self.base_symbols:
+                del self.slots[symbol]
+                self.free_slots.append(slot)
+
+    def evict_idle(self, max_idle: float) -> int:
+        """Evict state of symbols not requested in the last max_idle seconds"""
+        cutoff = time.monotonic() - max_idle
+        idle = [symbol for symbol, accessed in list(self.last_access.items()) if accessed < cutoff]
+        for symbol in idle:
+            self.evict_symbol(symbol)
+        return len(idle)
+
+    def get_stats(self) -> Dict:
+        return dict(self.stats, symbols=len(self.slots), capacity=len(self.prices))
+
+    def generate_analysis(self, symbol: str, signal_type: str, confidence: float, price: float, trend: str,
+                          time_str: Optional[str] = None) -> str:
         """Generate human-readable analysis"""
-        time_str = datetime.now().strftime('%H:%M:%S')
-        
+        time_str = time_str or datetime.now().strftime('%H:%M:%S')
+
         if signal_type == "BUY":
             if confidence > 0.8:
                 return f"🟢 STRONG BUY signal for {symbol} at ${price:,.2f}. Multiple bullish indicators aligned with {confidence*100:.0f}% confidence. {trend.title()} trend confirmed. Time: {time_str}"
             else:
                 return f"🟢 BUY signal for {symbol} at ${price:,.2f}. Positive momentum detected with {confidence*100:.0f}% confidence. Consider entry position. Time: {time_str}"
-        
+
         elif signal_type == "SELL":
             if confidence > 0.8:
                 return f"🔴 STRONG SELL signal for {symbol} at ${price:,.2f}. Bearish reversal confirmed with {confidence*100:.0f}% confidence. {trend.title()} pressure building. Time: {time_str}"
             else:
                 return f"🔴 SELL signal for {symbol} at ${price:,.2f}. Downward momentum with {confidence*100:.0f}% confidence. Consider position reduction. Time: {time_str}"
-        
+
         else:  # HOLD
             return f"🟡 HOLD signal for {symbol} at ${price:,.2f}. Market consolidation with {confidence*100:.0f}% confidence. Awaiting clear directional break. {trend.title()} trend. Time: {time_str}"
 
@@ -193,17 +418,21 @@ def get_enhanced_signal(symbol: str) -> Dict:
     """Get enhanced signal for symbol"""
     return signal_generator.generate_signal(symbol)
 
+def get_enhanced_signals(symbols: Iterable[str]) -> SignalBatch:
+    """Get enhanced signals for many symbols in one pass"""
+    return signal_generator.generate_signals(symbols)
+
 if __name__ == "__main__":
     # Test the signal generator
     print("🧪 Testing Enhanced Signal Generator")
     print("=" * 50)
-    
+
     symbols = ['BTC', 'ETH', 'LTC']
-    
+
     for i in range(10):
         print(f"\n⏰ Round {i+1}:")
         for symbol in symbols:
             signal = get_enhanced_signal(symbol)
             print(f"{symbol}: {signal['signal']} ({signal['confidence']:.0%}) - ${signal['price']:,.2f}")
-        
+
         time.sleep(2)
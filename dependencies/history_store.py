@@ -0,0 +1,280 @@
+"""
+Columnar OHLCV History Store for CryptSIST
+Penyimpanan riwayat harga OHLCV per simbol dan timeframe dalam kolom NumPy (append-only, memory-mapped)
+"""
+
+import json
+import logging
+import os
+import re
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+try:
+    import pandas as pd
+    PANDAS_AVAILABLE = True
+except ImportError:
+    PANDAS_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_HISTORY_DIR = os.path.join(os.path.expanduser('~'), '.cryptsist', 'history')
+
+# Symbols become directory names: plain tickers only, no separators or Windows device names
+SYMBOL_PATTERN = re.compile(r'[A-Z0-9][A-Z0-9_-]{0,31}')
+RESERVED_NAMES = {'CON', 'PRN', 'AUX', 'NUL'} | {f'{device}{n}' for device in ('COM', 'LPT') for n in range(1, 10)}
+
+TIMEFRAME_SECONDS = {
+    '1h': 3600,
+    '4h': 14400,
+    '1d': 86400
+}
+
+# Column name -> dtype; `time` is the candle open time in UTC epoch seconds
+COLUMNS = (
+    ('time', np.dtype('<i8')),
+    ('open', np.dtype('<f8')),
+    ('high', np.dtype('<f8')),
+    ('low', np.dtype('<f8')),
+    ('close', np.dtype('<f8')),
+    ('volume', np.dtype('<f8'))
+)
+
+
+class HistorySeries:
+    """
+    OHLCV candles of one symbol and timeframe, sorted by time.
+
+    Each column is a raw little-endian file read through np.memmap, so
+    slices are views of the page cache rather than copies. New candles after
+    the last one are written in place past the committed rows (files only
+    grow, never shrink, while mapped). Backfilled candles that land earlier
+    are merged into a new generation of column files, `<column>.<n>.bin`, so
+    a file that readers may still map is never truncated or replaced (both
+    fail on Windows); superseded generations are deleted once unmapped.
+    meta.json holds the committed row count and generation (bytes past the
+    row count from an interrupted append are ignored and overwritten),
+    `listed_from`, the earliest time the source has data for, and `empty`,
+    [first, last] ranges the source answered without candles.
+    """
+
+    def __init__(self, directory: str, step: int):
+        self.directory = directory
+        self.step = step
+        self.lock = threading.Lock()
+        self.meta = {'rows': 0, 'generation': 0, 'listed_from': None, 'empty': []}
+        self.mapped: Optional[Tuple[Tuple[int, int], Dict[str, np.ndarray]]] = None
+        os.makedirs(directory, exist_ok=True)
+        self._read_meta()
+
+    def _path(self, column: str, generation: Optional[int] = None) -> str:
+        if generation is None:
+            generation = self.meta['generation']
+        # Generation 0 keeps the original <column>.bin name
+        name = f"{column}.bin" if generation == 0 else f"{column}.{generation}.bin"
+        return os.path.join(self.directory, name)
+
+    def _read_meta(self) -> Dict[str, Any]:
+        try:
+            with open(os.path.join(self.directory, 'meta.json')) as f:
+                self.meta = dict(self.meta, **json.load(f))
+        except (OSError, ValueError):
+            pass
+        return self.meta
+
+    def _write_meta(self) -> None:
+        path = os.path.join(self.directory, 'meta.json')
+        with open(f"{path}.tmp", 'w') as f:
+            json.dump(self.meta, f)
+        os.replace(f"{path}.tmp", path)
+
+    def arrays(self) -> Dict[str, np.ndarray]:
+        """Read-only memory-mapped columns of all committed rows"""
+        meta = self._read_meta()
+        version = (meta['rows'], meta['generation'])
+        mapped = self.mapped
+        if mapped is not None and mapped[0] == version:
+            return mapped[1]
+        if meta['rows'] == 0:
+            columns = {name: np.empty(0, dtype) for name, dtype in COLUMNS}
+        else:
+            columns = {name: np.memmap(self._path(name), dtype=dtype, mode='r', shape=(meta['rows'],))
+                       for name, dtype in COLUMNS}
+        self.mapped = (version, columns)
+        return columns
+
+    def slice(self, start: int, end: int) -> Dict[str, np.ndarray]:
+        """Views of the candles with start <= time <= end"""
+        columns = self.arrays()
+        times = columns['time']
+        lo = int(np.searchsorted(times, start, side='left'))
+        hi = int(np.searchsorted(times, end, side='right'))
+        return {name: column[lo:hi] for name, column in columns.items()}
+
+    def missing_ranges(self, start: int, end: int) -> List[Tuple[int, int]]:
+        """Contiguous (first, last) candle times between start and end that are not stored"""
+        start -= start % self.step
+        listed_from = self.meta.get('listed_from')
+        if listed_from is not None:
+            start = max(start, listed_from)
+        if start > end:
+            return []
+        present = self.slice(start, end)['time']
+        expected = (end - start) // self.step + 1
+        if len(present) == expected:
+            return []
+        grid = np.arange(start, end + 1, self.step, dtype=np.int64)
+        missing = grid[~np.isin(grid, present)]
+        for first, last in self.meta.get('empty', []):
+            missing = missing[(missing < first) | (missing > last)]
+        if missing.size == 0:
+            return []
+        breaks = np.nonzero(np.diff(missing) != self.step)[0]
+        firsts = np.concatenate(([missing[0]], missing[breaks + 1]))
+        lasts = np.concatenate((missing[breaks], [missing[-1]]))
+        return [(int(first), int(last)) for first, last in zip(firsts, lasts)]
+
+    def write(self, rows: Dict[str, np.ndarray]) -> int:
+        """Store candles (dict of column arrays); later duplicates replace stored candles"""
+        if len(rows['time']) == 0:
+            return 0
+        new = {name: np.ascontiguousarray(rows[name], dtype=dtype) for name, dtype in COLUMNS}
+        with self.lock:
+            self._read_meta()
+            stored = self.meta['rows']
+            existing = self.arrays()
+            order = np.argsort(new['time'], kind='stable')
+            new = {name: column[order] for name, column in new.items()}
+            if stored == 0 or new['time'][0] > existing['time'][-1]:
+                self._append(new, stored)
+            else:
+                self._rewrite(existing, new)
+            return len(new['time'])
+
+    def _append(self, new: Dict[str, np.ndarray], stored: int) -> None:
+        # Drop duplicate times inside the batch, keeping the last
+        times = new['time']
+        keep = np.append(times[1:] != times[:-1], True)
+        for name, dtype in COLUMNS:
+            path = self._path(name)
+            # No truncate: committed rows are untouched and mapped views stay valid
+            with open(path, 'r+b' if os.path.exists(path) else 'w+b') as f:
+                f.seek(stored * dtype.itemsize)
+                f.write(new[name][keep].tobytes())
+        self.meta['rows'] = stored + int(keep.sum())
+        self._write_meta()
+
+    def _rewrite(self, existing: Dict[str, np.ndarray], new: Dict[str, np.ndarray]) -> None:
+        merged = {name: np.concatenate((new[name], np.asarray(existing[name]))) for name, _ in COLUMNS}
+        # np.unique keeps the first occurrence, and new candles come first
+        _, index = np.unique(merged['time'], return_index=True)
+        generation = self.meta['generation'] + 1
+        for name, _ in COLUMNS:
+            with open(self._path(name, generation), 'wb') as f:
+                f.write(merged[name][index].tobytes())
+        # Readers switch to the new files once meta.json names them
+        self.meta['rows'] = len(index)
+        self.meta['generation'] = generation
+        self._write_meta()
+        self.mapped = None
+        self._remove_old_generations()
+
+    def _remove_old_generations(self) -> None:
+        """Delete column files of superseded generations (those still mapped are retried next time)"""
+        current = {os.path.basename(self._path(name)) for name, _ in COLUMNS}
+        for filename in os.listdir(self.directory):
+            if filename.endswith('.bin') and filename not in current:
+                try:
+                    os.remove(os.path.join(self.directory, filename))
+                except OSError:
+                    pass  # still mapped by a reader (Windows)
+
+    def set_listed_from(self, listed_from: int) -> None:
+        """Record that the source has no candles before listed_from"""
+        with self.lock:
+            self._read_meta()
+            self.meta['listed_from'] = int(listed_from)
+            self._write_meta()
+
+    def add_empty_ranges(self, ranges: List[Tuple[int, int]]) -> None:
+        """Record (first, last) ranges the source answered without candles, so they are not requested again"""
+        with self.lock:
+            self._read_meta()
+            merged: List[List[int]] = []
+            for first, last in sorted([tuple(r) for r in self.meta.get('empty', [])] + list(ranges)):
+                if merged and first <= merged[-1][1] + self.step:
+                    merged[-1][1] = max(merged[-1][1], int(last))
+                else:
+                    merged.append([int(first), int(last)])
+            self.meta['empty'] = merged
+            self._write_meta()
+
+    def get_stats(self) -> Dict[str, Any]:
+        times = self.arrays()['time']
+        return {
+            'rows': int(len(times)),
+            'first': int(times[0]) if len(times) else None,
+            'last': int(times[-1]) if len(times) else None,
+            'listed_from': self.meta.get('listed_from'),
+            'empty_ranges': len(self.meta.get('empty', []))
+        }
+
+
+class HistoryStore:
+    """
+    Directory of HistorySeries laid out as <root>/<SYMBOL>/<timeframe>/
+
+    The NumPy column files are the storage format; Parquet is export-only
+    (export_parquet), not read back.
+    """
+
+    def __init__(self, root: str = DEFAULT_HISTORY_DIR):
+        self.root = root
+        self.series_by_key: Dict[Tuple[str, str], HistorySeries] = {}
+        self.lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls) -> Optional['HistoryStore']:
+        """
+        Build store from environment variables, or None when disabled
+
+        CRYPTSIST_HISTORY_DIR : store directory, empty disables the history store
+        """
+        root = os.environ.get('CRYPTSIST_HISTORY_DIR', DEFAULT_HISTORY_DIR)
+        return cls(os.path.expanduser(root)) if root else None
+
+    def series(self, symbol: str, timeframe: str = '1d') -> HistorySeries:
+        symbol = symbol.upper()
+        if not SYMBOL_PATTERN.fullmatch(symbol) or symbol in RESERVED_NAMES:
+            raise ValueError(f"Invalid symbol for the history store: {symbol!r}")
+        if timeframe not in TIMEFRAME_SECONDS:
+            raise ValueError(f"Unsupported timeframe: {timeframe!r}")
+        key = (symbol, timeframe)
+        with self.lock:
+            series = self.series_by_key.get(key)
+            if series is None:
+                series = HistorySeries(os.path.join(self.root, key[0], timeframe), TIMEFRAME_SECONDS[timeframe])
+                self.series_by_key[key] = series
+            return series
+
+    def to_dataframe(self, columns: Dict[str, np.ndarray]):
+        """pandas DataFrame over a slice, indexed by UTC candle time (pandas required)"""
+        if not PANDAS_AVAILABLE:
+            raise ImportError("pandas is required for DataFrame access")
+        frame = pd.DataFrame({name: columns[name] for name, _ in COLUMNS[1:]}, copy=False)
+        frame.index = pd.to_datetime(columns['time'], unit='s', utc=True)
+        return frame
+
+    def export_parquet(self, symbol: str, timeframe: str, path: str) -> None:
+        """Write a series to a Parquet file (pandas and pyarrow required)"""
+        series = self.series(symbol, timeframe)
+        self.to_dataframe(series.arrays()).to_parquet(path)
+
+
+def last_closed_candle(step: int, now: Optional[float] = None) -> int:
+    """Open time of the most recent fully closed candle"""
+    now = int(time.time() if now is None else now)
+    return now - now % step - step
@@ -0,0 +1,157 @@
+"""
+Micro-Batching of Provider Lookups for CryptSIST
+Mengumpulkan lookup per simbol yang datang bersamaan menjadi satu request multi-id ke provider
+"""
+
+import asyncio
+import concurrent.futures
+import threading
+from typing import Any, Awaitable, Callable, Dict, List
+
+
+class _BatcherStats:
+    """Counters shared by the thread and asyncio batchers"""
+
+    def __init__(self, window: float, max_batch: int):
+        self.window = window
+        self.max_batch = max_batch
+        self.stats = {
+            'lookups': 0,
+            'coalesced': 0,
+            'batches': 0,
+            'requests': 0,
+            'largest_batch': 0
+        }
+
+    def _count_batch(self, size: int) -> None:
+        self.stats['batches'] += 1
+        self.stats['requests'] += -(-size // self.max_batch)
+        self.stats['largest_batch'] = max(self.stats['largest_batch'], size)
+
+    def _chunks(self, keys: List[str]) -> List[List[str]]:
+        return [keys[i:i + self.max_batch] for i in range(0, len(keys), self.max_batch)]
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Lookups per provider request and batch sizes"""
+        lookups = self.stats['lookups']
+        return dict(
+            self.stats,
+            window_ms=round(self.window * 1000, 1),
+            max_batch=self.max_batch,
+            lookups_per_request=round(lookups / self.stats['requests'], 2) if self.stats['requests'] else 0.0
+        )
+
+
+class MicroBatcher(_BatcherStats):
+    """
+    Thread-safe micro-batcher for blocking callers.
+
+    The first caller of a batch waits `window` seconds (less once
+    `max_batch` keys are pending) for concurrent callers to add their keys,
+    then runs fetch_many(keys) for everyone, in chunks of `max_batch`.
+    fetch_many returns a dict key -> result; keys it leaves out resolve to
+    None. Concurrent lookups of the same key share one result.
+    """
+
+    def __init__(self, fetch_many: Callable[[List[str]], Dict[str, Any]], window: float = 0.005,
+                 max_batch: int = 100):
+        super().__init__(window, max_batch)
+        self.fetch_many = fetch_many
+        self.pending: Dict[str, concurrent.futures.Future] = {}
+        self.lock = threading.Lock()
+        self.filled = threading.Condition(self.lock)
+
+    def get(self, key: str) -> Any:
+        """Result for key, fetched together with the other keys requested meanwhile"""
+        with self.lock:
+            self.stats['lookups'] += 1
+            future = self.pending.get(key)
+            leader = False
+            if future is not None:
+                self.stats['coalesced'] += 1
+            else:
+                future = self.pending[key] = concurrent.futures.Future()
+                leader = len(self.pending) == 1
+                if len(self.pending) >= self.max_batch:
+                    self.filled.notify()
+            if leader:
+                self.filled.wait_for(lambda: len(self.pending) >= self.max_batch, timeout=self.window)
+                batch, self.pending = self.pending, {}
+                self._count_batch(len(batch))
+        if leader:
+            self._run(batch)
+        return future.result()
+
+    def _run(self, batch: Dict[str, concurrent.futures.Future]) -> None:
+        for chunk in self._chunks(list(batch)):
+            try:
+                results = self.fetch_many(chunk)
+            except Exception as e:
+                for key in chunk:
+                    batch[key].set_exception(e)
+                continue
+            for key in chunk:
+                batch[key].set_result(results.get(key))
+
+
+class AsyncMicroBatcher(_BatcherStats):
+    """
+    asyncio micro-batcher: lookups made within `window` seconds on the event
+    loop become one await fetch_many(keys) (chunked by `max_batch`), which
+    runs as its own task so a cancelled caller does not cancel the others.
+    Belongs to the event loop that first used it.
+    """
+
+    def __init__(self, fetch_many: Callable[[List[str]], Awaitable[Dict[str, Any]]], window: float = 0.005,
+                 max_batch: int = 100):
+        super().__init__(window, max_batch)
+        self.fetch_many = fetch_many
+        self.pending: Dict[str, asyncio.Future] = {}
+        self.timer = None
+        self.tasks: set = set()
+
+    async def get(self, key: str) -> Any:
+        """Result for key, fetched together with the other keys requested meanwhile"""
+        loop = asyncio.get_running_loop()
+        self.stats['lookups'] += 1
+        future = self.pending.get(key)
+        if future is not None:
+            self.stats['coalesced'] += 1
+        else:
+            future = self.pending[key] = loop.create_future()
+            # Retrieve a shared exception even when every waiter was cancelled
+            future.add_done_callback(lambda f: f.cancelled() or f.exception())
+            if len(self.pending) >= self.max_batch:
+                self._flush()
+            elif self.timer is None:
+                self.timer = loop.call_later(self.window, self._flush)
+        return await asyncio.shield(future)
+
+    def _flush(self) -> None:
+        if self.timer is not None:
+            self.timer.cancel()
+            self.timer = None
+        batch, self.pending = self.pending, {}
+        if not batch:
+            return
+        self._count_batch(len(batch))
+        for chunk in self._chunks(list(batch)):
+            task = asyncio.ensure_future(self._run(chunk, batch))
+            self.tasks.add(task)
+            task.add_done_callback(self.tasks.discard)
+
+    async def _run(self, chunk: List[str], batch: Dict[str, asyncio.Future]) -> None:
+        try:
+            results = await self.fetch_many(chunk)
+        except asyncio.CancelledError:
+            for key in chunk:
+                batch[key].cancel()
+            raise
+        except Exception as e:
+            for key in chunk:
+                if not batch[key].done():
+                    batch[key].set_exception(e)
+            return
+        for key in chunk:
+            if not batch[key].done():
+                batch[key].set_result(results.get(key))
@@ -0,0 +1,206 @@
+"""
+Persistent Price Cache for CryptSIST
+Cache SQLite (mode WAL) di bawah cache in-memory price fetcher agar data API bertahan saat server restart
+"""
+
+import atexit
+import json
+import logging
+import os
+import queue
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_PATH = os.path.join(os.path.expanduser('~'), '.cryptsist', 'price_cache.db')
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS cache (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL,
+    stored_at REAL NOT NULL,
+    expires_at REAL NOT NULL
+)
+"""
+
+
+class PersistentCache:
+    """
+    TTL-tagged key/value store in an SQLite database in WAL mode.
+
+    put() only enqueues: a background writer thread drains the queue,
+    keeps the last value per key and writes each batch in one transaction,
+    so request threads never wait on disk. load() returns the unexpired
+    entries for warming an in-memory cache on startup. Expired rows are
+    purged by the writer every `purge_interval` seconds.
+    """
+
+    def __init__(self, path: str, flush_interval: float = 0.5, max_batch: int = 500,
+                 purge_interval: float = 600.0):
+        self.path = path
+        self.flush_interval = flush_interval
+        self.max_batch = max_batch
+        self.purge_interval = purge_interval
+        self.queue: queue.SimpleQueue = queue.SimpleQueue()
+        self.writer: Optional[threading.Thread] = None
+        self.writer_lock = threading.Lock()
+        self.closed = False
+        self.stats = {'loaded': 0, 'queued': 0, 'written': 0, 'batches': 0, 'purged': 0, 'errors': 0}
+
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        with self._connect() as db:
+            db.execute(_SCHEMA)
+
+    @classmethod
+    def from_env(cls) -> Optional['PersistentCache']:
+        """
+        Build cache from environment variables, or None when disabled
+
+        CRYPTSIST_PRICE_CACHE_DB : SQLite file path, empty disables the persistent cache
+        """
+        path = os.environ.get('CRYPTSIST_PRICE_CACHE_DB', DEFAULT_CACHE_PATH)
+        if not path:
+            return None
+        try:
+            return cls(os.path.expanduser(path))
+        except (OSError, sqlite3.Error) as e:
+            logger.warning(f"⚠️ Persistent price cache disabled: {e}")
+            return None
+
+    def _connect(self) -> sqlite3.Connection:
+        db = sqlite3.connect(self.path, timeout=5.0)
+        db.execute('PRAGMA journal_mode=WAL')
+        # WAL with synchronous=NORMAL only risks the last transactions on power loss, fine for a cache
+        db.execute('PRAGMA synchronous=NORMAL')
+        return db
+
+    def load(self) -> Dict[str, Tuple[float, float, Any]]:
+        """Unexpired entries as key -> (stored_at, ttl, value)"""
+        now = time.time()
+        entries = {}
+        try:
+            db = self._connect()
+            try:
+                rows = db.execute('SELECT key, value, stored_at, expires_at FROM cache WHERE expires_at > ?', (now,))
+                for key, value, stored_at, expires_at in rows:
+                    try:
+                        entries[key] = (stored_at, expires_at - stored_at, json.loads(value))
+                    except ValueError:
+                        continue
+            finally:
+                db.close()
+        except sqlite3.Error as e:
+            self.stats['errors'] += 1
+            logger.warning(f"⚠️ Could not load persistent price cache: {e}")
+        self.stats['loaded'] += len(entries)
+        return entries
+
+    def put(self, key: str, value: Any, stored_at: float, ttl: float) -> None:
+        """Queue an entry for write-behind"""
+        if self.closed:
+            return
+        if self.writer is None:
+            self._start_writer()
+        self.queue.put((key, value, stored_at, stored_at + ttl))
+        self.stats['queued'] += 1
+
+    def _start_writer(self) -> None:
+        with self.writer_lock:
+            if self.writer is None:
+                self.writer = threading.Thread(target=self._write_loop, name='persistent-cache-writer', daemon=True)
+                self.writer.start()
+
+    def _write_loop(self) -> None:
+        db = self._connect()
+        last_purge = time.time()
+        try:
+            while True:
+                try:
+                    item = self.queue.get(timeout=self.purge_interval)
+                except queue.Empty:
+                    item = ()
+                if item is None:
+                    break
+                batch = {}
+                if item:
+                    batch[item[0]] = item
+                    # Let a burst of puts accumulate, then coalesce by key
+                    time.sleep(self.flush_interval)
+                stop = False
+                while len(batch) < self.max_batch:
+                    try:
+                        item = self.queue.get_nowait()
+                    except queue.Empty:
+                        break
+                    if item is None:
+                        stop = True
+                        break
+                    batch[item[0]] = item
+                if batch:
+                    self._write_batch(db, batch.values())
+                if time.time() - last_purge >= self.purge_interval:
+                    self._purge(db)
+                    last_purge = time.time()
+                if stop:
+                    break
+        finally:
+            db.close()
+
+    def _write_batch(self, db: sqlite3.Connection, items) -> None:
+        rows = []
+        for key, value, stored_at, expires_at in items:
+            try:
+                rows.append((key, json.dumps(value, default=str), stored_at, expires_at))
+            except (TypeError, ValueError):
+                self.stats['errors'] += 1
+        try:
+            with db:
+                db.executemany(
+                    'INSERT OR REPLACE INTO cache (key, value, stored_at, expires_at) VALUES (?, ?, ?, ?)', rows
+                )
+            self.stats['written'] += len(rows)
+            self.stats['batches'] += 1
+        except sqlite3.Error as e:
+            self.stats['errors'] += 1
+            logger.warning(f"⚠️ Persistent price cache write failed: {e}")
+
+    def _purge(self, db: sqlite3.Connection) -> None:
+        try:
+            with db:
+                self.stats['purged'] += db.execute('DELETE FROM cache WHERE expires_at <= ?', (time.time(),)).rowcount
+        except sqlite3.Error as e:
+            self.stats['errors'] += 1
+            logger.warning(f"⚠️ Persistent price cache purge failed: {e}")
+
+    def close(self, timeout: float = 5.0) -> None:
+        """Flush queued entries and stop the writer"""
+        if self.closed:
+            return
+        self.closed = True
+        if self.writer is not None:
+            self.queue.put(None)
+            self.writer.join(timeout)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return dict(self.stats, path=self.path, pending=self.queue.qsize())
+
+
+_shared_cache: Optional[PersistentCache] = None
+_shared_initialized = False
+_shared_lock = threading.Lock()
+
+
+def get_shared_persistent_cache() -> Optional[PersistentCache]:
+    """Process-wide persistent cache used by every price fetcher (None when disabled)"""
+    global _shared_cache, _shared_initialized
+    with _shared_lock:
+        if not _shared_initialized:
+            _shared_initialized = True
+            _shared_cache = PersistentCache.from_env()
+            if _shared_cache is not None:
+                # Flush write-behind entries on exit
+                atexit.register(_shared_cache.close)
+        return _shared_cache
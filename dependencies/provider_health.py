@@ -0,0 +1,203 @@
+"""
+Provider Health Tracking and Circuit Breakers for CryptSIST
+Memantau latensi dan error rate setiap provider API, memutus provider yang gagal dan mengatur ulang urutan sumber
+"""
+
+import os
+import threading
+import time
+from collections import deque
+from typing import Any, Dict, List, Optional
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+
+class ProviderUnavailable(Exception):
+    """Raised instead of sending a request while a provider's circuit is open"""
+
+
+class _ProviderHealth:
+    """Rolling outcomes and breaker state of one provider"""
+
+    def __init__(self, window: int):
+        self.latencies: deque = deque(maxlen=window)
+        self.outcomes: deque = deque(maxlen=window)  # True = success
+        self.state = CLOSED
+        self.consecutive_failures = 0
+        self.opened_at = 0.0
+        self.cooldown = 0.0
+        self.probe_in_flight = False
+        self.times_opened = 0
+        self.rejected = 0
+        self.last_error = ''
+
+    def error_rate(self) -> float:
+        return self.outcomes.count(False) / len(self.outcomes) if self.outcomes else 0.0
+
+    def percentile(self, percentile: float) -> Optional[float]:
+        samples = sorted(self.latencies)
+        if not samples:
+            return None
+        return samples[min(len(samples) - 1, int(len(samples) * percentile / 100))]
+
+
+class ProviderHealthTracker:
+    """
+    Per-provider latency/error tracking with circuit breakers.
+
+    A provider's circuit opens after `failure_threshold` consecutive
+    failures (network errors, timeouts, HTTP 429 and 5xx); while open,
+    before_request() raises ProviderUnavailable without touching the network.
+    After the cooldown one probe request is let through (half-open): success
+    closes the circuit, failure reopens it with the cooldown doubled up to
+    `max_cooldown`. order() ranks sources for a lookup: open circuits are
+    dropped, and degraded providers (high error rate or p95 latency above
+    `slow_latency`) move behind healthy ones, keeping the given priority
+    within each group.
+    """
+
+    def __init__(self, failure_threshold: int = 5, cooldown: float = 30.0, max_cooldown: float = 300.0,
+                 window: int = 200, degraded_error_rate: float = 0.25, slow_latency: float = 2.0,
+                 clock=time.monotonic):
+        self.failure_threshold = failure_threshold
+        self.base_cooldown = cooldown
+        self.max_cooldown = max_cooldown
+        self.window = window
+        self.degraded_error_rate = degraded_error_rate
+        self.slow_latency = slow_latency
+        self.clock = clock
+        self.providers: Dict[str, _ProviderHealth] = {}
+        self.lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls) -> 'ProviderHealthTracker':
+        """
+        Build tracker from environment variables
+
+        CRYPTSIST_BREAKER_FAILURES : consecutive failures that open a circuit
+        CRYPTSIST_BREAKER_COOLDOWN : seconds before the first half-open probe
+        CRYPTSIST_SLOW_PROVIDER    : p95 latency (seconds) that demotes a provider
+        """
+        return cls(
+            failure_threshold=int(os.environ.get('CRYPTSIST_BREAKER_FAILURES', 5)),
+            cooldown=float(os.environ.get('CRYPTSIST_BREAKER_COOLDOWN', 30)),
+            slow_latency=float(os.environ.get('CRYPTSIST_SLOW_PROVIDER', 2))
+        )
+
+    def _health(self, provider: str) -> _ProviderHealth:
+        health = self.providers.get(provider)
+        if health is None:
+            health = self.providers[provider] = _ProviderHealth(self.window)
+        return health
+
+    def before_request(self, provider: str) -> None:
+        """Raise ProviderUnavailable if the circuit does not allow a request now"""
+        with self.lock:
+            health = self._health(provider)
+            if health.state == CLOSED:
+                return
+            if health.state == OPEN and self.clock() - health.opened_at >= health.cooldown:
+                health.state = HALF_OPEN
+            if health.state == HALF_OPEN and not health.probe_in_flight:
+                health.probe_in_flight = True
+                return
+            health.rejected += 1
+            remaining = max(0.0, health.opened_at + health.cooldown - self.clock())
+        raise ProviderUnavailable(
+            f"{provider} circuit {health.state} after {health.consecutive_failures} failures "
+            f"(last: {health.last_error}); retry in {remaining:.0f}s"
+        )
+
+    def record(self, provider: str, latency: Optional[float], ok: bool, reason: str = '') -> None:
+        """Record a finished request (latency None when no response timing applies)"""
+        with self.lock:
+            health = self._health(provider)
+            if latency is not None:
+                health.latencies.append(latency)
+            health.outcomes.append(ok)
+            probe = health.probe_in_flight
+            health.probe_in_flight = False
+            if ok:
+                health.consecutive_failures = 0
+                if health.state != CLOSED:
+                    health.state = CLOSED
+                    health.cooldown = 0.0
+                return
+            health.consecutive_failures += 1
+            health.last_error = reason
+            if probe or (health.state == CLOSED and health.consecutive_failures >= self.failure_threshold):
+                health.cooldown = min(self.max_cooldown, health.cooldown * 2) if probe else self.base_cooldown
+                health.state = OPEN
+                health.opened_at = self.clock()
+                health.times_opened += 1
+
+    def release(self, provider: str) -> None:
+        """Forget an in-flight probe that was cancelled before it finished"""
+        with self.lock:
+            health = self.providers.get(provider)
+            if health is not None:
+                health.probe_in_flight = False
+
+    def is_degraded(self, provider: str) -> bool:
+        health = self.providers.get(provider)
+        if health is None:
+            return False
+        if health.state != CLOSED or health.error_rate() >= self.degraded_error_rate:
+            return True
+        p95 = health.percentile(95)
+        return p95 is not None and p95 >= self.slow_latency
+
+    def is_available(self, provider: str) -> bool:
+        """False while the circuit is open and cooling down"""
+        health = self.providers.get(provider)
+        if health is None or health.state == CLOSED:
+            return True
+        if health.state == OPEN:
+            return self.clock() - health.opened_at >= health.cooldown
+        return not health.probe_in_flight
+
+    def order(self, sources: List[str], available_only: bool = True) -> List[str]:
+        """
+        Sources with healthy ones first, each group in the given priority
+
+        available_only=False keeps open circuits, at their given priority, for
+        callers that can still answer from cache: their requests are refused
+        at once, so unlike slow or failing providers they cost no waiting.
+        """
+        if available_only:
+            sources = [source for source in sources if self.is_available(source)]
+        return sorted(sources, key=lambda source: self.is_available(source) and self.is_degraded(source))
+
+    def latency_percentile(self, provider: str, percentile: float) -> Optional[float]:
+        health = self.providers.get(provider)
+        return health.percentile(percentile) if health is not None else None
+
+    def sample_count(self, provider: str) -> int:
+        health = self.providers.get(provider)
+        return len(health.latencies) if health is not None else 0
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Breaker state, error rate and latency percentiles per provider"""
+        now = self.clock()
+        stats = {}
+        with self.lock:
+            for provider, health in self.providers.items():
+                percentiles = {f"p{p}_ms": round(health.percentile(p) * 1000, 1) if health.latencies else None
+                               for p in (50, 95, 99)}
+                stats[provider] = dict(
+                    percentiles,
+                    state=health.state,
+                    available=self.is_available(provider),
+                    degraded=self.is_degraded(provider),
+                    requests=len(health.outcomes),
+                    error_rate=round(health.error_rate(), 4),
+                    consecutive_failures=health.consecutive_failures,
+                    times_opened=health.times_opened,
+                    rejected=health.rejected,
+                    retry_in=round(max(0.0, health.opened_at + health.cooldown - now), 1)
+                    if health.state == OPEN else 0.0,
+                    last_error=health.last_error
+                )
+        return stats
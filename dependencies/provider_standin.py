@@ -0,0 +1,691 @@
+"""
+Local Price Provider Stand-in for CryptSIST
+Server HTTP lokal yang meniru endpoint Binance, CoinMarketCap, CoinDesk, Alpha Vantage dan CoinGecko untuk pengujian dan benchmark
+"""
+
+import argparse
+import asyncio
+import concurrent.futures
+import json
+import logging
+import math
+import random
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+
+import aiohttp
+from aiohttp import web
+
+logger = logging.getLogger(__name__)
+
+# Production endpoints the stand-in records from (see api_keys_config.PROVIDER_BASE_URLS)
+UPSTREAM_BASE_URLS = {
+    'binance': 'https://api.binance.com/api/v3',
+    'coinmarketcap': 'https://pro-api.coinmarketcap.com/v1',
+    'coindesk': 'https://api.coindesk.com/v1',
+    'alpha_vantage': 'https://www.alphavantage.co/query',
+    'coingecko': 'https://api.coingecko.com/api/v3'
+}
+
+# Query parameters that carry credentials: never part of a fixture key
+SECRET_PARAMS = {'apikey', 'api_key', 'x_cg_demo_api_key', 'x_cg_pro_api_key'}
+
+# Request headers forwarded upstream when recording
+FORWARDED_HEADERS = ('X-MBX-APIKEY', 'X-CMC_PRO_API_KEY', 'Accept', 'Accepts', 'User-Agent')
+
+# symbol, CoinGecko id (as in EnhancedPriceFetcher.COINGECKO_IDS), name, reference price in USD
+KNOWN_ASSETS = (
+    ('BTC', 'bitcoin', 'Bitcoin', 65000.0),
+    ('ETH', 'ethereum', 'Ethereum', 3500.0),
+    ('BNB', 'binancecoin', 'BNB', 580.0),
+    ('SOL', 'solana', 'Solana', 150.0),
+    ('XRP', 'ripple', 'XRP', 0.55),
+    ('ADA', 'cardano', 'Cardano', 0.45),
+    ('DOGE', 'dogecoin', 'Dogecoin', 0.12),
+    ('DOT', 'polkadot', 'Polkadot', 6.5),
+    ('LINK', 'chainlink', 'Chainlink', 14.0),
+    ('MATIC', 'polygon', 'Polygon', 0.7),
+    ('LTC', 'litecoin', 'Litecoin', 80.0),
+    ('UNI', 'uniswap', 'Uniswap', 7.5),
+    ('AVAX', 'avalanche-2', 'Avalanche', 35.0),
+    ('ATOM', 'cosmos', 'Cosmos Hub', 8.0),
+    ('XLM', 'stellar', 'Stellar', 0.11)
+)
+
+KLINE_SECONDS = {'1m': 60, '5m': 300, '15m': 900, '1h': 3600, '4h': 14400, '1d': 86400}
+
+
+class FaultProfile(NamedTuple):
+    """Faults injected into one provider's responses"""
+    latency: float = 0.0  # seconds added before every response
+    jitter: float = 0.0  # extra uniform random delay of up to this many seconds
+    error_rate: float = 0.0  # probability of an HTTP 500
+    rate_limit_rate: float = 0.0  # probability of the provider's rate-limit answer (HTTP 429)
+    down: bool = False  # every request fails with HTTP 503
+
+
+class Asset(NamedTuple):
+    symbol: str
+    coin_id: str
+    name: str
+    price: float
+    change_24h: float
+    change_7d: float
+    volume_24h: float
+    circulating_supply: float
+    rank: int = 0
+
+    @property
+    def market_cap(self) -> float:
+        return self.price * self.circulating_supply
+
+
+class SyntheticMarket:
+    """
+    Deterministic market behind the synthetic responses: the known assets
+    plus `extra_symbols` generated ones (SYN0001, SYN0002, ...), every value
+    derived from `seed` and the symbol so runs are reproducible.
+    """
+
+    def __init__(self, extra_symbols: int = 0, seed: int = 42):
+        self.seed = seed
+        listed = [(symbol, coin_id, name, price) for symbol, coin_id, name, price in KNOWN_ASSETS]
+        for index in range(1, extra_symbols + 1):
+            rng = random.Random(f"{seed}:SYN{index:04d}")
+            listed.append((f"SYN{index:04d}", f"synthetic-{index:04d}", f"Synthetic {index:04d}",
+                           round(rng.uniform(0.01, 500), 6)))
+        assets = []
+        for symbol, coin_id, name, price in listed:
+            rng = random.Random(f"{seed}:{symbol}")
+            assets.append(Asset(
+                symbol, coin_id, name, price,
+                change_24h=round(rng.uniform(-8, 8), 4),
+                change_7d=round(rng.uniform(-20, 20), 4),
+                volume_24h=round(price * rng.uniform(1e5, 1e7), 2),
+                circulating_supply=round(rng.uniform(1e7, 1e10) if price < 1000 else rng.uniform(1e6, 1e8))
+            ))
+        ranked = sorted(assets, key=lambda asset: -asset.market_cap)
+        self.assets: Dict[str, Asset] = {asset.symbol: asset._replace(rank=rank)
+                                         for rank, asset in enumerate(ranked, 1)}
+        self.by_id: Dict[str, Asset] = {asset.coin_id: asset for asset in self.assets.values()}
+
+    def pair(self, trading_pair: str) -> Optional[Asset]:
+        """Asset quoted by a Binance USDT pair such as BTCUSDT"""
+        if trading_pair.endswith('USDT'):
+            return self.assets.get(trading_pair[:-4])
+        return None
+
+    def candle(self, asset: Asset, open_time: int, step: int) -> Tuple[float, float, float, float, float]:
+        """OHLCV of the candle opening at open_time (epoch seconds): a slow wave around the reference price"""
+        rng = random.Random(f"{self.seed}:{asset.symbol}:{step}:{open_time}")
+        phase = (sum(map(ord, asset.symbol)) % 97) / 97 * 2 * math.pi
+        level = asset.price * (1 + 0.25 * math.sin(open_time / (86400 * 45) + phase))
+        open_ = level * (1 + rng.uniform(-0.01, 0.01))
+        close = level * (1 + rng.uniform(-0.01, 0.01))
+        high = max(open_, close) * (1 + rng.uniform(0, 0.015))
+        low = min(open_, close) * (1 - rng.uniform(0, 0.015))
+        volume = asset.volume_24h / asset.price * step / 86400 * rng.uniform(0.5, 1.5)
+        return open_, high, low, close, volume
+
+
+def _json(payload: Any, status: int = 200, headers: Optional[Dict[str, str]] = None) -> web.Response:
+    return web.Response(text=json.dumps(payload), status=status, content_type='application/json',
+                        headers=headers)
+
+
+def _iso(epoch: float) -> str:
+    return datetime.fromtimestamp(epoch, timezone.utc).strftime('%Y-%m-%dT%H:%M:%S.000Z')
+
+
+class ProviderStandInServer:
+    """
+    Serves <url>/<provider>/... like the real provider APIs, so pointing a
+    fetcher at it is a base URL change (see base_urls()).
+
+    Modes:
+      synthetic : answers from a deterministic SyntheticMarket
+      record    : forwards to the production APIs once per distinct request
+                  and appends the response to the `fixtures` JSON-lines file;
+                  requests already recorded are served from the file
+      replay    : serves only recorded responses (404 for unrecorded ones,
+                  or synthetic answers with fallback=True)
+
+    Faults are applied in every mode, per provider ('*' applies to all that
+    have no profile of their own): latency/jitter first, then down (503),
+    rate limiting (the provider's own 429 answer; Alpha Vantage answers 200
+    with a "Note" like the real API) and errors (500).
+    Control endpoints: GET /_standin/stats, GET|POST /_standin/faults
+    ({"binance": {"error_rate": 0.2}}) and POST /_standin/reset.
+    """
+
+    def __init__(self, mode: str = 'synthetic', fixtures: Optional[str] = None,
+                 faults: Optional[Dict[str, FaultProfile]] = None, extra_symbols: int = 0,
+                 seed: int = 42, fallback: bool = False, host: str = '127.0.0.1', port: int = 0,
+                 upstream: Optional[Dict[str, str]] = None):
+        if mode not in ('synthetic', 'record', 'replay'):
+            raise ValueError(f"Unknown stand-in mode: {mode}")
+        if mode != 'synthetic' and not fixtures:
+            raise ValueError(f"{mode} mode needs a fixtures file")
+        self.mode = mode
+        self.fixtures_path = fixtures
+        self.faults: Dict[str, FaultProfile] = dict(faults or {})
+        self.market = SyntheticMarket(extra_symbols, seed)
+        self.rng = random.Random(seed)
+        self.fallback = fallback
+        self.host = host
+        self.port = port
+        self.upstream = dict(UPSTREAM_BASE_URLS, **(upstream or {}))
+        self.fixtures: Dict[str, Dict[str, Any]] = self._load_fixtures() if fixtures else {}
+        self.runner: Optional[web.AppRunner] = None
+        self.session: Optional[aiohttp.ClientSession] = None
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self.thread: Optional[threading.Thread] = None
+        self.reset_stats()
+
+    @property
+    def url(self) -> str:
+        return f"http://{self.host}:{self.port}"
+
+    def base_urls(self) -> Dict[str, str]:
+        """Base URL per provider, for EnhancedPriceFetcher(base_urls=...)"""
+        return {provider: f"{self.url}/{provider}" for provider in UPSTREAM_BASE_URLS}
+
+    def set_faults(self, provider: str = '*', **fields: Any) -> FaultProfile:
+        """Replace the fault profile of a provider ('*' for all); no fields clears it"""
+        if provider != '*' and provider not in UPSTREAM_BASE_URLS:
+            raise ValueError(f"Unknown provider: {provider}")
+        if not fields:
+            self.faults.pop(provider, None)
+            return FaultProfile()
+        profile = self.faults[provider] = FaultProfile(**fields)
+        return profile
+
+    def clear_faults(self) -> None:
+        self.faults.clear()
+
+    def reset_stats(self) -> None:
+        self.stats = {'requests': 0, 'recorded': 0, 'replay_misses': 0, 'upstream_errors': 0}
+        self.provider_stats: Dict[str, Dict[str, Any]] = {}
+
+    async def start(self) -> str:
+        """Start listening and return the root URL (CRYPTSIST_PROVIDER_STANDIN)"""
+        app = web.Application()
+        app.router.add_get('/_standin/stats', self._handle_stats)
+        app.router.add_get('/_standin/faults', self._handle_faults)
+        app.router.add_post('/_standin/faults', self._handle_faults)
+        app.router.add_post('/_standin/reset', self._handle_reset)
+        app.router.add_get('/{provider}', self._handle)
+        app.router.add_get('/{provider}/{tail:.*}', self._handle)
+        self.runner = web.AppRunner(app, access_log=None)
+        await self.runner.setup()
+        site = web.TCPSite(self.runner, self.host, self.port)
+        await site.start()
+        self.port = site._server.sockets[0].getsockname()[1]
+        return self.url
+
+    async def stop(self) -> None:
+        if self.session is not None:
+            await self.session.close()
+            self.session = None
+        if self.runner is not None:
+            await self.runner.cleanup()
+            self.runner = None
+
+    def start_in_thread(self) -> str:
+        """Serve from a daemon thread with its own event loop (for blocking clients); returns the root URL"""
+        started: concurrent.futures.Future = concurrent.futures.Future()
+        self.loop = asyncio.new_event_loop()
+
+        def run():
+            asyncio.set_event_loop(self.loop)
+            try:
+                started.set_result(self.loop.run_until_complete(self.start()))
+            except Exception as e:
+                started.set_exception(e)
+                return
+            self.loop.run_forever()
+            self.loop.run_until_complete(self.stop())
+            self.loop.close()
+
+        self.thread = threading.Thread(target=run, name='provider-standin', daemon=True)
+        self.thread.start()
+        return started.result(timeout=10)
+
+    def stop_thread(self) -> None:
+        if self.thread is not None:
+            self.loop.call_soon_threadsafe(self.loop.stop)
+            self.thread.join(timeout=10)
+            self.thread = None
+
+    # ------------------------------------------------------------------
+    # Request handling
+    # ------------------------------------------------------------------
+
+    async def _handle(self, request: web.Request) -> web.Response:
+        provider = request.match_info['provider']
+        if provider not in UPSTREAM_BASE_URLS:
+            return _json({'error': f"unknown provider {provider}"}, status=404)
+        path = '/' + request.match_info.get('tail', '')
+        stats = self._provider_stats(provider)
+        stats['requests'] += 1
+        stats['endpoints'][path] = stats['endpoints'].get(path, 0) + 1
+        self.stats['requests'] += 1
+
+        response = await self._inject_faults(provider, stats)
+        if response is None:
+            if self.mode == 'synthetic':
+                response = self._synthetic(provider, path, request.query)
+            else:
+                response = await self._from_fixtures(provider, path, request)
+        status = str(response.status)
+        stats['status'][status] = stats['status'].get(status, 0) + 1
+        return response
+
+    def _provider_stats(self, provider: str) -> Dict[str, Any]:
+        stats = self.provider_stats.get(provider)
+        if stats is None:
+            stats = self.provider_stats[provider] = {
+                'requests': 0, 'status': {}, 'endpoints': {},
+                'injected': {'delay_s': 0.0, 'errors': 0, 'rate_limited': 0, 'down': 0}
+            }
+        return stats
+
+    async def _inject_faults(self, provider: str, stats: Dict[str, Any]) -> Optional[web.Response]:
+        profile = self.faults.get(provider) or self.faults.get('*')
+        if profile is None:
+            return None
+        injected = stats['injected']
+        delay = profile.latency + (self.rng.uniform(0, profile.jitter) if profile.jitter else 0.0)
+        if delay > 0:
+            injected['delay_s'] = round(injected['delay_s'] + delay, 6)
+            await asyncio.sleep(delay)
+        if profile.down:
+            injected['down'] += 1
+            return _json({'error': f"{provider} stand-in is down"}, status=503)
+        if profile.rate_limit_rate and self.rng.random() < profile.rate_limit_rate:
+            injected['rate_limited'] += 1
+            return self._rate_limited(provider)
+        if profile.error_rate and self.rng.random() < profile.error_rate:
+            injected['errors'] += 1
+            return _json({'error': 'injected internal server error'}, status=500)
+        return None
+
+    @staticmethod
+    def _rate_limited(provider: str) -> web.Response:
+        """The provider's own rate-limit answer"""
+        retry = {'Retry-After': '1'}
+        if provider == 'binance':
+            return _json({'code': -1003, 'msg': 'Too many requests; current limit is 1200 request weight '
+                                                'per 1 MINUTE.'}, status=429, headers=retry)
+        if provider == 'coinmarketcap':
+            return _json({'status': {'error_code': 1008, 'error_message': "You've exceeded your API Key's HTTP "
+                                                                          "request rate limit."}},
+                         status=429, headers=retry)
+        if provider == 'coingecko':
+            return _json({'status': {'error_code': 429, 'error_message': "You've exceeded the Rate Limit."}},
+                         status=429, headers=retry)
+        if provider == 'alpha_vantage':
+            return _json({'Note': 'Thank you for using Alpha Vantage! Our standard API call frequency is '
+                                  '5 calls per minute and 500 calls per day.'})
+        return web.Response(text='Too Many Requests', status=429, headers=retry)
+
+    # ------------------------------------------------------------------
+    # Synthetic responses
+    # ------------------------------------------------------------------
+
+    def _synthetic(self, provider: str, path: str, query) -> web.Response:
+        handler = {
+            ('binance', '/ticker/24hr'): self._binance_ticker,
+            ('binance', '/ticker/price'): self._binance_price,
+            ('binance', '/klines'): self._binance_klines,
+            ('coinmarketcap', '/cryptocurrency/quotes/latest'): self._coinmarketcap_quotes,
+            ('coindesk', '/bpi/currentprice.json'): self._coindesk_bpi,
+            ('alpha_vantage', '/'): self._alpha_vantage_query,
+            ('coingecko', '/simple/price'): self._coingecko_simple_price,
+            ('coingecko', '/coins/list'): self._coingecko_coins
+        }.get((provider, path))
+        if handler is None:
+            return _json({'error': f"{provider} endpoint {path} is not emulated"}, status=404)
+        return handler(query)
+
+    @staticmethod
+    def _binance_invalid_symbol() -> web.Response:
+        return _json({'code': -1121, 'msg': 'Invalid symbol.'}, status=400)
+
+    def _binance_ticker(self, query) -> web.Response:
+        now_ms = int(time.time() * 1000)
+        if 'symbol' in query:
+            asset = self.market.pair(query['symbol'])
+            if asset is None:
+                return self._binance_invalid_symbol()
+            return _json(self._binance_ticker_entry(asset, now_ms))
+        if 'symbols' in query:
+            try:
+                pairs = json.loads(query['symbols'])
+            except ValueError:
+                return _json({'code': -1100, 'msg': "Illegal characters found in parameter 'symbols'."},
+                             status=400)
+            assets = [self.market.pair(pair) for pair in pairs]
+            if None in assets:
+                return self._binance_invalid_symbol()
+        else:
+            assets = list(self.market.assets.values())
+        return _json([self._binance_ticker_entry(asset, now_ms) for asset in assets])
+
+    def _binance_price(self, query) -> web.Response:
+        if 'symbol' in query:
+            asset = self.market.pair(query['symbol'])
+            if asset is None:
+                return self._binance_invalid_symbol()
+            return _json({'symbol': f"{asset.symbol}USDT", 'price': f"{asset.price:.8f}"})
+        return _json([{'symbol': f"{asset.symbol}USDT", 'price': f"{asset.price:.8f}"}
+                      for asset in self.market.assets.values()])
+
+    @staticmethod
+    def _binance_ticker_entry(asset: Asset, now_ms: int) -> Dict[str, Any]:
+        open_price = asset.price / (1 + asset.change_24h / 100)
+        volume = asset.volume_24h / asset.price
+        return {
+            'symbol': f"{asset.symbol}USDT",
+            'priceChange': f"{asset.price - open_price:.8f}",
+            'priceChangePercent': f"{asset.change_24h:.3f}",
+            'weightedAvgPrice': f"{(asset.price + open_price) / 2:.8f}",
+            'prevClosePrice': f"{open_price:.8f}",
+            'lastPrice': f"{asset.price:.8f}",
+            'bidPrice': f"{asset.price * 0.9999:.8f}",
+            'askPrice': f"{asset.price * 1.0001:.8f}",
+            'openPrice': f"{open_price:.8f}",
+            'highPrice': f"{max(asset.price, open_price) * 1.02:.8f}",
+            'lowPrice': f"{min(asset.price, open_price) * 0.98:.8f}",
+            'volume': f"{volume:.8f}",
+            'quoteVolume': f"{asset.volume_24h:.8f}",
+            'openTime': now_ms - 86400000,
+            'closeTime': now_ms,
+            'count': int(volume) % 100000 + 1000
+        }
+
+    def _binance_klines(self, query) -> web.Response:
+        asset = self.market.pair(query.get('symbol', ''))
+        if asset is None:
+            return self._binance_invalid_symbol()
+        step = KLINE_SECONDS.get(query.get('interval', ''))
+        if step is None:
+            return _json({'code': -1120, 'msg': 'Invalid interval.'}, status=400)
+        limit = min(int(query.get('limit', 500)), 1000)
+        now = int(time.time())
+        end = min(int(query['endTime']) // 1000, now) if 'endTime' in query else now
+        start = int(query['startTime']) // 1000 if 'startTime' in query else end - step * (limit - 1)
+        first = -(-start // step) * step
+        rows = []
+        for open_time in range(first, end + 1, step):
+            if len(rows) >= limit:
+                break
+            open_, high, low, close, volume = self.market.candle(asset, open_time, step)
+            rows.append([open_time * 1000, f"{open_:.8f}", f"{high:.8f}", f"{low:.8f}", f"{close:.8f}",
+                         f"{volume:.8f}", (open_time + step) * 1000 - 1, f"{volume * close:.8f}",
+                         int(volume) % 5000 + 100, f"{volume / 2:.8f}", f"{volume * close / 2:.8f}", '0'])
+        return _json(rows)
+
+    def _coinmarketcap_quotes(self, query) -> web.Response:
+        symbols = [symbol.strip().upper() for symbol in query.get('symbol', '').split(',') if symbol.strip()]
+        if not symbols:
+            return _json({'status': {'error_code': 400, 'error_message': '"value" must contain at least one of '
+                                                                         '[id, symbol, slug]'}}, status=400)
+        unknown = [symbol for symbol in symbols if symbol not in self.market.assets]
+        if unknown and query.get('skip_invalid', 'false').lower() != 'true':
+            return _json({'status': {'error_code': 400,
+                                     'error_message': f'Invalid value for "symbol": "{",".join(unknown)}"'}},
+                         status=400)
+        now = _iso(time.time())
+        data = {}
+        for symbol in symbols:
+            asset = self.market.assets.get(symbol)
+            if asset is None:
+                continue
+            data[symbol] = {
+                'id': asset.rank, 'name': asset.name, 'symbol': symbol, 'slug': asset.coin_id,
+                'cmc_rank': asset.rank,
+                'circulating_supply': asset.circulating_supply,
+                'total_supply': asset.circulating_supply,
+                'max_supply': None,
+                'last_updated': now,
+                'quote': {'USD': {
+                    'price': asset.price,
+                    'volume_24h': asset.volume_24h,
+                    'percent_change_24h': asset.change_24h,
+                    'percent_change_7d': asset.change_7d,
+                    'market_cap': asset.market_cap,
+                    'last_updated': now
+                }}
+            }
+        return _json({'status': {'timestamp': now, 'error_code': 0, 'error_message': None,
+                                 'credit_count': 1 + len(data) // 100}, 'data': data})
+
+    def _coindesk_bpi(self, query) -> web.Response:
+        btc = self.market.assets['BTC']
+        now = datetime.now(timezone.utc)
+        return _json({
+            'time': {'updated': now.strftime('%b %d, %Y %H:%M:%S UTC'), 'updatedISO': now.isoformat()},
+            'chartName': 'Bitcoin',
+            'bpi': {'USD': {'code': 'USD', 'symbol': '&#36;', 'rate': f"{btc.price:,.4f}",
+                            'description': 'United States Dollar', 'rate_float': btc.price}}
+        })
+
+    def _alpha_vantage_query(self, query) -> web.Response:
+        function = query.get('function')
+        if function == 'CURRENCY_EXCHANGE_RATE':
+            asset = self.market.assets.get(query.get('from_currency', '').upper())
+            if asset is None or query.get('to_currency', '').upper() != 'USD':
+                return _json({'Error Message': 'Invalid API call. Please retry or visit the documentation '
+                                               '(https://www.alphavantage.co/documentation/) for '
+                                               'CURRENCY_EXCHANGE_RATE.'})
+            return _json({'Realtime Currency Exchange Rate': {
+                '1. From_Currency Code': asset.symbol,
+                '2. From_Currency Name': asset.name,
+                '3. To_Currency Code': 'USD',
+                '4. To_Currency Name': 'United States Dollar',
+                '5. Exchange Rate': f"{asset.price:.8f}",
+                '6. Last Refreshed': datetime.now(timezone.utc).strftime('%Y-%m-%d %H:%M:%S'),
+                '7. Time Zone': 'UTC',
+                '8. Bid Price': f"{asset.price * 0.9999:.8f}",
+                '9. Ask Price': f"{asset.price * 1.0001:.8f}"
+            }})
+        if function == 'DIGITAL_CURRENCY_DAILY':
+            asset = self.market.assets.get(query.get('symbol', '').upper())
+            if asset is None:
+                return _json({'Error Message': 'Invalid API call. Please retry or visit the documentation '
+                                               '(https://www.alphavantage.co/documentation/) for '
+                                               'DIGITAL_CURRENCY_DAILY.'})
+            today = datetime.now(timezone.utc).replace(hour=0, minute=0, second=0, microsecond=0)
+            series = {}
+            for days in range(365):
+                day = today - timedelta(days=days)
+                open_, high, low, close, volume = self.market.candle(asset, int(day.timestamp()), 86400)
+                series[day.strftime('%Y-%m-%d')] = {
+                    '1a. open (USD)': f"{open_:.8f}", '2a. high (USD)': f"{high:.8f}",
+                    '3a. low (USD)': f"{low:.8f}", '4a. close (USD)': f"{close:.8f}",
+                    '5. volume': f"{volume:.8f}"
+                }
+            return _json({
+                'Meta Data': {'1. Information': 'Daily Prices and Volumes for Digital Currency',
+                              '2. Digital Currency Code': asset.symbol, '3. Digital Currency Name': asset.name,
+                              '4. Market Code': query.get('market', 'USD'),
+                              '6. Last Refreshed': today.strftime('%Y-%m-%d'), '7. Time Zone': 'UTC'},
+                'Time Series (Digital Currency Daily)': series
+            })
+        return _json({'Error Message': 'This API function does not exist.'})
+
+    def _coingecko_simple_price(self, query) -> web.Response:
+        ids = [coin_id.strip() for coin_id in query.get('ids', '').split(',') if coin_id.strip()]
+        if not ids:
+            return _json({'error': 'Missing parameter ids'}, status=400)
+        flags = {name: query.get(name, 'false').lower() == 'true'
+                 for name in ('include_market_cap', 'include_24hr_vol', 'include_24hr_change',
+                              'include_last_updated_at')}
+        now = int(time.time())
+        prices = {}
+        for coin_id in ids:
+            asset = self.market.by_id.get(coin_id)
+            if asset is None:
+                continue
+            entry = {'usd': asset.price}
+            if flags['include_market_cap']:
+                entry['usd_market_cap'] = asset.market_cap
+            if flags['include_24hr_vol']:
+                entry['usd_24h_vol'] = asset.volume_24h
+            if flags['include_24hr_change']:
+                entry['usd_24h_change'] = asset.change_24h
+            if flags['include_last_updated_at']:
+                entry['last_updated_at'] = now
+            prices[coin_id] = entry
+        return _json(prices)
+
+    def _coingecko_coins(self, query) -> web.Response:
+        return _json([{'id': asset.coin_id, 'symbol': asset.symbol.lower(), 'name': asset.name}
+                      for asset in self.market.assets.values()])
+
+    # ------------------------------------------------------------------
+    # Record / replay
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def fixture_key(provider: str, path: str, query) -> str:
+        """Identity of a request in the fixtures file: provider, path and sorted non-secret parameters"""
+        params = sorted((name, value) for name, value in query.items() if name.lower() not in SECRET_PARAMS)
+        return f"{provider} {path}?" + '&'.join(f"{name}={value}" for name, value in params)
+
+    def _load_fixtures(self) -> Dict[str, Dict[str, Any]]:
+        fixtures = {}
+        try:
+            with open(self.fixtures_path) as f:
+                for line in f:
+                    if line.strip():
+                        record = json.loads(line)
+                        fixtures[record['key']] = record
+        except FileNotFoundError:
+            if self.mode == 'replay':
+                raise
+        return fixtures
+
+    async def _from_fixtures(self, provider: str, path: str, request: web.Request) -> web.Response:
+        key = self.fixture_key(provider, path, request.query)
+        record = self.fixtures.get(key)
+        if record is None and self.mode == 'record':
+            record = await self._record(provider, path, request, key)
+        if record is None:
+            self.stats['replay_misses'] += 1
+            if self.fallback:
+                return self._synthetic(provider, path, request.query)
+            return _json({'error': f"no recorded response for {key}"}, status=404)
+        return web.Response(text=record['body'], status=record['status'], content_type=record['content_type'])
+
+    async def _record(self, provider: str, path: str, request: web.Request, key: str) -> Optional[Dict[str, Any]]:
+        """Fetch the request from the production API and append it to the fixtures file"""
+        if self.session is None:
+            self.session = aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=30))
+        base = self.upstream[provider]
+        url = base if path == '/' else f"{base}{path}"
+        headers = {name: request.headers[name] for name in FORWARDED_HEADERS if name in request.headers}
+        try:
+            async with self.session.get(url, params=request.query, headers=headers) as upstream:
+                body = await upstream.text()
+                record = {'key': key, 'status': upstream.status,
+                          'content_type': upstream.content_type or 'application/json', 'body': body,
+                          'recorded_at': _iso(time.time())}
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            self.stats['upstream_errors'] += 1
+            logger.warning(f"⚠️ Recording {key} failed: {e}")
+            return None
+        # Rate-limit and server errors are passed through but not kept, so the next run retries them
+        if upstream.status == 429 or upstream.status >= 500:
+            return record
+        self.fixtures[key] = record
+        with open(self.fixtures_path, 'a') as f:
+            f.write(json.dumps(record) + '\n')
+        self.stats['recorded'] += 1
+        return record
+
+    # ------------------------------------------------------------------
+    # Control endpoints
+    # ------------------------------------------------------------------
+
+    async def _handle_stats(self, request: web.Request) -> web.Response:
+        return _json(self.get_stats())
+
+    async def _handle_faults(self, request: web.Request) -> web.Response:
+        if request.method == 'POST':
+            try:
+                for provider, fields in (await request.json()).items():
+                    self.set_faults(provider, **(fields or {}))
+            except (AttributeError, TypeError, ValueError) as e:
+                return _json({'error': str(e)}, status=400)
+        return _json({provider: profile._asdict() for provider, profile in self.faults.items()})
+
+    async def _handle_reset(self, request: web.Request) -> web.Response:
+        self.clear_faults()
+        self.reset_stats()
+        return _json({'reset': True})
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Requests per provider, endpoint and status, plus injected faults"""
+        return dict(
+            self.stats,
+            mode=self.mode,
+            symbols=len(self.market.assets),
+            fixtures=len(self.fixtures),
+            faults={provider: profile._asdict() for provider, profile in self.faults.items()},
+            providers={provider: dict(stats, status=dict(stats['status']), endpoints=dict(stats['endpoints']),
+                                      injected=dict(stats['injected']))
+                       for provider, stats in self.provider_stats.items()}
+        )
+
+
+def parse_faults(raw: Optional[str], defaults: Optional[FaultProfile] = None) -> Dict[str, FaultProfile]:
+    """Fault profiles from a JSON object ({"binance": {"rate_limit_rate": 0.3}}) over default '*' faults"""
+    faults = {'*': defaults} if defaults is not None and defaults != FaultProfile() else {}
+    for provider, fields in (json.loads(raw) if raw else {}).items():
+        faults[provider] = FaultProfile(**fields)
+    return faults
+
+
+async def _serve(args: argparse.Namespace) -> None:
+    faults = parse_faults(args.faults, FaultProfile(args.latency, args.jitter, args.error_rate, args.rate_limit_rate))
+    server = ProviderStandInServer(mode=args.mode, fixtures=args.fixtures, faults=faults,
+                                   extra_symbols=args.extra_symbols, seed=args.seed, fallback=args.fallback,
+                                   host=args.host, port=args.port)
+    url = await server.start()
+    print(f"🧪 Provider stand-in ({args.mode}, {len(server.market.assets)} symbols) at {url}")
+    print(f"   CRYPTSIST_PROVIDER_STANDIN={url}")
+    if faults:
+        print(f"   Faults: {json.dumps({p: f._asdict() for p, f in faults.items()})}")
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await server.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local stand-in for the price provider HTTP APIs")
+    parser.add_argument('--mode', choices=('synthetic', 'record', 'replay'), default='synthetic')
+    parser.add_argument('--fixtures', help="JSON-lines file of recorded responses (record/replay)")
+    parser.add_argument('--fallback', action='store_true', help="answer unrecorded requests synthetically")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--extra-symbols', type=int, default=0, help="synthetic symbols beyond the known ones")
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--latency', type=float, default=0.0, help="seconds added to every response")
+    parser.add_argument('--jitter', type=float, default=0.0)
+    parser.add_argument('--error-rate', type=float, default=0.0, help="probability of HTTP 500")
+    parser.add_argument('--rate-limit-rate', type=float, default=0.0, help="probability of HTTP 429")
+    parser.add_argument('--faults', help='per-provider faults as JSON, e.g. {"binance": {"down": true}}')
+    args = parser.parse_args()
+    try:
+        asyncio.run(_serve(args))
+    except KeyboardInterrupt:
+        print("\n🛑 Provider stand-in stopped")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,143 @@
+"""
+Compact Quote Records for CryptSIST
+Rekaman harga ringkas (__slots__) dengan provenance per sumber, pengganti dict bertingkat yang siklik
+"""
+
+import time
+from datetime import datetime
+from typing import Any, Dict, NamedTuple, Optional, Tuple
+
+
+class SourceQuote(NamedTuple):
+    """What one provider answered during a multi-source lookup"""
+    source: str  # provider key, e.g. 'binance'
+    price: Optional[float]
+    change_24h: Optional[float]
+    error: Optional[str] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+    @classmethod
+    def from_result(cls, source: str, result: Optional[Dict[str, Any]], error: Optional[str] = None) -> 'SourceQuote':
+        if result is None:
+            return cls(source, None, None, error or 'no result')
+        return cls(source, result.get('current_price'), result.get('price_change_24h'))
+
+
+class Quote:
+    """
+    Price quote of one symbol assembled from the primary source.
+
+    Holds scalars only; what every queried source answered is kept in
+    `provenance`, a tuple of SourceQuote, instead of the providers' result
+    dicts, so quotes are acyclic, small and freed by reference counting.
+    `timestamp` is the epoch time the quote was assembled. to_dict() gives
+    the dict layout of the former get_comprehensive_price_data result; the
+    primary source's descriptive fields (DETAIL_FIELDS) are kept when it
+    reported them, only its raw payload and request URL are not.
+    """
+
+    # Optional scalars copied from the primary provider result under the same keys
+    DETAIL_FIELDS = ('name', 'trading_pair', 'currency', 'high_24h', 'low_24h', 'price_change_7d',
+                     'circulating_supply', 'total_supply', 'max_supply', 'last_updated')
+
+    __slots__ = ('symbol', 'price', 'change_24h', 'volume_24h', 'market_cap', 'market_cap_rank',
+                 'source', 'api_source', 'market_cap_source', 'timestamp', 'provenance', 'error') + DETAIL_FIELDS
+
+    def __init__(self, symbol: str, price: Optional[float] = None, change_24h: Optional[float] = None,
+                 volume_24h: Optional[float] = None, market_cap: Optional[float] = None,
+                 market_cap_rank: Optional[int] = None, source: Optional[str] = None,
+                 api_source: Optional[str] = None, market_cap_source: Optional[str] = None,
+                 timestamp: Optional[float] = None, provenance: Tuple[SourceQuote, ...] = (),
+                 error: Optional[str] = None, **details: Any):
+        self.symbol = symbol
+        self.price = price
+        self.change_24h = change_24h
+        self.volume_24h = volume_24h
+        self.market_cap = market_cap
+        self.market_cap_rank = market_cap_rank
+        self.source = source
+        self.api_source = api_source
+        self.market_cap_source = market_cap_source
+        self.timestamp = time.time() if timestamp is None else timestamp
+        self.provenance = provenance
+        self.error = error
+        for field in self.DETAIL_FIELDS:
+            setattr(self, field, details.pop(field, None))
+        if details:
+            raise TypeError(f"Unknown quote fields: {', '.join(details)}")
+
+    @classmethod
+    def from_result(cls, symbol: str, api_source: str, result: Dict[str, Any],
+                    provenance: Tuple[SourceQuote, ...] = ()) -> 'Quote':
+        """Quote from a provider result dict (current_price, price_change_24h, ...)"""
+        return cls(
+            symbol=symbol,
+            price=result.get('current_price'),
+            change_24h=result.get('price_change_24h'),
+            volume_24h=result.get('volume_24h'),
+            market_cap=result.get('market_cap'),
+            market_cap_rank=result.get('market_cap_rank'),
+            source=result.get('source'),
+            api_source=api_source,
+            provenance=provenance,
+            **{field: result.get(field) for field in cls.DETAIL_FIELDS}
+        )
+
+    @classmethod
+    def failed(cls, symbol: str, error: str, provenance: Tuple[SourceQuote, ...] = ()) -> 'Quote':
+        return cls(symbol, provenance=provenance, error=error)
+
+    @property
+    def success(self) -> bool:
+        return self.error is None and self.price is not None
+
+    @property
+    def sources_available(self) -> int:
+        return sum(1 for entry in self.provenance if entry.ok)
+
+    @property
+    def data_quality(self) -> str:
+        answered = {entry.source for entry in self.provenance if entry.ok}
+        return 'Excellent' if 'coinmarketcap' in answered else 'High' if 'binance' in answered else 'Medium'
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Plain JSON-serializable dict in the former result layout"""
+        timestamp = datetime.fromtimestamp(self.timestamp).isoformat()
+        if not self.success:
+            return {
+                'success': False,
+                'error': self.error or 'No price available',
+                'symbol': self.symbol,
+                'attempted_sources': [entry.source for entry in self.provenance],
+                'timestamp': timestamp
+            }
+        data = {
+            'success': True,
+            'symbol': self.symbol,
+            'current_price': self.price,
+            'price_change_24h': self.change_24h,
+            'volume_24h': self.volume_24h,
+            'market_cap': self.market_cap,
+            'market_cap_rank': self.market_cap_rank,
+            'source': self.source,
+            'api_source': self.api_source,
+            'timestamp': timestamp,
+            **{field: getattr(self, field) for field in self.DETAIL_FIELDS if getattr(self, field) is not None},
+            'backup_sources': [entry.source for entry in self.provenance
+                               if entry.ok and entry.source != self.api_source],
+            'sources_available': self.sources_available,
+            'data_quality': self.data_quality,
+            'all_sources': {entry.source: entry._asdict() for entry in self.provenance}
+        }
+        if self.market_cap_source:
+            data['market_cap_source'] = self.market_cap_source
+            data['data_sources'] = [self.source, self.market_cap_source]
+        return data
+
+    def __repr__(self) -> str:
+        if not self.success:
+            return f"Quote({self.symbol!r}, error={self.error!r})"
+        return f"Quote({self.symbol!r}, price={self.price!r}, source={self.api_source!r})"
@@ -0,0 +1,250 @@
+"""
+Provider Rate Limiter and Quota Manager for CryptSIST
+Token bucket per menit dan kuota harian per provider API, disimpan ke disk agar bertahan saat restart
+"""
+
+import atexit
+import json
+import logging
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Default budgets per provider: (calls per minute, calls per day), None = unlimited
+DEFAULT_PROVIDER_LIMITS: Dict[str, Tuple[Optional[int], Optional[int]]] = {
+    'alpha_vantage': (5, 500),
+    'coinmarketcap': (30, 333),
+    'binance': (1200, None),
+    'coingecko': (30, None),
+    'coindesk': (60, None)
+}
+
+DEFAULT_STATE_PATH = os.path.join(os.path.expanduser('~'), '.cryptsist', 'provider_quota.json')
+
+
+class ProviderBudgetExhausted(Exception):
+    """Raised instead of sending a request when a provider has no budget left"""
+
+
+class _ProviderBudget:
+    """Per-minute token bucket plus a per-UTC-day call counter"""
+
+    def __init__(self, per_minute: Optional[int], per_day: Optional[int], now: float):
+        self.per_minute = per_minute
+        self.per_day = per_day
+        self.tokens = float(per_minute or 0)
+        self.updated = now
+        self.day = _utc_day(now)
+        self.day_count = 0
+        self.allowed = 0
+        self.denied = 0
+        self.last_denial = ''
+
+    def try_acquire(self, now: float) -> Optional[str]:
+        """Take one call from the budget, or return the reason it is exhausted"""
+        day = _utc_day(now)
+        if day != self.day:
+            self.day = day
+            self.day_count = 0
+        if self.per_day is not None and self.day_count >= self.per_day:
+            return f"daily quota of {self.per_day} calls used"
+
+        if self.per_minute is not None:
+            elapsed = max(0.0, now - self.updated)
+            self.tokens = min(float(self.per_minute), self.tokens + elapsed * self.per_minute / 60.0)
+            self.updated = now
+            if self.tokens < 1.0:
+                return f"{self.per_minute} calls/minute reached"
+            self.tokens -= 1.0
+
+        self.day_count += 1
+        return None
+
+    def seconds_until_available(self, now: float) -> float:
+        if self.per_day is not None and self.day_count >= self.per_day and _utc_day(now) == self.day:
+            return 86400.0 - now % 86400.0
+        if self.per_minute:
+            missing = 1.0 - min(float(self.per_minute), self.tokens + max(0.0, now - self.updated) * self.per_minute / 60.0)
+            return max(0.0, missing * 60.0 / self.per_minute)
+        return 0.0
+
+    def to_state(self) -> Dict[str, Any]:
+        return {'tokens': self.tokens, 'updated': self.updated, 'day': self.day, 'day_count': self.day_count}
+
+    def load_state(self, state: Dict[str, Any]) -> None:
+        self.tokens = min(float(self.per_minute or 0), float(state.get('tokens', self.tokens)))
+        self.updated = float(state.get('updated', self.updated))
+        if state.get('day') == self.day:
+            self.day_count = int(state.get('day_count', 0))
+
+
+def _utc_day(now: float) -> str:
+    return time.strftime('%Y-%m-%d', time.gmtime(now))
+
+
+class ProviderRateLimiter:
+    """
+    Thread-safe per-provider budgets shared by all price fetchers in a process.
+
+    Each provider has a calls/minute token bucket and a calls/day quota that
+    resets at UTC midnight. try_acquire() never blocks: callers that get False
+    should move on to another source. Budgets are saved to `state_path` by a
+    background flusher (at most once per `persist_interval` seconds, and on
+    close()) and restored on start, so restarts do not hand out a fresh daily
+    quota without putting file I/O on the request path. Providers without
+    limits are always allowed. `clock` returns epoch seconds, which also
+    decide the UTC day.
+    """
+
+    def __init__(self, limits: Optional[Dict[str, Tuple[Optional[int], Optional[int]]]] = None,
+                 state_path: Optional[str] = None, persist_interval: float = 1.0,
+                 clock: Callable[[], float] = time.time):
+        self.limits = dict(DEFAULT_PROVIDER_LIMITS if limits is None else limits)
+        self.state_path = state_path
+        self.persist_interval = persist_interval
+        self.clock = clock
+        self.lock = threading.Lock()
+        self.save_lock = threading.Lock()
+        now = clock()
+        self.budgets = {provider: _ProviderBudget(per_minute, per_day, now)
+                        for provider, (per_minute, per_day) in self.limits.items()}
+        self.last_persist = 0.0
+        self.dirty = False
+        self.flusher: Optional[threading.Thread] = None
+        self.flusher_lock = threading.Lock()
+        self.stop_event = threading.Event()
+        self._load()
+
+    @classmethod
+    def from_env(cls) -> 'ProviderRateLimiter':
+        """
+        Build limiter from environment variables
+
+        CRYPTSIST_RATE_LIMITS      : overrides, e.g. "coinmarketcap=30/333,alpha_vantage=5/500,binance=1200/-"
+        CRYPTSIST_RATE_LIMIT_STATE : state file path, empty disables persistence
+        """
+        limits = dict(DEFAULT_PROVIDER_LIMITS)
+        for item in os.environ.get('CRYPTSIST_RATE_LIMITS', '').split(','):
+            if '=' in item:
+                name, value = item.split('=', 1)
+                try:
+                    per_minute, _, per_day = value.partition('/')
+                    limits[name.strip()] = (
+                        int(per_minute) if per_minute.strip() not in ('', '-') else None,
+                        int(per_day) if per_day.strip() not in ('', '-') else None
+                    )
+                except ValueError:
+                    logger.warning(f"⚠️ Invalid rate limit ignored: {item}")
+
+        state_path = os.environ.get('CRYPTSIST_RATE_LIMIT_STATE', DEFAULT_STATE_PATH)
+        return cls(limits=limits, state_path=os.path.expanduser(state_path) if state_path else None)
+
+    def try_acquire(self, provider: str) -> bool:
+        """Consume one call of the provider's budget if available"""
+        budget = self.budgets.get(provider)
+        if budget is None:
+            return True
+        with self.lock:
+            now = self.clock()
+            reason = budget.try_acquire(now)
+            if reason is None:
+                budget.allowed += 1
+                self.dirty = True
+            else:
+                budget.denied += 1
+                budget.last_denial = reason
+        if reason is None and self.flusher is None and self.state_path:
+            self._start_flusher()
+        return reason is None
+
+    def check(self, provider: str) -> None:
+        """try_acquire() that raises ProviderBudgetExhausted when denied"""
+        if not self.try_acquire(provider):
+            raise ProviderBudgetExhausted(
+                f"Rate limit budget exhausted for {provider}: {self.budgets[provider].last_denial}"
+            )
+
+    def _start_flusher(self) -> None:
+        with self.flusher_lock:
+            if self.flusher is None and not self.stop_event.is_set():
+                self.flusher = threading.Thread(target=self._flush_loop, name='rate-limiter-flusher', daemon=True)
+                self.flusher.start()
+
+    def _flush_loop(self) -> None:
+        while not self.stop_event.wait(self.persist_interval):
+            if self.dirty:
+                self.save()
+
+    def close(self, timeout: float = 5.0) -> None:
+        """Stop the background flusher and write the final budgets"""
+        self.stop_event.set()
+        if self.flusher is not None:
+            self.flusher.join(timeout)
+        if self.dirty:
+            self.save()
+
+    def save(self) -> None:
+        """Write budgets to the state file (atomic replace)"""
+        if not self.state_path:
+            return
+        with self.lock:
+            state = {provider: budget.to_state() for provider, budget in self.budgets.items()}
+            self.last_persist = self.clock()
+            self.dirty = False
+        try:
+            os.makedirs(os.path.dirname(self.state_path) or '.', exist_ok=True)
+            tmp_path = f"{self.state_path}.tmp"
+            with self.save_lock:
+                with open(tmp_path, 'w') as f:
+                    json.dump(state, f)
+                os.replace(tmp_path, self.state_path)
+        except OSError as e:
+            logger.warning(f"⚠️ Could not save provider quota state: {e}")
+
+    def _load(self) -> None:
+        if not self.state_path or not os.path.exists(self.state_path):
+            return
+        try:
+            with open(self.state_path) as f:
+                state = json.load(f)
+            for provider, budget_state in state.items():
+                if provider in self.budgets:
+                    self.budgets[provider].load_state(budget_state)
+            logger.info(f"📊 Restored provider quota state from {self.state_path}")
+        except (OSError, ValueError) as e:
+            logger.warning(f"⚠️ Could not load provider quota state: {e}")
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Remaining budget and allowed/denied counters per provider"""
+        now = self.clock()
+        with self.lock:
+            return {
+                provider: {
+                    'per_minute': budget.per_minute,
+                    'per_day': budget.per_day,
+                    'used_today': budget.day_count,
+                    'remaining_today': budget.per_day - budget.day_count if budget.per_day is not None else None,
+                    'allowed': budget.allowed,
+                    'denied': budget.denied,
+                    'retry_after': round(budget.seconds_until_available(now), 2)
+                }
+                for provider, budget in self.budgets.items()
+            }
+
+
+_shared_limiter: Optional[ProviderRateLimiter] = None
+_shared_lock = threading.Lock()
+
+
+def get_shared_limiter() -> ProviderRateLimiter:
+    """Process-wide limiter used by every price fetcher (built from the environment once)"""
+    global _shared_limiter
+    with _shared_lock:
+        if _shared_limiter is None:
+            _shared_limiter = ProviderRateLimiter.from_env()
+            # Persist the updates since the last background flush on exit
+            atexit.register(_shared_limiter.close)
+        return _shared_limiter
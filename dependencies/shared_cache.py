@@ -0,0 +1,545 @@
+"""
+Shared Cache Backends for CryptSIST
+Antarmuka cache bersama (memory / Redis / file mmap) agar server, bridge dan worker lain berbagi data harga dan sinyal
+"""
+
+import abc
+import contextlib
+import json
+import logging
+import mmap
+import os
+import queue
+import struct
+import threading
+import time
+import zlib
+from typing import Any, Dict, Iterable, List, Optional
+
+try:
+    import redis
+    REDIS_AVAILABLE = True
+except ImportError:
+    REDIS_AVAILABLE = False
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_REDIS_URL = "redis://localhost:6379/0"
+DEFAULT_CACHE_FILE = os.path.join(os.path.expanduser('~'), '.cryptsist', 'shared_cache.mmap')
+
+
+def _dumps(value: Any) -> bytes:
+    return json.dumps(value, default=str, separators=(',', ':')).encode('utf-8')
+
+
+class CacheBackend(abc.ABC):
+    """
+    Key/value cache with per-entry TTL, storing JSON-serializable values.
+
+    get_many()/set_many() batch several keys into one round trip where the
+    backend supports it. `shared` tells whether other processes see the
+    entries. Backend failures are logged and counted, and reads degrade to a
+    miss, so a cache outage never fails a request.
+
+    Reads and set() may block on network or file I/O. Request paths write
+    with put(), which queues the value for a background writer that
+    coalesces pending writes by key into set_many() batches.
+    """
+
+    name = 'base'
+    shared = False
+
+    def __init__(self, max_batch: int = 500):
+        self.stats = {'hits': 0, 'misses': 0, 'sets': 0, 'errors': 0, 'queued': 0}
+        self.max_batch = max_batch
+        self.queue: 'queue.Queue' = queue.Queue()
+        self.writer: Optional[threading.Thread] = None
+        self.writer_lock = threading.Lock()
+        self.closed = False
+
+    def get(self, key: str) -> Optional[Any]:
+        return self.get_many([key]).get(key)
+
+    def set(self, key: str, value: Any, ttl: float) -> None:
+        self.set_many({key: value}, ttl)
+
+    def put(self, key: str, value: Any, ttl: float) -> None:
+        """Queue a write for the background writer (never blocks on backend I/O)"""
+        if self.closed:
+            return
+        if self.writer is None:
+            self._start_writer()
+        self.queue.put((key, value, ttl))
+        self.stats['queued'] += 1
+
+    def _start_writer(self) -> None:
+        with self.writer_lock:
+            if self.writer is None:
+                self.writer = threading.Thread(target=self._write_loop, name=f'{self.name}-cache-writer',
+                                               daemon=True)
+                self.writer.start()
+
+    def _write_loop(self) -> None:
+        while True:
+            item = self.queue.get()
+            pending = {}
+            taken = 1
+            while item is not None:
+                pending[item[0]] = item
+                if len(pending) >= self.max_batch:
+                    break
+                try:
+                    item = self.queue.get_nowait()
+                    taken += 1
+                except queue.Empty:
+                    break
+            batches: Dict[float, Dict[str, Any]] = {}
+            for key, value, ttl in pending.values():
+                batches.setdefault(ttl, {})[key] = value
+            for ttl, items in batches.items():
+                try:
+                    self.set_many(items, ttl)
+                except Exception as e:
+                    self.stats['errors'] += 1
+                    logger.warning(f"⚠️ {self.name} cache write-behind failed: {e}")
+            for _ in range(taken):
+                self.queue.task_done()
+            if item is None:
+                break
+
+    def flush(self) -> None:
+        """Wait until every queued put() has been written"""
+        if self.writer is not None:
+            self.queue.join()
+
+    @abc.abstractmethod
+    def get_many(self, keys: Iterable[str]) -> Dict[str, Any]:
+        """Unexpired values of the keys that are present"""
+
+    @abc.abstractmethod
+    def set_many(self, items: Dict[str, Any], ttl: float) -> None:
+        """Store every item for ttl seconds"""
+
+    @abc.abstractmethod
+    def delete(self, key: str) -> None:
+        """Drop a key (and any local copies of it)"""
+
+    def close(self, timeout: float = 5.0) -> None:
+        """Write queued puts and stop the writer"""
+        if self.closed:
+            return
+        self.closed = True
+        if self.writer is not None:
+            self.queue.put(None)
+            self.writer.join(timeout)
+
+    def _count(self, found: int, requested: int) -> None:
+        self.stats['hits'] += found
+        self.stats['misses'] += requested - found
+
+    def get_stats(self) -> Dict[str, Any]:
+        lookups = self.stats['hits'] + self.stats['misses']
+        return dict(
+            self.stats,
+            backend=self.name,
+            shared=self.shared,
+            pending=self.queue.qsize(),
+            hit_ratio=round(self.stats['hits'] / lookups, 4) if lookups else 0.0
+        )
+
+
+class MemoryCacheBackend(CacheBackend):
+    """
+    Process-local backend (a dict of (expires_at, value) under a lock).
+
+    Not shared, so the server and the price fetcher ignore it (their own
+    in-process caches already cover it); useful for tests and tools.
+    """
+
+    name = 'memory'
+
+    def __init__(self, max_entries: int = 10000):
+        super().__init__()
+        self.max_entries = max_entries
+        self.entries: Dict[str, tuple] = {}
+        self.lock = threading.Lock()
+
+    def get_many(self, keys: Iterable[str]) -> Dict[str, Any]:
+        keys = list(keys)
+        now = time.time()
+        found = {}
+        with self.lock:
+            for key in keys:
+                entry = self.entries.get(key)
+                if entry is not None:
+                    if entry[0] > now:
+                        found[key] = entry[1]
+                    else:
+                        del self.entries[key]
+        self._count(len(found), len(keys))
+        return found
+
+    def set_many(self, items: Dict[str, Any], ttl: float) -> None:
+        expires_at = time.time() + ttl
+        with self.lock:
+            for key, value in items.items():
+                self.entries[key] = (expires_at, value)
+            if len(self.entries) > self.max_entries:
+                now = time.time()
+                for key in [key for key, entry in self.entries.items() if entry[0] <= now]:
+                    del self.entries[key]
+                # Still full of live entries: drop the oldest inserted
+                for key in list(self.entries)[:len(self.entries) - self.max_entries]:
+                    del self.entries[key]
+        self.stats['sets'] += len(items)
+
+    def put(self, key: str, value: Any, ttl: float) -> None:
+        # No I/O to defer
+        self.set_many({key: value}, ttl)
+
+    def delete(self, key: str) -> None:
+        with self.lock:
+            self.entries.pop(key, None)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return dict(super().get_stats(), entries=len(self.entries))
+
+
+class RedisCacheBackend(CacheBackend):
+    """
+    Redis backend shared by every process pointing at the same server.
+
+    Batches use MGET and a non-transactional pipeline of SET PX, so N keys
+    cost one round trip. With `local_ttl` > 0 values are also kept in a
+    client-side cache for up to that many seconds; writers publish changed
+    keys on an invalidation channel that every client subscribes to, so
+    local copies are dropped as soon as another process overwrites them.
+    `client` accepts any redis-py compatible client (e.g. fakeredis).
+    """
+
+    name = 'redis'
+    shared = True
+
+    def __init__(self, url: str = DEFAULT_REDIS_URL, prefix: str = 'cryptsist:', local_ttl: float = 0.0,
+                 client=None, socket_timeout: float = 0.5):
+        super().__init__()
+        if client is None:
+            if not REDIS_AVAILABLE:
+                raise ImportError("redis package is not installed")
+            client = redis.Redis.from_url(url, socket_timeout=socket_timeout, socket_connect_timeout=socket_timeout)
+        self.client = client
+        self.prefix = prefix
+        self.local_ttl = local_ttl
+        self.local: Dict[str, tuple] = {}
+        self.invalidation_channel = f"{prefix}__invalidate"
+        self.invalidation_thread = None
+        self.stats.update({'local_hits': 0, 'invalidations': 0})
+        if local_ttl > 0:
+            pubsub = self.client.pubsub(ignore_subscribe_messages=True)
+            pubsub.subscribe(**{self.invalidation_channel: self._on_invalidate})
+            self.invalidation_thread = pubsub.run_in_thread(sleep_time=0.05, daemon=True)
+
+    def _on_invalidate(self, message: Dict[str, Any]) -> None:
+        data = message.get('data')
+        for key in (data.decode() if isinstance(data, bytes) else str(data)).split('\n'):
+            if self.local.pop(key, None) is not None:
+                self.stats['invalidations'] += 1
+
+    def get_many(self, keys: Iterable[str]) -> Dict[str, Any]:
+        keys = list(keys)
+        found = {}
+        remote_keys = []
+        if self.local_ttl > 0:
+            now = time.monotonic()
+            for key in keys:
+                entry = self.local.get(key)
+                if entry is not None and entry[0] > now:
+                    found[key] = entry[1]
+                else:
+                    remote_keys.append(key)
+            self.stats['local_hits'] += len(found)
+        else:
+            remote_keys = keys
+
+        if remote_keys:
+            try:
+                values = self.client.mget([self.prefix + key for key in remote_keys])
+            except Exception as e:
+                self.stats['errors'] += 1
+                logger.warning(f"⚠️ Redis cache read failed: {e}")
+                values = [None] * len(remote_keys)
+            expires_at = time.monotonic() + self.local_ttl
+            for key, raw in zip(remote_keys, values):
+                if raw is None:
+                    continue
+                try:
+                    value = json.loads(raw)
+                except ValueError:
+                    continue
+                found[key] = value
+                if self.local_ttl > 0:
+                    self.local[key] = (expires_at, value)
+        self._count(len(found), len(keys))
+        return found
+
+    def set_many(self, items: Dict[str, Any], ttl: float) -> None:
+        if not items:
+            return
+        try:
+            pipe = self.client.pipeline(transaction=False)
+            for key, value in items.items():
+                pipe.set(self.prefix + key, _dumps(value), px=max(1, int(ttl * 1000)))
+            if self.local_ttl > 0:
+                pipe.publish(self.invalidation_channel, '\n'.join(items))
+            pipe.execute()
+            self.stats['sets'] += len(items)
+        except Exception as e:
+            self.stats['errors'] += 1
+            logger.warning(f"⚠️ Redis cache write failed: {e}")
+            return
+        if self.local_ttl > 0:
+            expires_at = time.monotonic() + min(self.local_ttl, ttl)
+            for key, value in items.items():
+                self.local[key] = (expires_at, value)
+
+    def delete(self, key: str) -> None:
+        self.local.pop(key, None)
+        try:
+            pipe = self.client.pipeline(transaction=False)
+            pipe.delete(self.prefix + key)
+            if self.local_ttl > 0:
+                pipe.publish(self.invalidation_channel, key)
+            pipe.execute()
+        except Exception as e:
+            self.stats['errors'] += 1
+            logger.warning(f"⚠️ Redis cache delete failed: {e}")
+
+    def close(self, timeout: float = 5.0) -> None:
+        super().close(timeout)
+        if self.invalidation_thread is not None:
+            self.invalidation_thread.stop()
+            self.invalidation_thread = None
+
+    def get_stats(self) -> Dict[str, Any]:
+        return dict(super().get_stats(), local_entries=len(self.local))
+
+
+class FileCacheBackend(CacheBackend):
+    """
+    Host-local backend in a memory-mapped file shared by all processes on the machine.
+
+    The file is a table of fixed-size slots; a key lives in slot
+    crc32(key) % slots, and a colliding key simply replaces it (it is a
+    cache). Each slot starts with a sequence number that writers make odd
+    while writing and even when done (a seqlock), so readers never lock and
+    retry if they raced a writer. Writers serialize on a file lock. Values
+    larger than a slot are not cached.
+
+    The slot layout is part of the file name (shared_cache.<slots>x<slot_size>.mmap),
+    so processes configured differently use separate files. A file is never
+    truncated once written, since other processes may still map it; one with
+    an unexpected header makes the constructor raise instead.
+    """
+
+    name = 'file'
+    shared = True
+
+    MAGIC = b'CSCACHE1'
+    FILE_HEADER = struct.Struct('<8sII')  # magic, slots, slot size
+    FILE_HEADER_SIZE = 64
+    SLOT_HEADER = struct.Struct('<IdHI')  # sequence, expires_at, key length, value length
+    SEQUENCE = struct.Struct('<I')
+
+    def __init__(self, path: str = DEFAULT_CACHE_FILE, slots: int = 4096, slot_size: int = 8192):
+        super().__init__()
+        self.path = self.layout_path(path, slots, slot_size)
+        self.slots = slots
+        self.slot_size = slot_size
+        self.lock = threading.Lock()
+        self.stats.update({'oversize': 0, 'read_retries': 0})
+
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        size = self.FILE_HEADER_SIZE + slots * slot_size
+        layout = self.FILE_HEADER.pack(self.MAGIC, slots, slot_size)
+        self.file = os.fdopen(os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644), 'r+b')
+        with self._file_lock():
+            length = os.fstat(self.file.fileno()).st_size
+            self.file.seek(0)
+            header = self.file.read(self.FILE_HEADER.size)
+            if not header.strip(b'\0'):
+                # New file (or its creator died before the header): only ever grow it
+                if length < size:
+                    self.file.truncate(size)
+                self.file.seek(0)
+                self.file.write(layout)
+                self.file.flush()
+            elif header != layout or length < size:
+                self.file.close()
+                raise ValueError(f"{self.path} is not a cache file of this layout; remove it once no process maps it")
+        self.map = mmap.mmap(self.file.fileno(), size)
+
+    @staticmethod
+    def layout_path(path: str, slots: int, slot_size: int) -> str:
+        """File name for a slot layout, e.g. shared_cache.4096x8192.mmap"""
+        root, ext = os.path.splitext(path)
+        return f"{root}.{slots}x{slot_size}{ext}"
+
+    @contextlib.contextmanager
+    def _file_lock(self):
+        """Exclusive writer lock across threads (lock) and processes (file lock)"""
+        with self.lock:
+            if fcntl is not None:
+                fcntl.flock(self.file.fileno(), fcntl.LOCK_EX)
+            else:
+                self.file.seek(0)
+                msvcrt.locking(self.file.fileno(), msvcrt.LK_LOCK, 1)
+            try:
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(self.file.fileno(), fcntl.LOCK_UN)
+                else:
+                    self.file.seek(0)
+                    msvcrt.locking(self.file.fileno(), msvcrt.LK_UNLCK, 1)
+
+    def _offset(self, key_bytes: bytes) -> int:
+        return self.FILE_HEADER_SIZE + (zlib.crc32(key_bytes) % self.slots) * self.slot_size
+
+    def _read(self, key: str) -> Optional[Any]:
+        key_bytes = key.encode('utf-8')
+        offset = self._offset(key_bytes)
+        body = offset + self.SLOT_HEADER.size
+        for _ in range(3):
+            sequence, expires_at, key_length, value_length = self.SLOT_HEADER.unpack_from(self.map, offset)
+            if sequence & 1:
+                self.stats['read_retries'] += 1
+                time.sleep(0)
+                continue
+            if key_length != len(key_bytes) or self.map[body:body + key_length] != key_bytes:
+                return None
+            raw = self.map[body + key_length:body + key_length + value_length]
+            if self.SEQUENCE.unpack_from(self.map, offset)[0] != sequence:
+                self.stats['read_retries'] += 1
+                continue
+            if expires_at <= time.time():
+                return None
+            try:
+                return json.loads(raw)
+            except ValueError:
+                return None
+        return None
+
+    def get_many(self, keys: Iterable[str]) -> Dict[str, Any]:
+        keys = list(keys)
+        found = {}
+        for key in keys:
+            value = self._read(key)
+            if value is not None:
+                found[key] = value
+        self._count(len(found), len(keys))
+        return found
+
+    def set_many(self, items: Dict[str, Any], ttl: float) -> None:
+        expires_at = time.time() + ttl
+        records: List[tuple] = []
+        for key, value in items.items():
+            key_bytes = key.encode('utf-8')
+            raw = _dumps(value)
+            if self.SLOT_HEADER.size + len(key_bytes) + len(raw) > self.slot_size:
+                self.stats['oversize'] += 1
+                continue
+            records.append((key_bytes, raw))
+        if not records:
+            return
+        with self._file_lock():
+            for key_bytes, raw in records:
+                self._write_slot(key_bytes, raw, expires_at)
+        self.stats['sets'] += len(records)
+
+    def _write_slot(self, key_bytes: bytes, raw: bytes, expires_at: float) -> None:
+        offset = self._offset(key_bytes)
+        body = offset + self.SLOT_HEADER.size
+        sequence = self.SEQUENCE.unpack_from(self.map, offset)[0]
+        writing = sequence if sequence & 1 else sequence + 1  # odd: write in progress
+        self.SEQUENCE.pack_into(self.map, offset, writing & 0xFFFFFFFF)
+        self.map[body:body + len(key_bytes)] = key_bytes
+        self.map[body + len(key_bytes):body + len(key_bytes) + len(raw)] = raw
+        self.SLOT_HEADER.pack_into(self.map, offset, writing & 0xFFFFFFFF, expires_at, len(key_bytes), len(raw))
+        self.SEQUENCE.pack_into(self.map, offset, (writing + 1) & 0xFFFFFFFF)
+
+    def delete(self, key: str) -> None:
+        key_bytes = key.encode('utf-8')
+        with self._file_lock():
+            if self._read(key) is not None:
+                self._write_slot(key_bytes, b'', 0.0)
+
+    def close(self, timeout: float = 5.0) -> None:
+        super().close(timeout)
+        self.map.close()
+        self.file.close()
+
+    def get_stats(self) -> Dict[str, Any]:
+        return dict(super().get_stats(), path=self.path, slots=self.slots, slot_size=self.slot_size)
+
+
+def create_cache_backend(kind: str, **options) -> Optional[CacheBackend]:
+    """Build a backend by name ('memory', 'redis', 'file'); 'none' returns None"""
+    kind = kind.strip().lower()
+    if kind in ('', 'none', 'off'):
+        return None
+    if kind == 'memory':
+        return MemoryCacheBackend(**options)
+    if kind == 'redis':
+        backend = RedisCacheBackend(**options)
+        backend.client.ping()
+        return backend
+    if kind == 'file':
+        return FileCacheBackend(**options)
+    raise ValueError(f"Unknown cache backend: {kind}")
+
+
+_shared_backend: Optional[CacheBackend] = None
+_shared_initialized = False
+_shared_lock = threading.Lock()
+
+
+def get_shared_cache_backend() -> Optional[CacheBackend]:
+    """
+    Process-wide backend built from environment variables once
+
+    CRYPTSIST_CACHE_BACKEND  : none (default), redis, file or memory
+    CRYPTSIST_REDIS_URL      : Redis server for the redis backend
+    CRYPTSIST_CACHE_NEAR_TTL : client-side cache seconds for the redis backend (0 disables)
+    CRYPTSIST_CACHE_FILE     : mmap file for the file backend
+
+    An unavailable backend is disabled (None) rather than replaced, since a
+    process-local substitute would only duplicate the in-process caches.
+    """
+    global _shared_backend, _shared_initialized
+    with _shared_lock:
+        if _shared_initialized:
+            return _shared_backend
+        _shared_initialized = True
+        kind = os.environ.get('CRYPTSIST_CACHE_BACKEND', 'none')
+        options: Dict[str, Any] = {}
+        if kind == 'redis':
+            options = {
+                'url': os.environ.get('CRYPTSIST_REDIS_URL', DEFAULT_REDIS_URL),
+                'local_ttl': float(os.environ.get('CRYPTSIST_CACHE_NEAR_TTL', 0))
+            }
+        elif kind == 'file':
+            options = {'path': os.path.expanduser(os.environ.get('CRYPTSIST_CACHE_FILE', DEFAULT_CACHE_FILE))}
+        try:
+            _shared_backend = create_cache_backend(kind, **options)
+        except Exception as e:
+            logger.warning(f"⚠️ {kind} cache backend unavailable ({e}), shared cache disabled")
+            _shared_backend = None
+        if _shared_backend is not None:
+            logger.info(f"✅ Shared cache backend: {_shared_backend.name}")
+        return _shared_backend
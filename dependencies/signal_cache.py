@@ -0,0 +1,283 @@
+"""
+Bounded TTL/LRU Signal Cache for CryptSIST MT5 Server
+Cache sinyal dengan batas jumlah entry, TTL berbasis monotonic clock dan statistik
+"""
+
+import asyncio
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+
+class CacheEntry:
+    """
+    One cached value with its monotonic store time, version and pre-encoded form
+
+    A lazy entry holds build() -> (value, encoded) instead and runs it on the
+    first read of value or encoded. Concurrent first reads may both build;
+    build must be repeatable.
+    """
+
+    __slots__ = ('_value', 'stored_at', 'accessed_at', 'version', '_encoded', 'build')
+
+    def __init__(self, value: Any, stored_at: float, version: int, encoded: Optional[bytes] = None,
+                 build: Optional[Callable[[], Tuple[Any, Optional[bytes]]]] = None):
+        self._value = value
+        self.stored_at = stored_at
+        self.accessed_at = stored_at
+        self.version = version
+        self._encoded = encoded
+        self.build = build
+
+    @property
+    def value(self) -> Any:
+        if self.build is not None:
+            self._materialize()
+        return self._value
+
+    @property
+    def encoded(self) -> Optional[bytes]:
+        if self.build is not None:
+            self._materialize()
+        return self._encoded
+
+    def _materialize(self) -> None:
+        build = self.build
+        if build is not None:
+            self._value, self._encoded = build()
+            self.build = None
+
+
+class SignalCache:
+    """
+    Thread-safe cache bounded by entry count (LRU) and idle time.
+
+    Ages are measured with time.monotonic(), so wall-clock jumps and multi-day
+    uptimes do not affect freshness checks. Values should be immutable; callers
+    derive per-request variants from them instead of mutating shared entries.
+
+    With a shared `backend` (see shared_cache) every set() is also queued
+    there as dump(value) for `shared_ttl` seconds (write-behind), and local
+    misses are looked up in it, so processes reuse each other's signals.
+    load() rebuilds the value and encode() its pre-encoded form. Backend
+    lookups block, so event-loop callers use get_entry_async() and
+    prefetch_async(), which run them through `offload(func, *args)`.
+    """
+
+    def __init__(self, max_entries: int = 1000, max_idle: float = 600.0,
+                 on_evict: Optional[Callable[[str], None]] = None,
+                 clock: Callable[[], float] = time.monotonic,
+                 backend=None, dump: Optional[Callable[[Any], Any]] = None,
+                 load: Optional[Callable[[Any], Any]] = None,
+                 encode: Optional[Callable[[Any], bytes]] = None, shared_ttl: float = 60.0,
+                 offload: Optional[Callable[..., Awaitable[Any]]] = None):
+        self.max_entries = max_entries
+        self.max_idle = max_idle
+        self.on_evict = on_evict
+        self.clock = clock
+        self.backend = backend
+        self.dump = dump or (lambda value: value)
+        self.load = load or (lambda payload: payload)
+        self.encode = encode
+        self.shared_ttl = shared_ttl
+        self.offload = offload or asyncio.to_thread
+        self.entries: 'OrderedDict[str, CacheEntry]' = OrderedDict()
+        self.lock = threading.Lock()
+        self.version = 0
+        self.stats = {
+            'hits': 0,
+            'misses': 0,
+            'stale': 0,
+            'sets': 0,
+            'evictions': 0,
+            'idle_evictions': 0,
+            'shared_hits': 0,
+            'shared_errors': 0
+        }
+
+    def get_entry(self, key: str, max_age: Optional[float] = None) -> Optional[CacheEntry]:
+        """
+        Get an entry if present and younger than max_age seconds
+
+        Stale entries are kept (the background refresher may still replace them)
+        but reported as a miss, unless the shared backend holds a fresh one.
+        """
+        entry = self._get_local(key, max_age)
+        if entry is None and self.backend is not None:
+            entry = self._get_shared(key, max_age)
+        return self._count_lookup(entry)
+
+    async def get_entry_async(self, key: str, max_age: Optional[float] = None) -> Optional[CacheEntry]:
+        """get_entry() that runs the shared backend lookup through offload()"""
+        entry = self._get_local(key, max_age)
+        if entry is None and self.backend is not None:
+            try:
+                entry = await self.offload(self._get_shared, key, max_age)
+            except Exception:
+                # e.g. a full executor queue: degrade to a miss like a backend outage
+                self.stats['shared_errors'] += 1
+        return self._count_lookup(entry)
+
+    def _get_local(self, key: str, max_age: Optional[float]) -> Optional[CacheEntry]:
+        with self.lock:
+            entry = self.entries.get(key)
+            now = self.clock()
+            if entry is not None and (max_age is None or now - entry.stored_at < max_age):
+                entry.accessed_at = now
+                self.entries.move_to_end(key)
+                return entry
+            if entry is not None:
+                self.stats['stale'] += 1
+        return None
+
+    def _get_shared(self, key: str, max_age: Optional[float]) -> Optional[CacheEntry]:
+        return self._install_shared(key, self.backend.get(key), max_age)
+
+    def _count_lookup(self, entry: Optional[CacheEntry]) -> Optional[CacheEntry]:
+        with self.lock:
+            self.stats['hits' if entry is not None else 'misses'] += 1
+        return entry
+
+    def prefetch(self, keys: List[str], max_age: Optional[float] = None) -> int:
+        """Load keys that are missing or stale locally from the shared backend in one batch"""
+        missing = self._missing(keys, max_age)
+        return self._prefetch_missing(missing, max_age) if missing else 0
+
+    async def prefetch_async(self, keys: List[str], max_age: Optional[float] = None) -> int:
+        """prefetch() that runs the shared backend batch through offload()"""
+        missing = self._missing(keys, max_age)
+        if not missing:
+            return 0
+        try:
+            return await self.offload(self._prefetch_missing, missing, max_age)
+        except Exception:
+            self.stats['shared_errors'] += 1
+            return 0
+
+    def _missing(self, keys: List[str], max_age: Optional[float]) -> List[str]:
+        if self.backend is None:
+            return []
+        with self.lock:
+            now = self.clock()
+            return [key for key in keys
+                    if key not in self.entries
+                    or (max_age is not None and now - self.entries[key].stored_at >= max_age)]
+
+    def _prefetch_missing(self, missing: List[str], max_age: Optional[float]) -> int:
+        found = self.backend.get_many(missing)
+        return sum(1 for key, payload in found.items() if self._install_shared(key, payload, max_age) is not None)
+
+    def _install_shared(self, key: str, payload: Optional[Dict[str, Any]],
+                        max_age: Optional[float]) -> Optional[CacheEntry]:
+        """Store a backend payload locally if it is fresh enough (keeping its original age)"""
+        if payload is None:
+            return None
+        age = max(0.0, time.time() - payload['stored_at'])
+        if max_age is not None and age >= max_age:
+            return None
+        value = self.load(payload['value'])
+        encoded = self.encode(value) if self.encode else None
+        with self.lock:
+            current = self.entries.get(key)
+            if current is not None and self.clock() - current.stored_at <= age:
+                return current  # a newer local entry arrived meanwhile
+            self.version += 1
+            entry = CacheEntry(value, self.clock() - age, self.version, encoded)
+            self.entries[key] = entry
+            self.entries.move_to_end(key)
+            self.stats['shared_hits'] += 1
+            evicted = self._evict_over_limit()
+        self._notify(evicted)
+        return entry
+
+    def get(self, key: str, max_age: Optional[float] = None) -> Any:
+        entry = self.get_entry(key, max_age)
+        return entry.value if entry is not None else None
+
+    def set(self, key: str, value: Any, encoded: Optional[bytes] = None) -> CacheEntry:
+        """
+        Store a value, evicting least recently used entries beyond max_entries
+
+        encoded optionally holds the value serialized once at store time so hot
+        reads can skip re-encoding it. The shared backend write is queued, so
+        set() never waits on backend I/O.
+        """
+        return self._store(key, value, encoded, None)
+
+    def set_lazy(self, key: str, build: Callable[[], Tuple[Any, Optional[bytes]]]) -> CacheEntry:
+        """
+        Store a value that build() -> (value, encoded) produces on the first read
+
+        Entries that are replaced or evicted before anyone reads them never pay
+        for building. With a shared backend the value is built right away,
+        since other processes read it from there.
+        """
+        return self._store(key, None, None, build)
+
+    def _store(self, key: str, value: Any, encoded: Optional[bytes],
+               build: Optional[Callable[[], Tuple[Any, Optional[bytes]]]]) -> CacheEntry:
+        with self.lock:
+            self.version += 1
+            entry = CacheEntry(value, self.clock(), self.version, encoded, build)
+            self.entries[key] = entry
+            self.entries.move_to_end(key)
+            self.stats['sets'] += 1
+            evicted = self._evict_over_limit()
+        self._notify(evicted)
+        if self.backend is not None:
+            self.backend.put(key, {'value': self.dump(entry.value), 'stored_at': time.time()}, self.shared_ttl)
+        return entry
+
+    def _evict_over_limit(self) -> List[str]:
+        """Drop least recently used entries beyond max_entries (lock held)"""
+        evicted: List[str] = []
+        while len(self.entries) > self.max_entries:
+            old_key, _ = self.entries.popitem(last=False)
+            evicted.append(old_key)
+        self.stats['evictions'] += len(evicted)
+        return evicted
+
+    def age(self, key: str) -> Optional[float]:
+        """Seconds since the entry was stored, or None"""
+        with self.lock:
+            entry = self.entries.get(key)
+            return self.clock() - entry.stored_at if entry is not None else None
+
+    def purge_idle(self) -> int:
+        """Evict entries that were neither read nor written for max_idle seconds"""
+        evicted: List[str] = []
+        with self.lock:
+            cutoff = self.clock() - self.max_idle
+            for key, entry in list(self.entries.items()):
+                if entry.accessed_at < cutoff:
+                    del self.entries[key]
+                    evicted.append(key)
+            self.stats['evictions'] += len(evicted)
+            self.stats['idle_evictions'] += len(evicted)
+        self._notify(evicted)
+        return len(evicted)
+
+    def _notify(self, keys: List[str]) -> None:
+        if self.on_evict:
+            for key in keys:
+                self.on_evict(key)
+
+    def __contains__(self, key: str) -> bool:
+        with self.lock:
+            return key in self.entries
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Hit/miss/eviction counters"""
+        with self.lock:
+            lookups = self.stats['hits'] + self.stats['misses']
+            return dict(
+                self.stats,
+                entries=len(self.entries),
+                max_entries=self.max_entries,
+                backend=self.backend.name if self.backend is not None else None,
+                hit_ratio=round(self.stats['hits'] / lookups, 4) if lookups else 0.0
+            )
@@ -0,0 +1,243 @@
+"""
+Background Signal Refresher for CryptSIST MT5 Server
+Menjaga sinyal watchlist dan simbol yang sering diminta tetap segar di cache
+"""
+
+import asyncio
+import logging
+import random
+import time
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class SignalRefresher:
+    """
+    Server-side scheduler that keeps tracked symbols fresh in the signal cache.
+
+    Tracked symbols are the configured watchlist, symbols pinned by live stream
+    subscriptions and every symbol requested in the last `recent_window`
+    seconds, at most `max_tracked` of them in that order of preference. On each jittered tick the symbols whose signal is older than
+    `refresh_interval` are refreshed, most-requested first, within a per-minute
+    refresh budget so upstream providers are not overrun. With
+    `refresh_batch_func` the due symbols of a tick are refreshed by one call
+    instead of one refresh_func call each.
+    """
+
+    def __init__(self, refresh_func: Callable[[str], Awaitable[Any]],
+                 watchlist: Optional[Iterable[str]] = None,
+                 refresh_interval: float = 5.0, tick_interval: float = 1.0,
+                 jitter: float = 0.2, budget_per_minute: int = 600,
+                 max_per_tick: int = 50, recent_window: float = 300.0,
+                 max_tracked: int = 500,
+                 refresh_batch_func: Optional[Callable[[List[str]], Awaitable[Any]]] = None):
+        self.refresh_func = refresh_func
+        self.refresh_batch_func = refresh_batch_func
+        self.watchlist = set(watchlist or [])
+        self.refresh_interval = refresh_interval
+        self.tick_interval = tick_interval
+        self.jitter = jitter
+        self.budget_per_minute = budget_per_minute
+        self.max_per_tick = max_per_tick
+        self.recent_window = recent_window
+        self.max_tracked = max_tracked
+
+        self.pinned: Dict[str, int] = {}
+        self.request_counts: Dict[str, float] = {}
+        self.last_seen: Dict[str, float] = {}
+        self.last_refreshed: Dict[str, float] = {}
+
+        # Token bucket for the refresh budget
+        self.tokens = float(budget_per_minute)
+        self.tokens_updated = time.monotonic()
+        self.last_decay = time.monotonic()
+
+        self.task: Optional[asyncio.Task] = None
+        self.stats = {
+            'ticks': 0,
+            'refreshes': 0,
+            'refresh_errors': 0,
+            'budget_exhausted': 0,
+            'hits': 0,
+            'misses': 0,
+            'backlog': 0,
+            'max_backlog': 0,
+            'total_lag': 0.0,
+            'max_lag': 0.0,
+            'last_tick_ms': 0.0
+        }
+
+    def record_request(self, symbol: str, hit: bool) -> None:
+        """Record a client request so the symbol stays tracked and gets priority"""
+        self.request_counts[symbol] = self.request_counts.get(symbol, 0.0) + 1.0
+        self.last_seen[symbol] = time.monotonic()
+        self.stats['hits' if hit else 'misses'] += 1
+
+    def pin(self, symbols: Iterable[str]) -> None:
+        """Keep symbols tracked while a stream subscription needs them"""
+        for symbol in symbols:
+            self.pinned[symbol] = self.pinned.get(symbol, 0) + 1
+
+    def unpin(self, symbols: Iterable[str]) -> None:
+        """Release symbols pinned by pin()"""
+        for symbol in symbols:
+            count = self.pinned.get(symbol, 0) - 1
+            if count > 0:
+                self.pinned[symbol] = count
+            else:
+                self.pinned.pop(symbol, None)
+
+    def forget(self, symbol: str) -> None:
+        """Drop tracking state of an evicted symbol (watchlist and pinned symbols stay)"""
+        if symbol in self.watchlist or symbol in self.pinned:
+            return
+        self.last_seen.pop(symbol, None)
+        self.request_counts.pop(symbol, None)
+        self.last_refreshed.pop(symbol, None)
+
+    def mark_refreshed(self, symbol: str) -> None:
+        """Record that a symbol's cached signal was just regenerated"""
+        self.last_refreshed[symbol] = time.monotonic()
+
+    def tracked_symbols(self) -> List[str]:
+        """Watchlist, pinned, then recently requested symbols, most requested first within each, up to max_tracked"""
+        now = time.monotonic()
+        for symbol in [s for s, seen in self.last_seen.items() if now - seen > self.recent_window]:
+            if symbol not in self.watchlist and symbol not in self.pinned:
+                self.last_seen.pop(symbol, None)
+                self.request_counts.pop(symbol, None)
+                self.last_refreshed.pop(symbol, None)
+
+        symbols = self.watchlist | set(self.pinned) | set(self.last_seen)
+        ranked = sorted(symbols, key=lambda s: (s not in self.watchlist, s not in self.pinned,
+                                                -self.request_counts.get(s, 0.0)))
+        return ranked[:self.max_tracked]
+
+    def _take_budget(self, wanted: int) -> int:
+        now = time.monotonic()
+        self.tokens = min(float(self.budget_per_minute),
+                          self.tokens + (now - self.tokens_updated) * self.budget_per_minute / 60.0)
+        self.tokens_updated = now
+        granted = min(wanted, int(self.tokens))
+        self.tokens -= granted
+        return granted
+
+    def _decay_counts(self) -> None:
+        # Halve request counts every minute so priority follows recent demand
+        now = time.monotonic()
+        if now - self.last_decay >= 60.0:
+            self.last_decay = now
+            for symbol in self.request_counts:
+                self.request_counts[symbol] *= 0.5
+
+    def _record_lag(self, symbol: str, now: float) -> None:
+        previous = self.last_refreshed.get(symbol)
+        if previous is not None:
+            lag = max(0.0, now - previous - self.refresh_interval)
+            self.stats['total_lag'] += lag
+            self.stats['max_lag'] = max(self.stats['max_lag'], lag)
+
+    async def _refresh(self, symbol: str, now: float) -> None:
+        self._record_lag(symbol, now)
+        try:
+            await self.refresh_func(symbol)
+            self.last_refreshed[symbol] = time.monotonic()
+            self.stats['refreshes'] += 1
+        except Exception as e:
+            self.stats['refresh_errors'] += 1
+            logger.error(f"❌ Background refresh failed for {symbol}: {e}")
+
+    async def _refresh_batch(self, symbols: List[str], now: float) -> None:
+        for symbol in symbols:
+            self._record_lag(symbol, now)
+        try:
+            await self.refresh_batch_func(symbols)
+        except Exception as e:
+            self.stats['refresh_errors'] += len(symbols)
+            logger.error(f"❌ Background batch refresh of {len(symbols)} symbols failed: {e}")
+            return
+        refreshed = time.monotonic()
+        for symbol in symbols:
+            self.last_refreshed[symbol] = refreshed
+        self.stats['refreshes'] += len(symbols)
+
+    async def tick(self) -> None:
+        """Refresh every due symbol that fits in the budget"""
+        started = time.perf_counter()
+        self._decay_counts()
+        now = time.monotonic()
+
+        due = [symbol for symbol in self.tracked_symbols()
+               if now - self.last_refreshed.get(symbol, float('-inf')) >= self.refresh_interval]
+        granted = self._take_budget(min(len(due), self.max_per_tick))
+        if granted < len(due) and granted < self.max_per_tick:
+            self.stats['budget_exhausted'] += 1
+
+        if granted and self.refresh_batch_func is not None:
+            await self._refresh_batch(due[:granted], now)
+        elif granted:
+            await asyncio.gather(*[self._refresh(symbol, now) for symbol in due[:granted]])
+
+        backlog = len(due) - granted
+        self.stats['ticks'] += 1
+        self.stats['backlog'] = backlog
+        self.stats['max_backlog'] = max(self.stats['max_backlog'], backlog)
+        self.stats['last_tick_ms'] = round((time.perf_counter() - started) * 1000, 2)
+
+    async def run(self) -> None:
+        """Scheduler loop with jittered tick interval"""
+        logger.info(f"🔄 Signal refresher started for watchlist: {sorted(self.watchlist)}")
+        while True:
+            try:
+                await self.tick()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"❌ Signal refresher tick failed: {e}")
+            delay = self.tick_interval * (1 + random.uniform(-self.jitter, self.jitter))
+            await asyncio.sleep(max(0.05, delay))
+
+    def start(self) -> None:
+        """Start the scheduler on the running event loop"""
+        if self.task is None or self.task.done():
+            self.task = asyncio.get_running_loop().create_task(self.run())
+
+    async def stop(self) -> None:
+        """Stop the scheduler"""
+        if self.task is not None:
+            self.task.cancel()
+            try:
+                await self.task
+            except asyncio.CancelledError:
+                pass
+            self.task = None
+
+    def is_running(self) -> bool:
+        return self.task is not None and not self.task.done()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Hit rate, refresh lag and backlog"""
+        requests = self.stats['hits'] + self.stats['misses']
+        refreshes = self.stats['refreshes']
+        now = time.monotonic()
+        ages = [now - refreshed for refreshed in self.last_refreshed.values()]
+        return {
+            'running': self.is_running(),
+            'watchlist': sorted(self.watchlist),
+            'tracked_symbols': len(self.tracked_symbols()),
+            'ticks': self.stats['ticks'],
+            'refreshes': refreshes,
+            'refresh_errors': self.stats['refresh_errors'],
+            'hit_rate': round(self.stats['hits'] / requests, 4) if requests else 0.0,
+            'hits': self.stats['hits'],
+            'misses': self.stats['misses'],
+            'backlog': self.stats['backlog'],
+            'max_backlog': self.stats['max_backlog'],
+            'budget_exhausted': self.stats['budget_exhausted'],
+            'budget_tokens': int(self.tokens),
+            'avg_refresh_lag_ms': round(self.stats['total_lag'] / refreshes * 1000, 2) if refreshes else 0.0,
+            'max_refresh_lag_ms': round(self.stats['max_lag'] * 1000, 2),
+            'max_signal_age_ms': round(max(ages) * 1000, 2) if ages else 0.0,
+            'last_tick_ms': self.stats['last_tick_ms']
+        }
@@ -0,0 +1,203 @@
+"""
+Signal Streaming Broadcaster for CryptSIST MT5 Server
+Push update sinyal ke banyak subscriber (WebSocket / SSE) dengan conflation dan backpressure
+"""
+
+import asyncio
+import itertools
+import logging
+import time
+from typing import Any, Dict, Iterable, List, Optional, Set
+
+logger = logging.getLogger(__name__)
+
+# Fields whose change triggers an update for subscribers
+DIFF_FIELDS = ('signal', 'confidence', 'price')
+
+
+class SignalSubscriber:
+    """
+    One streaming client.
+
+    Pending updates are conflated per symbol (a newer update replaces an unsent
+    older one), so a subscriber never holds more than one update per symbol no
+    matter how slowly it drains.
+    """
+
+    def __init__(self, subscriber_id: int, symbols: Dict[str, str]):
+        self.subscriber_id = subscriber_id
+        self.symbols = dict(symbols)  # canonical -> requested format
+        self.pending: Dict[str, Dict[str, Any]] = {}
+        self.pending_since: Optional[float] = None
+        self.wakeup = asyncio.Event()
+        self.closed = False
+        self.close_reason: Optional[str] = None
+        self.sent = 0
+        self.conflated = 0
+
+    def offer(self, cache_key: str, update: Dict[str, Any]) -> None:
+        if self.closed:
+            return
+        if cache_key in self.pending:
+            self.conflated += 1
+        elif self.pending_since is None:
+            self.pending_since = time.monotonic()
+        self.pending[cache_key] = update
+        self.wakeup.set()
+
+    def discard_pending(self, cache_keys: Iterable[str]) -> None:
+        """Drop pending updates already covered by a snapshot that was just taken"""
+        for cache_key in cache_keys:
+            self.pending.pop(cache_key, None)
+        if not self.pending:
+            self.pending_since = None
+
+    def pending_age(self) -> float:
+        return time.monotonic() - self.pending_since if self.pending_since is not None else 0.0
+
+    def close(self, reason: str) -> None:
+        self.closed = True
+        self.close_reason = reason
+        self.pending.clear()
+        self.wakeup.set()
+
+    async def next_updates(self, timeout: Optional[float] = None) -> List[Dict[str, Any]]:
+        """
+        Wait for pending updates and drain them
+
+        Returns an empty list on timeout (useful for heartbeats) or when closed.
+        """
+        while not self.pending and not self.closed:
+            self.wakeup.clear()
+            try:
+                await asyncio.wait_for(self.wakeup.wait(), timeout)
+            except asyncio.TimeoutError:
+                return []
+        if self.closed:
+            return []
+
+        updates = []
+        for cache_key, update in self.pending.items():
+            updates.append(dict(update, symbol=self.symbols.get(cache_key, cache_key)))
+        self.pending.clear()
+        self.pending_since = None
+        self.sent += len(updates)
+        return updates
+
+
+class SignalBroadcaster:
+    """
+    Multiplexes signal updates to all subscribers of a symbol.
+
+    publish() is called whenever a cached signal is regenerated; subscribers are
+    only notified when one of DIFF_FIELDS actually changed. Subscribers that let
+    updates sit unsent for longer than `max_lag` seconds are dropped, and a
+    subscriber may follow at most `max_symbols` symbols.
+    """
+
+    def __init__(self, max_lag: float = 30.0, max_subscribers: int = 1000, max_symbols: int = 50):
+        self.max_lag = max_lag
+        self.max_subscribers = max_subscribers
+        self.max_symbols = max_symbols
+        self.subscribers: Dict[int, SignalSubscriber] = {}
+        self.by_symbol: Dict[str, Set[int]] = {}
+        self.last_published: Dict[str, Dict[str, Any]] = {}
+        self._ids = itertools.count(1)
+        self.published = 0
+        self.suppressed = 0
+        self.dropped = 0
+
+    def subscribe(self, symbols: Dict[str, str]) -> SignalSubscriber:
+        """Register a subscriber for canonical symbols (canonical -> requested format)"""
+        if len(self.subscribers) >= self.max_subscribers:
+            raise RuntimeError(f"Too many stream subscribers ({self.max_subscribers})")
+        self._check_symbol_count(len(symbols))
+        subscriber = SignalSubscriber(next(self._ids), symbols)
+        self.subscribers[subscriber.subscriber_id] = subscriber
+        for cache_key in subscriber.symbols:
+            self.by_symbol.setdefault(cache_key, set()).add(subscriber.subscriber_id)
+        return subscriber
+
+    def add_symbols(self, subscriber: SignalSubscriber, symbols: Dict[str, str]) -> None:
+        """Extend a subscription; raises ValueError (adding nothing) past max_symbols"""
+        self._check_symbol_count(len(subscriber.symbols.keys() | symbols.keys()))
+        for cache_key, requested in symbols.items():
+            subscriber.symbols[cache_key] = requested
+            self.by_symbol.setdefault(cache_key, set()).add(subscriber.subscriber_id)
+
+    def _check_symbol_count(self, count: int) -> None:
+        if count > self.max_symbols:
+            raise ValueError(f"Too many symbols per stream ({count} > {self.max_symbols})")
+
+    def remove_symbols(self, subscriber: SignalSubscriber, cache_keys: Iterable[str]) -> None:
+        for cache_key in cache_keys:
+            subscriber.symbols.pop(cache_key, None)
+            subscriber.pending.pop(cache_key, None)
+            self._unindex(cache_key, subscriber.subscriber_id)
+
+    def unsubscribe(self, subscriber: SignalSubscriber) -> None:
+        self.subscribers.pop(subscriber.subscriber_id, None)
+        for cache_key in list(subscriber.symbols):
+            self._unindex(cache_key, subscriber.subscriber_id)
+        if not subscriber.closed:
+            subscriber.close("unsubscribed")
+
+    def _unindex(self, cache_key: str, subscriber_id: int) -> None:
+        ids = self.by_symbol.get(cache_key)
+        if ids is not None:
+            ids.discard(subscriber_id)
+            if not ids:
+                del self.by_symbol[cache_key]
+
+    def subscribed_symbols(self) -> List[str]:
+        return list(self.by_symbol)
+
+    def has_subscribers(self, cache_key: str) -> bool:
+        return cache_key in self.by_symbol
+
+    def publish(self, cache_key: str, payload: Dict[str, Any]) -> bool:
+        """
+        Publish a freshly generated signal
+
+        Returns:
+            True when subscribers were notified, False when nothing relevant changed
+        """
+        previous = self.last_published.get(cache_key)
+        changed = [field for field in DIFF_FIELDS
+                   if previous is None or previous.get(field) != payload.get(field)]
+        if not changed:
+            self.suppressed += 1
+            return False
+
+        self.last_published[cache_key] = payload
+        self.published += 1
+        update = dict(payload, changed=changed)
+        for subscriber_id in list(self.by_symbol.get(cache_key, ())):
+            subscriber = self.subscribers.get(subscriber_id)
+            if subscriber is None:
+                continue
+            if subscriber.pending_age() > self.max_lag:
+                # Slow consumer: drop it instead of letting its backlog grow
+                self.dropped += 1
+                logger.warning(f"⚠️ Dropping slow stream subscriber #{subscriber_id}")
+                subscriber.close("slow consumer")
+                self.unsubscribe(subscriber)
+                continue
+            subscriber.offer(cache_key, update)
+        return True
+
+    def forget(self, cache_key: str) -> None:
+        """Forget the last published payload of an evicted symbol"""
+        if cache_key not in self.by_symbol:
+            self.last_published.pop(cache_key, None)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            'subscribers': len(self.subscribers),
+            'symbols': len(self.by_symbol),
+            'published': self.published,
+            'suppressed': self.suppressed,
+            'dropped_subscribers': self.dropped,
+            'pending_updates': sum(len(s.pending) for s in self.subscribers.values()),
+            'conflated': sum(s.conflated for s in self.subscribers.values())
+        }
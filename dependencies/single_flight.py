@@ -0,0 +1,111 @@
+"""
+Single-Flight Request Coalescing for CryptSIST
+Menggabungkan cache miss bersamaan untuk key yang sama menjadi satu komputasi
+"""
+
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Mapping
+
+
+class SingleFlight:
+    """
+    Per-key in-flight deduplication.
+
+    The first caller for a key starts the computation; every concurrent caller
+    for the same key awaits the same future instead of starting its own.
+    """
+
+    def __init__(self):
+        self.in_flight: Dict[str, asyncio.Future] = {}
+        self.originated = 0
+        self.coalesced = 0
+
+    async def do(self, key: str, func: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Run func once per key for all concurrent callers
+
+        Args:
+            key: Dedup key (e.g. canonical symbol)
+            func: Zero-argument coroutine function producing the value
+
+        Returns:
+            Result of the shared computation (exceptions are shared as well)
+        """
+        future = self.in_flight.get(key)
+        if future is not None:
+            self.coalesced += 1
+            # Shield so one cancelled waiter does not cancel the shared work
+            return await asyncio.shield(future)
+
+        self.originated += 1
+        future = asyncio.ensure_future(func())
+        self.in_flight[key] = future
+        future.add_done_callback(lambda _: self._forget(key, future))
+        return await asyncio.shield(future)
+
+    async def do_many(self, keys: Iterable[str],
+                      func: Callable[[List[str]], Awaitable[Mapping[str, Any]]]) -> Mapping[str, Any]:
+        """
+        Run one batch computation for the keys not already in flight
+
+        Every key of the batch is registered while it runs, so concurrent do()
+        callers for any of them await the batch instead of computing it again.
+        Keys already in flight are left to their own computation.
+
+        Args:
+            keys: Dedup keys
+            func: Coroutine function taking the keys to compute and returning key -> result
+
+        Returns:
+            func's results (empty when every key was already in flight)
+        """
+        pending = []
+        for key in dict.fromkeys(keys):
+            if key in self.in_flight:
+                self.coalesced += 1
+            else:
+                pending.append(key)
+        if not pending:
+            return {}
+
+        self.originated += len(pending)
+        loop = asyncio.get_running_loop()
+        futures = {key: loop.create_future() for key in pending}
+        for key, future in futures.items():
+            self.in_flight[key] = future
+            future.add_done_callback(lambda _, key=key, future=future: self._forget(key, future))
+        batch = asyncio.ensure_future(func(pending))
+        batch.add_done_callback(lambda _: self._settle(batch, futures))
+        return await asyncio.shield(batch)
+
+    @staticmethod
+    def _settle(batch: asyncio.Future, futures: Dict[str, asyncio.Future]) -> None:
+        """Hand each key's waiters its share of a finished batch"""
+        for key, future in futures.items():
+            if future.done():
+                continue
+            if batch.cancelled():
+                future.cancel()
+            elif batch.exception() is not None:
+                future.set_exception(batch.exception())
+            elif key in batch.result():
+                future.set_result(batch.result()[key])
+            else:
+                future.set_exception(KeyError(key))
+
+    def _forget(self, key: str, future: asyncio.Future) -> None:
+        if self.in_flight.get(key) is future:
+            del self.in_flight[key]
+        # Mark exception as retrieved when every waiter was cancelled
+        if not future.cancelled():
+            future.exception()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Coalesced vs originated computation counters"""
+        total = self.originated + self.coalesced
+        return {
+            'originated': self.originated,
+            'coalesced': self.coalesced,
+            'in_flight': len(self.in_flight),
+            'coalesce_ratio': round(self.coalesced / total, 4) if total else 0.0
+        }
@@ -0,0 +1,212 @@
+"""
+Non-blocking Structured Logging for CryptSIST MT5 Server
+Log terstruktur (structlog) lewat queue dengan thread penulis di background, sampling per route
+dan pembatasan log error yang berulang
+"""
+
+import json
+import logging
+import logging.handlers
+import queue
+import sys
+import time
+from typing import Any, Dict, Optional
+
+try:
+    import structlog
+    STRUCTLOG_AVAILABLE = True
+except ImportError:
+    STRUCTLOG_AVAILABLE = False
+
+_listener: Optional[logging.handlers.QueueListener] = None
+
+
+class LogSampler:
+    """
+    Deterministic 1-in-N sampling per route.
+
+    The first request of every N is logged; the check is a dict lookup and an
+    integer increment so unsampled requests allocate nothing.
+    """
+
+    def __init__(self, rates: Optional[Dict[str, int]] = None, default_every: int = 1):
+        self.rates = dict(rates or {})
+        self.default_every = max(1, default_every)
+        self.counters: Dict[str, int] = {}
+
+    @classmethod
+    def from_spec(cls, spec: str, default_every: int = 1) -> 'LogSampler':
+        """Build from a 'route:N,route:N' spec (e.g. 'signal:100,batch:10')"""
+        rates = {}
+        for part in spec.split(','):
+            route, _, every = part.partition(':')
+            if route.strip() and every.strip().isdigit():
+                rates[route.strip()] = max(1, int(every))
+        return cls(rates, default_every)
+
+    def sample(self, route: str) -> bool:
+        count = self.counters.get(route, 0)
+        self.counters[route] = count + 1
+        return count % self.rates.get(route, self.default_every) == 0
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {'rates': dict(self.rates), 'seen': dict(self.counters)}
+
+
+class RepeatedErrorFilter(logging.Filter):
+    """
+    Rate-limit WARNING and above per call site.
+
+    A call site logs at most once per `interval` seconds; the next record that
+    gets through carries the number of suppressed repeats in `record.suppressed`.
+    Suppressed records are dropped before they reach the queue.
+    """
+
+    def __init__(self, interval: float = 60.0):
+        super().__init__()
+        self.interval = interval
+        self.sites: Dict[tuple, list] = {}
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno < logging.WARNING or self.interval <= 0:
+            return True
+        key = (record.name, record.pathname, record.lineno)
+        site = self.sites.get(key)
+        now = record.created
+        if site is not None and now - site[0] < self.interval:
+            site[1] += 1
+            return False
+        record.suppressed = site[1] if site is not None else 0
+        self.sites[key] = [now, 0]
+        return True
+
+
+class _InProcessQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler that defers all formatting to the writer thread"""
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Records stay in-process, so there is no need to pre-render the message
+        # (and structlog event dicts must reach the formatter unrendered)
+        return record
+
+
+def _add_record_fields(logger, method_name, event_dict):
+    record = event_dict.get('_record')
+    if record is not None:
+        event_dict['timestamp'] = time.strftime('%Y-%m-%dT%H:%M:%S', time.localtime(record.created)) + \
+            f".{int(record.msecs):03d}"
+        event_dict['level'] = record.levelname.lower()
+        event_dict['logger'] = record.name
+        if getattr(record, 'suppressed', 0):
+            event_dict['suppressed'] = record.suppressed
+    return event_dict
+
+
+class _PlainFormatter(logging.Formatter):
+    """Fallback formatter used when structlog is not installed"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        text = super().format(record)
+        suppressed = getattr(record, 'suppressed', 0)
+        return f"{text} (suppressed {suppressed} repeats)" if suppressed else text
+
+
+def _build_formatter(fmt: str) -> logging.Formatter:
+    if not STRUCTLOG_AVAILABLE:
+        return _PlainFormatter('%(asctime)s %(levelname)s %(name)s: %(message)s')
+    if fmt == 'json':
+        renderer = structlog.processors.JSONRenderer(
+            serializer=lambda obj, **kwargs: json.dumps(obj, ensure_ascii=False, **kwargs)
+        )
+    else:
+        renderer = structlog.dev.ConsoleRenderer(colors=False)
+    return structlog.stdlib.ProcessorFormatter(
+        processors=[
+            _add_record_fields,
+            structlog.stdlib.ProcessorFormatter.remove_processors_meta,
+            structlog.processors.format_exc_info,
+            renderer
+        ]
+    )
+
+
+def setup_logging(level: int = logging.INFO, fmt: str = 'console',
+                  error_interval: float = 60.0) -> logging.handlers.QueueListener:
+    """
+    Route all logging through a queue drained by a background writer thread
+
+    Replaces the root handlers so callers only pay for building the record and
+    a queue put; formatting and the stderr write happen on the writer thread.
+    Safe to call more than once.
+    """
+    global _listener
+    if _listener is not None:
+        return _listener
+
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    queue_handler = _InProcessQueueHandler(log_queue)
+    queue_handler.addFilter(RepeatedErrorFilter(error_interval))
+
+    stream_handler = logging.StreamHandler(sys.stderr)
+    stream_handler.setFormatter(_build_formatter(fmt))
+
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    root.addHandler(queue_handler)
+    root.setLevel(level)
+
+    if STRUCTLOG_AVAILABLE:
+        # Only level filtering runs on the calling thread; rendering happens in the formatter
+        structlog.configure(
+            processors=[
+                structlog.stdlib.filter_by_level,
+                structlog.stdlib.ProcessorFormatter.wrap_for_formatter
+            ],
+            logger_factory=structlog.stdlib.LoggerFactory(),
+            wrapper_class=structlog.stdlib.BoundLogger,
+            cache_logger_on_first_use=True
+        )
+
+    _listener = logging.handlers.QueueListener(log_queue, stream_handler, respect_handler_level=True)
+    _listener.start()
+    return _listener
+
+
+def stop_logging() -> None:
+    """Flush queued records and stop the writer thread"""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+class _KeyValueLogger:
+    """Minimal structlog-style adapter over a stdlib logger"""
+
+    def __init__(self, logger: logging.Logger):
+        self.logger = logger
+
+    def _log(self, level: int, event: str, **kwargs) -> None:
+        if self.logger.isEnabledFor(level):
+            fields = ' '.join(f"{key}={value}" for key, value in kwargs.items())
+            self.logger.log(level, f"{event} {fields}" if fields else event)
+
+    def debug(self, event: str, **kwargs) -> None:
+        self._log(logging.DEBUG, event, **kwargs)
+
+    def info(self, event: str, **kwargs) -> None:
+        self._log(logging.INFO, event, **kwargs)
+
+    def warning(self, event: str, **kwargs) -> None:
+        self._log(logging.WARNING, event, **kwargs)
+
+    def error(self, event: str, **kwargs) -> None:
+        self._log(logging.ERROR, event, **kwargs)
+
+
+def get_logger(name: str):
+    """structlog logger when available, otherwise a key=value stdlib adapter"""
+    if STRUCTLOG_AVAILABLE:
+        return structlog.get_logger(name)
+    return _KeyValueLogger(logging.getLogger(name))
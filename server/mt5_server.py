@@ -17,19 +17,42 @@ config_dir = os.path.join(parent_dir, 'config')
 
 sys.path.extend([parent_dir, root_dir, dependencies_dir, config_dir])
 
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Request, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel
+from fastapi.responses import Response, StreamingResponse
+from pydantic import BaseModel, ConfigDict
 import uvicorn
 import logging
 from datetime import datetime
 import asyncio
-from typing import Dict, List, Optional
+import functools
+import hashlib
+import json
+import secrets
+import time
+from typing import Any, Dict, List, Mapping, Optional, Tuple
 
 from dependencies.enhanced_price_fetcher import EnhancedPriceFetcher
 from dependencies.sentiment_analyzer import CryptoSentimentAnalyzer
 from dependencies.simple_groq_client import SimpleGroqClient
 from dependencies.enhanced_signal_generator import EnhancedSignalGenerator
+from dependencies.component_executor import ComponentExecutor
+from dependencies.single_flight import SingleFlight
+from dependencies.signal_refresher import SignalRefresher
+from dependencies.signal_stream import SignalBroadcaster, DIFF_FIELDS
+from dependencies.signal_cache import SignalCache, CacheEntry
+from dependencies.metrics import MetricsRegistry
+from dependencies.structured_logging import LogSampler, get_logger, setup_logging, stop_logging
+
+# Fast JSON encoder for pre-encoded responses (optional dependency)
+try:
+    import orjson
+    
+    def encode_json(data: Any) -> bytes:
+        return orjson.dumps(data)
+except ImportError:
+    def encode_json(data: Any) -> bytes:
+        return json.dumps(data, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
 
 # Import CryptSIST components (with fallbacks)
 price_fetcher_available = False
@@ -38,8 +61,9 @@ groq_client_available = False
 signal_generator_available = False
 
 try:
-    from enhanced_price_fetcher import EnhancedPriceFetcher
-    price_fetcher = EnhancedPriceFetcher()
+    from async_price_fetcher import AsyncEnhancedPriceFetcher
+    # Provider calls are awaited on the server loop over pooled keep-alive sessions
+    price_fetcher = AsyncEnhancedPriceFetcher()
     price_fetcher_available = True
     print("✅ Enhanced price fetcher loaded")
 except ImportError as e:
@@ -71,9 +95,16 @@ except ImportError as e:
 
 print("📝 Server starting with available components")
 
-# Configure logging
-logging.basicConfig(level=logging.INFO)
+# Configure logging: records go through a queue to a background writer thread;
+# per-request lines on hot routes are sampled 1-in-N and repeated errors rate-limited
+setup_logging(
+    level=getattr(logging, os.environ.get('CRYPTSIST_LOG_LEVEL', 'INFO').upper(), logging.INFO),
+    fmt=os.environ.get('CRYPTSIST_LOG_FORMAT', 'console'),
+    error_interval=float(os.environ.get('CRYPTSIST_LOG_ERROR_INTERVAL', 60))
+)
 logger = logging.getLogger(__name__)
+request_log = get_logger(__name__)
+request_log_sampler = LogSampler.from_spec(os.environ.get('CRYPTSIST_LOG_SAMPLE', 'signal:100,batch:10'))
 
 app = FastAPI(
     title="CryptSIST MT5 API",
@@ -90,8 +121,67 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Prometheus metrics (/metrics)
+METRICS_ENABLED = os.environ.get('CRYPTSIST_METRICS_ENABLED', 'true').lower() == 'true'
+LOOP_LAG_INTERVAL = float(os.environ.get('CRYPTSIST_LOOP_LAG_INTERVAL', 0.5))
+metrics = MetricsRegistry()
+http_request_duration = metrics.histogram(
+    'cryptsist_http_request_duration_seconds', 'HTTP request latency by route', ('method', 'route', 'status')
+)
+http_in_flight = metrics.gauge('cryptsist_http_requests_in_flight', 'HTTP requests currently being served')
+signal_generation_duration = metrics.histogram(
+    'cryptsist_signal_generation_seconds',
+    'Signal generation duration per signal (batched refreshes record each signal\'s share of the pass)'
+)
+event_loop_lag = metrics.histogram(
+    'cryptsist_event_loop_lag_seconds', 'Event loop scheduling delay',
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 5.0)
+)
+
+class MetricsMiddleware:
+    """
+    Pure ASGI middleware recording per-route latency and in-flight requests.
+
+    Routes are labelled with their path template (e.g. /signal/{symbol}) so the
+    label set stays bounded; unmatched paths share one label.
+    """
+    
+    def __init__(self, app):
+        self.app = app
+    
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+        
+        status = [500]
+        
+        async def send_with_status(message):
+            if message['type'] == 'http.response.start':
+                status[0] = message['status']
+            await send(message)
+        
+        started = time.perf_counter()
+        http_in_flight.inc()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            http_in_flight.dec()
+            route = scope.get('route')
+            http_request_duration.observe(
+                time.perf_counter() - started,
+                scope['method'], getattr(route, 'path', 'unmatched'), str(status[0])
+            )
+
+if METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware)
+
 # Data models
 class TradingSignal(BaseModel):
+    # Cached signals are shared between concurrent responses, so they are immutable;
+    # per-request variants are derived with model_copy(update=...)
+    model_config = ConfigDict(frozen=True)
+    
     symbol: str
     signal: str  # "BUY", "SELL", "HOLD"
     confidence: float
@@ -105,9 +195,110 @@ class HealthStatus(BaseModel):
     timestamp: str
     version: str
 
-# Global cache for signals
-signal_cache: Dict[str, TradingSignal] = {}
-last_update: Dict[str, datetime] = {}
+class BatchSignalResult(BaseModel):
+    symbol: str
+    status: str  # "ok", "timeout", "error"
+    signal: Optional[TradingSignal] = None
+    etag: Optional[str] = None
+    error: Optional[str] = None
+
+class BatchSignalResponse(BaseModel):
+    timestamp: str
+    requested: int
+    unique: int
+    succeeded: int
+    results: List[BatchSignalResult]
+
+class ServerStats(BaseModel):
+    timestamp: str
+    executor: Dict[str, Any]
+    single_flight: Dict[str, Any]
+    refresher: Dict[str, Any]
+    stream: Dict[str, Any]
+    cache: Dict[str, Any]
+
+# Executor for blocking component calls (price fetcher, signal generator, sentiment)
+component_executor = ComponentExecutor.from_env()
+
+# Bounded fan-out for /signals/batch
+BATCH_CONCURRENCY = int(os.environ.get('CRYPTSIST_BATCH_CONCURRENCY', 64))
+BATCH_SYMBOL_TIMEOUT = float(os.environ.get('CRYPTSIST_BATCH_SYMBOL_TIMEOUT', 10))
+
+# Coalesces concurrent cache misses for the same symbol into one generation
+signal_flight = SingleFlight()
+
+# Signal freshness: entries older than SIGNAL_TTL are regenerated on request unless the
+# background refresher is running, in which case requests read the cache for up to
+# SIGNAL_MAX_STALENESS seconds and never pay the generation cost themselves
+SIGNAL_TTL = float(os.environ.get('CRYPTSIST_SIGNAL_TTL', 5))
+SIGNAL_MAX_STALENESS = float(os.environ.get('CRYPTSIST_SIGNAL_MAX_STALENESS', 30))
+REFRESHER_ENABLED = os.environ.get('CRYPTSIST_REFRESHER_ENABLED', 'true').lower() == 'true'
+
+signal_refresher = SignalRefresher(
+    refresh_func=lambda cache_key: signal_flight.do(cache_key, lambda: refresh_cached_signal(cache_key)),
+    # Due symbols of a tick go through one vectorized generator pass
+    refresh_batch_func=(lambda cache_keys: refresh_cached_signals(cache_keys)) if signal_generator_available else None,
+    watchlist=[s.strip().upper() for s in os.environ.get('CRYPTSIST_WATCHLIST', 'BTC,ETH,LTC').split(',') if s.strip()],
+    refresh_interval=SIGNAL_TTL,
+    tick_interval=float(os.environ.get('CRYPTSIST_REFRESH_TICK', 1)),
+    jitter=float(os.environ.get('CRYPTSIST_REFRESH_JITTER', 0.2)),
+    budget_per_minute=int(os.environ.get('CRYPTSIST_REFRESH_BUDGET_PER_MINUTE', 600)),
+    max_per_tick=int(os.environ.get('CRYPTSIST_REFRESH_MAX_PER_TICK', 50))
+)
+
+# Binance WebSocket market data: a streamed price book the price fetcher reads before REST
+BINANCE_STREAM_ENABLED = os.environ.get('CRYPTSIST_BINANCE_STREAM', 'false').lower() == 'true'
+binance_stream = None
+if BINANCE_STREAM_ENABLED and price_fetcher_available:
+    from binance_stream import BinanceStreamClient, DEFAULT_STREAM_URL
+    binance_stream = BinanceStreamClient(
+        pairs=[f"{symbol}USDT" for symbol in signal_refresher.watchlist],
+        base_url=os.environ.get('CRYPTSIST_BINANCE_STREAM_URL', DEFAULT_STREAM_URL),
+        record_path=os.environ.get('CRYPTSIST_BINANCE_STREAM_RECORD') or None
+    )
+    price_fetcher.attach_price_book(binance_stream.book,
+                                    max_age=float(os.environ.get('CRYPTSIST_BINANCE_STREAM_MAX_AGE', 2)))
+
+# Push streaming (/stream/signals over WebSocket and SSE)
+STREAM_HEARTBEAT = float(os.environ.get('CRYPTSIST_STREAM_HEARTBEAT', 15))
+STREAM_SEND_TIMEOUT = float(os.environ.get('CRYPTSIST_STREAM_SEND_TIMEOUT', 5))
+signal_broadcaster = SignalBroadcaster(
+    max_lag=float(os.environ.get('CRYPTSIST_STREAM_MAX_LAG', 30)),
+    max_subscribers=int(os.environ.get('CRYPTSIST_STREAM_MAX_SUBSCRIBERS', 1000)),
+    max_symbols=int(os.environ.get('CRYPTSIST_STREAM_MAX_SYMBOLS', 50))
+)
+
+def evict_symbol_state(cache_key: str) -> None:
+    """Release per-symbol state held outside the cache when a signal is evicted"""
+    signal_refresher.forget(cache_key)
+    signal_broadcaster.forget(cache_key)
+    if signal_generator_available:
+        signal_generator.evict_symbol(cache_key)
+
+# Cross-process cache backend (Redis or mmap file) shared with the price fetcher; imported
+# flat like the fetcher so both use the same process-wide instance
+from shared_cache import get_shared_cache_backend
+shared_cache_backend = get_shared_cache_backend()
+
+# Global cache for signals, bounded so garbage-symbol traffic cannot grow memory
+SIGNAL_CACHE_HOUSEKEEPING_INTERVAL = 60
+signal_cache = SignalCache(
+    max_entries=int(os.environ.get('CRYPTSIST_SIGNAL_CACHE_MAX_ENTRIES', 1000)),
+    max_idle=float(os.environ.get('CRYPTSIST_SIGNAL_CACHE_MAX_IDLE', 600)),
+    on_evict=evict_symbol_state,
+    # Only a backend other processes can see adds anything over the local LRU
+    backend=shared_cache_backend if shared_cache_backend is not None and shared_cache_backend.shared else None,
+    dump=lambda signal: signal.model_dump(),
+    load=lambda data: TradingSignal(**data),
+    encode=lambda signal: encode_signal_tail(signal),
+    shared_ttl=SIGNAL_MAX_STALENESS,
+    # Backend lookups (Redis round trips, file reads) run off the event loop
+    offload=functools.partial(component_executor.run, 'shared_cache')
+)
+
+# Serve cache hits from bytes encoded once per refresh instead of re-validating
+# and re-encoding the model on every request
+PRE_ENCODED_RESPONSES = os.environ.get('CRYPTSIST_PRE_ENCODED_RESPONSES', 'true').lower() == 'true'
 
 @app.get("/", response_model=HealthStatus)
 async def root():
@@ -127,24 +318,140 @@ async def health_check():
         version="1.0.0"
     )
 
+@app.get("/stats", response_model=ServerStats)
+async def get_server_stats():
+    """Executor queue depth, per-component concurrency and coalescing stats"""
+    return ServerStats(
+        timestamp=datetime.now().isoformat(),
+        executor=component_executor.get_stats(),
+        single_flight=signal_flight.get_stats(),
+        refresher=signal_refresher.get_stats(),
+        stream=signal_broadcaster.get_stats(),
+        cache=signal_cache.get_stats()
+    )
+
+@app.get("/providers/health")
+async def get_provider_health():
+    """Circuit breaker state, error rate and latency percentiles per price provider"""
+    if not price_fetcher_available:
+        raise HTTPException(status_code=503, detail="Price fetcher not available")
+    return dict(price_fetcher.get_provider_health(), timestamp=datetime.now().isoformat())
+
+def cache_hit_ratios():
+    yield ('signal',), signal_cache.get_stats()['hit_ratio']
+    if price_fetcher_available:
+        yield ('price',), price_fetcher.get_cache_stats()['hit_ratio']
+
+def cache_lookups():
+    for name, stats in [('signal', signal_cache.get_stats())] + (
+            [('price', price_fetcher.get_cache_stats())] if price_fetcher_available else []):
+        yield (name, 'hit'), stats['hits']
+        yield (name, 'miss'), stats['misses']
+
+metrics.gauge('cryptsist_cache_hit_ratio', 'Cache hit ratio since start', ('cache',), callback=cache_hit_ratios)
+metrics.counter('cryptsist_cache_lookups_total', 'Cache lookups by result', ('cache', 'result'),
+                callback=cache_lookups)
+if price_fetcher_available:
+    metrics.register(price_fetcher.http_latency)
+    metrics.register(price_fetcher.http_errors)
+    
+    def provider_budget(field):
+        def collect():
+            for provider, budget in price_fetcher.rate_limiter.get_stats().items():
+                if budget[field] is not None:
+                    yield (provider,), budget[field]
+        return collect
+    
+    metrics.gauge('cryptsist_provider_budget_remaining_today', 'Calls left in the provider daily quota',
+                  ('provider',), callback=provider_budget('remaining_today'))
+    metrics.counter('cryptsist_provider_budget_denied_total', 'Provider calls skipped for lack of budget',
+                    ('provider',), callback=provider_budget('denied'))
+    
+    def provider_circuits():
+        for provider, health in price_fetcher.provider_health.get_stats().items():
+            yield (provider,), {'closed': 0, 'half_open': 1, 'open': 2}[health['state']]
+    
+    def provider_error_rates():
+        for provider, health in price_fetcher.provider_health.get_stats().items():
+            yield (provider,), health['error_rate']
+    
+    metrics.gauge('cryptsist_provider_circuit_state', 'Provider circuit breaker state (0 closed, 1 half-open, 2 open)',
+                  ('provider',), callback=provider_circuits)
+    metrics.gauge('cryptsist_provider_error_rate', 'Failed share of the provider\'s recent requests',
+                  ('provider',), callback=provider_error_rates)
+
+if binance_stream is not None:
+    metrics.gauge('cryptsist_binance_stream_connected', 'Whether the Binance market data stream is connected',
+                  callback=lambda: [((), float(binance_stream.is_connected()))])
+    metrics.gauge('cryptsist_price_book_pairs', 'Trading pairs held in the streamed price book',
+                  callback=lambda: [((), len(binance_stream.book))])
+    metrics.counter('cryptsist_binance_stream_events_total', 'Binance stream messages and reconnects',
+                    ('event',), callback=lambda: [(('message',), binance_stream.stats['messages']),
+                                                  (('reconnect',), binance_stream.stats['reconnects'])])
+
+@app.get("/metrics")
+async def get_metrics():
+    """Prometheus text exposition of latency, provider, cache and event loop metrics"""
+    return Response(content=metrics.render(), media_type="text/plain; version=0.0.4")
+
+async def monitor_event_loop_lag():
+    """Measure how late the event loop wakes up a sleeping task"""
+    while True:
+        started = time.perf_counter()
+        await asyncio.sleep(LOOP_LAG_INTERVAL)
+        event_loop_lag.observe(max(0.0, time.perf_counter() - started - LOOP_LAG_INTERVAL))
+
+async def signal_cache_housekeeping():
+    """Periodically evict idle signals and idle generator state"""
+    while True:
+        await asyncio.sleep(SIGNAL_CACHE_HOUSEKEEPING_INTERVAL)
+        evicted = signal_cache.purge_idle()
+        if signal_generator_available:
+            evicted += signal_generator.evict_idle(signal_cache.max_idle)
+        if evicted:
+            logger.info(f"🧹 Evicted {evicted} idle symbol states")
+
+@app.on_event("startup")
+async def start_signal_refresher():
+    """Start keeping watchlist signals fresh in the background"""
+    if REFRESHER_ENABLED:
+        signal_refresher.start()
+    app.state.housekeeping = asyncio.create_task(signal_cache_housekeeping())
+    if METRICS_ENABLED:
+        app.state.loop_lag_monitor = asyncio.create_task(monitor_event_loop_lag())
+    if binance_stream is not None:
+        binance_stream.start()
+
+@app.on_event("shutdown")
+async def shutdown_executor():
+    """Stop the refresher and release worker pools on shutdown"""
+    await signal_refresher.stop()
+    for task_name in ('housekeeping', 'loop_lag_monitor'):
+        task = getattr(app.state, task_name, None)
+        if task:
+            task.cancel()
+    if binance_stream is not None:
+        await binance_stream.stop()
+    if price_fetcher_available:
+        await price_fetcher.close()
+    if shared_cache_backend is not None:
+        shared_cache_backend.close()
+    component_executor.shutdown()
+    stop_logging()
+
 async def generate_trading_signal(symbol: str) -> TradingSignal:
     """
     Generate trading signal using enhanced signal generator
     """
+    started = time.perf_counter()
     try:
         if signal_generator_available:
-            # Use enhanced signal generator for dynamic signals
-            signal_data = signal_generator.generate_signal(symbol)
-            
-            return TradingSignal(
-                symbol=symbol,
-                signal=signal_data['signal'],
-                confidence=signal_data['confidence'],
-                price=signal_data['price'],
-                timestamp=datetime.now().isoformat(),
-                sentiment=signal_data.get('sentiment', 'NEUTRAL'),
-                analysis=signal_data.get('analysis', 'Enhanced AI analysis')
+            # Use enhanced signal generator for dynamic signals (off the event loop)
+            signal_data = await component_executor.run(
+                'signal_generator', signal_generator.generate_signal, symbol
             )
+            
+            return signal_from_generator(symbol, signal_data)
         else:
             # Fallback to basic signal generation
             import random
@@ -170,12 +477,168 @@ async def generate_trading_signal(symbol: str) -> TradingSignal:
             sentiment="NEUTRAL",
             analysis="Error in signal generation - returning safe default"
         )
+    finally:
+        signal_generation_duration.observe(time.perf_counter() - started)
+
+def signal_from_generator(symbol: str, signal_data: Mapping[str, Any]) -> TradingSignal:
+    """TradingSignal from an enhanced signal generator result"""
+    return TradingSignal(
+        symbol=symbol,
+        signal=signal_data['signal'],
+        confidence=signal_data['confidence'],
+        price=signal_data['price'],
+        timestamp=signal_data.get('timestamp') or datetime.now().isoformat(),
+        sentiment=signal_data.get('sentiment', 'NEUTRAL'),
+        analysis=signal_data.get('analysis', 'Enhanced AI analysis')
+    )
+
+def store_signal(cache_key: str, signal: TradingSignal) -> CacheEntry:
+    """Cache a freshly generated signal and publish it to stream subscribers"""
+    entry = signal_cache.set(cache_key, signal, encoded=encode_signal_tail(signal))
+    signal_refresher.mark_refreshed(cache_key)
+    signal_broadcaster.publish(cache_key, signal.model_dump())
+    return entry
+
+async def refresh_cached_signal(cache_key: str) -> CacheEntry:
+    """
+    Generate a fresh signal for a canonical symbol and store it in the cache
+    """
+    signal = await generate_trading_signal(cache_key)
+    return store_signal(cache_key, signal)
+
+def store_generated_signal(cache_key: str, signal_data: Mapping[str, Any]) -> CacheEntry:
+    """
+    Cache a generator result without building it: the TradingSignal (with its
+    analysis text) and its encoded form are built on the first read
+    """
+    def build() -> Tuple[TradingSignal, bytes]:
+        signal = signal_from_generator(cache_key, signal_data)
+        return signal, encode_signal_tail(signal)
+    
+    entry = signal_cache.set_lazy(cache_key, build)
+    signal_refresher.mark_refreshed(cache_key)
+    if signal_broadcaster.has_subscribers(cache_key):
+        signal_broadcaster.publish(cache_key, entry.value.model_dump())
+    else:
+        # Nobody streams the symbol: publish() only needs the fields it diffs
+        signal_broadcaster.publish(cache_key, {field: signal_data[field] for field in DIFF_FIELDS})
+    return entry
+
+async def refresh_cached_signals(cache_keys: List[str]) -> Mapping[str, CacheEntry]:
+    """
+    Regenerate the signals of many canonical symbols with one vectorized
+    generate_signals() pass and store them in the cache
+    
+    The symbols are registered with signal_flight while the pass runs, so
+    request misses for them wait for it instead of generating them again.
+    """
+    return await signal_flight.do_many(cache_keys, generate_cached_signals)
+
+async def generate_cached_signals(cache_keys: List[str]) -> Dict[str, CacheEntry]:
+    """One generate_signals() pass over cache_keys, stored as lazily built entries"""
+    started = time.perf_counter()
+    try:
+        batch = await component_executor.run('signal_generator', signal_generator.generate_signals, cache_keys)
+    finally:
+        share = (time.perf_counter() - started) / len(cache_keys)
+        for _ in cache_keys:
+            signal_generation_duration.observe(share)
+    return {cache_key: store_generated_signal(cache_key, batch[cache_key]) for cache_key in cache_keys}
+
+def encode_signal_tail(signal: TradingSignal) -> bytes:
+    """
+    Encode a signal once, without its leading symbol field
+    
+    symbol is the first field and the only one that varies per request format,
+    so a response body is b'{"symbol":<symbol>,' + tail.
+    """
+    data = signal.model_dump()
+    data.pop('symbol')
+    return encode_json(data)[1:]
+
+def encoded_signal(entry: CacheEntry, symbol: str) -> bytes:
+    """Response body of a cached signal for a requested symbol format"""
+    return b'{"symbol":' + encode_json(symbol) + b',' + entry.encoded
+
+# Fallback ETag prefix for entries without an encoded form (cache versions are per process)
+ETAG_INSTANCE = secrets.token_hex(4)
+
+def signal_etag(entry: CacheEntry, symbol: str) -> str:
+    """
+    ETag of a cached signal rendered for a requested symbol format
+
+    Derived from the encoded signal, so every worker (and every process sharing
+    a cache backend) hands out the same tag for the same payload.
+    """
+    if entry.encoded is None:
+        return f'"{ETAG_INSTANCE}-{entry.version:x}-{symbol}"'
+    digest = hashlib.blake2b(entry.encoded, digest_size=8)
+    digest.update(symbol.encode())
+    return f'"{digest.hexdigest()}"'
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Check an If-None-Match header against an ETag"""
+    if not if_none_match:
+        return False
+    candidates = [tag.strip() for tag in if_none_match.split(',')]
+    return '*' in candidates or etag in candidates or f'W/{etag}' in candidates
+
+def canonical_symbol(symbol: str) -> str:
+    """Normalize a requested symbol (e.g. btcusd, BTCUSD, BTC) to its cache key (BTC)"""
+    symbol = symbol.strip().upper()
+    return symbol[:-3] if symbol.endswith('USD') else symbol
+
+def parse_symbol_list(symbols: str) -> Dict[str, str]:
+    """
+    Parse a comma-separated symbol list into canonical symbol -> requested format
+    
+    Duplicates such as BTCUSD,BTC collapse to one entry keeping the first format.
+    """
+    unique_symbols: Dict[str, str] = {}
+    for raw_symbol in symbols.split(','):
+        raw_symbol = raw_symbol.strip().upper()
+        if raw_symbol:
+            unique_symbols.setdefault(canonical_symbol(raw_symbol), raw_symbol)
+    return unique_symbols
+
+def signal_max_age() -> float:
+    """
+    Oldest cached signal a request may be served
+
+    With the refresher running the cache is kept fresh in the background,
+    so requests only fall through to generation for never-seen symbols.
+    """
+    return SIGNAL_MAX_STALENESS if signal_refresher.is_running() else SIGNAL_TTL
+
+async def lookup_signal(cache_key: str) -> Optional[CacheEntry]:
+    """Cached entry for a canonical symbol requested by a client, or None on a miss"""
+    entry = await signal_cache.get_entry_async(cache_key, max_age=signal_max_age())
+    signal_refresher.record_request(cache_key, entry is not None)
+    return entry
+
+async def resolve_signal(cache_key: str) -> CacheEntry:
+    """
+    Return the cache entry for a canonical symbol, generating it on a miss
+
+    Raises whatever the generation raises; callers decide how to degrade.
+    """
+    entry = await lookup_signal(cache_key)
+    if entry is not None:
+        return entry
+    return await generate_missing_signal(cache_key)
+
+async def generate_missing_signal(cache_key: str) -> CacheEntry:
+    """Get fresh data (concurrent misses for the same symbol share one generation)"""
+    return await signal_flight.do(cache_key, lambda: refresh_cached_signal(cache_key))
 
 @app.get("/signal/{symbol}", response_model=TradingSignal)
-async def get_trading_signal(symbol: str):
+async def get_trading_signal(symbol: str, request: Request, response: Response):
     """
     Get trading signal for a specific cryptocurrency symbol
     
+    Responses carry an ETag; clients echoing it in If-None-Match get
+    304 Not Modified until the cached signal is regenerated.
+    
     Args:
         symbol: Crypto symbol (e.g., BTC, ETH, LTC)
     
@@ -185,35 +648,23 @@ async def get_trading_signal(symbol: str):
     try:
         # Normalize symbol
         symbol = symbol.upper()
-        if symbol.endswith('USD'):
-            base_symbol = symbol[:-3]
-        else:
-            base_symbol = symbol
-            
-        logger.info(f"🔍 Getting signal for {symbol}")
-        
-        # Check cache (refresh every 5 seconds for more dynamic signals)
-        cache_key = base_symbol
-        now = datetime.now()
+        cache_key = canonical_symbol(symbol)
         
-        if (cache_key in signal_cache and 
-            cache_key in last_update and 
-            (now - last_update[cache_key]).seconds < 5):  # Reduced cache time for more dynamic signals
-            
-            logger.info(f"📋 Returning cached signal for {symbol}")
-            cached_signal = signal_cache[cache_key]
-            cached_signal.symbol = symbol  # Update symbol format
-            return cached_signal
+        entry = await resolve_signal(cache_key)
+        etag = signal_etag(entry, symbol)
+        if etag_matches(request.headers.get('if-none-match'), etag):
+            return Response(status_code=304, headers={'ETag': etag})
         
-        # Get fresh data
-        signal = await generate_trading_signal(base_symbol)
-        signal.symbol = symbol  # Set requested symbol format
+        if request_log_sampler.sample('signal'):
+            request_log.info("signal_served", symbol=symbol, signal=entry.value.signal,
+                             age=round(signal_cache.clock() - entry.stored_at, 2))
         
-        # Update cache
-        signal_cache[cache_key] = signal
-        last_update[cache_key] = now
+        if PRE_ENCODED_RESPONSES and entry.encoded is not None:
+            return Response(content=encoded_signal(entry, symbol), media_type="application/json",
+                            headers={'ETag': etag})
         
-        logger.info(f"✅ Generated new signal for {symbol}: {signal.signal}")
+        signal = entry.value.model_copy(update={'symbol': symbol})  # Set requested symbol format
+        response.headers['ETag'] = etag
         return signal
         
     except Exception as e:
@@ -229,31 +680,246 @@ async def get_trading_signal(symbol: str):
             analysis="Error in signal processing"
         )
 
-@app.get("/signals/batch", response_model=List[TradingSignal])
-async def get_batch_signals(symbols: str = "BTCUSD,ETHUSD,LTCUSD"):
+@app.get("/signals/batch", response_model=BatchSignalResponse)
+async def get_batch_signals(request: Request, response: Response, symbols: str = "BTCUSD,ETHUSD,LTCUSD"):
     """
     Get trading signals for multiple symbols
     
+    Symbols are canonicalized and de-duplicated (BTCUSD,BTC resolve once), then
+    resolved concurrently with a bounded fan-out. A failing or slow symbol only
+    affects its own entry. The batch ETag covers every per-symbol ETag, so
+    If-None-Match returns 304 until any symbol in the batch changes.
+    
     Args:
         symbols: Comma-separated list of symbols
     
     Returns:
-        List of TradingSignal objects
+        BatchSignalResponse with per-symbol status
     """
+    requested = sum(1 for raw_symbol in symbols.split(',') if raw_symbol.strip())
+    unique_symbols = parse_symbol_list(symbols)
+    # One batched round trip to the shared cache instead of one per symbol
+    await signal_cache.prefetch_async(list(unique_symbols), max_age=signal_max_age())
+    cached = dict(zip(unique_symbols, await asyncio.gather(*[
+        lookup_signal(cache_key) for cache_key in unique_symbols
+    ])))
+    
+    # Misses go through one vectorized generator pass; symbols it does not
+    # cover (already in flight, or the pass failed) fall back to one each
+    missing = [cache_key for cache_key, entry in cached.items() if entry is None]
+    if missing and signal_generator_available:
+        try:
+            cached.update(await asyncio.wait_for(refresh_cached_signals(missing), BATCH_SYMBOL_TIMEOUT))
+        except Exception as e:
+            logger.error(f"❌ Batch generation of {len(missing)} signals failed: {e}")
+    
+    fan_out = asyncio.Semaphore(BATCH_CONCURRENCY)
+    
+    async def resolve_entry(cache_key: str, symbol: str) -> Tuple[str, str, Any]:
+        entry = cached[cache_key]
+        if entry is not None:
+            return symbol, "ok", entry
+        try:
+            async with fan_out:
+                entry = await asyncio.wait_for(generate_missing_signal(cache_key), BATCH_SYMBOL_TIMEOUT)
+            return symbol, "ok", entry
+        except asyncio.TimeoutError:
+            return symbol, "timeout", f"No signal within {BATCH_SYMBOL_TIMEOUT}s"
+        except Exception as e:
+            logger.error(f"❌ Error getting batch signal for {symbol}: {e}")
+            return symbol, "error", str(e)
+    
+    resolved = await asyncio.gather(*[
+        resolve_entry(cache_key, symbol) for cache_key, symbol in unique_symbols.items()
+    ])
+    
+    entry_tags = [
+        (symbol, status, signal_etag(value, symbol) if status == "ok" else None)
+        for symbol, status, value in resolved
+    ]
+    digest = hashlib.sha1(repr(entry_tags).encode()).hexdigest()[:20]
+    etag = f'"b{digest}"'
+    if etag_matches(request.headers.get('if-none-match'), etag):
+        return Response(status_code=304, headers={'ETag': etag})
+    
+    if PRE_ENCODED_RESPONSES:
+        return encoded_batch_response(requested, resolved, entry_tags, etag)
+    
+    results = []
+    for (symbol, status, value), (_, _, symbol_etag) in zip(resolved, entry_tags):
+        if status == "ok":
+            results.append(BatchSignalResult(
+                symbol=symbol,
+                status=status,
+                signal=value.value.model_copy(update={'symbol': symbol}),
+                etag=symbol_etag
+            ))
+        else:
+            results.append(BatchSignalResult(symbol=symbol, status=status, error=value))
+    succeeded = sum(1 for result in results if result.status == "ok")
+    
+    response.headers['ETag'] = etag
+    if request_log_sampler.sample('batch'):
+        request_log.info("batch_served", unique=len(results), succeeded=succeeded)
+    return BatchSignalResponse(
+        timestamp=datetime.now().isoformat(),
+        requested=requested,
+        unique=len(results),
+        succeeded=succeeded,
+        results=results
+    )
+
+def encoded_batch_response(requested: int, resolved: List[Tuple[str, str, Any]],
+                           entry_tags: List[Tuple[str, str, Optional[str]]], etag: str) -> Response:
+    """
+    Assemble a BatchSignalResponse body from pre-encoded signals
+    
+    Field order matches BatchSignalResult/BatchSignalResponse so clients see the
+    same JSON as the model path.
+    """
+    parts = []
+    succeeded = 0
+    for (symbol, status, value), (_, _, symbol_etag) in zip(resolved, entry_tags):
+        if status == "ok" and value.encoded is not None:
+            succeeded += 1
+            parts.append(b'{"symbol":' + encode_json(symbol) + b',"status":"ok","signal":'
+                         + encoded_signal(value, symbol) + b',"etag":' + encode_json(symbol_etag)
+                         + b',"error":null}')
+        elif status == "ok":
+            succeeded += 1
+            parts.append(encode_json(BatchSignalResult(
+                symbol=symbol, status=status,
+                signal=value.value.model_copy(update={'symbol': symbol}), etag=symbol_etag
+            ).model_dump()))
+        else:
+            parts.append(encode_json({'symbol': symbol, 'status': status, 'signal': None,
+                                      'etag': None, 'error': value}))
+    
+    if request_log_sampler.sample('batch'):
+        request_log.info("batch_served", unique=len(parts), succeeded=succeeded)
+    header = encode_json({
+        'timestamp': datetime.now().isoformat(),
+        'requested': requested,
+        'unique': len(parts),
+        'succeeded': succeeded
+    })
+    body = header[:-1] + b',"results":[' + b','.join(parts) + b']}'
+    return Response(content=body, media_type="application/json", headers={'ETag': etag})
+
+async def stream_snapshot(symbols: Dict[str, str]) -> List[Dict[str, Any]]:
+    """Current signals for a new subscription, in the requested symbol formats"""
+    entries = await asyncio.gather(*[resolve_signal(cache_key) for cache_key in symbols],
+                                   return_exceptions=True)
+    return [
+        dict(entry.value.model_dump(), symbol=symbols[cache_key])
+        for cache_key, entry in zip(symbols, entries)
+        if not isinstance(entry, BaseException)
+    ]
+
+@app.websocket("/stream/signals")
+async def stream_signals_websocket(websocket: WebSocket, symbols: str = "BTCUSD,ETHUSD,LTCUSD"):
+    """
+    Push signal updates over WebSocket
+    
+    Sends a snapshot on connect, then only the symbols whose signal, confidence or
+    price changed. Clients may send {"action": "subscribe"|"unsubscribe", "symbols": [...]}
+    to change the subscription on the same connection; a subscribe that would pass
+    CRYPTSIST_STREAM_MAX_SYMBOLS is answered with an error and ignored. Slow
+    clients are dropped.
+    """
+    await websocket.accept()
     try:
-        symbol_list = [s.strip().upper() for s in symbols.split(',')]
-        signals = []
-        
-        for symbol in symbol_list:
-            signal = await get_trading_signal(symbol)
-            signals.append(signal)
-        
-        logger.info(f"📊 Generated batch signals for {len(signals)} symbols")
-        return signals
-        
-    except Exception as e:
-        logger.error(f"❌ Error getting batch signals: {e}")
-        return []
+        subscriber = signal_broadcaster.subscribe(parse_symbol_list(symbols))
+    except RuntimeError as e:
+        await websocket.close(code=1013, reason=str(e))
+        return
+    except ValueError as e:
+        await websocket.close(code=1008, reason=str(e))
+        return
+    signal_refresher.pin(subscriber.symbols)
+    
+    async def receive_commands():
+        try:
+            while True:
+                message = await websocket.receive_json()
+                requested = parse_symbol_list(','.join(message.get('symbols', [])))
+                if message.get('action') == 'subscribe':
+                    added = {k: v for k, v in requested.items() if k not in subscriber.symbols}
+                    try:
+                        signal_broadcaster.add_symbols(subscriber, added)
+                    except ValueError as e:
+                        await websocket.send_json({'type': 'error', 'error': str(e)})
+                        continue
+                    signal_refresher.pin(added)
+                    # Snapshot for the new symbols goes out through the normal update path
+                    for entry in await stream_snapshot(added):
+                        subscriber.offer(canonical_symbol(entry['symbol']), dict(entry, changed=list(DIFF_FIELDS)))
+                elif message.get('action') == 'unsubscribe':
+                    removed = [k for k in requested if k in subscriber.symbols]
+                    signal_broadcaster.remove_symbols(subscriber, removed)
+                    signal_refresher.unpin(removed)
+        except (WebSocketDisconnect, ValueError, AttributeError):
+            subscriber.close("disconnected")
+    
+    receiver = asyncio.create_task(receive_commands())
+    try:
+        snapshot = await stream_snapshot(subscriber.symbols)
+        subscriber.discard_pending(list(subscriber.symbols))
+        await websocket.send_json({'type': 'snapshot', 'signals': snapshot})
+        while True:
+            updates = await subscriber.next_updates(timeout=STREAM_HEARTBEAT)
+            if subscriber.closed:
+                break
+            message = {'type': 'update', 'signals': updates} if updates else {'type': 'heartbeat'}
+            await asyncio.wait_for(websocket.send_json(message), STREAM_SEND_TIMEOUT)
+        if subscriber.close_reason == "slow consumer":
+            await websocket.close(code=1013, reason="slow consumer")
+    except asyncio.TimeoutError:
+        logger.warning(f"⚠️ Dropping stream subscriber #{subscriber.subscriber_id}: send timed out")
+        await websocket.close(code=1013, reason="slow consumer")
+    except WebSocketDisconnect:
+        pass
+    finally:
+        receiver.cancel()
+        signal_broadcaster.unsubscribe(subscriber)
+        signal_refresher.unpin(subscriber.symbols)
+
+def sse_event(event: str, data: Dict[str, Any]) -> str:
+    """Format one Server-Sent Event"""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+@app.get("/stream/signals")
+async def stream_signals_sse(request: Request, symbols: str = "BTCUSD,ETHUSD,LTCUSD"):
+    """
+    Push signal updates as Server-Sent Events (same semantics as the WebSocket stream)
+    """
+    try:
+        subscriber = signal_broadcaster.subscribe(parse_symbol_list(symbols))
+    except RuntimeError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    signal_refresher.pin(subscriber.symbols)
+    
+    async def events():
+        try:
+            snapshot = await stream_snapshot(subscriber.symbols)
+            subscriber.discard_pending(list(subscriber.symbols))
+            yield sse_event('snapshot', {'signals': snapshot})
+            while not subscriber.closed:
+                updates = await subscriber.next_updates(timeout=STREAM_HEARTBEAT)
+                if await request.is_disconnected():
+                    break
+                if updates:
+                    yield sse_event('update', {'signals': updates})
+                elif not subscriber.closed:
+                    yield ": heartbeat\n\n"
+        finally:
+            signal_broadcaster.unsubscribe(subscriber)
+            signal_refresher.unpin(subscriber.symbols)
+    
+    return StreamingResponse(events(), media_type="text/event-stream",
+                             headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
 
 def main():
     """Main function to run the server"""
@@ -264,7 +930,8 @@ def main():
     print()
     
     try:
-        uvicorn.run(app, host="127.0.0.1", port=8000, log_level="info")
+        # log_config=None lets uvicorn's own loggers propagate to the queued root handler
+        uvicorn.run(app, host="127.0.0.1", port=8000, log_level="info", log_config=None)
     except KeyboardInterrupt:
         print("\n🛑 Server stopped by user")
     except Exception as e:
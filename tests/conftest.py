@@ -0,0 +1,18 @@
+"""
+Pytest configuration for CryptSIST
+Menambahkan folder modul ke sys.path seperti yang dilakukan server, dan mengisolasi state di disk
+"""
+
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+for path in (ROOT, os.path.join(ROOT, 'dependencies'), os.path.join(ROOT, 'config')):
+    if path not in sys.path:
+        sys.path.insert(0, path)
+
+# Keep test runs away from ~/.cryptsist and any configured shared cache
+os.environ['CRYPTSIST_PRICE_CACHE_DB'] = ''
+os.environ['CRYPTSIST_RATE_LIMIT_STATE'] = ''
+os.environ['CRYPTSIST_CACHE_BACKEND'] = 'none'
+os.environ['CRYPTSIST_HISTORY_DIR'] = ''
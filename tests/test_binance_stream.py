@@ -0,0 +1,73 @@
+"""
+Tests for BinanceStreamClient against the local replay stand-in
+"""
+
+import asyncio
+import time
+
+from binance_stream import BinanceStreamClient
+from binance_stream_replay import BinanceStreamReplayServer, synthetic_frames
+
+
+async def wait_until(predicate, timeout: float = 5.0) -> None:
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        if time.monotonic() > deadline:
+            raise AssertionError("condition not reached before timeout")
+        await asyncio.sleep(0.01)
+
+
+def run_with_replay(scenario, drop_after=None, pairs=('BTCUSDT',)):
+    async def main():
+        frames = synthetic_frames(['BTCUSDT', 'ETHUSDT', 'SOLUSDT'], count=200, interval=0.01)
+        server = BinanceStreamReplayServer(frames, speed=1.0, drop_after=drop_after)
+        url = await server.start()
+        client = BinanceStreamClient(pairs, base_url=url, reconnect_min=0.01, reconnect_max=0.05)
+        client.start()
+        try:
+            await scenario(server, client)
+        finally:
+            await client.stop()
+            await server.stop()
+    asyncio.run(main())
+
+
+def test_book_fills_from_stream():
+    async def scenario(server, client):
+        await wait_until(lambda: client.book.get('BTCUSDT') is not None and client.book.get('BTCUSDT').bid)
+        quote = client.book.get('BTCUSDT')
+        assert quote.last > 0 and quote.bid < quote.last < quote.ask
+        # Only the subscribed pair is streamed
+        assert client.book.get('ETHUSDT') is None
+        assert client.is_connected()
+
+    run_with_replay(scenario)
+
+
+def test_subscribe_while_connected():
+    async def scenario(server, client):
+        await wait_until(client.is_connected)
+        await client.subscribe(['ethusdt'])
+        await wait_until(lambda: client.book.get('ETHUSDT') is not None)
+        assert server.stats['subscribe_requests'] == 1
+        assert client.stats['subscribe_requests'] == 1
+        assert client.get_stats()['pairs'] == 2
+
+    run_with_replay(scenario)
+
+
+def test_reconnects_and_resubscribes_after_drop():
+    async def scenario(server, client):
+        await wait_until(client.is_connected)
+        await client.subscribe(['ETHUSDT'])
+        await wait_until(lambda: client.stats['connects'] >= 2)
+        assert client.stats['reconnects'] >= 1
+
+        # The new connection carries the added pair in its URL, no SUBSCRIBE needed
+        client.book.quotes.clear()
+        await wait_until(lambda: client.book.get('ETHUSDT') is not None
+                         and client.book.get('BTCUSDT') is not None)
+        assert server.stats['subscribe_requests'] == 1
+        assert server.stats['connections'] >= 2
+
+    run_with_replay(scenario, drop_after=20)
@@ -0,0 +1,93 @@
+"""
+Tests for the columnar OHLCV history store
+"""
+
+import os
+
+import numpy as np
+import pytest
+
+from history_store import HistoryStore, TIMEFRAME_SECONDS
+
+DAY = TIMEFRAME_SECONDS['1d']
+
+
+def candles(first_day: int, count: int, price: float = 100.0):
+    times = np.arange(first_day, first_day + count, dtype=np.int64) * DAY
+    closes = price + np.arange(count, dtype=np.float64)
+    return {'time': times, 'open': closes, 'high': closes + 1, 'low': closes - 1,
+            'close': closes, 'volume': np.full(count, 10.0)}
+
+
+@pytest.fixture
+def store(tmp_path):
+    return HistoryStore(str(tmp_path / 'history'))
+
+
+def test_append_and_slice(store):
+    series = store.series('btc')
+    series.write(candles(100, 5))
+    series.write(candles(105, 5, price=200.0))
+    view = series.slice(102 * DAY, 106 * DAY)
+    assert list(view['time'] // DAY) == [102, 103, 104, 105, 106]
+    assert list(view['close']) == [102.0, 103.0, 104.0, 200.0, 201.0]
+    assert series.missing_ranges(98 * DAY, 111 * DAY) == [(98 * DAY, 99 * DAY), (110 * DAY, 111 * DAY)]
+
+
+def test_backfill_writes_a_new_generation_and_keeps_old_views(store):
+    series = store.series('ETH')
+    series.write(candles(100, 5))
+    old_view = series.slice(100 * DAY, 104 * DAY)
+
+    # Earlier candles (and an overlapping one) force a rewrite
+    series.write(candles(95, 6, price=50.0))
+    assert series.meta['generation'] == 1
+    assert list(old_view['close']) == [100.0, 101.0, 102.0, 103.0, 104.0]
+
+    merged = series.slice(95 * DAY, 104 * DAY)
+    assert list(merged['time'] // DAY) == list(range(95, 105))
+    assert merged['close'][5] == 55.0  # the backfilled candle replaced the stored one
+
+    files = sorted(f for f in os.listdir(series.directory) if f.endswith('.bin'))
+    assert files == sorted(f"{name}.1.bin" for name in ('time', 'open', 'high', 'low', 'close', 'volume'))
+
+
+def test_interrupted_append_bytes_are_overwritten(store):
+    series = store.series('SOL')
+    series.write(candles(100, 3))
+    with open(os.path.join(series.directory, 'time.bin'), 'ab') as f:
+        f.write(b'\xff' * 16)  # uncommitted tail
+    series.write(candles(103, 2))
+    assert list(series.arrays()['time'] // DAY) == [100, 101, 102, 103, 104]
+
+
+def test_reopened_store_reads_committed_rows(store, tmp_path):
+    store.series('ADA').write(candles(100, 4))
+    store.series('ADA').write(candles(90, 2))
+    reopened = HistoryStore(str(tmp_path / 'history')).series('ADA')
+    assert reopened.get_stats()['rows'] == 6
+    assert reopened.get_stats()['first'] == 90 * DAY
+
+
+@pytest.mark.parametrize('symbol', ['../etc', 'BTC/USDT', 'C:\\X', 'con', 'LPT1', '', '.hidden'])
+def test_unsafe_symbols_are_rejected(store, symbol):
+    with pytest.raises(ValueError):
+        store.series(symbol)
+
+
+def test_unknown_timeframe_is_rejected(store):
+    with pytest.raises(ValueError):
+        store.series('BTC', '5m')
+
+
+def test_answered_empty_ranges_are_not_missing(store):
+    series = store.series('DOGE')
+    series.write(candles(100, 3))
+    series.write(candles(106, 2))
+    assert series.missing_ranges(100 * DAY, 110 * DAY) == [(103 * DAY, 105 * DAY), (108 * DAY, 110 * DAY)]
+
+    series.add_empty_ranges([(103 * DAY, 104 * DAY)])
+    series.add_empty_ranges([(105 * DAY, 105 * DAY)])  # adjacent: merged
+    assert series.meta['empty'] == [[103 * DAY, 105 * DAY]]
+    assert series.missing_ranges(100 * DAY, 110 * DAY) == [(108 * DAY, 110 * DAY)]
+    assert store.series('DOGE').get_stats()['empty_ranges'] == 1
@@ -0,0 +1,108 @@
+"""
+Tests for micro-batching of provider lookups
+"""
+
+import asyncio
+import concurrent.futures
+
+import pytest
+
+from micro_batch import AsyncMicroBatcher, MicroBatcher
+
+
+def lookup_all(batcher: MicroBatcher, keys):
+    """Call batcher.get for every key from its own thread, returning results or exceptions in order"""
+    with concurrent.futures.ThreadPoolExecutor(max_workers=len(keys)) as pool:
+        futures = [pool.submit(batcher.get, key) for key in keys]
+        return [future.exception() or future.result() for future in futures]
+
+
+def test_concurrent_lookups_share_one_fetch():
+    calls = []
+
+    def fetch_many(keys):
+        calls.append(sorted(keys))
+        return {key: key.lower() for key in keys if key != 'GONE'}
+
+    batcher = MicroBatcher(fetch_many, window=0.3)
+    assert lookup_all(batcher, ['BTC', 'ETH', 'BTC', 'GONE']) == ['btc', 'eth', 'btc', None]
+    assert calls == [['BTC', 'ETH', 'GONE']]
+    stats = batcher.get_stats()
+    assert (stats['lookups'], stats['coalesced'], stats['requests']) == (4, 1, 1)
+
+
+def test_lookups_are_fetched_in_chunks_of_max_batch():
+    calls = []
+
+    def fetch_many(keys):
+        calls.append(keys)
+        return {key: key for key in keys}
+
+    keys = [f"SYN{i}" for i in range(7)]
+    batcher = MicroBatcher(fetch_many, window=0.3, max_batch=3)
+    assert lookup_all(batcher, keys) == keys
+    assert all(len(chunk) <= 3 for chunk in calls)
+    assert sorted(key for chunk in calls for key in chunk) == keys
+
+
+def test_fetch_errors_reach_every_waiter():
+    def fetch_many(keys):
+        raise RuntimeError('provider down')
+
+    batcher = MicroBatcher(fetch_many, window=0.3)
+    results = lookup_all(batcher, ['BTC', 'ETH', 'BTC'])
+    assert [str(result) for result in results] == ['provider down'] * 3
+
+
+def test_async_lookups_share_one_fetch_per_chunk():
+    calls = []
+
+    async def fetch_many(keys):
+        calls.append(keys)
+        return {key: key.lower() for key in keys}
+
+    async def main():
+        batcher = AsyncMicroBatcher(fetch_many, window=0.05, max_batch=2)
+        results = await asyncio.gather(*[batcher.get(key) for key in ('BTC', 'BTC', 'ETH', 'SOL', 'ADA', 'XRP')])
+        return results, batcher.get_stats()
+
+    results, stats = asyncio.run(main())
+    assert results == ['btc', 'btc', 'eth', 'sol', 'ada', 'xrp']
+    # Full batches go out at once; the remainder waits for the window
+    assert calls == [['BTC', 'ETH'], ['SOL', 'ADA'], ['XRP']]
+    assert (stats['lookups'], stats['coalesced'], stats['requests']) == (6, 1, 3)
+
+
+def test_async_fetch_errors_reach_every_waiter():
+    async def fetch_many(keys):
+        await asyncio.sleep(0.01)
+        raise RuntimeError('provider down')
+
+    async def main():
+        batcher = AsyncMicroBatcher(fetch_many, window=0.01)
+        return await asyncio.gather(*[batcher.get(key) for key in ('BTC', 'ETH', 'BTC')], return_exceptions=True)
+
+    assert [str(result) for result in asyncio.run(main())] == ['provider down'] * 3
+
+
+def test_cancelled_caller_does_not_cancel_the_others():
+    fetched = []
+
+    async def fetch_many(keys):
+        await asyncio.sleep(0.05)
+        fetched.append(keys)
+        return {key: key.lower() for key in keys}
+
+    async def main():
+        batcher = AsyncMicroBatcher(fetch_many, window=0.01)
+        cancelled = asyncio.ensure_future(batcher.get('BTC'))
+        same_key = asyncio.ensure_future(batcher.get('BTC'))
+        other_key = asyncio.ensure_future(batcher.get('ETH'))
+        await asyncio.sleep(0.02)  # the batch is in flight
+        cancelled.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await cancelled
+        return await same_key, await other_key
+
+    assert asyncio.run(main()) == ('btc', 'eth')
+    assert fetched == [['BTC', 'ETH']]
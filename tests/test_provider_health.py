@@ -0,0 +1,50 @@
+"""
+Tests for provider circuit breakers and source ordering
+"""
+
+import pytest
+
+from provider_health import ProviderHealthTracker, ProviderUnavailable
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def open_circuit(tracker: ProviderHealthTracker, provider: str) -> None:
+    for _ in range(tracker.failure_threshold):
+        tracker.record(provider, 0.1, False, 'http_503')
+
+
+def test_circuit_opens_and_half_opens_after_cooldown():
+    clock = FakeClock()
+    tracker = ProviderHealthTracker(failure_threshold=3, cooldown=30, clock=clock)
+    open_circuit(tracker, 'binance')
+    with pytest.raises(ProviderUnavailable):
+        tracker.before_request('binance')
+
+    clock.now += 31
+    tracker.before_request('binance')  # the half-open probe
+    with pytest.raises(ProviderUnavailable):
+        tracker.before_request('binance')
+    tracker.record('binance', 0.1, True)
+    tracker.before_request('binance')
+    assert tracker.get_stats()['binance']['state'] == 'closed'
+
+
+def test_order_skips_or_keeps_open_circuits():
+    clock = FakeClock()
+    tracker = ProviderHealthTracker(failure_threshold=3, cooldown=30, slow_latency=1.0, clock=clock)
+    sources = ['coinmarketcap', 'binance', 'coindesk', 'alpha_vantage']
+    open_circuit(tracker, 'coinmarketcap')
+    for _ in range(5):
+        tracker.record('binance', 3.0, True)  # slow: demoted
+
+    assert tracker.order(sources) == ['coindesk', 'alpha_vantage', 'binance']
+    # Open circuits answer from cache or fail at once, so they keep their priority
+    assert tracker.order(sources, available_only=False) == ['coinmarketcap', 'coindesk', 'alpha_vantage',
+                                                            'binance']
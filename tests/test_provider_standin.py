@@ -0,0 +1,239 @@
+"""
+Tests for the local provider stand-in, driven through EnhancedPriceFetcher
+"""
+
+import asyncio
+import json
+import time
+
+import pytest
+
+from async_price_fetcher import AsyncEnhancedPriceFetcher
+from enhanced_price_fetcher import EnhancedPriceFetcher
+from history_store import HistoryStore
+from provider_health import ProviderHealthTracker
+from provider_standin import ProviderStandInServer
+from rate_limiter import ProviderRateLimiter
+
+
+@pytest.fixture
+def standin():
+    server = ProviderStandInServer()
+    server.start_in_thread()
+    yield server
+    server.stop_thread()
+
+
+def make_fetcher(server: ProviderStandInServer, limits=None) -> EnhancedPriceFetcher:
+    """Fetcher against the stand-in with its own limiter and breaker, so tests do not share budgets"""
+    fetcher = EnhancedPriceFetcher(server.base_urls())
+    fetcher.rate_limiter = ProviderRateLimiter(limits=limits or {}, state_path=None)
+    fetcher.provider_health = ProviderHealthTracker(failure_threshold=3, cooldown=30)
+    return fetcher
+
+
+def age_entry(fetcher: EnhancedPriceFetcher, key: str, seconds: float) -> None:
+    fetcher.cache[key]['timestamp'] -= seconds
+
+
+def wait_for_refreshes(fetcher: EnhancedPriceFetcher, timeout: float = 5.0) -> None:
+    expires = time.monotonic() + timeout
+    while fetcher.refreshing and time.monotonic() < expires:
+        time.sleep(0.01)
+    assert not fetcher.refreshing
+
+
+def cmc_requests(server: ProviderStandInServer) -> int:
+    return server.get_stats()['providers']['coinmarketcap']['requests']
+
+
+def test_synthetic_prices_reach_the_fetcher(standin):
+    fetcher = make_fetcher(standin)
+    binance = fetcher.get_binance_crypto_data('BTC')
+    assert binance['success'] and binance['current_price'] == standin.market.assets['BTC'].price
+
+    cmc = fetcher.get_coinmarketcap_data('ETH')
+    assert cmc['success'] and cmc['market_cap_rank'] == standin.market.assets['ETH'].rank
+
+    quote = fetcher.get_comprehensive_price_data('SOL')
+    assert quote.price == standin.market.assets['SOL'].price
+
+    providers = standin.get_stats()['providers']
+    assert providers['binance']['endpoints']['/ticker/24hr'] >= 1
+    assert providers['coinmarketcap']['status'] == {'200': providers['coinmarketcap']['requests']}
+
+
+def test_injected_rate_limits_open_the_circuit(standin):
+    fetcher = make_fetcher(standin)
+    standin.set_faults('coinmarketcap', rate_limit_rate=1.0)
+    for symbol in ('BTC', 'ETH', 'ADA'):
+        result = fetcher.get_coinmarketcap_data(symbol)
+        assert not result['success'] and 'HTTP 429' in result['error']
+
+    health = fetcher.provider_health.get_stats()['coinmarketcap']
+    assert health['state'] == 'open' and health['last_error'] == 'http_429'
+
+    # The open circuit fails fast: the stand-in sees no further request
+    assert not fetcher.get_coinmarketcap_data('DOT')['success']
+    assert standin.get_stats()['providers']['coinmarketcap']['injected']['rate_limited'] == 3
+    assert standin.get_stats()['providers']['coinmarketcap']['requests'] == 3
+
+
+def test_exhausted_budget_stops_requests_before_the_provider(standin):
+    fetcher = make_fetcher(standin, limits={'coinmarketcap': (2, None)})
+    standin.set_faults('coinmarketcap', rate_limit_rate=1.0)
+    results = [fetcher.get_coinmarketcap_data(symbol) for symbol in ('BTC', 'ETH', 'ADA', 'DOT')]
+    assert [result['success'] for result in results] == [False] * 4
+
+    limiter = fetcher.rate_limiter.get_stats()['coinmarketcap']
+    assert limiter['allowed'] == 2 and limiter['denied'] == 2
+    assert standin.get_stats()['providers']['coinmarketcap']['requests'] == 2
+    # Denied calls never reached the provider, so only the two 429s count against its circuit
+    assert fetcher.provider_health.get_stats()['coinmarketcap']['consecutive_failures'] == 2
+
+
+def test_replay_serves_recorded_fixtures(standin, tmp_path):
+    fixtures = str(tmp_path / 'fixtures.jsonl')
+    recorder = ProviderStandInServer(mode='record', fixtures=fixtures, upstream=standin.base_urls())
+    recorder.start_in_thread()
+    try:
+        recorded = make_fetcher(recorder).get_coinmarketcap_data('BTC')
+    finally:
+        recorder.stop_thread()
+    assert recorded['success'] and recorder.get_stats()['recorded'] == 1
+    with open(fixtures) as f:
+        records = [json.loads(line) for line in f]
+    assert [record['key'].split('?')[0] for record in records] == ['coinmarketcap /cryptocurrency/quotes/latest']
+
+    replay = ProviderStandInServer(mode='replay', fixtures=fixtures)
+    replay.start_in_thread()
+    try:
+        fetcher = make_fetcher(replay)
+        replayed = fetcher.get_coinmarketcap_data('BTC')
+        missing = fetcher.get_coinmarketcap_data('ETH')
+    finally:
+        replay.stop_thread()
+    assert replayed['current_price'] == recorded['current_price']
+    assert replayed['last_updated'] == recorded['last_updated']
+    assert not missing['success'] and 'HTTP 404' in missing['error']
+    assert replay.get_stats()['replay_misses'] == 1
+
+
+def test_market_overview_fills_the_binance_snapshot_in_chunks():
+    server = ProviderStandInServer(extra_symbols=45)
+    server.start_in_thread()
+    try:
+        fetcher = make_fetcher(server)
+        symbols = list(server.market.assets)[:50] + ['NOTLISTED']
+        overview = fetcher.get_market_overview(symbols)
+        binance = server.get_stats()['providers']['binance']
+    finally:
+        server.stop_thread()
+    assert overview['successful_fetches'] == 50
+    # The listing once, then 50 listed pairs at 20 per filtered request; nothing per symbol
+    assert binance['endpoints'] == {'/ticker/price': 1, '/ticker/24hr': 3}
+    assert fetcher.get_binance_crypto_data('NOTLISTED')['error'] == 'NOTLISTEDUSDT is not listed on Binance'
+
+
+def test_failed_history_backfill_is_negative_cached(standin, tmp_path):
+    fetcher = make_fetcher(standin)
+    fetcher.history_store = HistoryStore(str(tmp_path / 'history'))
+    results = [fetcher.get_historical_data('ZZZNOTLISTED', 30) for _ in range(3)]
+    assert [result['success'] for result in results] == [False] * 3
+    assert results[2]['error'] == results[0]['error']
+    providers = standin.get_stats()['providers']
+    # One klines request and one Alpha Vantage fallback; the repeats are served from the negative cache
+    assert providers['binance']['requests'] == 1 and providers['alpha_vantage']['requests'] == 1
+
+    history = fetcher.get_historical_data('BTC', 30)
+    assert history['days_received'] == 30
+    assert fetcher.get_historical_data('BTC', 30)['requests_made'] == 0
+
+
+def test_quota_limited_fallback_waits_for_the_sources_ahead(standin):
+    fetcher = make_fetcher(standin)
+    for symbol in ('BTC', 'ETH', 'SOL', 'ADA'):
+        assert fetcher.get_comprehensive_price_data(symbol).success
+    assert 'alpha_vantage' not in standin.get_stats()['providers']
+    assert fetcher.get_fanout_stats()['deferred_skipped'] == 4
+
+    async def run_async():
+        async_fetcher = AsyncEnhancedPriceFetcher(base_urls=standin.base_urls())
+        async_fetcher.rate_limiter = fetcher.rate_limiter
+        async_fetcher.provider_health = ProviderHealthTracker(failure_threshold=3, cooldown=30)
+        try:
+            return await async_fetcher.get_comprehensive_price_data('DOT')
+        finally:
+            await async_fetcher.close()
+
+    assert asyncio.run(run_async()).success
+    assert 'alpha_vantage' not in standin.get_stats()['providers']
+
+    # Once the sources ahead fail, the fallback starts without waiting for its delay
+    standin.set_faults('coinmarketcap', down=True)
+    standin.set_faults('binance', down=True)
+    fetcher.deferred_launch_delay = 60.0
+    quote = fetcher.get_comprehensive_price_data('XRP', deadline=5.0)
+    assert quote.success and quote.api_source == 'alpha_vantage'
+    assert standin.get_stats()['providers']['alpha_vantage']['requests'] == 1
+    assert fetcher.get_fanout_stats()['deferred_launches'] == 1
+
+
+def test_stale_entry_is_served_while_one_refresh_runs(standin):
+    fetcher = make_fetcher(standin)
+    first = fetcher.get_coinmarketcap_data('BTC')
+    age_entry(fetcher, 'coinmarketcap_BTC', fetcher.cache_duration + 1)
+
+    standin.set_faults('coinmarketcap', latency=0.2)
+    stale = [fetcher.get_coinmarketcap_data('BTC') for _ in range(3)]
+    assert all(result is first for result in stale)
+    wait_for_refreshes(fetcher)
+
+    stats = fetcher.get_cache_stats()
+    assert stats['stale_hits'] == 3 and stats['refreshes'] == 1
+    assert cmc_requests(standin) == 2
+    # The refreshed entry is fresh again: no further request
+    assert fetcher.get_coinmarketcap_data('BTC') is not first
+    assert cmc_requests(standin) == 2
+
+
+def test_failed_result_is_negative_cached_for_its_ttl(standin):
+    fetcher = make_fetcher(standin)
+    negative_ttl = fetcher._cache_policy('coinmarketcap_BTC').negative_ttl
+    standin.set_faults('coinmarketcap', down=True)
+    failed = fetcher.get_coinmarketcap_data('BTC')
+    assert not failed['success'] and 'HTTP 503' in failed['error']
+    assert fetcher.get_coinmarketcap_data('BTC') == failed
+    assert cmc_requests(standin) == 1
+    assert fetcher.get_cache_stats()['negative_hits'] == 1
+
+    standin.set_faults('coinmarketcap')
+    age_entry(fetcher, 'coinmarketcap_BTC', negative_ttl)
+    assert fetcher.get_coinmarketcap_data('BTC')['success']
+    assert cmc_requests(standin) == 2
+
+
+def test_failed_refresh_keeps_stale_data_and_backs_off(standin):
+    fetcher = make_fetcher(standin)
+    first = fetcher.get_coinmarketcap_data('BTC')
+    age_entry(fetcher, 'coinmarketcap_BTC', fetcher.cache_duration + 1)
+
+    standin.set_faults('coinmarketcap', down=True)
+    assert fetcher.get_coinmarketcap_data('BTC') is first
+    wait_for_refreshes(fetcher)
+    assert cmc_requests(standin) == 2
+    assert 'HTTP 503' in fetcher.get_cache_stats()['backing_off']['coinmarketcap_BTC']
+
+    # Within the negative TTL the stale data is served without another refresh
+    assert fetcher.get_coinmarketcap_data('BTC') is first
+    assert fetcher.get_cache_stats()['refresh_failures'] == 1
+    assert cmc_requests(standin) == 2
+
+    standin.set_faults('coinmarketcap')
+    _, reason = fetcher.refresh_failures['coinmarketcap_BTC']
+    fetcher.refresh_failures['coinmarketcap_BTC'] = (time.time() - 1, reason)
+    assert fetcher.get_coinmarketcap_data('BTC') is first
+    wait_for_refreshes(fetcher)
+    assert cmc_requests(standin) == 3
+    assert 'coinmarketcap_BTC' not in fetcher.refresh_failures
+    assert fetcher.get_cache_stats()['refreshes'] == 2
@@ -0,0 +1,39 @@
+"""
+Tests for compact Quote records
+"""
+
+import json
+
+from quote import Quote, SourceQuote
+
+CMC_RESULT = {
+    'success': True, 'symbol': 'ETH', 'name': 'Ethereum', 'current_price': 3000.0, 'market_cap': 3.6e11,
+    'market_cap_rank': 2, 'volume_24h': 1.5e10, 'price_change_24h': 1.2, 'price_change_7d': -0.4,
+    'circulating_supply': 120e6, 'total_supply': 120e6, 'max_supply': None,
+    'last_updated': '2026-01-01T00:00:00Z', 'source': 'CoinMarketCap', 'api_source': 'coinmarketcap',
+    'api_url': 'https://example.invalid/quotes', 'raw_data': {'large': 'payload'}
+}
+
+
+def test_from_result_keeps_descriptive_fields():
+    provenance = (SourceQuote.from_result('coinmarketcap', CMC_RESULT),
+                  SourceQuote.from_result('binance', None, 'timeout'))
+    data = Quote.from_result('ETH', 'coinmarketcap', CMC_RESULT, provenance).to_dict()
+    assert data['current_price'] == 3000.0
+    assert data['name'] == 'Ethereum'
+    assert data['circulating_supply'] == 120e6
+    assert data['last_updated'] == '2026-01-01T00:00:00Z'
+    # Missing values are left out like in the provider dict; payloads are not copied
+    assert 'max_supply' not in data and 'raw_data' not in data and 'api_url' not in data
+    assert data['sources_available'] == 1
+    assert data['all_sources']['binance']['error'] == 'timeout'
+    json.dumps(data)
+
+
+def test_binance_fields_and_failed_quote():
+    quote = Quote.from_result('BTC', 'binance', {'current_price': 65000.0, 'high_24h': 66000.0,
+                                                 'low_24h': 64000.0, 'trading_pair': 'BTCUSDT'})
+    assert (quote.high_24h, quote.low_24h, quote.trading_pair) == (66000.0, 64000.0, 'BTCUSDT')
+    failed = Quote.failed('XYZ', 'No data sources available').to_dict()
+    assert failed['success'] is False and failed['error'] == 'No data sources available'
+    json.dumps(failed)
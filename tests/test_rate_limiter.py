@@ -0,0 +1,83 @@
+"""
+Tests for provider rate limits and daily quotas
+"""
+
+import json
+import time
+
+import pytest
+
+from rate_limiter import ProviderBudgetExhausted, ProviderRateLimiter
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 20000 * 86400.0 + 86390  # ten seconds before a UTC midnight
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def read_state(path: str) -> dict:
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def test_token_bucket_refills_per_minute():
+    clock = FakeClock()
+    limiter = ProviderRateLimiter(limits={'binance': (3, None)}, state_path=None, clock=clock)
+    assert [limiter.try_acquire('binance') for _ in range(4)] == [True, True, True, False]
+    assert limiter.get_stats()['binance']['retry_after'] == 20.0
+
+    clock.now += 20
+    assert limiter.try_acquire('binance')
+    assert not limiter.try_acquire('binance')
+    assert limiter.try_acquire('unlimited')
+    stats = limiter.get_stats()['binance']
+    assert (stats['allowed'], stats['denied']) == (4, 2)
+
+
+def test_daily_quota_resets_at_utc_midnight():
+    clock = FakeClock()
+    limiter = ProviderRateLimiter(limits={'alpha_vantage': (None, 2)}, state_path=None, clock=clock)
+    limiter.check('alpha_vantage')
+    limiter.check('alpha_vantage')
+    with pytest.raises(ProviderBudgetExhausted, match='daily quota of 2 calls used'):
+        limiter.check('alpha_vantage')
+    assert limiter.get_stats()['alpha_vantage']['retry_after'] == 10.0
+
+    clock.now += 10
+    assert limiter.try_acquire('alpha_vantage')
+    stats = limiter.get_stats()['alpha_vantage']
+    assert (stats['used_today'], stats['remaining_today']) == (1, 1)
+
+
+def test_budgets_survive_a_restart_through_the_flusher(tmp_path):
+    clock = FakeClock()
+    state_path = str(tmp_path / 'quota.json')
+    limits = {'coinmarketcap': (5, 10)}
+    limiter = ProviderRateLimiter(limits=limits, state_path=state_path, persist_interval=0.02, clock=clock)
+    assert limiter.try_acquire('coinmarketcap') and limiter.try_acquire('coinmarketcap')
+
+    # Requests never write the file themselves; the flusher thread does
+    expires = time.monotonic() + 5
+    while read_state(state_path).get('coinmarketcap', {}).get('day_count') != 2 and time.monotonic() < expires:
+        time.sleep(0.01)
+    assert read_state(state_path)['coinmarketcap']['day_count'] == 2
+
+    assert limiter.try_acquire('coinmarketcap')
+    limiter.close()
+    assert not limiter.flusher.is_alive()
+    assert read_state(state_path)['coinmarketcap']['day_count'] == 3
+
+    restored = ProviderRateLimiter(limits=limits, state_path=state_path, clock=clock)
+    assert restored.get_stats()['coinmarketcap']['used_today'] == 3
+    assert [restored.try_acquire('coinmarketcap') for _ in range(3)] == [True, True, False]
+    restored.close()
+
+    # The next UTC day starts with a fresh quota
+    clock.now += 10
+    assert ProviderRateLimiter(limits=limits, state_path=state_path, clock=clock).get_stats()['coinmarketcap']['used_today'] == 0
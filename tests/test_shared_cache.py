@@ -0,0 +1,185 @@
+"""
+Tests for the shared cache backends and SignalCache's use of them
+"""
+
+import asyncio
+import time
+
+import pytest
+
+from shared_cache import (CacheBackend, FileCacheBackend, MemoryCacheBackend, RedisCacheBackend,
+                          create_cache_backend)
+from signal_cache import SignalCache
+
+
+def wait_until(predicate, timeout: float = 2.0) -> None:
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        if time.monotonic() > deadline:
+            raise AssertionError("condition not reached before timeout")
+        time.sleep(0.01)
+
+
+@pytest.fixture
+def fake_redis_server():
+    fakeredis = pytest.importorskip('fakeredis')
+    return fakeredis, fakeredis.FakeServer()
+
+
+@pytest.fixture(params=['memory', 'file', 'redis'])
+def backend(request, tmp_path):
+    if request.param == 'memory':
+        cache = MemoryCacheBackend()
+    elif request.param == 'file':
+        cache = FileCacheBackend(str(tmp_path / 'cache.mmap'), slots=4096, slot_size=512)
+    else:
+        fakeredis, server = request.getfixturevalue('fake_redis_server')
+        cache = RedisCacheBackend(client=fakeredis.FakeRedis(server=server))
+    yield cache
+    cache.close()
+
+
+def test_backend_interface_is_abstract():
+    with pytest.raises(TypeError):
+        CacheBackend()
+
+
+def test_batch_set_and_get(backend):
+    backend.set_many({'a': {'price': 1.5}, 'b': [1, 2], 'c': 'text'}, ttl=30)
+    assert backend.get_many(['a', 'b', 'c', 'missing']) == {'a': {'price': 1.5}, 'b': [1, 2], 'c': 'text'}
+    assert backend.get('b') == [1, 2]
+    backend.delete('b')
+    assert backend.get('b') is None
+    stats = backend.get_stats()
+    assert stats['hits'] == 4 and stats['misses'] == 2
+
+
+def test_entries_expire_after_ttl(backend):
+    backend.set_many({'short': 1}, ttl=0.05)
+    backend.set('long', 2, ttl=30)
+    assert backend.get('short') == 1
+    time.sleep(0.1)
+    assert backend.get_many(['short', 'long']) == {'long': 2}
+
+
+def test_put_is_written_behind(backend):
+    for i in range(20):
+        backend.put(f'key{i}', i, ttl=30)
+    backend.put('key0', 'latest', ttl=30)
+    backend.flush()
+    assert backend.get('key0') == 'latest'
+    assert backend.get('key19') == 19
+    assert backend.get_stats()['pending'] == 0
+
+
+def test_closed_backend_drops_puts(backend):
+    backend.put('before', 1, ttl=30)
+    backend.close()
+    backend.put('after', 2, ttl=30)
+    assert backend.get_stats()['pending'] == 0
+
+
+def test_file_backend_is_shared_between_instances(tmp_path):
+    path = str(tmp_path / 'cache.mmap')
+    writer = FileCacheBackend(path, slots=64, slot_size=512)
+    reader = FileCacheBackend(path, slots=64, slot_size=512)
+    try:
+        writer.set_many({'BTCUSD': {'price': 65000}}, ttl=30)
+        assert reader.get('BTCUSD') == {'price': 65000}
+        writer.set('BTCUSD', {'price': 65100}, ttl=30)
+        assert reader.get('BTCUSD') == {'price': 65100}
+    finally:
+        writer.close()
+        reader.close()
+
+
+def test_file_backend_layouts_never_share_or_truncate_a_file(tmp_path):
+    path = str(tmp_path / 'cache.mmap')
+    small = FileCacheBackend(path, slots=64, slot_size=512)
+    large = FileCacheBackend(path, slots=128, slot_size=512)
+    try:
+        small.set('BTCUSD', {'price': 65000}, ttl=30)
+        assert large.get('BTCUSD') is None
+        assert small.get('BTCUSD') == {'price': 65000}
+        assert small.get_stats()['path'] == str(tmp_path / 'cache.64x512.mmap')
+    finally:
+        small.close()
+        large.close()
+
+    foreign = tmp_path / 'other.8x128.mmap'
+    foreign.write_bytes(b'not a cache file')
+    with pytest.raises(ValueError):
+        FileCacheBackend(str(tmp_path / 'other.mmap'), slots=8, slot_size=128)
+    assert foreign.read_bytes() == b'not a cache file'
+
+
+def test_file_backend_skips_oversize_values(tmp_path):
+    cache = FileCacheBackend(str(tmp_path / 'cache.mmap'), slots=8, slot_size=128)
+    try:
+        cache.set('big', 'x' * 500, ttl=30)
+        assert cache.get('big') is None
+        assert cache.get_stats()['oversize'] == 1
+    finally:
+        cache.close()
+
+
+def test_redis_near_cache_is_invalidated_by_other_writers(fake_redis_server):
+    fakeredis, server = fake_redis_server
+    first = RedisCacheBackend(client=fakeredis.FakeRedis(server=server), local_ttl=30)
+    second = RedisCacheBackend(client=fakeredis.FakeRedis(server=server), local_ttl=30)
+    try:
+        first.set('ETHUSD', {'price': 3000}, ttl=30)
+        assert second.get('ETHUSD') == {'price': 3000}
+        assert second.get('ETHUSD') == {'price': 3000}
+        assert second.get_stats()['local_hits'] == 1
+
+        first.set('ETHUSD', {'price': 3100}, ttl=30)
+        wait_until(lambda: second.get_stats()['invalidations'] >= 1)
+        assert second.get('ETHUSD') == {'price': 3100}
+    finally:
+        first.close()
+        second.close()
+
+
+def test_create_cache_backend_by_name(tmp_path):
+    assert create_cache_backend('none') is None
+    assert isinstance(create_cache_backend('memory'), MemoryCacheBackend)
+    file_backend = create_cache_backend('file', path=str(tmp_path / 'cache.mmap'), slots=8, slot_size=256)
+    assert file_backend.shared
+    file_backend.close()
+    with pytest.raises(ValueError):
+        create_cache_backend('memcached')
+
+
+def test_signal_cache_reads_shared_backend_through_offload(tmp_path):
+    path = str(tmp_path / 'cache.mmap')
+    writer = SignalCache(backend=FileCacheBackend(path, slots=64, slot_size=512))
+    offloaded = []
+
+    async def offload(func, *args):
+        offloaded.append(func.__name__)
+        return await asyncio.to_thread(func, *args)
+
+    reader = SignalCache(backend=FileCacheBackend(path, slots=64, slot_size=512), offload=offload)
+    try:
+        writer.set('BTCUSD', {'signal': 'BUY'})
+        writer.set('ETHUSD', {'signal': 'SELL'})
+        writer.backend.flush()
+
+        async def main():
+            entry = await reader.get_entry_async('BTCUSD', max_age=30)
+            loaded = await reader.prefetch_async(['BTCUSD', 'ETHUSD', 'LTCUSD'], max_age=30)
+            missing = await reader.get_entry_async('LTCUSD', max_age=30)
+            return entry, loaded, missing
+
+        entry, loaded, missing = asyncio.run(main())
+        assert entry.value == {'signal': 'BUY'}
+        assert loaded == 1
+        assert missing is None
+        assert reader.get_entry('ETHUSD').value == {'signal': 'SELL'}
+        assert offloaded == ['_get_shared', '_prefetch_missing', '_get_shared']
+        stats = reader.get_stats()
+        assert stats['shared_hits'] == 2 and stats['misses'] == 1
+    finally:
+        writer.backend.close()
+        reader.backend.close()
@@ -0,0 +1,113 @@
+"""
+Tests for the bounded TTL/LRU signal cache
+"""
+
+import asyncio
+
+from shared_cache import MemoryCacheBackend
+from signal_cache import SignalCache
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_least_recently_used_entries_are_evicted_first():
+    evicted = []
+    cache = SignalCache(max_entries=3, on_evict=evicted.append, clock=FakeClock())
+    for key in ('BTC', 'ETH', 'LTC'):
+        cache.set(key, key.lower())
+    assert cache.get('BTC') == 'btc'  # BTC becomes the most recently used
+    cache.set('XRP', 'xrp')
+    cache.set('ADA', 'ada')
+    assert evicted == ['ETH', 'LTC']
+    assert list(cache.entries) == ['BTC', 'XRP', 'ADA']
+    assert cache.get_stats()['evictions'] == 2
+
+
+def test_entries_age_on_the_injected_clock():
+    clock = FakeClock()
+    cache = SignalCache(clock=clock)
+    cache.set('BTC', 'btc')
+    clock.now += 4
+    assert cache.age('BTC') == 4
+    assert cache.get('BTC', max_age=5) == 'btc'
+    clock.now += 2
+    assert cache.get('BTC', max_age=5) is None
+    assert 'BTC' in cache  # stale entries stay for the refresher to replace
+    stats = cache.get_stats()
+    assert (stats['hits'], stats['misses'], stats['stale']) == (1, 1, 1)
+
+
+def test_purge_idle_keeps_recently_read_entries():
+    clock = FakeClock()
+    evicted = []
+    cache = SignalCache(max_idle=60, on_evict=evicted.append, clock=clock)
+    cache.set('BTC', 'btc')
+    cache.set('ETH', 'eth')
+    clock.now += 50
+    cache.get('BTC')
+    clock.now += 20
+    assert cache.purge_idle() == 1
+    assert evicted == ['ETH'] and list(cache.entries) == ['BTC']
+    assert cache.get_stats()['idle_evictions'] == 1
+
+
+def test_on_evict_runs_outside_the_lock():
+    clock = FakeClock()
+    held = []
+    cache = SignalCache(max_entries=1, max_idle=10,
+                        on_evict=lambda key: held.append(cache.lock.locked()), clock=clock)
+    cache.set('BTC', 'btc')
+    cache.set('ETH', 'eth')
+    clock.now += 11
+    cache.purge_idle()
+    assert held == [False, False]
+
+
+def test_lazy_entry_builds_once_and_only_when_read():
+    builds = []
+
+    def build():
+        builds.append('BTC')
+        return {'signal': 'BUY'}, b'{"signal":"BUY"}'
+
+    cache = SignalCache(max_entries=1, clock=FakeClock())
+    cache.set_lazy('ETH', lambda: builds.append('ETH'))
+    entry = cache.set_lazy('BTC', build)  # evicts ETH before anyone read it
+    assert builds == []
+    assert entry.encoded == b'{"signal":"BUY"}'
+    assert cache.get('BTC') == {'signal': 'BUY'}
+    assert builds == ['BTC'] and entry.build is None
+
+
+def test_lazy_entry_is_built_for_a_shared_backend():
+    backend = MemoryCacheBackend()
+    cache = SignalCache(backend=backend, clock=FakeClock())
+    cache.set_lazy('BTC', lambda: ({'signal': 'SELL'}, None))
+    assert cache.entries['BTC'].build is None
+    backend.close()
+    assert backend.get('BTC')['value'] == {'signal': 'SELL'}
+
+
+def test_async_lookups_degrade_to_a_miss_when_offload_fails():
+    async def refuse(func, *args):
+        raise RuntimeError('executor queue full')
+
+    backend = MemoryCacheBackend()
+    writer = SignalCache(backend=backend)
+    writer.set('BTC', 'btc')
+    backend.close()
+    reader = SignalCache(backend=backend, offload=refuse)
+
+    async def main():
+        return await reader.get_entry_async('BTC'), await reader.prefetch_async(['BTC', 'ETH'])
+
+    assert asyncio.run(main()) == (None, 0)
+    stats = reader.get_stats()
+    assert stats['shared_errors'] == 2 and stats['misses'] == 1
+    assert reader.get('BTC') == 'btc'  # the synchronous path still reaches the backend
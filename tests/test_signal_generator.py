@@ -0,0 +1,35 @@
+"""
+Tests for the enhanced signal generator
+"""
+
+import datetime as dt
+
+import enhanced_signal_generator
+from enhanced_signal_generator import EnhancedSignalGenerator
+
+
+class FixedDatetime(dt.datetime):
+    @classmethod
+    def now(cls, tz=None):
+        return cls(2026, 10, 16, 12, 34, 56)
+
+
+def test_single_signal_matches_a_one_symbol_pass(monkeypatch):
+    monkeypatch.setattr(enhanced_signal_generator, 'datetime', FixedDatetime)
+    scalar = EnhancedSignalGenerator(seed=7)
+    vectorized = EnhancedSignalGenerator(seed=7)
+    for _ in range(50):
+        for symbol in ('BTC', 'XRP', 'NEWCOIN'):
+            assert scalar.generate_signal(symbol) == dict(vectorized.generate_signals([symbol])[symbol])
+    assert scalar.prices.tolist() == vectorized.prices.tolist()
+
+
+def test_batch_renders_analysis_on_read():
+    generator = EnhancedSignalGenerator(seed=1)
+    rendered = []
+    generator.generate_analysis = lambda *args: rendered.append(args[0]) or 'text'
+    batch = generator.generate_signals(['BTC', 'ETH', 'BTC'])
+    assert list(batch) == ['BTC', 'ETH']
+    assert batch['ETH']['signal'] in ('BUY', 'SELL', 'HOLD')
+    assert rendered == []
+    assert batch['ETH']['analysis'] == 'text' and rendered == ['ETH']
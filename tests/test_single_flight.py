@@ -0,0 +1,104 @@
+"""
+Tests for single-flight coalescing and lazily built signal cache entries
+"""
+
+import asyncio
+
+import pytest
+
+from signal_cache import SignalCache
+from single_flight import SingleFlight
+
+
+def test_batch_keys_coalesce_concurrent_misses():
+    flight = SingleFlight()
+    computed = []
+
+    async def generate_many(keys):
+        computed.append(('batch', keys))
+        await asyncio.sleep(0.05)
+        return {key: f"{key}-batch" for key in keys}
+
+    async def generate_one(key):
+        computed.append(('single', key))
+        return f"{key}-single"
+
+    async def main():
+        batch = asyncio.ensure_future(flight.do_many(['BTC', 'ETH', 'BTC'], generate_many))
+        await asyncio.sleep(0)
+        miss = await flight.do('ETH', lambda: generate_one('ETH'))
+        return await batch, miss
+
+    results, miss = asyncio.run(main())
+    assert results == {'BTC': 'BTC-batch', 'ETH': 'ETH-batch'}
+    assert miss == 'ETH-batch'
+    assert computed == [('batch', ['BTC', 'ETH'])]
+    assert flight.get_stats() == {'originated': 2, 'coalesced': 1, 'in_flight': 0, 'coalesce_ratio': 0.3333}
+
+
+def test_batch_skips_keys_already_in_flight():
+    flight = SingleFlight()
+
+    async def slow(value):
+        await asyncio.sleep(0.05)
+        return value
+
+    async def main():
+        single = asyncio.ensure_future(flight.do('BTC', lambda: slow('single')))
+        await asyncio.sleep(0)
+        batch = await flight.do_many(['BTC', 'ETH'], lambda keys: slow({key: 'batch' for key in keys}))
+        return await single, batch
+
+    single, batch = asyncio.run(main())
+    assert single == 'single'
+    assert batch == {'ETH': 'batch'}
+
+
+def test_batch_failures_reach_waiting_keys():
+    flight = SingleFlight()
+
+    async def partial(keys):
+        await asyncio.sleep(0.01)
+        return {'BTC': 1}
+
+    async def failing(keys):
+        await asyncio.sleep(0.01)
+        raise RuntimeError('generator down')
+
+    async def main():
+        batch = asyncio.ensure_future(flight.do_many(['BTC', 'ETH'], partial))
+        await asyncio.sleep(0)
+        with pytest.raises(KeyError):
+            await flight.do('ETH', lambda: asyncio.sleep(0, 'single'))
+        await batch
+
+        batch = asyncio.ensure_future(flight.do_many(['BTC'], failing))
+        await asyncio.sleep(0)
+        with pytest.raises(RuntimeError):
+            await flight.do('BTC', lambda: asyncio.sleep(0, 'single'))
+        with pytest.raises(RuntimeError):
+            await batch
+        assert flight.in_flight == {}
+
+    asyncio.run(main())
+
+
+def test_lazy_entries_build_on_first_read():
+    cache = SignalCache()
+    builds = []
+
+    def build(value):
+        def run():
+            builds.append(value)
+            return value, value.encode()
+        return run
+
+    entry = cache.set_lazy('BTC', build('first'))
+    cache.set_lazy('ETH', build('replaced'))
+    cache.set_lazy('ETH', build('second'))
+    assert builds == []
+
+    assert cache.get('BTC') == 'first'
+    assert entry.encoded == b'first'
+    assert cache.get_entry('ETH').encoded == b'second'
+    assert builds == ['first', 'second']